@@ -0,0 +1,170 @@
+# ruff: noqa: T201
+"""Benchmark bounded decoding before apparel color extraction.
+
+Decodes product JPEGs at full resolution and with the COLOR_MAX_SIDE cap
+(JPEG draft mode plus INTER_AREA), then segments and extracts the palette
+from each. Reports per-stage latency, the palette delta (symmetric mean
+nearest-color CIEDE2000) of the capped result against full resolution, and
+how well each palette represents the full-resolution apparel pixels (mean
+CIEDE2000 to the nearest palette color).
+
+The palette delta swings whenever a quantizer keeps a different one of two
+near-identical shades, so the --tolerance check is on the representation
+error: the capped palette may describe the full-resolution garment at most
+that much worse than the full-resolution palette does.
+
+Segmentation uses the MediaPipe model when --model points at it; otherwise
+a background threshold stands in and the stage is timed but not
+representative of the model.
+
+Run from the service root:
+    PYTHONPATH=../../shared:. python -m scripts.benchmark_color_downscale --output downscale.json
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from src.config import ServiceConfig
+from src.services.mediapipe_analyzer import MediaPipeAnalyzer
+
+from scripts.benchmark_color_quantizer import palette_delta, quantization_error, synthetic_garment
+from shared.utils.benchmark import StageTimer, encode_jpeg, environment_info, load_fixtures, write_report
+
+
+def product_photo(side: int, rng: np.random.Generator) -> np.ndarray:
+    """Synthetic garment on a white studio background, as Shopify product shots usually are"""
+    garment, mask = synthetic_garment(side, rng)
+    return np.where(mask[..., None] == 255, garment, 250).astype(np.uint8)
+
+
+def threshold_mask(image: np.ndarray) -> np.ndarray:
+    """Non-background pixels, standing in for the segmentation model"""
+    distance = np.abs(image.astype(np.int16) - 250).sum(axis=2)
+    return np.where(distance > 60, 255, 0).astype(np.uint8)
+
+
+def extract(
+    analyzer: MediaPipeAnalyzer, jpeg: bytes, max_side: int, timer: StageTimer, prefix: str
+) -> tuple[list, np.ndarray]:
+    """decode -> segment -> palette, timing each stage under prefix; returns the palette and apparel pixels (RGB)"""
+    with timer.stage(f"{prefix}.decode"):
+        image = analyzer._decode_bounded(jpeg, max_side)
+
+    with timer.stage(f"{prefix}.segmentation"):
+        if analyzer.config.model_path:
+            _, _, _, crop, mask = analyzer._segment_apparel(image)
+        else:
+            mask = threshold_mask(image)
+            crop = image
+
+    if crop is None or mask is None:
+        return [], np.empty((0, 3), np.uint8)
+
+    with timer.stage(f"{prefix}.palette"):
+        palette = analyzer._extract_apparel_palette_lab(
+            mask, crop, analyzer.config.default_colors, analyzer.config.sample_size, analyzer.config.min_chroma
+        )
+    return palette, crop[mask == 255][:, ::-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sides", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument("--fixtures", help="directory of real product images to run instead of synthetic ones")
+    parser.add_argument("--max-side", type=int, default=512, help="COLOR_MAX_SIDE under test")
+    parser.add_argument("--model", help="MediaPipe segmentation model (.tflite)")
+    # Defaults to the service's COLOR_QUANTIZER, so the tolerance check covers production
+    parser.add_argument("--quantizer", default=ServiceConfig.model_fields["color_quantizer"].default)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--tolerance", type=float, default=1.0, help="max pixel ΔE increase of the capped palette over full resolution"
+    )
+    parser.add_argument("--output", help="JSON report path ('-' for stdout)")
+    args = parser.parse_args()
+
+    config = SimpleNamespace(
+        model_path=args.model,
+        color_quantizer=args.quantizer,
+        color_max_side=args.max_side,
+        default_colors=5,
+        sample_size=20000,
+        min_chroma=5.0,
+    )
+    analyzer = MediaPipeAnalyzer(config, logging.getLogger("benchmark"))
+    if args.model:
+        analyzer.create_segmenters(1)
+
+    if args.fixtures:
+        images = load_fixtures(args.fixtures)
+    else:
+        rng = np.random.default_rng(5)
+        images = [(f"synthetic_{side}", encode_jpeg(product_photo(side, rng))) for side in args.sides]
+
+    if not args.model:
+        print("no --model: segmentation is a background threshold, not the MediaPipe model")
+
+    results = []
+    failed = False
+    print(f"{'image':<18} {'stage':<13} {'full ms':>9} {'capped ms':>10} {'speedup':>8}")
+    for name, jpeg in images:
+        timer = StageTimer()
+        for _ in range(args.repeat):
+            reference, pixels = extract(analyzer, jpeg, 0, timer, "full")
+            palette, _ = extract(analyzer, jpeg, args.max_side, timer, "capped")
+
+        delta = palette_delta(reference, palette)
+        # About 20k full-resolution apparel pixels keep the CIEDE2000 matrix small
+        sample = pixels[:: max(1, len(pixels) // 20000)]
+        error_full, error_capped = quantization_error(sample, reference), quantization_error(sample, palette)
+        within = bool(error_capped - error_full <= args.tolerance)
+        failed |= not within
+        stages = timer.summary()
+
+        for stage in ("decode", "segmentation", "palette"):
+            full, capped = stages.get(f"full.{stage}"), stages.get(f"capped.{stage}")
+            if not full or not capped:
+                continue
+            print(
+                f"{name:<18} {stage:<13} {full['p50_ms']:>9.1f} {capped['p50_ms']:>10.1f} "
+                f"{full['p50_ms'] / max(capped['p50_ms'], 1e-3):>8.1f}"
+            )
+        print(
+            f"{name:<18} palette ΔE vs full {delta:.2f}, pixel ΔE full {error_full:.2f} / capped {error_capped:.2f}"
+            f" -> {'ok' if within else 'OVER TOLERANCE'}"
+        )
+
+        results.append(
+            {
+                "image": name,
+                "bytes": len(jpeg),
+                "stages": stages,
+                "palette_full": reference,
+                "palette_capped": palette,
+                "palette_delta_e": round(delta, 3),
+                "pixel_delta_e_full": round(error_full, 3),
+                "pixel_delta_e_capped": round(error_capped, 3),
+                "within_tolerance": within,
+            }
+        )
+
+    write_report(
+        args.output,
+        {
+            "benchmark": "catalog-ai-analyzer.color_downscale",
+            "environment": environment_info(),
+            "max_side": args.max_side,
+            "model": Path(args.model).name if args.model else None,
+            "tolerance": args.tolerance,
+            "results": results,
+        },
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
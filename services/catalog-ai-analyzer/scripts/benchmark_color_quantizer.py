@@ -0,0 +1,95 @@
+# ruff: noqa: T201
+"""Benchmark apparel palette extraction across color quantizers.
+
+Uses synthetic garment crops (striped/patterned regions with noise and a
+binary apparel mask) so no segmentation model is needed. Reports latency,
+palette delta against the legacy KMeans(n_init=8) palette (symmetric mean
+nearest-color CIEDE2000) and each palette's pixel quantization error.
+
+Run from the service root:
+    PYTHONPATH=../../shared:. python -m scripts.benchmark_color_quantizer
+"""
+
+import argparse
+import logging
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from src.services.mediapipe_analyzer import MediaPipeAnalyzer
+
+from shared.color import QUANTIZER_METHODS, delta_e_ciede2000, rgb_to_lab
+
+GARMENT_COLORS_BGR = [[40, 40, 160], [200, 190, 180], [60, 110, 30], [20, 20, 20], [90, 160, 220], [150, 60, 120]]
+
+
+def synthetic_garment(side: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Horizontal color bands with noise inside an elliptical apparel mask"""
+    bands = rng.choice(len(GARMENT_COLORS_BGR), size=8)
+    rows = np.repeat(bands, -(-side // len(bands)))[:side]
+    image = np.asarray(GARMENT_COLORS_BGR)[rows][:, None, :].repeat(side, axis=1)
+    image = np.clip(image + rng.normal(0, 10, size=image.shape), 0, 255).astype(np.uint8)
+
+    yy, xx = np.mgrid[:side, :side]
+    inside = ((yy - side / 2) / (side * 0.48)) ** 2 + ((xx - side / 2) / (side * 0.35)) ** 2 <= 1
+    mask = np.where(inside, 255, 0).astype(np.uint8)
+    return image, mask
+
+
+def palette_delta(reference: list, candidate: list) -> float:
+    """Symmetric mean nearest-color CIEDE2000 between two palettes"""
+    if not reference or not candidate:
+        return float("nan")
+    distances = delta_e_ciede2000(rgb_to_lab(np.asarray(reference))[:, None], rgb_to_lab(np.asarray(candidate))[None])
+    return float((distances.min(axis=1).mean() + distances.min(axis=0).mean()) / 2)
+
+
+def quantization_error(pixels_rgb: np.ndarray, palette: list) -> float:
+    """Mean CIEDE2000 from pixels to their nearest palette color"""
+    if not palette:
+        return float("nan")
+    distances = delta_e_ciede2000(rgb_to_lab(pixels_rgb)[:, None], rgb_to_lab(np.asarray(palette))[None])
+    return float(distances.min(axis=1).mean())
+
+
+def analyzer(method: str) -> MediaPipeAnalyzer:
+    return MediaPipeAnalyzer(SimpleNamespace(color_quantizer=method), logging.getLogger("benchmark"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sides", type=int, nargs="+", default=[512, 1024, 2048])
+    parser.add_argument("--n-colors", type=int, default=5)
+    parser.add_argument("--sample-size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+
+    def run(a: MediaPipeAnalyzer, image: np.ndarray, mask: np.ndarray, repeat: int):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            palette = a._extract_apparel_palette_lab(mask, image, args.n_colors, args.sample_size)
+        return palette, (time.perf_counter() - start) / repeat * 1000
+
+    # Warm up sklearn/BLAS
+    run(analyzer("kmeans"), *synthetic_garment(64, rng), 1)
+
+    print(f"{'side':>6} {'method':<10} {'ms':>9} {'speedup':>8} {'ΔE vs legacy':>13} {'pixel ΔE':>9}")
+    for side in args.sides:
+        image, mask = synthetic_garment(side, rng)
+        pixels_rgb = image[mask == 255][::97, ::-1]
+        reference, legacy_ms = run(analyzer("kmeans"), image, mask, args.repeat)
+
+        for method in QUANTIZER_METHODS:
+            palette, ms = (
+                (reference, legacy_ms) if method == "kmeans" else run(analyzer(method), image, mask, args.repeat)
+            )
+            print(
+                f"{side:>6} {method:<10} {ms:>9.1f} {legacy_ms / ms:>8.1f} "
+                f"{palette_delta(reference, palette):>13.2f} {quantization_error(pixels_rgb, palette):>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
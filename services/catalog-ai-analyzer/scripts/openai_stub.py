@@ -0,0 +1,147 @@
+# ruff: noqa: T201
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Answers POST /v1/chat/completions with canned attribute JSON: one object
+for a single image, {"items": [...]} for several. Can rate limit like the
+real API (429 with Retry-After once more than --rpm requests arrive in a
+minute) and add latency, so batching, the shared token bucket and the
+attribute cache can be exercised without an API key.
+
+Run from the service root, then point the analyzer at it:
+    python -m scripts.openai_stub --port 8089 --rpm 60
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 ...
+
+GET /stats returns the request and image counts seen so far.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ATTRIBUTES = {
+    "category": "shirts",
+    "subcategory": "casual-shirts",
+    "description": "Striped cotton shirt",
+    "gender": "unisex",
+    "attributes": {
+        "colors": [{"name": "navy", "hex": "#1F2A44", "confidence": 0.9}],
+        "patterns": [{"name": "striped", "confidence": 0.8}],
+        "styles": [{"name": "casual", "confidence": 0.85}],
+        "materials": [{"name": "cotton", "confidence": 0.7}],
+        "season": ["spring", "summer"],
+        "occasion": ["casual"],
+    },
+}
+
+
+class StubState:
+    def __init__(self, rpm: int, latency: float):
+        self.rpm = rpm
+        self.latency = latency
+        self.requests = 0
+        self.images = 0
+        self.rate_limited = 0
+        self._recent: deque = deque()
+        self._lock = threading.Lock()
+
+    def admit(self) -> float:
+        """0 if the request is within the limit, else seconds until it would be"""
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                self.rate_limited += 1
+                return 60 - (now - self._recent[0])
+            self._recent.append(now)
+            return 0.0
+
+    def record(self, images: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.images += images
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "images": self.images, "rate_limited": self.rate_limited}
+
+
+def make_handler(state: StubState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path != "/stats":
+                self._reply(404, {"error": {"message": "not found"}})
+                return
+            self._reply(200, state.stats())
+
+        def do_POST(self) -> None:
+            if self.path != "/v1/chat/completions":
+                self._reply(404, {"error": {"message": "not found"}})
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+            wait = state.admit()
+            if wait:
+                self._reply(
+                    429,
+                    {"error": {"message": "rate limited"}},
+                    {"Retry-After": f"{wait:.0f}", "retry-after-ms": f"{wait * 1000:.0f}"},
+                )
+                return
+
+            images = sum(1 for part in payload["messages"][0]["content"] if part.get("type") == "image_url")
+            state.record(images)
+            time.sleep(state.latency)
+
+            if images == 1:
+                content = ATTRIBUTES
+            else:
+                content = {"items": [{"index": index, **ATTRIBUTES} for index in range(images)]}
+            self._reply(200, {"choices": [{"message": {"role": "assistant", "content": json.dumps(content)}}]})
+
+        def _reply(self, status: int, body: dict, headers: dict | None = None) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def serve(port: int, rpm: int = 0, latency: float = 0.0) -> tuple[ThreadingHTTPServer, StubState]:
+    """Start the stub on a background thread; port 0 picks a free one (see server.server_port)"""
+    state = StubState(rpm, latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before answering 429 (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per request")
+    args = parser.parse_args()
+
+    server, state = serve(args.port, args.rpm, args.latency)
+    print(f"OpenAI stub on http://127.0.0.1:{server.server_port}/v1 (rpm={args.rpm or 'unlimited'})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(state.stats())
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
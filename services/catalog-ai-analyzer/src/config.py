@@ -40,20 +40,62 @@ class ServiceConfig(BaseModel):
     openai_model: str = Field(default="gpt-4-vision-preview", alias="OPENAI_VISION_MODEL")
     openai_max_retries: int = Field(default=3, alias="OPENAI_MAX_RETRIES")
     openai_timeout_seconds: int = Field(default=30, alias="OPENAI_TIMEOUT_SECONDS")
+    openai_base_url: str = Field(default="https://api.openai.com/v1", alias="OPENAI_BASE_URL")
+    # Shared by every worker; a 429 pauses all of them for the server's Retry-After
+    openai_requests_per_minute: int = Field(default=500, alias="OPENAI_REQUESTS_PER_MINUTE")
+    openai_request_burst: int = 10
+    # Cache misses wait up to openai_batch_wait_ms to share a request with others (1 = no batching)
+    openai_batch_size: int = Field(default=4, alias="OPENAI_BATCH_SIZE")
+    openai_batch_wait_ms: int = 200
+    # Results by image content and prompt version, in a JetStream KV bucket
+    openai_cache_ttl_seconds: int = Field(default=30 * 24 * 60 * 60, alias="OPENAI_CACHE_TTL_SECONDS")
+
+    # Stamped on results; catalog-service re-analyzes everything when it changes
+    analysis_model_version: str = Field(default="v1.0.0", alias="CATALOG_ANALYSIS_MODEL_VERSION")
 
     # MediaPipe Configuration
     model_path: str = Field(default="models/selfie_multiclass_256x256.tflite", alias="MEDIAPIPE_MODEL_PATH")
 
     # Processing Configuration
-    max_concurrent_items: int = Field(default=5, alias="MAX_CONCURRENT_ITEMS")
+    # Items in flight across all batches, shared round-robin between merchants
+    max_concurrent_items: int = Field(default=24, alias="MAX_CONCURRENT_ITEMS")
     max_batch_size: int = Field(default=20, alias="MAX_BATCH_SIZE")
     image_download_timeout: int = Field(default=10, alias="IMAGE_DOWNLOAD_TIMEOUT")
     analysis_timeout_per_item: int = Field(default=30, alias="ANALYSIS_TIMEOUT_PER_ITEM")
 
+    # Per-stage limits inside the item pool: downloads and OpenAI calls are I/O bound,
+    # color extraction runs on color_workers threads, each with its own segmenter
+    download_concurrency: int = Field(default=16, alias="CATALOG_AI_DOWNLOAD_CONCURRENCY")
+    download_per_host: int = Field(default=8, alias="CATALOG_AI_DOWNLOAD_PER_HOST")
+    image_download_http2: bool = True
+    # Shopify CDN images are requested at this width (0 = original upload)
+    shopify_cdn_max_width: int = Field(default=1024, alias="CATALOG_AI_CDN_MAX_WIDTH")
+    color_workers: int = Field(default=min(4, os.cpu_count() or 1), alias="CATALOG_AI_COLOR_WORKERS")
+    openai_concurrency: int = Field(default=8, alias="CATALOG_AI_OPENAI_CONCURRENCY")
+
+    # Batch requests handled at once; their items share the pool above
+    max_concurrent_batches: int = Field(default=4, alias="CATALOG_AI_MAX_CONCURRENT_BATCHES")
+    # Progress is saved every N finished items so a redelivered request resumes
+    batch_checkpoint_interval: int = 50
+    batch_checkpoint_ttl_seconds: int = 24 * 60 * 60
+    batch_in_progress_interval_seconds: float = 10.0
+
+    # Downloaded images, content-addressed on disk; revalidated with ETag/Last-Modified once stale
+    image_cache_enabled: bool = Field(default=True, alias="CATALOG_AI_IMAGE_CACHE_ENABLED")
+    image_cache_dir: str = Field(default="/tmp/catalog-ai-images", alias="CATALOG_AI_IMAGE_CACHE_DIR")
+    image_cache_max_bytes: int = Field(default=1024 * 1024 * 1024, alias="CATALOG_AI_IMAGE_CACHE_MAX_BYTES")
+    image_cache_fresh_seconds: int = 3600
+    # Analyzer results kept per image digest, so variants sharing an image are analyzed once
+    image_result_cache_size: int = 4096
+
     # Color extraction settings (from legacy)
     default_colors: int = Field(default=5, alias="DEFAULT_COLORS")
     sample_size: int = Field(default=20000, alias="COLOR_SAMPLE_SIZE")
     min_chroma: float = Field(default=5.0, alias="MIN_CHROMA")
+    # kmeans | minibatch | histogram; minibatch/histogram are faster but drift from the kmeans palette
+    color_quantizer: str = Field(default="kmeans", alias="COLOR_QUANTIZER")
+    # Long-side cap before segmentation (the model runs at 256x256); JPEGs decode at reduced scale. 0 = full size
+    color_max_side: int = Field(default=512, alias="COLOR_MAX_SIDE")
 
     # API configuration
     api_host: str = "0.0.0.0"
@@ -4,9 +4,11 @@ import asyncio
 from shared.messaging.jetstream_client import JetStreamClient
 from shared.utils.logger import ServiceLogger
 from .config import ServiceConfig
+from .services.batch_checkpoints import BatchCheckpointStore
 from .services.catalog_ai_service import CatalogAIService
 from .services.mediapipe_analyzer import MediaPipeAnalyzer
 from .services.openai_analyzer import OpenAIAnalyzer
+from .services.attribute_cache import AttributeCache
 from .events.publishers import CatalogAIPublisher
 from .events.listeners import CatalogAnalysisRequestedListener
 
@@ -25,6 +27,8 @@ class ServiceLifecycle:
         self.openai_analyzer: Optional[OpenAIAnalyzer] = None
         self.catalog_ai_service: Optional[CatalogAIService] = None
         self.event_publisher: Optional[CatalogAIPublisher] = None
+        self.batch_checkpoints: Optional[BatchCheckpointStore] = None
+        self.attribute_cache: Optional[AttributeCache] = None
         
         # Listeners
         self._listeners: List = []
@@ -36,12 +40,16 @@ class ServiceLifecycle:
             
             # 1. Messaging
             await self._init_messaging()
+            await self._init_checkpoints()
+            await self._init_attribute_cache()
             
             # 2. Analyzers
             self._init_analyzers()
+            await self.mediapipe_analyzer.start()
             
             # 3. Main service
             self._init_service()
+            await self.catalog_ai_service.start()
             
             # 4. Event listeners
             await self._init_listeners()
@@ -68,6 +76,9 @@ class ServiceLifecycle:
         if self.openai_analyzer:
             await self.openai_analyzer.close()
         
+        if self.mediapipe_analyzer:
+            self.mediapipe_analyzer.close()
+        
         if self.catalog_ai_service:
             await self.catalog_ai_service.close()
         
@@ -94,6 +105,24 @@ class ServiceLifecycle:
         
         self.logger.info("Messaging initialized")
     
+    async def _init_checkpoints(self) -> None:
+        """Batch progress store, so redelivered analysis requests resume"""
+        self.batch_checkpoints = BatchCheckpointStore(
+            js_client=self.messaging_client,
+            config=self.config,
+            logger=self.logger
+        )
+        await self.batch_checkpoints.start()
+    
+    async def _init_attribute_cache(self) -> None:
+        """OpenAI results by image content, shared by all replicas"""
+        self.attribute_cache = AttributeCache(
+            js_client=self.messaging_client,
+            config=self.config,
+            logger=self.logger
+        )
+        await self.attribute_cache.start()
+    
     def _init_analyzers(self) -> None:
         """Initialize MediaPipe and OpenAI analyzers"""
         self.mediapipe_analyzer = MediaPipeAnalyzer(
@@ -103,7 +132,8 @@ class ServiceLifecycle:
         
         self.openai_analyzer = OpenAIAnalyzer(
             config=self.config,
-            logger=self.logger
+            logger=self.logger,
+            cache=self.attribute_cache
         )
         
         self.logger.info("Analyzers initialized")
@@ -114,25 +144,12 @@ class ServiceLifecycle:
             config=self.config,
             mediapipe=self.mediapipe_analyzer,
             openai=self.openai_analyzer,
-            logger=self.logger
+            logger=self.logger,
+            # analysis_completed is published per item as the batch streams results
+            publisher=self.event_publisher,
+            checkpoints=self.batch_checkpoints
         )
         
-        # Wrap service to publish events after each item
-        original_analyze = self.catalog_ai_service.analyze_single_item
-        
-        async def wrapped_analyze(merchant_id, correlation_id, item):
-            result = await original_analyze(merchant_id, correlation_id, item)
-            
-            # Publish analysis completed event
-            await self.event_publisher.analysis_completed(
-                payload=result,
-                correlation_id=correlation_id
-            )
-            
-            return result
-        
-        self.catalog_ai_service.analyze_single_item = wrapped_analyze
-        
         self.logger.info("Catalog AI service initialized")
     
     async def _init_listeners(self) -> None:
@@ -141,6 +158,7 @@ class ServiceLifecycle:
             js_client=self.messaging_client,
             publisher=self.event_publisher,
             service=self.catalog_ai_service,
+            config=self.config,
             logger=self.logger
         )
         
@@ -11,6 +11,8 @@ class AnalysisItem(BaseModel):
     product_id: str  # Platform product ID (e.g., "8526062977266")
     variant_id: str  # Platform variant ID (e.g., "46547096469746")
     image_url: str
+    # SHA-256 of the image last analyzed under the current model version; an identical download is not re-analyzed
+    image_hash: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
 class AnalysisConfig(BaseModel):
@@ -60,7 +62,10 @@ class ItemAnalysisResult(BaseModel):
     variant_id: str
     correlation_id: str
     service_version: str = "v1.0.0"
-    status: str  # success|partial|failed
+    model_version: Optional[str] = None
+    status: str  # success|partial|failed|unchanged
+    image_url: Optional[str] = None
+    image_hash: Optional[str] = None
     category: Optional[str] = None
     subcategory: Optional[str] = None
     description: Optional[str] = None
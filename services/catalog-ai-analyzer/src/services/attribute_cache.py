@@ -0,0 +1,76 @@
+# services/catalog-ai-analyzer/src/services/attribute_cache.py
+import json
+import re
+from typing import Any
+
+from nats.js.api import KeyValueConfig, StorageType
+from nats.js.errors import BucketNotFoundError, KeyNotFoundError
+from nats.js.kv import KeyValue
+
+from shared.messaging.jetstream_client import JetStreamClient
+from shared.utils.logger import ServiceLogger
+
+from ..config import ServiceConfig
+from ..schemas.analysis import AttributeResult
+
+
+class AttributeCache:
+    """OpenAI attribute results in a JetStream KV bucket, keyed by image content.
+
+    Keys combine the prompt version, the model and the image SHA-256, so a
+    re-sync or another product using the same image never calls the API
+    again, while a prompt or model change starts a fresh keyspace. Shared by
+    every replica.
+    """
+
+    bucket = "catalog-ai-attributes"
+
+    def __init__(self, js_client: JetStreamClient, config: ServiceConfig, logger: ServiceLogger):
+        self.js_client = js_client
+        self.config = config
+        self.logger = logger
+        self._kv: KeyValue | None = None
+
+    async def start(self) -> None:
+        """Open the bucket, creating it with a TTL on first use"""
+        try:
+            self._kv = await self.js_client.js.key_value(self.bucket)
+        except BucketNotFoundError:
+            self._kv = await self.js_client.js.create_key_value(
+                config=KeyValueConfig(
+                    bucket=self.bucket,
+                    ttl=self.config.openai_cache_ttl_seconds,
+                    storage=StorageType.FILE,
+                )
+            )
+            self.logger.info(f"Created key-value bucket '{self.bucket}'")
+
+    @property
+    def kv(self) -> KeyValue:
+        if not self._kv:
+            raise RuntimeError("Attribute cache not started")
+        return self._kv
+
+    @staticmethod
+    def key(prompt_version: str, model: str, digest: str) -> str:
+        # KV keys allow [-/_=.a-zA-Z0-9]
+        return re.sub(r"[^-/_=a-zA-Z0-9]", "_", f"{prompt_version}.{model}") + f".{digest}"
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            entry = await self.kv.get(key)
+        except KeyNotFoundError:
+            return None
+        if not entry.value:
+            return None
+
+        data = json.loads(entry.value)
+        if data.get("attributes") is not None:
+            data["attributes"] = AttributeResult(**data["attributes"])
+        return data
+
+    async def put(self, key: str, result: dict[str, Any]) -> None:
+        data = dict(result)
+        if isinstance(data.get("attributes"), AttributeResult):
+            data["attributes"] = data["attributes"].model_dump()
+        await self.kv.put(key, json.dumps(data, separators=(",", ":")).encode())
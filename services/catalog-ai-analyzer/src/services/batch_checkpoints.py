@@ -0,0 +1,99 @@
+# services/catalog-ai-analyzer/src/services/batch_checkpoints.py
+import json
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from nats.js.api import KeyValueConfig, StorageType
+from nats.js.errors import BucketNotFoundError, KeyNotFoundError
+from nats.js.kv import KeyValue
+
+from shared.messaging.jetstream_client import JetStreamClient
+from shared.utils.logger import ServiceLogger
+
+from ..config import ServiceConfig
+
+
+@dataclass
+class BatchCheckpoint:
+    """Items of one sync batch that already finished (and had their event published)"""
+
+    done: dict[str, str] = field(default_factory=dict)  # item_id -> success|partial|failed|unchanged
+    completed: bool = False
+    unsaved: int = 0
+
+    def record(self, item_id: str, status: str) -> None:
+        self.done[item_id] = status
+        self.unsaved += 1
+
+    def counts(self) -> tuple[int, int, int]:
+        """(processed, failed, partial) as reported in batch_completed"""
+        statuses = list(self.done.values())
+        processed = statuses.count("success") + statuses.count("unchanged")
+        return processed, statuses.count("failed"), statuses.count("partial")
+
+    def to_bytes(self) -> bytes:
+        by_status: dict[str, list] = {}
+        for item_id, status in self.done.items():
+            by_status.setdefault(status, []).append(item_id)
+        return json.dumps({"completed": self.completed, "done": by_status}, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BatchCheckpoint":
+        raw = json.loads(data)
+        done = {item_id: status for status, item_ids in raw.get("done", {}).items() for item_id in item_ids}
+        return cls(done=done, completed=raw.get("completed", False))
+
+
+class BatchCheckpointStore:
+    """Batch progress in a JetStream KV bucket, keyed by merchant and sync.
+
+    A redelivered analysis request skips items recorded here, and a batch
+    already marked completed only re-reports its counts. Items that finished
+    after the last save are analyzed and published again (at-least-once).
+    """
+
+    bucket = "catalog-ai-batch-checkpoints"
+
+    def __init__(self, js_client: JetStreamClient, config: ServiceConfig, logger: ServiceLogger):
+        self.js_client = js_client
+        self.config = config
+        self.logger = logger
+        self._kv: KeyValue | None = None
+
+    async def start(self) -> None:
+        """Open the bucket, creating it with a TTL on first use"""
+        try:
+            self._kv = await self.js_client.js.key_value(self.bucket)
+        except BucketNotFoundError:
+            self._kv = await self.js_client.js.create_key_value(
+                config=KeyValueConfig(
+                    bucket=self.bucket,
+                    ttl=self.config.batch_checkpoint_ttl_seconds,
+                    storage=StorageType.FILE,
+                )
+            )
+            self.logger.info(f"Created key-value bucket '{self.bucket}'")
+
+    @property
+    def kv(self) -> KeyValue:
+        if not self._kv:
+            raise RuntimeError("Batch checkpoint store not started")
+        return self._kv
+
+    @staticmethod
+    def _key(merchant_id: UUID, sync_id: UUID) -> str:
+        return f"{merchant_id}.{sync_id}"
+
+    async def load(self, merchant_id: UUID, sync_id: UUID) -> BatchCheckpoint:
+        """Saved progress, or an empty checkpoint for a new batch"""
+        try:
+            entry = await self.kv.get(self._key(merchant_id, sync_id))
+        except KeyNotFoundError:
+            return BatchCheckpoint()
+        if not entry.value:
+            return BatchCheckpoint()
+        return BatchCheckpoint.from_bytes(entry.value)
+
+    async def save(self, merchant_id: UUID, sync_id: UUID, checkpoint: BatchCheckpoint) -> None:
+        await self.kv.put(self._key(merchant_id, sync_id), checkpoint.to_bytes())
+        checkpoint.unsaved = 0
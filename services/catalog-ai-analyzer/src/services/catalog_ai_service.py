@@ -1,47 +1,156 @@
 # services/catalog-ai-analyzer/src/services/catalog_ai_service.py
 import asyncio
 import time
-from typing import Optional, Dict
+from collections import OrderedDict
+from functools import partial
+from typing import Optional, Dict, List, Tuple
 from uuid import UUID
-import httpx
 from shared.utils.logger import ServiceLogger
 from ..config import ServiceConfig
+from ..events.publishers import CatalogAIPublisher
 from ..schemas.analysis import (
     AnalysisItem, ItemAnalysisResult, AnalysisMetadata,
     PreciseColors
 )
+from .batch_checkpoints import BatchCheckpoint, BatchCheckpointStore
+from .fair_scheduler import MerchantFairScheduler
 from .mediapipe_analyzer import MediaPipeAnalyzer
 from .openai_analyzer import OpenAIAnalyzer
 
-from ..utils.image_downloader import ImageDownloader
+from ..utils.image_cache import ImageCache
+from ..utils.image_downloader import DownloadedImage, ImageDownloader
 from ..exceptions import (
     ImageDownloadError,
-    AnalysisTimeoutError,
     BothAnalyzersFailedError,
     MissingProductIdentifiersError,
 )
 
 class CatalogAIService:
-    """Main orchestrator for catalog AI analysis"""
+    """Main orchestrator for catalog AI analysis.
+
+    Items from every in-flight batch share one worker pool scheduled
+    round-robin per merchant; inside an item, downloads, color extraction
+    (worker threads) and OpenAI calls each have their own concurrency limit.
+    """
     
     def __init__(
         self,
         config: ServiceConfig,
         mediapipe: MediaPipeAnalyzer,
         openai: OpenAIAnalyzer,
-        logger: ServiceLogger
+        logger: ServiceLogger,
+        publisher: Optional[CatalogAIPublisher] = None,
+        checkpoints: Optional[BatchCheckpointStore] = None
     ):
         self.config = config
         self.mediapipe = mediapipe
         self.openai = openai
         self.logger = logger
+        self.publisher = publisher
+        self.checkpoints = checkpoints
         
         # Use the image downloader utility
+        self.image_cache = (
+            ImageCache(config.image_cache_dir, config.image_cache_max_bytes, logger)
+            if config.image_cache_enabled else None
+        )
         self.image_downloader = ImageDownloader(
             timeout=config.image_download_timeout,
             max_retries=3,
-            logger=logger
+            logger=logger,
+            cache=self.image_cache,
+            fresh_seconds=config.image_cache_fresh_seconds,
+            max_connections=config.download_concurrency,
+            max_per_host=config.download_per_host,
+            http2=config.image_download_http2,
+            cdn_max_width=config.shopify_cdn_max_width
         )
+        # Image digest -> analyzer task, shared by every variant using that image
+        self._image_results: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+        
+        self.scheduler = MerchantFairScheduler(workers=config.max_concurrent_items, logger=logger)
+        self._openai_slots = asyncio.Semaphore(config.openai_concurrency)
+        self._color_slots = asyncio.Semaphore(config.color_workers)
+    
+    async def start(self) -> None:
+        """Load the image cache index"""
+        if self.image_cache:
+            await asyncio.to_thread(self.image_cache.start)
+    
+    async def analyze_batch(
+        self,
+        merchant_id: UUID,
+        sync_id: UUID,
+        correlation_id: str,
+        items: List[AnalysisItem]
+    ) -> Tuple[int, int, int]:
+        """Analyze a sync batch, publishing each result as it finishes.
+        
+        Returns (processed, failed, partial) over the whole batch, including
+        items finished by earlier deliveries of the same request.
+        """
+        checkpoint = await self._load_checkpoint(merchant_id, sync_id)
+        if checkpoint.completed:
+            self.logger.info(f"Batch {sync_id} already completed, skipping analysis")
+            return checkpoint.counts()
+        
+        pending = [item for item in items if str(item.item_id) not in checkpoint.done]
+        if len(pending) < len(items):
+            self.logger.info(
+                f"Resuming batch {sync_id}: {len(items) - len(pending)} of {len(items)} items already analyzed"
+            )
+        
+        futures = [
+            self.scheduler.submit(
+                str(merchant_id), partial(self.analyze_single_item, merchant_id, correlation_id, item)
+            )
+            for item in pending
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(futures):
+                result = await next_result
+                await self._publish_result(result, correlation_id)
+                checkpoint.record(str(result.item_id), result.status)
+                
+                if checkpoint.unsaved >= self.config.batch_checkpoint_interval:
+                    await self._save_checkpoint(merchant_id, sync_id, checkpoint)
+        except Exception:
+            # Keep what finished so the redelivery resumes from here
+            for future in futures:
+                future.cancel()
+            await self._save_checkpoint(merchant_id, sync_id, checkpoint)
+            raise
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        
+        checkpoint.completed = True
+        await self._save_checkpoint(merchant_id, sync_id, checkpoint)
+        return checkpoint.counts()
+    
+    async def _publish_result(self, result: ItemAnalysisResult, correlation_id: str) -> None:
+        if self.publisher:
+            await self.publisher.analysis_completed(payload=result, correlation_id=correlation_id)
+    
+    async def _load_checkpoint(self, merchant_id: UUID, sync_id: UUID) -> BatchCheckpoint:
+        if not self.checkpoints:
+            return BatchCheckpoint()
+        try:
+            return await self.checkpoints.load(merchant_id, sync_id)
+        except Exception as e:
+            self.logger.warning(f"Batch checkpoint load failed, analyzing every item: {e}")
+            return BatchCheckpoint()
+    
+    async def _save_checkpoint(self, merchant_id: UUID, sync_id: UUID, checkpoint: BatchCheckpoint) -> None:
+        """Best effort: a lost checkpoint only means re-analyzing items on redelivery"""
+        if not self.checkpoints:
+            return
+        try:
+            await self.checkpoints.save(merchant_id, sync_id, checkpoint)
+        except Exception as e:
+            self.logger.warning(f"Batch checkpoint save failed: {e}")
     
     async def analyze_single_item(
         self,
@@ -68,29 +177,20 @@ class CatalogAIService:
             # Download image using the utility
             download_start = time.perf_counter()
             try:
-                image_bytes = await self.image_downloader.download(item.image_url)
+                image = await self.image_downloader.fetch(item.image_url)
             except Exception as e:
                 raise ImageDownloadError(
-                    f"Failed to download image: {str(e)}",
+                    f"Failed to download image: {e!s}",
                     url=item.image_url
-                )
+                ) from e
             processing_times["download_ms"] = int((time.perf_counter() - download_start) * 1000)
             
-            # Run parallel analysis with timeout
-            try:
-                color_task = self._extract_colors_safe(image_bytes)
-                ai_task = self._analyze_attributes_safe(image_bytes)
-                
-                color_result, ai_result = await asyncio.wait_for(
-                    asyncio.gather(color_task, ai_task),
-                    timeout=self.config.analysis_timeout_per_item
-                )
-            except asyncio.TimeoutError:
-                raise AnalysisTimeoutError(
-                    f"Analysis timeout after {self.config.analysis_timeout_per_item}s",
-                    timeout_seconds=self.config.analysis_timeout_per_item,
-                    item_id=str(item.item_id)
-                )
+            # New URL, same bytes as the last analysis: the stored result still holds
+            if item.image_hash and item.image_hash == image.digest:
+                processing_times["total_ms"] = int((time.perf_counter() - start_time) * 1000)
+                return self._unchanged_result(merchant_id, correlation_id, item, image, processing_times)
+            
+            color_result, ai_result = await self._analyze_image(image)
             
             # Check if both failed
             if color_result is None and ai_result is None:
@@ -112,7 +212,10 @@ class CatalogAIService:
                 product_id=item.product_id,
                 variant_id=item.variant_id,
                 correlation_id=correlation_id,
+                model_version=self.config.analysis_model_version,
                 status=status,
+                image_url=item.image_url,
+                image_hash=image.digest,
                 category=ai_result.get("category") if ai_result else None,
                 subcategory=ai_result.get("subcategory") if ai_result else None,
                 description=ai_result.get("description") if ai_result else None,
@@ -158,22 +261,132 @@ class CatalogAIService:
                 error=str(e)
             )
     
+    def _unchanged_result(
+        self,
+        merchant_id: UUID,
+        correlation_id: str,
+        item: AnalysisItem,
+        image: DownloadedImage,
+        processing_times: Dict[str, int]
+    ) -> ItemAnalysisResult:
+        return ItemAnalysisResult(
+            merchant_id=merchant_id,
+            item_id=item.item_id,
+            product_id=item.product_id,
+            variant_id=item.variant_id,
+            correlation_id=correlation_id,
+            model_version=self.config.analysis_model_version,
+            status="unchanged",
+            image_url=item.image_url,
+            image_hash=image.digest,
+            analysis_metadata=AnalysisMetadata(
+                analyzers_used=[],
+                quality_score=0.0,
+                confidence_score=0.0,
+                processing_times=processing_times
+            )
+        )
+    
+    async def _analyze_image(self, image: DownloadedImage) -> Tuple[Optional[PreciseColors], Optional[Dict]]:
+        """Analyzer results for an image, computed once per digest"""
+        task = self._image_results.get(image.digest)
+        if task is None:
+            task = asyncio.create_task(self._run_analyzers(image.content, image.digest))
+            task.add_done_callback(partial(self._forget_incomplete, image.digest))
+            self._image_results[image.digest] = task
+            if len(self._image_results) > self.config.image_result_cache_size:
+                self._image_results.popitem(last=False)
+        else:
+            self._image_results.move_to_end(image.digest)
+        
+        # One variant giving up must not cancel the analysis its siblings wait on
+        return await asyncio.shield(task)
+    
+    def _forget_incomplete(self, digest: str, task: asyncio.Task) -> None:
+        """Only keep results where both analyzers succeeded; failures get another try"""
+        failed = task.cancelled() or None in task.result()
+        if failed and self._image_results.get(digest) is task:
+            del self._image_results[digest]
+    
+    async def _run_analyzers(self, image_bytes: bytes, digest: str) -> Tuple[Optional[PreciseColors], Optional[Dict]]:
+        """Both analyzers in parallel"""
+        # Each times out on its own once it has a slot, so waiting behind other items doesn't count
+        color_result, ai_result = await asyncio.gather(
+            self._extract_colors_safe(image_bytes),
+            self._analyze_attributes_safe(image_bytes, digest)
+        )
+        return color_result, ai_result
+    
     async def _extract_colors_safe(self, image_bytes: bytes) -> Optional[PreciseColors]:
-        """Safe color extraction that returns None on error"""
+        """Color extraction on the segmenter pool's threads; None on error or timeout"""
         try:
-            return await self.mediapipe.extract_colors(image_bytes)
+            async with self._color_slots:
+                return await asyncio.wait_for(
+                    self.mediapipe.extract_colors(image_bytes),
+                    timeout=self.config.analysis_timeout_per_item
+                )
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Color extraction timed out after {self.config.analysis_timeout_per_item}s")
+            return None
         except Exception as e:
             self.logger.exception(f"Color extraction failed: {e}")
             return None
     
-    async def _analyze_attributes_safe(self, image_bytes: bytes) -> Optional[Dict]:
-        """Safe attribute analysis that returns None on error"""
+    async def _analyze_attributes_safe(self, image_bytes: bytes, digest: str) -> Optional[Dict]:
+        """Attribute analysis within the OpenAI limit; None on error or timeout"""
         try:
-            return await self.openai.analyze_attributes(image_bytes)
+            async with self._openai_slots:
+                return await asyncio.wait_for(
+                    self.openai.analyze_attributes(image_bytes, digest),
+                    timeout=self.config.analysis_timeout_per_item
+                )
+        except asyncio.TimeoutError:
+            self.logger.warning(f"OpenAI analysis timed out after {self.config.analysis_timeout_per_item}s")
+            return None
         except Exception as e:
             self.logger.exception(f"OpenAI analysis failed: {e}")
             return None
     
+    @staticmethod
+    def _determine_status(color_result: Optional[PreciseColors], ai_result: Optional[Dict]) -> str:
+        if color_result is not None and ai_result is not None:
+            return "success"
+        if color_result is not None or ai_result is not None:
+            return "partial"
+        return "failed"
+    
+    @staticmethod
+    def _get_analyzers_used(color_result: Optional[PreciseColors], ai_result: Optional[Dict]) -> List[str]:
+        analyzers = []
+        if color_result is not None:
+            analyzers.append("mediapipe")
+        if ai_result is not None:
+            analyzers.append("openai")
+        return analyzers
+    
+    @staticmethod
+    def _calculate_quality_score(color_result: Optional[PreciseColors], ai_result: Optional[Dict]) -> float:
+        """Share of the expected output present: a palette and the AI category"""
+        score = 0.0
+        if color_result is not None and color_result.color_count:
+            score += 0.5
+        if ai_result and ai_result.get("category"):
+            score += 0.5
+        return score
+    
+    @staticmethod
+    def _calculate_confidence_score(ai_result: Optional[Dict]) -> float:
+        """Mean confidence the model reported over its attributes"""
+        attributes = ai_result.get("attributes") if ai_result else None
+        if not attributes:
+            return 0.0
+        confidences = [c.confidence for c in attributes.colors + attributes.patterns]
+        confidences += [entry.get("confidence", 0.0) for entry in attributes.styles + attributes.materials]
+        return round(sum(confidences) / len(confidences), 3) if confidences else 0.0
+    
     async def close(self):
         """Cleanup resources"""
+        await self.scheduler.close()
+        for task in self._image_results.values():
+            task.cancel()
         await self.image_downloader.close()
\ No newline at end of file
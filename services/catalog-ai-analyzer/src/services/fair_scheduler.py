@@ -0,0 +1,85 @@
+# services/catalog-ai-analyzer/src/services/fair_scheduler.py
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from shared.utils.logger import ServiceLogger
+
+Job = tuple[Callable[[], Awaitable[Any]], asyncio.Future]
+
+
+class MerchantFairScheduler:
+    """Fixed pool of item workers shared by every in-flight batch.
+
+    Pending items are queued per merchant and workers take them round-robin,
+    one item per merchant per turn, so a small sync is not stuck behind
+    another merchant's full catalog. Within a merchant, items run in
+    submission order.
+    """
+
+    def __init__(self, workers: int, logger: ServiceLogger):
+        self.workers = workers
+        self.logger = logger
+        self._queues: OrderedDict[str, deque[Job]] = OrderedDict()
+        self._pending = asyncio.Semaphore(0)
+        self._tasks: list[asyncio.Task] = []
+
+    def submit(self, merchant_key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Queue fn() for a merchant; the future resolves with its result"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(merchant_key, deque()).append((fn, future))
+        self._pending.release()
+        return future
+
+    def pending(self, merchant_key: str | None = None) -> int:
+        """Queued items, for one merchant or in total (cancelled ones included until skipped)"""
+        if merchant_key is not None:
+            return len(self._queues.get(merchant_key, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _next_job(self) -> Job:
+        """Head of the first merchant's queue; that merchant moves to the back"""
+        merchant_key, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        if queue:
+            self._queues.move_to_end(merchant_key)
+        else:
+            del self._queues[merchant_key]
+        return job
+
+    async def _work(self) -> None:
+        while True:
+            await self._pending.acquire()
+            fn, future = self._next_job()
+            # Cancelled by its batch before it started
+            if future.done():
+                continue
+
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop the workers and cancel everything still queued"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for queue in self._queues.values():
+            for _, future in queue:
+                future.cancel()
+        self._queues.clear()
+        self._pending = asyncio.Semaphore(0)
@@ -1,28 +1,80 @@
 # services/catalog-ai-analyzer/src/services/mediapipe_analyzer.py
+import asyncio
+import io
+import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import cv2
 import numpy as np
 import mediapipe as mp
-from sklearn.cluster import KMeans
-from typing import Tuple, List, Optional
+from typing import Iterator, Tuple, List, Optional
+from PIL import Image, ImageOps, UnidentifiedImageError
+from shared.color import ColorQuantizer, stratified_sample
 from shared.utils.logger import ServiceLogger
 from ..config import ServiceConfig
 from ..schemas.analysis import PreciseColors
 
 class MediaPipeAnalyzer:
-    """MediaPipe-based color extraction from legacy code, adapted for URL-based processing"""
+    """MediaPipe-based color extraction from legacy code, adapted for URL-based processing.
+    
+    start() creates one ImageSegmenter per worker thread; extract_colors runs
+    decode, segmentation and the palette on those threads, so the event loop
+    keeps serving downloads and OpenAI calls. A segmenter instance is not
+    thread-safe, so each call borrows one from the pool for its segment().
+    """
     
     def __init__(self, config: ServiceConfig, logger: ServiceLogger):
         self.config = config
         self.logger = logger
-        self._segmenter = None
+        self._segmenters: "queue.Queue" = queue.Queue()
+        self._segmenter_count = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Sampling happens before the LAB conversion, so the quantizer sees every pixel it gets
+        self.quantizer = ColorQuantizer(method=config.color_quantizer, sample_size=0, n_init=8)
+    
+    async def start(self) -> None:
+        """Create the segmenter pool and its worker threads"""
+        workers = self.config.color_workers
+        start_time = time.perf_counter()
+        await asyncio.to_thread(self.create_segmenters, workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog-color")
+        self.logger.info(
+            f"MediaPipe segmenter pool ready: {workers} instances in {(time.perf_counter() - start_time) * 1000:.0f}ms"
+        )
+    
+    def create_segmenters(self, count: int) -> None:
+        """Add count segmenters to the pool (blocking)"""
+        for _ in range(count):
+            self._segmenters.put(self._create_segmenter())
+            self._segmenter_count += 1
+    
+    def close(self) -> None:
+        """Stop the workers and release idle segmenters"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        while True:
+            try:
+                self._segmenters.get_nowait().close()
+            except queue.Empty:
+                break
+            except Exception:
+                self.logger.exception("Segmenter close failed")
+        self._segmenter_count = 0
     
     async def extract_colors(self, image_bytes: bytes) -> Optional[PreciseColors]:
-        """Extract precise colors using MediaPipe segmentation"""
+        """Extract precise colors using MediaPipe segmentation, on a pool thread"""
+        if self._executor is None:
+            raise RuntimeError("MediaPipe analyzer not started")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.extract_colors_sync, image_bytes)
+    
+    def extract_colors_sync(self, image_bytes: bytes) -> Optional[PreciseColors]:
+        """Blocking extract_colors, for running in a worker thread"""
         try:
-            # Convert bytes to numpy array
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            image = self._decode_bounded(image_bytes, self.config.color_max_side)
             
             if image is None:
                 self.logger.exception("Failed to decode image")
@@ -58,11 +110,36 @@ class MediaPipeAnalyzer:
             self.logger.exception(f"MediaPipe color extraction failed: {e}")
             return None
     
-    def _get_segmenter(self):
-        """Create ImageSegmenter once - from legacy code"""
-        if self._segmenter is not None:
-            return self._segmenter
+    @staticmethod
+    def _decode_bounded(image_bytes: bytes, max_side: int) -> Optional[np.ndarray]:
+        """BGR image with its long side at most max_side (0 = full size).
+        
+        JPEGs use draft mode, so libjpeg decodes at 1/2, 1/4 or 1/8 scale
+        and the full-resolution raster is never materialized.
+        """
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                if max_side and img.format == "JPEG" and max(img.size) > max_side:
+                    scale = max_side / max(img.size)
+                    img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+                # cv2.imdecode applies EXIF orientation too
+                rgb = np.asarray(ImageOps.exif_transpose(img).convert("RGB"))
+            image = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        except (UnidentifiedImageError, OSError):
+            image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                return None
         
+        height, width = image.shape[:2]
+        if max_side and max(height, width) > max_side:
+            scale = max_side / max(height, width)
+            image = cv2.resize(
+                image, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA
+            )
+        return image
+    
+    def _create_segmenter(self):
+        """Create one ImageSegmenter - from legacy code"""
         from mediapipe.tasks.python.core.base_options import BaseOptions
         from mediapipe.tasks.python.vision.image_segmenter import (
             ImageSegmenter,
@@ -75,19 +152,28 @@ class MediaPipeAnalyzer:
             running_mode=_RunningMode.IMAGE,
             output_category_mask=True,
         )
-        self._segmenter = ImageSegmenter.create_from_options(opts)
-        return self._segmenter
+        return ImageSegmenter.create_from_options(opts)
+    
+    @contextmanager
+    def _borrow_segmenter(self) -> Iterator:
+        """Exclusive use of one pooled segmenter"""
+        if not self._segmenter_count:
+            raise RuntimeError("No segmenters: MediaPipe analyzer not started")
+        segmenter = self._segmenters.get()
+        try:
+            yield segmenter
+        finally:
+            self._segmenters.put(segmenter)
     
     def _segment_apparel(self, image: np.ndarray) -> Tuple:
         """Run MediaPipe segmentation - from legacy code"""
-        segmenter = self._get_segmenter()
-        
         # Wrap NumPy BGR in mp.Image
         mp_img = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
         
-        # Run segmentation
-        result = segmenter.segment(mp_img)
-        class_mask = result.category_mask.numpy_view()
+        # Run segmentation; copy the mask out before the segmenter goes back to the pool
+        with self._borrow_segmenter() as segmenter:
+            result = segmenter.segment(mp_img)
+            class_mask = result.category_mask.numpy_view().copy()
         
         # Build binary apparel mask (class 4 = clothes/apparel)
         apparel_mask = np.where(class_mask == 4, 255, 0).astype(np.uint8)
@@ -138,10 +224,8 @@ class MediaPipeAnalyzer:
         if len(pixels) == 0:
             return []
         
-        # Sample if too many pixels
-        if len(pixels) > sample_size:
-            idx = np.random.choice(len(pixels), sample_size, replace=False)
-            pixels = pixels[idx]
+        # Stratified sample if too many pixels
+        pixels = stratified_sample(pixels, sample_size, np.random.default_rng(0))
         
         # Convert BGR→RGB→Lab
         pixels_rgb = pixels[:, ::-1]
@@ -150,15 +234,12 @@ class MediaPipeAnalyzer:
             cv2.COLOR_RGB2LAB
         ).reshape(-1, 3)
         
-        # K-Means clustering in Lab space
-        km = KMeans(n_clusters=n_colors * 2, n_init=8, random_state=0)
-        labels = km.fit_predict(pixels_lab)
-        centers_lab = km.cluster_centers_
+        # Quantize in Lab space, centers come back sorted by count
+        centers_lab, _ = self.quantizer.quantize(pixels_lab, n_colors * 2)
         
-        # Compute counts & chroma, filter low-chroma
-        counts = np.bincount(labels)
+        # Filter low-chroma
         chroma = np.linalg.norm(centers_lab[:, 1:], axis=1)
-        keep = [i for i in np.argsort(-counts) if chroma[i] >= min_chroma]
+        keep = [i for i in range(len(centers_lab)) if chroma[i] >= min_chroma]
         
         # Take top n_colors
         chosen = keep[:n_colors]
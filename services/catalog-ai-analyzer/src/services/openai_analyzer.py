@@ -1,70 +1,63 @@
 # services/catalog-ai-analyzer/src/services/openai_analyzer.py
 import base64
+import hashlib
 import json
 import asyncio
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any
 import httpx
 from shared.utils.logger import ServiceLogger
 from ..config import ServiceConfig
 from ..schemas.analysis import AttributeResult, ColorResult, PatternResult
 from ..exceptions import OpenAIAPIError, OpenAIRateLimitError
+from ..utils.rate_limiter import TokenBucket, retry_after_seconds
+from .attribute_cache import AttributeCache
+
+# Bump when the prompt or the parsing changes; cached results of older versions are ignored
+PROMPT_VERSION = "attributes-v1"
+
+@dataclass
+class _PendingImage:
+    base64_image: str
+    future: asyncio.Future
 
 class OpenAIAnalyzer:
-    """OpenAI Vision API integration for semantic attribute analysis"""
-    
-    def __init__(self, config: ServiceConfig, logger: ServiceLogger):
+    """OpenAI Vision API integration for semantic attribute analysis.
+
+    Results are cached by image content and prompt version. Cache misses are
+    collected for up to openai_batch_wait_ms and sent several images per
+    request. Every request takes a token from one bucket shared by all
+    workers; a 429 pauses the bucket for the server's Retry-After.
+    """
+
+    def __init__(self, config: ServiceConfig, logger: ServiceLogger, cache: Optional[AttributeCache] = None):
         self.config = config
         self.logger = logger
+        self.cache = cache
         self.client = httpx.AsyncClient(timeout=config.openai_timeout_seconds)
-    
-    async def analyze_attributes(self, image_bytes: bytes) -> Optional[Dict[str, Any]]:
+        self.rate_limiter = TokenBucket(
+            rate_per_second=config.openai_requests_per_minute / 60,
+            burst=config.openai_request_burst
+        )
+        self._batch: List[_PendingImage] = []
+        self._batch_flush: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: set = set()
+
+    async def analyze_attributes(self, image_bytes: bytes, digest: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Analyze product attributes using OpenAI Vision API"""
+        digest = digest or hashlib.sha256(image_bytes).hexdigest()
+        cache_key = AttributeCache.key(PROMPT_VERSION, self.config.openai_model, digest)
+
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             base64_image = base64.b64encode(image_bytes).decode('utf-8')
-            prompt = self._build_analysis_prompt()
-            
-            for attempt in range(self.config.openai_max_retries):
-                try:
-                    response = await self._call_openai_api(base64_image, prompt)
-                    if response:
-                        return self._parse_openai_response(response)
-                        
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 429:
-                        # Rate limited
-                        wait_time = 2 ** attempt
-                        if attempt == self.config.openai_max_retries - 1:
-                            raise OpenAIRateLimitError(
-                                retry_after=wait_time
-                            )
-                        self.logger.warning(f"OpenAI rate limited, waiting {wait_time}s")
-                        await asyncio.sleep(wait_time)
-                    elif e.response.status_code >= 500:
-                        # Server error
-                        if attempt == self.config.openai_max_retries - 1:
-                            raise OpenAIAPIError(
-                                f"OpenAI server error: {e.response.status_code}",
-                                status_code=e.response.status_code,
-                                error_type="server_error"
-                            )
-                        await asyncio.sleep(2 ** attempt)
-                    else:
-                        # Client error - don't retry
-                        raise OpenAIAPIError(
-                            f"OpenAI client error: {e.response.status_code}",
-                            status_code=e.response.status_code,
-                            error_type="client_error"
-                        )
-                except httpx.TimeoutException:
-                    if attempt == self.config.openai_max_retries - 1:
-                        raise OpenAIAPIError(
-                            "OpenAI API timeout",
-                            error_type="timeout"
-                        )
-                    await asyncio.sleep(2 ** attempt)
-            
-            return None
-            
+            if self.config.openai_batch_size > 1:
+                result = await self._enqueue(base64_image)
+            else:
+                result = await self._analyze_single(base64_image)
         except (OpenAIAPIError, OpenAIRateLimitError):
             raise  # Re-raise our domain exceptions
         except Exception as e:
@@ -72,14 +65,110 @@ class OpenAIAnalyzer:
                 f"Unexpected OpenAI error: {str(e)}",
                 error_type="unexpected"
             )
-    
-    async def _call_openai_api(self, base64_image: str, prompt: str) -> Dict:
-        """Call OpenAI Vision API"""
+
+        if result is not None:
+            await self._cache_put(cache_key, result)
+        return result
+
+    async def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache:
+            return None
+        try:
+            return await self.cache.get(key)
+        except Exception as e:
+            self.logger.warning(f"Attribute cache read failed: {e}")
+            return None
+
+    async def _cache_put(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.cache:
+            return
+        try:
+            await self.cache.put(key, result)
+        except Exception as e:
+            self.logger.warning(f"Attribute cache write failed: {e}")
+
+    async def _enqueue(self, base64_image: str) -> Optional[Dict[str, Any]]:
+        """Join the next batched request"""
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append(_PendingImage(base64_image, future))
+
+        if len(self._batch) >= self.config.openai_batch_size:
+            self._flush_batch()
+        elif self._batch_flush is None:
+            self._batch_flush = asyncio.get_running_loop().call_later(
+                self.config.openai_batch_wait_ms / 1000, self._flush_batch
+            )
+        return await future
+
+    def _flush_batch(self) -> None:
+        if self._batch_flush is not None:
+            self._batch_flush.cancel()
+            self._batch_flush = None
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[_PendingImage]) -> None:
+        """One request for the whole batch; images the response doesn't cover are retried alone"""
+        try:
+            if len(batch) == 1:
+                results = [await self._analyze_single(batch[0].base64_image)]
+            else:
+                results = await self._analyze_many([pending.base64_image for pending in batch])
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        missing = [pending for pending, result in zip(batch, results, strict=True) if result is None]
+        if missing and len(batch) > 1:
+            self.logger.warning(f"Batched OpenAI response covered {len(batch) - len(missing)} of {len(batch)} images")
+            await asyncio.gather(*(self._run_batch([pending]) for pending in missing))
+
+        for pending, result in zip(batch, results, strict=True):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    async def _analyze_single(self, base64_image: str) -> Optional[Dict[str, Any]]:
+        response = await self._call_openai_api([base64_image], self._build_analysis_prompt(), max_tokens=1000)
+        content = self._response_content(response)
+        if content is None:
+            return None
+        return self._parse_openai_response(content)
+
+    async def _analyze_many(self, base64_images: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Results in image order; None where the response had no usable entry"""
+        response = await self._call_openai_api(
+            base64_images, self._build_batch_prompt(len(base64_images)), max_tokens=1000 * len(base64_images)
+        )
+        results: List[Optional[Dict[str, Any]]] = [None] * len(base64_images)
+        content = self._response_content(response)
+        if content is None:
+            return results
+
+        try:
+            data = json.loads(content)
+        except ValueError:
+            self.logger.exception("Failed to parse batched OpenAI response")
+            return results
+
+        items = data.get("items", []) if isinstance(data, dict) else data
+        for position, item in enumerate(items if isinstance(items, list) else []):
+            index = item.get("index", position) if isinstance(item, dict) else None
+            if isinstance(index, int) and 0 <= index < len(results) and results[index] is None:
+                results[index] = self._to_result(item)
+        return results
+
+    async def _call_openai_api(self, base64_images: List[str], prompt: str, max_tokens: int) -> Dict:
+        """Call OpenAI Vision API with rate limiting and retries"""
         headers = {
             "Authorization": f"Bearer {self.config.openai_api_key}",
             "Content-Type": "application/json"
         }
-        
+
         payload = {
             "model": self.config.openai_model,
             "messages": [
@@ -90,38 +179,98 @@ class OpenAIAnalyzer:
                             "type": "text",
                             "text": prompt
                         },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
+                        *(
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:image/jpeg;base64,{base64_image}"
+                                }
                             }
-                        }
+                            for base64_image in base64_images
+                        )
                     ]
                 }
             ],
-            "max_tokens": 1000
+            "max_tokens": max_tokens
         }
-        
-        response = await self.client.post(
-            "https://api.openai.com/v1/chat/completions",
-            json=payload,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        return response.json()
-    
+
+        for attempt in range(self.config.openai_max_retries):
+            last_attempt = attempt == self.config.openai_max_retries - 1
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.client.post(
+                    f"{self.config.openai_base_url}/chat/completions",
+                    json=payload,
+                    headers=headers
+                )
+                response.raise_for_status()
+                return response.json()
+
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code == 429:
+                    # Rate limited: everyone waits for the server's reset, not just this request
+                    wait_time = retry_after_seconds(e.response.headers) or 2 ** attempt
+                    self.rate_limiter.pause(wait_time)
+                    if last_attempt:
+                        raise OpenAIRateLimitError(
+                            retry_after=int(wait_time)
+                        )
+                    self.logger.warning(f"OpenAI rate limited, pausing requests for {wait_time:.1f}s")
+                elif status_code >= 500:
+                    # Server error
+                    if last_attempt:
+                        raise OpenAIAPIError(
+                            f"OpenAI server error: {status_code}",
+                            status_code=status_code,
+                            error_type="server_error"
+                        )
+                    await asyncio.sleep(retry_after_seconds(e.response.headers) or 2 ** attempt)
+                else:
+                    # Client error - don't retry
+                    raise OpenAIAPIError(
+                        f"OpenAI client error: {status_code}",
+                        status_code=status_code,
+                        error_type="client_error"
+                    )
+            except httpx.TimeoutException:
+                if last_attempt:
+                    raise OpenAIAPIError(
+                        "OpenAI API timeout",
+                        error_type="timeout"
+                    )
+                await asyncio.sleep(2 ** attempt)
+
+        raise OpenAIAPIError("OpenAI retries exhausted", error_type="retries_exhausted")
+
     def _build_analysis_prompt(self) -> str:
         """Build structured prompt for OpenAI Vision"""
-        return """Analyze this product image and return a JSON object with the following structure:
-        {
+        return f"""Analyze this product image and return a JSON object with the following structure:
+        {self._result_schema()}
+
+        Focus on fashion/apparel attributes. Be precise and confident.
+        Return ONLY valid JSON, no additional text."""
+
+    def _build_batch_prompt(self, count: int) -> str:
+        """Prompt for several images in one request, answered as one JSON array"""
+        return f"""You are given {count} product images, numbered 0 to {count - 1} in the order they appear.
+        Analyze each image separately and return a JSON object {{"items": [...]}} with exactly {count} entries,
+        one per image, each with an "index" field (the image number) and the following structure:
+        {self._result_schema()}
+
+        Focus on fashion/apparel attributes. Be precise and confident.
+        Return ONLY valid JSON, no additional text."""
+
+    @staticmethod
+    def _result_schema() -> str:
+        return """{
             "category": "main product category (e.g., shirts, dresses, shoes)",
             "subcategory": "specific subcategory (e.g., casual-shirts, evening-dresses)",
             "description": "brief product description (max 100 chars)",
             "gender": "male|female|unisex",
             "attributes": {
                 "colors": [
-                    {"name": "color name", "confidence": 0.0-1.0}
+                    {"name": "color name", "hex": "#RRGGBB", "confidence": 0.0-1.0}
                 ],
                 "patterns": [
                     {"name": "pattern name", "confidence": 0.0-1.0}
@@ -135,48 +284,59 @@ class OpenAIAnalyzer:
                 "season": ["spring", "summer", "fall", "winter"],
                 "occasion": ["casual", "formal", "business", "sport", "evening"]
             }
-        }
-        
-        Focus on fashion/apparel attributes. Be precise and confident.
-        Return ONLY valid JSON, no additional text."""
-    
-    def _parse_openai_response(self, response: Dict) -> Optional[Dict[str, Any]]:
-        """Parse OpenAI response and extract structured data"""
+        }"""
+
+    def _response_content(self, response: Dict) -> Optional[str]:
+        """Message text of a completion, without markdown fences"""
         try:
             content = response['choices'][0]['message']['content']
-            
-            # Clean up response (remove markdown if present)
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            # Parse JSON
-            data = json.loads(content.strip())
-            
-            # Convert to our schema
+        except (KeyError, IndexError, TypeError):
+            self.logger.exception("OpenAI response has no message content")
+            return None
+
+        # Clean up response (remove markdown if present)
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.endswith("```"):
+            content = content[:-3]
+        return content.strip()
+
+    def _parse_openai_response(self, content: str) -> Optional[Dict[str, Any]]:
+        """Parse OpenAI response and extract structured data"""
+        try:
+            return self._to_result(json.loads(content))
+        except Exception as e:
+            self.logger.exception(f"Failed to parse OpenAI response: {e}")
+            return None
+
+    def _to_result(self, data: Dict) -> Optional[Dict[str, Any]]:
+        """Convert one parsed result to our schema"""
+        try:
+            attributes = data.get("attributes", {})
             return {
                 "category": data.get("category"),
                 "subcategory": data.get("subcategory"),
                 "description": data.get("description"),
                 "gender": data.get("gender"),
                 "attributes": AttributeResult(
-                    colors=[ColorResult(**c) for c in data.get("attributes", {}).get("colors", [])],
-                    patterns=[PatternResult(**p) for p in data.get("attributes", {}).get("patterns", [])],
-                    styles=[{"name": s["name"], "confidence": s["confidence"]} 
-                            for s in data.get("attributes", {}).get("styles", [])],
-                    materials=[{"name": m["name"], "confidence": m["confidence"]} 
-                              for m in data.get("attributes", {}).get("materials", [])],
-                    season=data.get("attributes", {}).get("season", []),
-                    occasion=data.get("attributes", {}).get("occasion", [])
+                    colors=[ColorResult(**c) for c in attributes.get("colors", [])],
+                    patterns=[PatternResult(**p) for p in attributes.get("patterns", [])],
+                    styles=[{"name": s["name"], "confidence": s["confidence"]}
+                            for s in attributes.get("styles", [])],
+                    materials=[{"name": m["name"], "confidence": m["confidence"]}
+                              for m in attributes.get("materials", [])],
+                    season=attributes.get("season", []),
+                    occasion=attributes.get("occasion", [])
                 )
             }
-            
         except Exception as e:
             self.logger.exception(f"Failed to parse OpenAI response: {e}")
             return None
-    
+
     async def close(self):
         """Close HTTP client"""
-        await self.client.aclose()
\ No newline at end of file
+        self._flush_batch()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        await self.client.aclose()
@@ -0,0 +1,148 @@
+# services/catalog-ai-analyzer/src/utils/image_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from shared.utils.logger import ServiceLogger
+
+
+@dataclass
+class CachedImage:
+    """What the cache knows about a URL: the blob it served and its validators"""
+
+    digest: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+
+
+class ImageCache:
+    """Content-addressed on-disk image cache with an LRU byte cap.
+
+    Blobs are stored once per SHA-256, so product images served under several
+    URLs take the space of one. Each URL gets a small JSON entry with the blob
+    digest and the ETag/Last-Modified to revalidate with. Blocking methods;
+    call them from a worker thread.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, logger: ServiceLogger | None = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self._blob_dir = self.directory / "blobs"
+        self._url_dir = self.directory / "urls"
+        # digest -> size, least recently used first
+        self._blobs: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the directories and rebuild the LRU from blob mtimes"""
+        self._blob_dir.mkdir(parents=True, exist_ok=True)
+        self._url_dir.mkdir(parents=True, exist_ok=True)
+
+        blobs = []
+        for path in self._blob_dir.glob("*/*"):
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            blobs.append((stat.st_mtime, path.name, stat.st_size))
+
+        with self._lock:
+            self._blobs = OrderedDict((digest, size) for _, digest, size in sorted(blobs))
+            self._total_bytes = sum(self._blobs.values())
+            self._evict()
+
+        if self.logger:
+            self.logger.info(f"Image cache: {len(self._blobs)} blobs, {self._total_bytes / 1e6:.1f} MB")
+
+    @staticmethod
+    def digest(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blob_dir / digest[:2] / digest
+
+    def _url_path(self, url: str) -> Path:
+        return self._url_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def lookup(self, url: str) -> CachedImage | None:
+        """Entry for a URL whose blob is still cached"""
+        path = self._url_path(url)
+        try:
+            entry = CachedImage(**json.loads(path.read_text()))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+        with self._lock:
+            if entry.digest in self._blobs:
+                return entry
+        # Blob was evicted; the entry is useless without it
+        path.unlink(missing_ok=True)
+        return None
+
+    def read(self, digest: str) -> bytes | None:
+        """Blob content, marking it recently used"""
+        try:
+            content = self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._blobs.pop(digest, 0)
+            return None
+
+        with self._lock:
+            if digest in self._blobs:
+                self._blobs.move_to_end(digest)
+        # mtime carries the LRU order across restarts
+        os.utime(self._blob_path(digest))
+        return content
+
+    def store(self, url: str, content: bytes, etag: str | None, last_modified: str | None) -> str:
+        """Cache content for a URL, returning its digest"""
+        digest = self.digest(content)
+        blob_path = self._blob_path(digest)
+
+        with self._lock:
+            known = digest in self._blobs
+        if not known:
+            blob_path.parent.mkdir(exist_ok=True)
+            self._write_atomic(blob_path, content)
+            with self._lock:
+                if digest not in self._blobs:
+                    self._blobs[digest] = len(content)
+                    self._total_bytes += len(content)
+                self._evict(keep=digest)
+
+        self.refresh(url, CachedImage(digest=digest, etag=etag, last_modified=last_modified))
+        return digest
+
+    def refresh(self, url: str, entry: CachedImage) -> None:
+        """Record a (re)validation of the URL's entry"""
+        entry.fetched_at = time.time()
+        self._write_atomic(self._url_path(url), json.dumps(asdict(entry)).encode())
+
+    def _evict(self, keep: str | None = None) -> None:
+        """Drop least recently used blobs until under the byte cap (caller holds the lock)"""
+        while self._total_bytes > self.max_bytes and self._blobs:
+            digest, size = next(iter(self._blobs.items()))
+            if digest == keep:
+                break
+            del self._blobs[digest]
+            self._total_bytes -= size
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"blobs": len(self._blobs), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
@@ -1,18 +1,43 @@
 # services/catalog-ai-analyzer/src/utils/image_downloader.py
 import asyncio
-from typing import Optional
+import importlib.util
+import time
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import httpx
 from shared.utils.logger import ServiceLogger
 from shared.utils.exceptions import ValidationError, RequestTimeoutError, InfrastructureError
+from .image_cache import CachedImage, ImageCache
+
+@dataclass
+class DownloadedImage:
+    """Image bytes with their SHA-256, which identifies the image across URLs"""
+    content: bytes
+    digest: str
+    cached: bool = False
 
 class ImageDownloader:
-    """Utility for downloading and validating product images"""
+    """Utility for downloading and validating product images.
+
+    Concurrent requests for one URL share a single download. With a cache,
+    URLs fetched within fresh_seconds are served from disk and older ones are
+    revalidated with If-None-Match/If-Modified-Since.
+    
+    Requests wait for a per-host slot before taking one of max_connections,
+    so a slow host queues its own requests without starving the others.
+    Bodies are streamed and abandoned as soon as they pass MAX_SIZE_BYTES.
+    """
+    
+    # Shopify's image CDN resizes on the fly with ?width=
+    SHOPIFY_CDN_HOSTS: ClassVar[frozenset[str]] = frozenset({'cdn.shopify.com'})
+    SHOPIFY_CDN_PATH_PREFIX = '/cdn/shop/'
     
     # Supported image formats
-    SUPPORTED_FORMATS = {
+    SUPPORTED_FORMATS: ClassVar[frozenset[str]] = frozenset({
         'image/jpeg', 'image/jpg', 'image/png', 
         'image/webp', 'image/gif', 'image/bmp'
-    }
+    })
     
     # Maximum file size (10MB)
     MAX_SIZE_BYTES = 10 * 1024 * 1024
@@ -21,15 +46,35 @@ class ImageDownloader:
         self, 
         timeout: int = 10,
         max_retries: int = 3,
-        logger: Optional[ServiceLogger] = None
+        logger: Optional[ServiceLogger] = None,
+        cache: Optional[ImageCache] = None,
+        fresh_seconds: float = 0,
+        max_connections: int = 16,
+        max_per_host: int = 8,
+        http2: bool = True,
+        cdn_max_width: int = 0
     ):
         self.timeout = timeout
         self.max_retries = max_retries
         self.logger = logger
+        self.cache = cache
+        self.fresh_seconds = fresh_seconds
+        self.max_per_host = max_per_host
+        self.cdn_max_width = cdn_max_width
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._connection_slots = asyncio.Semaphore(max_connections)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        
+        # HTTP/2 needs the optional h2 package (httpx[http2])
+        if http2 and importlib.util.find_spec("h2") is None:
+            if logger:
+                logger.warning("h2 not installed, image downloads use HTTP/1.1")
+            http2 = False
         self.client = httpx.AsyncClient(
             timeout=httpx.Timeout(timeout),
             follow_redirects=True,
-            limits=httpx.Limits(max_keepalive_connections=10)
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
         )
     
     async def download(self, url: str) -> bytes:
@@ -47,6 +92,10 @@ class ImageDownloader:
             RequestTimeoutError: Download timeout
             InfrastructureError: Network/server errors
         """
+        return (await self.fetch(url)).content
+    
+    async def fetch(self, url: str) -> DownloadedImage:
+        """download() with the image digest; joins an in-flight download of the same URL"""
         if not url or not url.startswith(('http://', 'https://')):
             raise ValidationError(
                 message="Invalid image URL",
@@ -54,6 +103,96 @@ class ImageDownloader:
                 value=url
             )
         
+        url = self._resized_url(url)
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when it fails; don't warn about an unretrieved exception
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[url] = future
+        try:
+            image = await self._fetch(url)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(image)
+            return image
+        finally:
+            self._inflight.pop(url, None)
+    
+    async def _fetch(self, url: str) -> DownloadedImage:
+        """Serve from the cache, revalidate it, or download"""
+        cached: Optional[Tuple[CachedImage, bytes]] = None
+        if self.cache:
+            cached = await asyncio.to_thread(self._read_cache, url)
+        
+        headers = {}
+        if cached:
+            entry, content = cached
+            if time.time() - entry.fetched_at < self.fresh_seconds:
+                return DownloadedImage(content=content, digest=entry.digest, cached=True)
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        
+        response, content = await self._download(url, headers)
+        
+        if response.status_code == 304 and cached:
+            entry, content = cached
+            await asyncio.to_thread(self.cache.refresh, url, entry)
+            return DownloadedImage(content=content, digest=entry.digest, cached=True)
+        
+        if self.cache:
+            digest = await asyncio.to_thread(
+                self.cache.store,
+                url,
+                content,
+                response.headers.get("etag"),
+                response.headers.get("last-modified")
+            )
+        else:
+            digest = ImageCache.digest(content)
+        return DownloadedImage(content=content, digest=digest)
+    
+    def _read_cache(self, url: str) -> Optional[Tuple[CachedImage, bytes]]:
+        entry = self.cache.lookup(url)
+        if entry is None:
+            return None
+        content = self.cache.read(entry.digest)
+        return (entry, content) if content is not None else None
+    
+    def _resized_url(self, url: str) -> str:
+        """Ask the Shopify CDN for at most cdn_max_width pixels instead of the original upload"""
+        if not self.cdn_max_width:
+            return url
+        
+        parts = urlsplit(url)
+        if parts.hostname not in self.SHOPIFY_CDN_HOSTS and not parts.path.startswith(self.SHOPIFY_CDN_PATH_PREFIX):
+            return url
+        
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        # Respect a size already chosen by the caller
+        if any(key in ('width', 'height') for key, _ in query):
+            return url
+        query.append(('width', str(self.cdn_max_width)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return slot
+    
+    async def _download(self, url: str, headers: Dict[str, str]) -> Tuple[httpx.Response, bytes]:
+        """GET with validation and retries; a 304 to a conditional request comes back with no content"""
         last_error = None
         
         for attempt in range(self.max_retries):
@@ -61,47 +200,12 @@ class ImageDownloader:
                 if self.logger:
                     self.logger.debug(f"Downloading image (attempt {attempt + 1}): {url}")
                 
-                # Make request
-                response = await self.client.get(url)
-                
-                # Check status
-                if response.status_code == 404:
-                    raise ValidationError(
-                        message=f"Image not found: {url}",
-                        field="image_url",
-                        value=url
-                    )
+                # Host slot first: waiting on a slow host doesn't hold a connection slot
+                async with self._host_slot(url), self._connection_slots:
+                    response, content = await self._stream(url, headers)
                 
-                response.raise_for_status()
-                
-                # Validate content type
-                content_type = response.headers.get('content-type', '').lower()
-                if content_type and not any(fmt in content_type for fmt in self.SUPPORTED_FORMATS):
-                    raise ValidationError(
-                        message=f"Unsupported image format: {content_type}",
-                        field="content_type",
-                        value=content_type
-                    )
-                
-                # Check size
-                content_length = response.headers.get('content-length')
-                if content_length and int(content_length) > self.MAX_SIZE_BYTES:
-                    raise ValidationError(
-                        message=f"Image too large: {int(content_length)} bytes (max {self.MAX_SIZE_BYTES})",
-                        field="content_length",
-                        value=content_length
-                    )
-                
-                # Get content
-                content = response.content
-                
-                # Validate actual size
-                if len(content) > self.MAX_SIZE_BYTES:
-                    raise ValidationError(
-                        message=f"Image too large: {len(content)} bytes",
-                        field="image_size",
-                        value=len(content)
-                    )
+                if response.status_code == 304:
+                    return response, content
                 
                 # Validate it's actually an image (check magic bytes)
                 if not self._validate_image_bytes(content):
@@ -113,7 +217,7 @@ class ImageDownloader:
                 if self.logger:
                     self.logger.debug(f"Successfully downloaded {len(content)} bytes from {url}")
                 
-                return content
+                return response, content
                 
             except httpx.TimeoutException as e:
                 last_error = RequestTimeoutError(
@@ -138,7 +242,7 @@ class ImageDownloader:
                         message=f"Failed to download image: HTTP {e.response.status_code}",
                         field="image_url",
                         value=url
-                    )
+                    ) from e
                     
             except httpx.RequestError as e:
                 last_error = InfrastructureError(
@@ -170,6 +274,53 @@ class ImageDownloader:
             service="image_download"
         )
     
+    async def _stream(self, url: str, headers: Dict[str, str]) -> Tuple[httpx.Response, bytes]:
+        """One GET, reading the body only up to MAX_SIZE_BYTES"""
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and headers:
+                return response, b""
+            
+            # Check status
+            if response.status_code == 404:
+                raise ValidationError(
+                    message=f"Image not found: {url}",
+                    field="image_url",
+                    value=url
+                )
+            
+            response.raise_for_status()
+            
+            # Validate content type
+            content_type = response.headers.get('content-type', '').lower()
+            if content_type and not any(fmt in content_type for fmt in self.SUPPORTED_FORMATS):
+                raise ValidationError(
+                    message=f"Unsupported image format: {content_type}",
+                    field="content_type",
+                    value=content_type
+                )
+            
+            # Check size
+            content_length = response.headers.get('content-length')
+            if content_length and int(content_length) > self.MAX_SIZE_BYTES:
+                raise ValidationError(
+                    message=f"Image too large: {int(content_length)} bytes (max {self.MAX_SIZE_BYTES})",
+                    field="content_length",
+                    value=content_length
+                )
+            
+            # Missing or wrong Content-Length: stop reading once past the limit
+            content = bytearray()
+            async for chunk in response.aiter_bytes():
+                content += chunk
+                if len(content) > self.MAX_SIZE_BYTES:
+                    raise ValidationError(
+                        message=f"Image too large: more than {self.MAX_SIZE_BYTES} bytes",
+                        field="image_size",
+                        value=len(content)
+                    )
+            
+            return response, bytes(content)
+    
     def _validate_image_bytes(self, data: bytes) -> bool:
         """Validate image data by checking magic bytes"""
         if len(data) < 8:
@@ -202,17 +353,19 @@ class ImageDownloader:
         """
         Download multiple images concurrently
         
+        A sliding window: the next URL starts as soon as any download finishes,
+        instead of waiting for the slowest of a fixed chunk.
+        
         Returns:
-            List of (url, image_bytes, error) tuples
+            List of (url, image_bytes, error) tuples, in the order of urls
         """
-        results = []
+        window = asyncio.Semaphore(max_concurrent)
         
-        for chunk in self._chunk_urls(urls, max_concurrent):
-            tasks = [self._download_safe(url) for url in chunk]
-            chunk_results = await asyncio.gather(*tasks)
-            results.extend(chunk_results)
+        async def download_one(url: str) -> tuple[str, Optional[bytes], Optional[Exception]]:
+            async with window:
+                return await self._download_safe(url)
         
-        return results
+        return list(await asyncio.gather(*(download_one(url) for url in urls)))
     
     async def _download_safe(self, url: str) -> tuple[str, Optional[bytes], Optional[Exception]]:
         """Safe download that returns error instead of raising"""
@@ -222,11 +375,6 @@ class ImageDownloader:
         except Exception as e:
             return (url, None, e)
     
-    def _chunk_urls(self, urls: list[str], chunk_size: int):
-        """Split URLs into chunks"""
-        for i in range(0, len(urls), chunk_size):
-            yield urls[i:i + chunk_size]
-    
     async def close(self):
         """Close HTTP client"""
         await self.client.aclose()
\ No newline at end of file
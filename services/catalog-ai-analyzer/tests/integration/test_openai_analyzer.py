@@ -0,0 +1,109 @@
+import asyncio
+import math
+import types
+
+import pytest
+from nats.js.errors import KeyNotFoundError
+from scripts.openai_stub import serve
+from src.config import ServiceConfig
+from src.exceptions import OpenAIRateLimitError
+from src.services.attribute_cache import AttributeCache
+from src.services.openai_analyzer import OpenAIAnalyzer
+
+from shared.utils.logger import ServiceLogger
+
+
+class _MemoryKV:
+    """In-process stand-in for the JetStream KV bucket"""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    async def get(self, key: str):
+        if key not in self.values:
+            raise KeyNotFoundError
+        return types.SimpleNamespace(value=self.values[key])
+
+    async def put(self, key: str, value: bytes) -> None:
+        self.values[key] = value
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(rpm: int = 0):
+        server, state = serve(0, rpm=rpm)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/v1", state
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _config(base_url: str, **overrides) -> ServiceConfig:
+    # Unvalidated: the OpenAI path needs no MediaPipe model file
+    return ServiceConfig.model_construct(openai_api_key="sk-test", openai_base_url=base_url, **overrides)
+
+
+def _analyzer(config: ServiceConfig, cache: AttributeCache | None = None) -> OpenAIAnalyzer:
+    return OpenAIAnalyzer(config, ServiceLogger("test-openai-analyzer"), cache=cache)
+
+
+def test_images_are_sent_in_batches(stub):
+    base_url, state = stub()
+    images = [f"image-{index}".encode() for index in range(10)]
+
+    async def run():
+        analyzer = _analyzer(_config(base_url, openai_batch_size=4, openai_batch_wait_ms=50))
+        try:
+            return await asyncio.gather(*(analyzer.analyze_attributes(image) for image in images))
+        finally:
+            await analyzer.close()
+
+    results = asyncio.run(run())
+
+    assert all(result["category"] == "shirts" for result in results)
+    assert state.stats() == {"requests": math.ceil(10 / 4), "images": 10, "rate_limited": 0}
+
+
+def test_rate_limit_pauses_the_shared_bucket(stub):
+    base_url, state = stub(rpm=1)
+
+    async def run():
+        analyzer = _analyzer(_config(base_url, openai_batch_size=1, openai_max_retries=1))
+        try:
+            await analyzer.analyze_attributes(b"first")
+            with pytest.raises(OpenAIRateLimitError):
+                await analyzer.analyze_attributes(b"second")
+
+            # The stub's Retry-After is about a minute: no caller gets a token meanwhile
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(analyzer.rate_limiter.acquire(), timeout=0.2)
+        finally:
+            await analyzer.close()
+
+    asyncio.run(run())
+
+    assert state.stats() == {"requests": 1, "images": 1, "rate_limited": 1}
+
+
+def test_repeated_image_is_served_from_the_cache(stub):
+    base_url, state = stub()
+    config = _config(base_url, openai_batch_size=1)
+    cache = AttributeCache(js_client=None, config=config, logger=ServiceLogger("test-attribute-cache"))
+    cache._kv = _MemoryKV()
+
+    async def run():
+        analyzer = _analyzer(config, cache)
+        try:
+            return await analyzer.analyze_attributes(b"image"), await analyzer.analyze_attributes(b"image")
+        finally:
+            await analyzer.close()
+
+    first, second = asyncio.run(run())
+
+    assert second == first
+    assert state.stats()["requests"] == 1
@@ -0,0 +1,133 @@
+import asyncio
+import types
+from uuid import UUID, uuid4
+
+import pytest
+from nats.js.errors import KeyNotFoundError
+from src.config import ServiceConfig
+from src.schemas.analysis import AnalysisItem
+from src.services.batch_checkpoints import BatchCheckpoint, BatchCheckpointStore
+from src.services.catalog_ai_service import CatalogAIService
+
+from shared.utils.logger import ServiceLogger
+
+MERCHANT_ID = UUID("9b2f6c1e-0000-4000-8000-000000000001")
+SYNC_ID = UUID("9b2f6c1e-0000-4000-8000-000000000002")
+
+
+class _MemoryKV:
+    """In-process stand-in for the JetStream KV bucket"""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    async def get(self, key: str):
+        if key not in self.values:
+            raise KeyNotFoundError
+        return types.SimpleNamespace(value=self.values[key])
+
+    async def put(self, key: str, value: bytes) -> None:
+        self.values[key] = value
+
+
+def _config(**overrides) -> ServiceConfig:
+    # Unvalidated: no MediaPipe model file is needed here
+    return ServiceConfig.model_construct(image_cache_enabled=False, **overrides)
+
+
+def _store(config: ServiceConfig) -> BatchCheckpointStore:
+    store = BatchCheckpointStore(js_client=None, config=config, logger=ServiceLogger("test-batch-checkpoints"))
+    store._kv = _MemoryKV()
+    return store
+
+
+def _item() -> AnalysisItem:
+    return AnalysisItem(item_id=uuid4(), product_id="p1", variant_id="v1", image_url="https://cdn/a.jpg")
+
+
+def test_checkpoint_round_trips_through_bytes():
+    checkpoint = BatchCheckpoint()
+    for item_id, status in [("a", "success"), ("b", "failed"), ("c", "partial"), ("d", "unchanged")]:
+        checkpoint.record(item_id, status)
+    checkpoint.completed = True
+
+    restored = BatchCheckpoint.from_bytes(checkpoint.to_bytes())
+
+    assert restored.done == checkpoint.done
+    assert restored.completed
+    assert restored.unsaved == 0
+    assert restored.counts() == (2, 1, 1)
+
+
+def test_store_saves_and_loads_by_merchant_and_sync():
+    store = _store(_config())
+    checkpoint = BatchCheckpoint()
+    checkpoint.record("a", "success")
+
+    async def run():
+        await store.save(MERCHANT_ID, SYNC_ID, checkpoint)
+        return await store.load(MERCHANT_ID, SYNC_ID), await store.load(MERCHANT_ID, uuid4())
+
+    saved, missing = asyncio.run(run())
+
+    assert list(store.kv.values) == [f"{MERCHANT_ID}.{SYNC_ID}"]
+    assert checkpoint.unsaved == 0
+    assert saved.done == {"a": "success"}
+    assert missing.done == {} and not missing.completed
+
+
+def test_redelivered_batch_skips_items_already_done():
+    # One worker: items finish in order, so the first three are checkpointed before the last one fails
+    config = _config(batch_checkpoint_interval=1, max_concurrent_items=1)
+    store = _store(config)
+    items = [_item() for _ in range(4)]
+    analyzed: list[UUID] = []
+    fail = {items[-1].item_id}
+
+    async def analyze_single_item(merchant_id, correlation_id, item):
+        analyzed.append(item.item_id)
+        if item.item_id in fail:
+            fail.clear()
+            raise RuntimeError("analyzer crashed")
+        return types.SimpleNamespace(item_id=item.item_id, status="success")
+
+    async def deliver():
+        service = CatalogAIService(config, None, None, ServiceLogger("test-batch-checkpoints"), checkpoints=store)
+        service.analyze_single_item = analyze_single_item
+        try:
+            return await service.analyze_batch(MERCHANT_ID, SYNC_ID, "corr_1", items)
+        finally:
+            await service.close()
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await deliver()
+        first = list(analyzed)
+        analyzed.clear()
+        return first, await deliver()
+
+    first, counts = asyncio.run(run())
+
+    assert first == [item.item_id for item in items]
+    assert analyzed == [items[-1].item_id]
+    assert counts == (4, 0, 0)
+
+
+def test_completed_batch_only_reports_its_counts():
+    config = _config()
+    store = _store(config)
+    checkpoint = BatchCheckpoint(done={"a": "success", "b": "failed"}, completed=True)
+
+    async def analyze_single_item(merchant_id, correlation_id, item):
+        raise AssertionError("completed batch analyzed again")
+
+    async def run():
+        await store.save(MERCHANT_ID, SYNC_ID, checkpoint)
+        service = CatalogAIService(config, None, None, ServiceLogger("test-batch-checkpoints"), checkpoints=store)
+        service.analyze_single_item = analyze_single_item
+        try:
+            return await service.analyze_batch(MERCHANT_ID, SYNC_ID, "corr_1", [_item()])
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == (1, 1, 0)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from src.services.fair_scheduler import MerchantFairScheduler
+
+from shared.utils.logger import ServiceLogger
+
+
+def _scheduler(workers: int = 1) -> MerchantFairScheduler:
+    return MerchantFairScheduler(workers=workers, logger=ServiceLogger("test-fair-scheduler"))
+
+
+def test_merchants_take_turns():
+    ran: list[str] = []
+
+    def job(label: str):
+        async def fn():
+            ran.append(label)
+            return label
+
+        return fn
+
+    async def run():
+        scheduler = _scheduler()
+        try:
+            # The big catalog is queued first, yet the small one is not stuck behind it
+            futures = [scheduler.submit("big", job(f"big{index}")) for index in range(3)]
+            futures += [scheduler.submit("small", job(f"small{index}")) for index in range(2)]
+            return await asyncio.gather(*futures)
+        finally:
+            await scheduler.close()
+
+    results = asyncio.run(run())
+
+    assert ran == ["big0", "small0", "big1", "small1", "big2"]
+    assert results == ["big0", "big1", "big2", "small0", "small1"]
+
+
+def test_item_cancelled_before_it_starts_is_skipped():
+    ran: list[str] = []
+
+    async def run():
+        scheduler = _scheduler()
+        release = asyncio.Event()
+
+        async def blocking():
+            ran.append("first")
+            await release.wait()
+
+        async def record(label: str):
+            ran.append(label)
+
+        try:
+            first = scheduler.submit("merchant", blocking)
+            cancelled = scheduler.submit("merchant", lambda: record("cancelled"))
+            last = scheduler.submit("merchant", lambda: record("last"))
+            await asyncio.sleep(0)
+
+            cancelled.cancel()
+            release.set()
+            await asyncio.gather(first, last)
+            return scheduler.pending()
+        finally:
+            await scheduler.close()
+
+    assert asyncio.run(run()) == 0
+    assert ran == ["first", "last"]
+
+
+def test_failure_resolves_only_its_own_future():
+    async def run():
+        scheduler = _scheduler()
+
+        async def fail():
+            raise ValueError("bad image")
+
+        async def succeed():
+            return "ok"
+
+        try:
+            failed = scheduler.submit("merchant", fail)
+            succeeded = scheduler.submit("merchant", succeed)
+            with pytest.raises(ValueError):
+                await failed
+            return await succeeded
+        finally:
+            await scheduler.close()
+
+    assert asyncio.run(run()) == "ok"
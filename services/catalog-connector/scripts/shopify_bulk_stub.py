@@ -0,0 +1,174 @@
+# ruff: noqa: T201
+"""Local stand-in for a shop's Admin GraphQL API in bulk operation mode.
+
+Accepts bulkOperationRunQuery, reports the operation RUNNING for --polls
+status queries and then COMPLETED with a URL to the JSONL result, which it
+streams in small chunks. The result is the recorded fixture
+(tests/fixtures/shopify_bulk_products.jsonl) or, with --products N, a generated
+catalog of N products written line by line, for checking that the
+connector parses it in constant memory.
+
+Run from the service root, then point the connector at it in bulk mode:
+    python -m scripts.shopify_bulk_stub --port 8090 --products 50000
+    SHOPIFY_API_URL=http://127.0.0.1:8090/admin/api/2024-01/graphql.json SHOPIFY_FETCH_MODE=bulk ...
+"""
+
+import argparse
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE = Path(__file__).parents[1] / "tests" / "fixtures" / "shopify_bulk_products.jsonl"
+OPERATION_ID = "gid://shopify/BulkOperation/720918"
+COST = {
+    "requestedQueryCost": 10,
+    "throttleStatus": {"maximumAvailable": 1000, "currentlyAvailable": 990, "restoreRate": 50},
+}
+
+
+def generated_lines(products: int, variants: int) -> Iterator[bytes]:
+    for p in range(products):
+        product_id = f"gid://shopify/Product/{9000000000000 + p}"
+        yield (
+            json.dumps(
+                {
+                    "id": product_id,
+                    "title": f"Product {p}",
+                    "createdAt": "2024-01-01T00:00:00Z",
+                    "updatedAt": "2024-06-01T00:00:00Z",
+                    "featuredImage": {"url": f"https://cdn.shopify.com/s/files/1/0000/0001/files/p{p}.jpg"},
+                }
+            ).encode()
+            + b"\n"
+        )
+        for v in range(variants):
+            yield (
+                json.dumps(
+                    {
+                        "id": f"gid://shopify/ProductVariant/{40000000000000 + p * variants + v}",
+                        "title": f"Size {v}",
+                        "sku": f"SKU-{p}-{v}",
+                        "price": "19.99",
+                        "inventoryQuantity": v,
+                        "image": None,
+                        "__parentId": product_id,
+                    }
+                ).encode()
+                + b"\n"
+            )
+
+
+class StubState:
+    def __init__(self, polls: int, products: int, variants: int):
+        self.polls = polls
+        self.products = products
+        self.variants = variants
+        self.status_queries = 0
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        with self._lock:
+            self.status_queries += 1
+            return self.status_queries
+
+    def lines(self) -> Iterator[bytes]:
+        if self.products:
+            return generated_lines(self.products, self.variants)
+        return (line for line in FIXTURE.read_bytes().splitlines(keepends=True))
+
+
+def make_handler(state: StubState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            query = payload["query"]
+
+            if "bulkOperationRunQuery" in query:
+                operation = {"id": OPERATION_ID, "status": "CREATED"}
+                data = {"bulkOperationRunQuery": {"bulkOperation": operation, "userErrors": []}}
+            elif "bulkOperationCancel" in query:
+                operation = {"id": OPERATION_ID, "status": "CANCELING"}
+                data = {"bulkOperationCancel": {"bulkOperation": operation, "userErrors": []}}
+            elif "BulkOperation" in query:
+                done = state.poll() > state.polls
+                host = self.headers.get("Host")
+                data = {
+                    "node": {
+                        "id": OPERATION_ID,
+                        "status": "COMPLETED" if done else "RUNNING",
+                        "errorCode": None,
+                        "objectCount": None,
+                        "url": f"http://{host}/bulk/result.jsonl" if done else None,
+                        "partialDataUrl": None,
+                    }
+                }
+            else:
+                self._reply(400, {"errors": [{"message": "unsupported query"}]})
+                return
+            self._reply(200, {"data": data, "extensions": {"cost": COST}})
+
+        def do_GET(self) -> None:
+            if self.path != "/bulk/result.jsonl":
+                self._reply(404, {"errors": [{"message": "not found"}]})
+                return
+            # Chunked, so the client sees lines split across reads as it would from cloud storage
+            self.send_response(200)
+            self.send_header("Content-Type", "application/jsonl")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            pending = b""
+            for line in state.lines():
+                pending += line
+                if len(pending) >= 8192:
+                    self._chunk(pending[:5000])
+                    pending = pending[5000:]
+            self._chunk(pending)
+            self._chunk(b"")
+
+        def _chunk(self, data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        def _reply(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def serve(port: int, polls: int = 2, products: int = 0, variants: int = 3) -> tuple[ThreadingHTTPServer, StubState]:
+    """Start the stub on a background thread; port 0 picks a free one (see server.server_port)"""
+    state = StubState(polls, products, variants)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--polls", type=int, default=2, help="status queries answered RUNNING before COMPLETED")
+    parser.add_argument("--products", type=int, default=0, help="generate this many products instead of the fixture")
+    parser.add_argument("--variants", type=int, default=3, help="variants per generated product")
+    args = parser.parse_args()
+
+    server, _ = serve(args.port, args.polls, args.products, args.variants)
+    print(f"Shopify bulk stub on http://127.0.0.1:{server.server_port}/admin/api/2024-01/graphql.json")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # services/platform-connector/src/adapters/base.py
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 from typing import Any
 
 from shared.utils.logger import ServiceLogger
@@ -20,11 +21,18 @@ class PlatformAdapter(ABC):
 
     @abstractmethod
     async def fetch_products(
-        self, merchant_id: str, platform_shop_id: str, domain: str, sync_id: str, correlation_id: str
+        self,
+        merchant_id: str,
+        platform_shop_id: str,
+        domain: str,
+        sync_id: str,
+        correlation_id: str,
+        updated_since: str | None = None,
     ) -> AsyncIterator[dict[str, Any]]:
         """
         Fetch products from platform.
-        Yields batches of products.
+        Yields batches of products; with updated_since (ISO 8601) only
+        those updated on the platform after it.
         """
         pass
 
@@ -33,9 +41,22 @@ class PlatformAdapter(ABC):
         """Transform platform product to internal format"""
         pass
 
+    async def close(self) -> None:
+        """Release connections held across syncs"""
+        # Adapters that keep no connections have nothing to release
+        return None
+
     def extract_id(self, gid: str) -> str:
         """Extract numeric ID from platform GID"""
         # e.g., "gid://shopify/Product/123456" -> "123456"
         if "/" in gid:
             return gid.split("/")[-1]
         return gid
+
+    @staticmethod
+    def parse_updated_since(value: str) -> datetime:
+        """ISO 8601 cursor as an aware UTC datetime (naive values are UTC)"""
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            return moment.replace(tzinfo=UTC)
+        return moment.astimezone(UTC)
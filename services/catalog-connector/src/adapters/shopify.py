@@ -5,29 +5,59 @@ from typing import Any
 
 import aiohttp
 
-from shared.utils.exceptions import InfrastructureError, RequestTimeoutError, UnauthorizedError
+from shared.utils.exceptions import InfrastructureError, NotFoundError, RequestTimeoutError, UnauthorizedError
 
+from ..exceptions import ShopifyAPIError
 from ..services.token_service import TokenServiceClient
 from .base import PlatformAdapter
+from .shopify_bulk import (
+    BULK_CANCEL_MUTATION,
+    BULK_FAILED_STATUSES,
+    BULK_PRODUCTS_QUERY,
+    BULK_RUN_MUTATION,
+    BULK_STATUS_QUERY,
+    iter_jsonl,
+    iter_products,
+)
+from .shopify_throttle import ShopifyCostThrottle, retry_after_seconds
 
 
 class ShopifyAdapter(PlatformAdapter):
-    """Shopify platform adapter using GraphQL API with Token Service"""
+    """Shopify platform adapter using GraphQL API with Token Service.
+
+    Requests are paced per shop by the GraphQL cost bucket, the next page is
+    fetched while the current one is being published, and one HTTP session
+    is kept for all syncs. With shopify_fetch_mode "bulk" the catalog is
+    exported by a bulk operation and its JSONL result streamed instead of
+    paged. Incremental syncs filter the products search by updated_at and
+    always page, as a delta is usually far smaller than a bulk export's
+    start-up cost.
+    """
 
     def __init__(self, logger, config, token_client: TokenServiceClient):
         super().__init__(logger, config)
         self.token_client = token_client
+        self._session: aiohttp.ClientSession | None = None
+        # Shop domain -> cost bucket, kept across syncs of the same shop
+        self._throttles: dict[str, ShopifyCostThrottle] = {}
+
+    # Shopify rejects any single query whose requested cost exceeds this (MAX_COST_EXCEEDED)
+    MAX_QUERY_COST = 1000
+    VARIANTS_PER_PRODUCT = 100
+    # Requested cost of one product node: itself, featuredImage, the variants connection (2)
+    # and each variant with its image; a page costs 2 + first * this
+    PRODUCT_QUERY_COST = 4 + 2 * VARIANTS_PER_PRODUCT
 
     PRODUCTS_QUERY = """
-    query getProducts($cursor: String) {
-        products(first: 250, after: $cursor) {
+    query getProducts($cursor: String, $first: Int!, $variants: Int!, $query: String) {
+        products(first: $first, after: $cursor, query: $query) {
             edges {
                 node {
                     id
                     title
                     createdAt
                     updatedAt
-                    variants(first: 100) {
+                    variants(first: $variants) {
                         edges {
                             node {
                                 id
@@ -68,22 +98,28 @@ class ShopifyAdapter(PlatformAdapter):
 
             return token
 
-        except NotFoundError:
+        except NotFoundError as e:
             # Token not found in Token Service
             raise UnauthorizedError(
                 f"No Shopify access token found for shop: {domain}",
                 auth_type="shopify_oauth",
                 details={"domain": domain},
-            )
+            ) from e
         except InfrastructureError as e:
             # Token Service unavailable
             self.logger.exception(f"Token Service error: {e}", extra={"domain": domain})
             raise
 
     async def fetch_products(
-        self, merchant_id: str, platform_shop_id: str, domain: str, sync_id: str, correlation_id: str
+        self,
+        merchant_id: str,
+        platform_shop_id: str,
+        domain: str,
+        sync_id: str,
+        correlation_id: str,
+        updated_since: str | None = None,
     ) -> AsyncIterator[dict[str, Any]]:
-        """Fetch products from Shopify in batches"""
+        """Fetch products from Shopify in batches (paged or bulk export, per shopify_fetch_mode)"""
 
         # Get access token from Token Service
         token = await self.authenticate({"domain": domain, "correlation_id": correlation_id})
@@ -91,90 +127,58 @@ class ShopifyAdapter(PlatformAdapter):
         if not token:
             raise UnauthorizedError(f"Failed to get Shopify token for {domain}", auth_type="shopify_oauth")
 
+        search = self._updated_since_search(updated_since) if updated_since else None
+        bulk = self.config.get("shopify_fetch_mode", "paged") == "bulk" and not search
         self.logger.info(
             f"Starting Shopify product fetch for {domain}",
-            extra={"correlation_id": correlation_id, "sync_id": sync_id, "merchant_id": merchant_id},
+            extra={
+                "correlation_id": correlation_id,
+                "sync_id": sync_id,
+                "merchant_id": merchant_id,
+                "mode": "bulk" if bulk else "paged",
+                "search": search,
+            },
         )
 
         batch_num = 0
-        cursor = None
         total_products = 0
 
-        async with aiohttp.ClientSession() as session:
-            while True:
-                batch_num += 1
-
-                try:
-                    # Execute GraphQL query
-                    response_data = await self._execute_graphql(
-                        session, domain, token, self.PRODUCTS_QUERY, {"cursor": cursor}
-                    )
-
-                    # Transform products
-                    products_batch = []
-                    for edge in response_data["data"]["products"]["edges"]:
-                        product = edge["node"]
-
-                        # Process each variant
-                        for variant_edge in product.get("variants", {}).get("edges", []):
-                            variant = variant_edge["node"]
-
-                            transformed = self.transform_product(
-                                {
-                                    "product": product,
-                                    "variant": variant,
-                                    "domain": domain,
-                                    "platform_shop_id": platform_shop_id,
-                                }
-                            )
-
-                            products_batch.append(transformed)
-
-                    total_products += len(products_batch)
-
-                    # Check if there are more pages
-                    has_more = response_data["data"]["products"]["pageInfo"]["hasNextPage"]
-
-                    # Yield this batch
-                    yield {
-                        "merchant_id": merchant_id,
-                        "sync_id": sync_id,
-                        "platform_name": "shopify",
-                        "platform_shop_id": platform_shop_id,
-                        "domain": domain,
-                        "products": products_batch,
-                        "batch_num": batch_num,
-                        "has_more": has_more,
-                    }
-
-                    if not has_more:
-                        break
-
-                    # Get cursor for next page
-                    edges = response_data["data"]["products"]["edges"]
-                    if edges:
-                        cursor = edges[-1]["cursor"]
-
-                    # Rate limit protection
-                    await asyncio.sleep(self.config.get("shopify_rate_limit_delay", 0.5))
+        # Pages are fetched ahead into a bounded queue while the caller publishes the previous one
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.config.get("shopify_prefetch_pages", 1)))
+        batches = (
+            self._bulk_batches(domain, token, platform_shop_id, correlation_id, sync_id)
+            if bulk
+            else self._paged_batches(domain, token, platform_shop_id, search)
+        )
+        producer = asyncio.create_task(self._produce_pages(pages, batches, domain, correlation_id, sync_id))
 
-                except UnauthorizedError:
-                    # Token might be expired or revoked
-                    self.logger.exception(
-                        f"Shopify authentication failed for {domain}",
-                        extra={"correlation_id": correlation_id, "sync_id": sync_id},
-                    )
-                    raise
+        try:
+            while True:
+                page = await pages.get()
+                if isinstance(page, BaseException):
+                    raise page
 
-                except aiohttp.ClientError as e:
-                    raise InfrastructureError(
-                        f"Failed to fetch products from Shopify: {e}", service="shopify_api", retryable=True
-                    )
+                products_batch, has_more = page
+                batch_num += 1
+                total_products += len(products_batch)
+
+                # Yield this batch
+                yield {
+                    "merchant_id": merchant_id,
+                    "sync_id": sync_id,
+                    "platform_name": "shopify",
+                    "platform_shop_id": platform_shop_id,
+                    "domain": domain,
+                    "products": products_batch,
+                    "batch_num": batch_num,
+                    "has_more": has_more,
+                }
 
-                except TimeoutError:
-                    raise RequestTimeoutError(
-                        "Shopify API request timed out", timeout_seconds=30, operation="fetch_products"
-                    )
+                if not has_more:
+                    break
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
 
         self.logger.info(
             "Completed Shopify product fetch",
@@ -186,34 +190,289 @@ class ShopifyAdapter(PlatformAdapter):
             },
         )
 
-    async def _execute_graphql(
-        self, session: aiohttp.ClientSession, domain: str, token: str, query: str, variables: dict[str, Any]
-    ) -> dict[str, Any]:
-        """Execute GraphQL query against Shopify Admin API"""
+    async def fetch_products_by_id(
+        self, domain: str, platform_shop_id: str, product_ids: list[str], correlation_id: str
+    ) -> list[dict[str, Any]]:
+        """Current variants of the given products (deleted ones are simply absent).
 
-        url = f"https://{domain}/admin/api/2024-01/graphql.json"
-        headers = {"X-Shopify-Access-Token": token, "Content-Type": "application/json"}
+        Goes through the products search, whose index trails writes by a few
+        seconds; callers refreshing after a webhook wait at least that long.
+        """
+        token = await self.authenticate({"domain": domain, "correlation_id": correlation_id})
+        search = " OR ".join(f"id:{product_id}" for product_id in product_ids)
+
+        products = []
+        async for products_batch, _ in self._paged_batches(domain, token, platform_shop_id, search):
+            products.extend(products_batch)
+        return products
+
+    def _updated_since_search(self, updated_since: str) -> str:
+        """Products search string for an incremental sync"""
+        since = self.parse_updated_since(updated_since)
+        return f"updated_at:>'{since.strftime('%Y-%m-%dT%H:%M:%SZ')}'"
+
+    async def _produce_pages(
+        self,
+        pages: asyncio.Queue,
+        batches: AsyncIterator[tuple[list[dict[str, Any]], bool]],
+        domain: str,
+        correlation_id: str,
+        sync_id: str,
+    ) -> None:
+        """Put (products, has_more) batches on the queue in order, or the error that stopped them"""
+        try:
+            async for batch in batches:
+                await pages.put(batch)
+
+        except UnauthorizedError as e:
+            # Token might be expired or revoked
+            self.logger.exception(
+                f"Shopify authentication failed for {domain}",
+                extra={"correlation_id": correlation_id, "sync_id": sync_id},
+            )
+            await pages.put(e)
 
-        payload = {"query": query, "variables": variables}
+        except aiohttp.ClientError as e:
+            await pages.put(
+                InfrastructureError(
+                    f"Failed to fetch products from Shopify: {e}", service="shopify_api", retryable=True
+                )
+            )
+
+        except TimeoutError:
+            await pages.put(
+                RequestTimeoutError("Shopify API request timed out", timeout_seconds=30, operation="fetch_products")
+            )
+
+        except Exception as e:
+            await pages.put(e)
+
+        finally:
+            # Releases an in-progress bulk download when the sync stops early
+            await batches.aclose()
 
-        async with session.post(
-            url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=30)
-        ) as response:
-            if response.status == 401:
-                raise UnauthorizedError("Invalid Shopify access token", auth_type="shopify_oauth")
+    async def _paged_batches(
+        self, domain: str, token: str, platform_shop_id: str, search: str | None = None
+    ) -> AsyncIterator[tuple[list[dict[str, Any]], bool]]:
+        """One batch per products page, following the cursor; search filters the products.
 
-            if response.status == 429:
-                # Rate limited
-                retry_after = response.headers.get("Retry-After", "5")
+        Pages are sized so the query's requested cost stays within MAX_QUERY_COST:
+        from the static estimate at first, then from the cost Shopify reports.
+        """
+        cursor = None
+        first = self._page_size(self.PRODUCT_QUERY_COST)
+        while True:
+            response_data = await self._execute_graphql(
+                domain,
+                token,
+                self.PRODUCTS_QUERY,
+                {"cursor": cursor, "first": first, "variants": self.VARIANTS_PER_PRODUCT, "query": search},
+            )
+            requested = (response_data.get("extensions", {}).get("cost") or {}).get("requestedQueryCost")
+            if requested:
+                first = self._page_size((requested - 2) / first)
+
+            # Transform products
+            products_batch = []
+            edges = response_data["data"]["products"]["edges"]
+            for edge in edges:
+                products_batch.extend(self._transform_variants(edge["node"], domain, platform_shop_id))
+
+            # Check if there are more pages
+            has_more = response_data["data"]["products"]["pageInfo"]["hasNextPage"] and bool(edges)
+            yield products_batch, has_more
+
+            if not has_more:
+                return
+
+            # Get cursor for next page
+            cursor = edges[-1]["cursor"]
+
+    def _page_size(self, product_cost: float) -> int:
+        """Products per page that keep the query within MAX_QUERY_COST, at most shopify_batch_size"""
+        batch_size = self.config.get("shopify_batch_size", 250)
+        return max(1, min(batch_size, int((self.MAX_QUERY_COST - 2) // max(product_cost, 1))))
+
+    async def _bulk_batches(
+        self, domain: str, token: str, platform_shop_id: str, correlation_id: str, sync_id: str
+    ) -> AsyncIterator[tuple[list[dict[str, Any]], bool]]:
+        """Batches of shopify_batch_size products from a bulk export, streamed as it downloads"""
+        url = await self._run_bulk_operation(domain, token, correlation_id, sync_id)
+        batch_size = self.config.get("shopify_batch_size", 250)
+
+        # Each batch is held until the next exists, since has_more is only known at the end of the file
+        pending: list[dict[str, Any]] | None = None
+        products_batch: list[dict[str, Any]] = []
+        product_count = 0
+        if url:
+            async for product in iter_products(iter_jsonl(self._download(url)), self.logger):
+                products_batch.extend(self._transform_variants(product, domain, platform_shop_id))
+                product_count += 1
+                if product_count == batch_size:
+                    if pending is not None:
+                        yield pending, True
+                    pending, products_batch, product_count = products_batch, [], 0
+
+        if products_batch:
+            if pending is not None:
+                yield pending, True
+            pending = products_batch
+        yield pending or [], False
+
+    async def _run_bulk_operation(self, domain: str, token: str, correlation_id: str, sync_id: str) -> str | None:
+        """Start the products export and poll until it finishes; returns the JSONL URL (None if empty)"""
+        response_data = await self._execute_graphql(domain, token, BULK_RUN_MUTATION, {"query": BULK_PRODUCTS_QUERY})
+        result = response_data["data"]["bulkOperationRunQuery"]
+        if result["userErrors"]:
+            # Usually another bulk query of this app is still running on the shop
+            raise InfrastructureError(
+                f"Shopify bulk operation rejected: {result['userErrors'][0]['message']}",
+                service="shopify_api",
+                retryable=True,
+                details={"user_errors": result["userErrors"]},
+            )
+
+        operation_id = result["bulkOperation"]["id"]
+        timeout = self.config.get("shopify_bulk_timeout_seconds", 3600)
+        interval = self.config.get("shopify_bulk_poll_seconds", 2.0)
+        deadline = asyncio.get_running_loop().time() + timeout
+
+        while True:
+            await asyncio.sleep(interval)
+            response_data = await self._execute_graphql(domain, token, BULK_STATUS_QUERY, {"id": operation_id})
+            operation = response_data["data"]["node"]
+            status = operation["status"]
+
+            if status == "COMPLETED":
+                self.logger.info(
+                    f"Shopify bulk operation completed with {operation.get('objectCount')} objects",
+                    extra={"correlation_id": correlation_id, "sync_id": sync_id, "operation_id": operation_id},
+                )
+                return operation.get("url")
+
+            if status in BULK_FAILED_STATUSES:
                 raise InfrastructureError(
-                    "Shopify rate limit exceeded",
+                    f"Shopify bulk operation {status.lower()}: {operation.get('errorCode')}",
                     service="shopify_api",
-                    retryable=True,
-                    details={"retry_after": retry_after},
+                    retryable=operation.get("errorCode") != "ACCESS_DENIED",
+                    details={"operation_id": operation_id},
                 )
 
+            if asyncio.get_running_loop().time() > deadline:
+                # Free the shop's bulk slot so the retried sync can start a new one
+                try:
+                    await self._execute_graphql(domain, token, BULK_CANCEL_MUTATION, {"id": operation_id})
+                except Exception as e:
+                    self.logger.warning(f"Could not cancel bulk operation {operation_id}: {e}")
+                raise RequestTimeoutError(
+                    "Shopify bulk operation did not finish", timeout_seconds=timeout, operation="bulk_operation"
+                )
+
+            # Exports of large catalogs take minutes; poll less often as it runs
+            interval = min(interval * 1.5, 30.0)
+
+    async def _download(self, url: str) -> AsyncIterator[bytes]:
+        """Stream the bulk result file (a signed URL, so no Shopify token)"""
+        async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=None, sock_read=60)) as response:
             response.raise_for_status()
-            return await response.json()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                yield chunk
+
+    def _transform_variants(self, product: dict[str, Any], domain: str, platform_shop_id: str) -> list[dict[str, Any]]:
+        """One internal product per variant"""
+        return [
+            self.transform_product(
+                {
+                    "product": product,
+                    "variant": variant_edge["node"],
+                    "domain": domain,
+                    "platform_shop_id": platform_shop_id,
+                }
+            )
+            for variant_edge in product.get("variants", {}).get("edges", [])
+        ]
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """HTTP session shared by every sync, so connections to shops are reused"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config.get("shopify_max_connections", 20), ttl_dns_cache=300)
+            )
+        return self._session
+
+    def _throttle(self, domain: str) -> ShopifyCostThrottle:
+        if domain not in self._throttles:
+            self._throttles[domain] = ShopifyCostThrottle()
+        return self._throttles[domain]
+
+    async def _execute_graphql(self, domain: str, token: str, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        """Execute GraphQL query against Shopify Admin API, paced by the shop's cost bucket"""
+
+        url_template = self.config.get("shopify_api_url", "https://{domain}/admin/api/2024-01/graphql.json")
+        url = url_template.format(domain=domain)
+        headers = {"X-Shopify-Access-Token": token, "Content-Type": "application/json"}
+
+        payload = {"query": query, "variables": variables}
+        throttle = self._throttle(domain)
+        max_retries = self.config.get("shopify_max_retries", 3)
+
+        for attempt in range(max_retries + 1):
+            await throttle.wait()
+
+            async with self.session.post(
+                url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status == 401:
+                    raise UnauthorizedError("Invalid Shopify access token", auth_type="shopify_oauth")
+
+                if response.status == 429:
+                    # Rate limited
+                    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                    if attempt == max_retries:
+                        raise InfrastructureError(
+                            "Shopify rate limit exceeded",
+                            service="shopify_api",
+                            retryable=True,
+                            details={"retry_after": retry_after},
+                        )
+                    await asyncio.sleep(retry_after)
+                    continue
+
+                response.raise_for_status()
+                data = await response.json()
+
+            cost = data.get("extensions", {}).get("cost")
+            if any(error.get("extensions", {}).get("code") == "THROTTLED" for error in data.get("errors") or []):
+                # The query was rejected for cost: wait until the bucket refills enough
+                delay = throttle.retry_delay(cost)
+                if attempt == max_retries:
+                    raise InfrastructureError(
+                        "Shopify query throttled",
+                        service="shopify_api",
+                        retryable=True,
+                        details={"retry_after": delay},
+                    )
+                self.logger.warning(f"Shopify query throttled for {domain}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            throttle.update(cost)
+            if data.get("errors"):
+                # e.g. MAX_COST_EXCEEDED or a query error: there is no usable data to return
+                codes = [error.get("extensions", {}).get("code") for error in data["errors"]]
+                raise ShopifyAPIError(
+                    f"Shopify GraphQL error: {data['errors'][0].get('message')}",
+                    service="shopify_api",
+                    retryable="INTERNAL_SERVER_ERROR" in codes,
+                    details={"errors": data["errors"], "cost": cost},
+                )
+            return data
+
+    async def close(self) -> None:
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
 
     def transform_product(self, raw_data: dict[str, Any]) -> dict[str, Any]:
         """Transform Shopify product to internal format"""
@@ -222,9 +481,9 @@ class ShopifyAdapter(PlatformAdapter):
 
         # Get image URL (variant image or product featured image)
         image_url = None
-        if variant.get("image", {}).get("url"):
+        if (variant.get("image") or {}).get("url"):
             image_url = variant["image"]["url"]
-        elif product.get("featuredImage", {}).get("url"):
+        elif (product.get("featuredImage") or {}).get("url"):
             image_url = product["featuredImage"]["url"]
 
         return {
@@ -0,0 +1,124 @@
+# services/platform-connector/src/adapters/shopify_bulk.py
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from shared.utils.logger import ServiceLogger
+
+# Bulk queries take no pagination arguments; Shopify walks every connection itself
+BULK_PRODUCTS_QUERY = """
+{
+    products {
+        edges {
+            node {
+                id
+                title
+                createdAt
+                updatedAt
+                featuredImage {
+                    url
+                }
+                variants {
+                    edges {
+                        node {
+                            id
+                            title
+                            sku
+                            price
+                            inventoryQuantity
+                            image {
+                                url
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+BULK_RUN_MUTATION = """
+mutation runBulkQuery($query: String!) {
+    bulkOperationRunQuery(query: $query) {
+        bulkOperation {
+            id
+            status
+        }
+        userErrors {
+            field
+            message
+        }
+    }
+}
+"""
+
+BULK_STATUS_QUERY = """
+query bulkOperationStatus($id: ID!) {
+    node(id: $id) {
+        ... on BulkOperation {
+            id
+            status
+            errorCode
+            objectCount
+            url
+            partialDataUrl
+        }
+    }
+}
+"""
+
+BULK_CANCEL_MUTATION = """
+mutation cancelBulkOperation($id: ID!) {
+    bulkOperationCancel(id: $id) {
+        bulkOperation {
+            id
+            status
+        }
+        userErrors {
+            field
+            message
+        }
+    }
+}
+"""
+
+# Terminal states other than COMPLETED; CANCELING is not terminal and keeps being polled
+BULK_FAILED_STATUSES = frozenset({"FAILED", "CANCELED", "EXPIRED"})
+
+
+async def iter_jsonl(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, Any]]:
+    """Parse a JSONL byte stream record by record, holding at most one partial line"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def iter_products(
+    records: AsyncIterator[dict[str, Any]], logger: ServiceLogger | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """Rebuild products with their variants from flattened bulk records.
+
+    Shopify writes each product followed by its variant lines (linked by
+    __parentId), so only the current product is held. The output has the
+    same shape as a page node: {"variants": {"edges": [{"node": ...}]}}.
+    """
+    product: dict[str, Any] | None = None
+    async for record in records:
+        parent_id = record.pop("__parentId", None)
+        if parent_id is None:
+            if product is not None:
+                yield product
+            product = {**record, "variants": {"edges": []}}
+        elif product is not None and parent_id == product["id"]:
+            product["variants"]["edges"].append({"node": record})
+        elif logger:
+            logger.warning(f"Bulk record {record.get('id')} does not follow its parent {parent_id}, skipped")
+    if product is not None:
+        yield product
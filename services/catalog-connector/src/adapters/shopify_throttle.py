@@ -0,0 +1,73 @@
+# services/platform-connector/src/adapters/shopify_throttle.py
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+
+class ShopifyCostThrottle:
+    """Client-side view of one shop's GraphQL cost bucket.
+
+    Shopify reports the bucket with every response (extensions.cost.throttleStatus):
+    points available, the maximum and the restore rate per second. Before a
+    query we estimate what has been restored since and wait only as long as
+    it takes to afford the query's cost, instead of a fixed delay per page.
+    """
+
+    def __init__(self, maximum_available: float = 1000.0, restore_rate: float = 50.0):
+        self.maximum_available = maximum_available
+        self.restore_rate = restore_rate
+        self.currently_available = maximum_available
+        # Cost of the last query of this shape, the best estimate of the next one
+        self.expected_cost = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def available(self) -> float:
+        elapsed = time.monotonic() - self._updated
+        return min(self.maximum_available, self.currently_available + elapsed * self.restore_rate)
+
+    async def wait(self, cost: float | None = None) -> float:
+        """Sleep until the bucket can pay for a query; returns seconds waited"""
+        cost = min(self.expected_cost if cost is None else cost, self.maximum_available)
+        async with self._lock:
+            delay = max(0.0, (cost - self.available()) / self.restore_rate)
+            if delay:
+                await asyncio.sleep(delay)
+            # Reserve the points so concurrent queries against the shop don't all go at once
+            self.currently_available = self.available() - cost
+            self._updated = time.monotonic()
+        return delay
+
+    def update(self, cost: dict[str, Any] | None) -> None:
+        """Sync with the cost extension of a GraphQL response"""
+        if not cost:
+            return
+        status = cost.get("throttleStatus") or {}
+        self.maximum_available = float(status.get("maximumAvailable", self.maximum_available))
+        self.restore_rate = float(status.get("restoreRate", self.restore_rate)) or self.restore_rate
+        if "currentlyAvailable" in status:
+            self.currently_available = float(status["currentlyAvailable"])
+            self._updated = time.monotonic()
+        if "requestedQueryCost" in cost:
+            self.expected_cost = float(cost["requestedQueryCost"])
+
+    def retry_delay(self, cost: dict[str, Any] | None) -> float:
+        """Seconds until a THROTTLED query can be afforded"""
+        self.update(cost)
+        requested = float((cost or {}).get("requestedQueryCost", self.expected_cost))
+        return max(1.0, (requested - self.available()) / self.restore_rate)
+
+
+def retry_after_seconds(value: str | None, default: float = 5.0) -> float:
+    """Delay from a 429's Retry-After header, in seconds or as an HTTP date; default when missing or malformed"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
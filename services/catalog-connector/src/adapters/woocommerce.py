@@ -48,18 +48,35 @@ class WooCommerceAdapter(PlatformAdapter):
             raise
 
     async def fetch_products(
-        self, merchant_id: str, platform_shop_id: str, domain: str, sync_id: str, correlation_id: str
+        self,
+        merchant_id: str,
+        platform_shop_id: str,
+        domain: str,
+        sync_id: str,
+        correlation_id: str,
+        updated_since: str | None = None,
     ) -> AsyncIterator[dict[str, Any]]:
-        """Fetch products from WooCommerce in batches"""
+        """Fetch products from WooCommerce in batches (only those modified after updated_since, if given)"""
 
         # Get auth headers from Token Service
         headers = await self.authenticate({"domain": domain, "correlation_id": correlation_id})
 
         self.logger.info(
             f"Starting WooCommerce product fetch for {domain}",
-            extra={"correlation_id": correlation_id, "sync_id": sync_id, "merchant_id": merchant_id},
+            extra={
+                "correlation_id": correlation_id,
+                "sync_id": sync_id,
+                "merchant_id": merchant_id,
+                "updated_since": updated_since,
+            },
         )
 
+        # Incremental: the store filters by modification date, compared in GMT rather than the shop's timezone
+        filters = {}
+        if updated_since:
+            since = self.parse_updated_since(updated_since)
+            filters = {"modified_after": since.strftime("%Y-%m-%dT%H:%M:%S"), "dates_are_gmt": "true"}
+
         batch_num = 0
         page = 1
         total_products = 0
@@ -71,7 +88,7 @@ class WooCommerceAdapter(PlatformAdapter):
 
                 # Fetch products page
                 url = f"https://{domain}/wp-json/wc/v3/products"
-                params = {"page": page, "per_page": per_page, "status": "publish"}
+                params = {"page": page, "per_page": per_page, "status": "publish", **filters}
 
                 try:
                     async with session.get(
@@ -33,9 +33,23 @@ class ServiceConfig(BaseModel):
     internal_jwt_secret: str = Field(..., alias="INTERNAL_JWT_SECRET")
 
     # Platform API configuration
-    shopify_rate_limit_delay: float = Field(default=0.5, alias="SHOPIFY_RATE_LIMIT_DELAY")
+    # Shopify requests are paced by the GraphQL cost bucket (extensions.cost.throttleStatus)
+    shopify_api_url: str = Field(default="https://{domain}/admin/api/2024-01/graphql.json", alias="SHOPIFY_API_URL")
+    # Products per batch; paged fetches also cap it so a query stays within Shopify's 1000-point limit
     shopify_batch_size: int = Field(default=250, alias="SHOPIFY_BATCH_SIZE")
     shopify_max_retries: int = Field(default=3, alias="SHOPIFY_MAX_RETRIES")
+    # Pages fetched ahead of the one being published
+    shopify_prefetch_pages: int = Field(default=1, alias="SHOPIFY_PREFETCH_PAGES")
+    shopify_max_connections: int = Field(default=20, alias="SHOPIFY_MAX_CONNECTIONS")
+    # "paged" walks the products connection; "bulk" exports the catalog with a bulk operation (large shops)
+    shopify_fetch_mode: str = Field(default="paged", alias="SHOPIFY_FETCH_MODE")
+    shopify_bulk_poll_seconds: float = 2.0
+    shopify_bulk_timeout_seconds: int = Field(default=3600, alias="SHOPIFY_BULK_TIMEOUT_SECONDS")
+
+    # Product webhooks: a shop's changed products are refreshed together once it has been quiet this long
+    product_refresh_debounce_seconds: float = Field(default=5.0, alias="PRODUCT_REFRESH_DEBOUNCE_SECONDS")
+    product_refresh_max_delay_seconds: float = Field(default=30.0, alias="PRODUCT_REFRESH_MAX_DELAY_SECONDS")
+    product_refresh_max_products: int = Field(default=50, alias="PRODUCT_REFRESH_MAX_PRODUCTS")
 
     # WooCommerce settings
     woocommerce_batch_size: int = Field(default=100, alias="WOOCOMMERCE_BATCH_SIZE")
@@ -1,11 +1,11 @@
 # services/platform-connector/src/events/listeners.py
-from typing import Any
+from pydantic import ValidationError as PydanticValidationError
 
-from shared.api.correlation import set_correlation_context
 from shared.messaging import Listener
+from shared.messaging.events.base import EventEnvelope
 from shared.utils.exceptions import ValidationError
 
-from ..schemas.events import CatalogSyncRequestedPayload
+from ..schemas.events import CatalogSyncRequestedPayload, ProductChangedPayload
 
 
 class CatalogSyncRequestedListener(Listener):
@@ -27,15 +27,12 @@ class CatalogSyncRequestedListener(Listener):
         super().__init__(js_client, logger)
         self.connector_service = connector_service
 
-    async def on_message(self, data: dict[str, Any]) -> None:
+    async def on_message(self, envelope: EventEnvelope) -> None:
         """Process catalog sync request"""
+        correlation_id = envelope.correlation_id
         try:
             # Validate payload
-            payload = CatalogSyncRequestedPayload(**data)
-
-            # Set correlation context from event
-            if correlation_id := data.get("correlation_id"):
-                set_correlation_context(correlation_id)
+            payload = CatalogSyncRequestedPayload.model_validate(envelope.data)
 
             self.logger.info(
                 f"Received sync request for {payload.platform_name}",
@@ -43,6 +40,7 @@ class CatalogSyncRequestedListener(Listener):
                     "correlation_id": correlation_id,
                     "sync_id": payload.sync_id,
                     "merchant_id": payload.merchant_id,
+                    "sync_type": payload.sync_type,
                 },
             )
 
@@ -53,10 +51,11 @@ class CatalogSyncRequestedListener(Listener):
                 platform_shop_id=payload.platform_shop_id,
                 domain=payload.domain,
                 sync_id=payload.sync_id,
-                correlation_id=correlation_id or "unknown",
+                correlation_id=correlation_id,
+                updated_since=payload.updated_since if payload.sync_type == "incremental" else None,
             )
 
-        except ValidationError as e:
+        except PydanticValidationError as e:
             self.logger.exception(f"Invalid sync request: {e}")
             return  # ACK invalid messages
 
@@ -84,3 +83,38 @@ class CatalogSyncRequestedListener(Listener):
         # Max retries exceeded or non-retryable
         self.logger.exception(f"Sync request failed permanently: {error}", extra={"data": data})
         return True  # ACK to prevent further retries
+
+
+class ProductChangedListener(Listener):
+    """Listen for product webhooks (created or updated) and queue the product for refresh"""
+
+    def __init__(self, js_client, connector_service, logger, action: str = "updated"):
+        self.action = action
+        super().__init__(js_client, logger)
+        self.connector_service = connector_service
+
+    @property
+    def subject(self) -> str:
+        return f"evt.webhook.catalog.product_{self.action}"
+
+    @property
+    def queue_group(self) -> str:
+        return f"platform-connector-product-{self.action}-handler"
+
+    @property
+    def service_name(self) -> str:
+        return "platform-connector"
+
+    async def on_message(self, envelope: EventEnvelope) -> None:
+        """Hand the product to the refresh coalescer; the fetch happens once the shop goes quiet"""
+        try:
+            payload = ProductChangedPayload.model_validate(envelope.data)
+        except PydanticValidationError as e:
+            self.logger.exception(f"Invalid product webhook event: {e}")
+            return  # ACK invalid messages
+
+        self.connector_service.queue_product_refresh(
+            domain=payload.domain,
+            product_id=payload.product_id,
+            correlation_id=envelope.correlation_id,
+        )
@@ -21,6 +21,18 @@ class PlatformEventPublisher(Publisher):
             correlation_id=correlation_id
         )
     
+    async def platform_products_refreshed(
+        self,
+        batch_data: Dict[str, Any],
+        correlation_id: str
+    ) -> str:
+        """Publish products re-fetched after product webhooks"""
+        return await self.publish_event(
+            subject="evt.platform.products.refreshed",
+            data=batch_data,
+            correlation_id=correlation_id
+        )
+    
     async def platform_fetch_completed(
         self,
         merchant_id: str,
@@ -1,5 +1,5 @@
 # src/exceptions.py
-from shared.errors import DomainError, ExternalServiceError, ValidationError
+from shared.utils.exceptions import DomainError, InfrastructureError, ValidationError
 
 
 class ConnectorError(DomainError):
@@ -8,10 +8,10 @@ class ConnectorError(DomainError):
     pass
 
 
-class ShopifyAPIError(ExternalServiceError):
-    """Shopify API error"""
+class ShopifyAPIError(InfrastructureError):
+    """Shopify API error: a GraphQL response with errors"""
 
-    pass
+    code = "SHOPIFY_API_ERROR"
 
 
 class BulkOperationError(ConnectorError):
@@ -5,7 +5,7 @@ from shared.messaging import JetStreamClient
 from shared.utils.logger import ServiceLogger
 
 from .config import ServiceConfig
-from .events.listeners import CatalogSyncRequestedListener
+from .events.listeners import CatalogSyncRequestedListener, ProductChangedListener
 from .events.publishers import PlatformEventPublisher
 from .services.connector_service import ConnectorService
 
@@ -66,6 +66,13 @@ class ServiceLifecycle:
             except Exception:
                 self.logger.exception("Listener stop failed", exc_info=True)
 
+        # Close platform sessions
+        if self.connector_service:
+            try:
+                await self.connector_service.close()
+            except Exception:
+                self.logger.exception("Connector close failed", exc_info=True)
+
         # Close messaging
         if self.messaging_client:
             try:
@@ -106,4 +113,15 @@ class ServiceLifecycle:
         await sync_listener.start()
         self._listeners.append(sync_listener)
 
+        # Product webhooks, refreshed in coalesced batches
+        for action in ("created", "updated"):
+            product_listener = ProductChangedListener(
+                js_client=self.messaging_client,
+                connector_service=self.connector_service,
+                logger=self.logger,
+                action=action,
+            )
+            await product_listener.start()
+            self._listeners.append(product_listener)
+
         self.logger.info("Event listeners started")
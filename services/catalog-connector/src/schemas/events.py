@@ -11,3 +11,14 @@ class CatalogSyncRequestedPayload(BaseModel):
     domain: str
     sync_id: str
     sync_type: str = "full"
+    # ISO 8601; set for incremental syncs
+    updated_since: str | None = None
+
+
+class ProductChangedPayload(BaseModel):
+    """Payload for webhook.catalog.product_created / product_updated events"""
+
+    domain: str
+    product_id: str
+    webhook_id: str | None = None
+    updated_at: str | None = None
@@ -1,10 +1,12 @@
 # services/platform-connector/src/services/connector_service.py (updated)
+from uuid import uuid4
 
 from shared.utils.exceptions import InfrastructureError, NotFoundError, UnauthorizedError
 from shared.utils.logger import ServiceLogger
 
 from ..adapters.shopify import ShopifyAdapter
 from ..adapters.woocommerce import WooCommerceAdapter
+from .product_refresh import ProductRefreshCoalescer
 from .token_service import TokenServiceClient
 
 
@@ -25,6 +27,21 @@ class ConnectorService:
             "woocommerce": WooCommerceAdapter(logger, config, self.token_client),
         }
 
+        # Product webhooks are coalesced per shop before refreshing
+        self.product_refresh = ProductRefreshCoalescer(
+            self.refresh_products,
+            logger,
+            debounce_seconds=config.get("product_refresh_debounce_seconds", 5.0),
+            max_delay_seconds=config.get("product_refresh_max_delay_seconds", 30.0),
+            max_products=config.get("product_refresh_max_products", 50),
+        )
+
+    async def close(self) -> None:
+        """Flush pending product refreshes and close adapter sessions"""
+        await self.product_refresh.close()
+        for adapter in self.adapters.values():
+            await adapter.close()
+
     async def process_sync_request(
         self,
         merchant_id: str,
@@ -33,8 +50,9 @@ class ConnectorService:
         domain: str,
         sync_id: str,
         correlation_id: str,
+        updated_since: str | None = None,
     ) -> None:
-        """Process catalog sync request with token retrieval"""
+        """Process catalog sync request with token retrieval; updated_since makes it incremental"""
 
         self.logger.info(
             f"Processing sync request for {platform_name}",
@@ -44,6 +62,7 @@ class ConnectorService:
                 "merchant_id": merchant_id,
                 "platform": platform_name,
                 "domain": domain,
+                "updated_since": updated_since,
             },
         )
 
@@ -71,6 +90,7 @@ class ConnectorService:
                 domain=domain,
                 sync_id=sync_id,
                 correlation_id=correlation_id,
+                updated_since=updated_since,
             ):
                 batch_count += 1
                 total_products += len(batch["products"])
@@ -144,3 +164,34 @@ class ConnectorService:
                 merchant_id=merchant_id, sync_id=sync_id, error=str(e), correlation_id=correlation_id
             )
             raise
+
+    def queue_product_refresh(self, domain: str, product_id: str, correlation_id: str) -> None:
+        """Schedule a product changed on the platform for a (coalesced) refresh"""
+        self.product_refresh.add(domain, product_id, correlation_id)
+
+    async def refresh_products(self, domain: str, product_ids: list[str], correlation_id: str) -> None:
+        """Re-fetch products of a Shopify shop and publish their current variants"""
+        adapter = self.adapters["shopify"]
+        products = await adapter.fetch_products_by_id(
+            domain=domain, platform_shop_id=domain, product_ids=product_ids, correlation_id=correlation_id
+        )
+
+        self.logger.info(
+            f"Refreshed {len(product_ids)} products for {domain}",
+            extra={"correlation_id": correlation_id, "product_ids": product_ids, "variants": len(products)},
+        )
+        if not products:
+            return  # Deleted since; product_deleted removes them from the catalog
+
+        # Shopify shops are keyed by domain, as in sync requests
+        await self.event_publisher.platform_products_refreshed(
+            batch_data={
+                "merchant_id": domain,
+                "refresh_id": str(uuid4()),
+                "platform_name": "shopify",
+                "platform_shop_id": domain,
+                "domain": domain,
+                "products": products,
+            },
+            correlation_id=correlation_id,
+        )
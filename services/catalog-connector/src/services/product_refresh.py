@@ -0,0 +1,98 @@
+# services/platform-connector/src/services/product_refresh.py
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from shared.utils.logger import ServiceLogger
+
+RefreshCallback = Callable[[str, list[str], str], Awaitable[None]]
+
+
+class ProductRefreshCoalescer:
+    """Debounces product webhooks per shop and refreshes the products together.
+
+    Shopify sends products/update for every save, often several a second
+    while a merchant edits a product. Product ids are collected per shop and
+    refreshed once the shop has been quiet for debounce_seconds, or at the
+    latest max_delay_seconds after its first pending event, so each product
+    is fetched once however many events named it. max_products caps the ids
+    in one refresh (one products search).
+
+    Pending ids live in memory only: ids lost on a crash or a failed refresh
+    are picked up by the next incremental sync.
+    """
+
+    def __init__(
+        self,
+        refresh: RefreshCallback,
+        logger: ServiceLogger,
+        debounce_seconds: float = 5.0,
+        max_delay_seconds: float = 30.0,
+        max_products: int = 50,
+    ):
+        self.refresh = refresh
+        self.logger = logger
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.max_products = max_products
+
+        # Shop domain -> pending product ids (insertion ordered), first event time, latest correlation id
+        self._pending: dict[str, dict[str, None]] = {}
+        self._first_seen: dict[str, float] = {}
+        self._correlation: dict[str, str] = {}
+        # Shop domain -> task waiting out the debounce; removed once it starts refreshing
+        self._timers: dict[str, asyncio.Task] = {}
+        self._running: set[asyncio.Task] = set()
+
+    def add(self, domain: str, product_id: str, correlation_id: str) -> None:
+        """Queue a product for refresh, pushing back the shop's pending refresh"""
+        loop = asyncio.get_running_loop()
+        pending = self._pending.setdefault(domain, {})
+        pending[product_id] = None
+        first_seen = self._first_seen.setdefault(domain, loop.time())
+        self._correlation[domain] = correlation_id
+
+        if timer := self._timers.pop(domain, None):
+            timer.cancel()
+
+        if len(pending) >= self.max_products:
+            self._start(domain)
+            return
+
+        delay = max(0.0, min(self.debounce_seconds, first_seen + self.max_delay_seconds - loop.time()))
+        self._timers[domain] = asyncio.create_task(self._flush_after(domain, delay))
+
+    async def close(self) -> None:
+        """Refresh everything still pending and wait for refreshes in progress"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for domain in list(self._pending):
+            self._start(domain)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _flush_after(self, domain: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Past this point add() starts a new window instead of cancelling this one
+        self._timers.pop(domain, None)
+        self._start(domain)
+
+    def _start(self, domain: str) -> None:
+        product_ids = list(self._pending.pop(domain, {}))
+        self._first_seen.pop(domain, None)
+        correlation_id = self._correlation.pop(domain, "unknown")
+        if not product_ids:
+            return
+
+        task = asyncio.create_task(self._refresh(domain, product_ids, correlation_id))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _refresh(self, domain: str, product_ids: list[str], correlation_id: str) -> None:
+        try:
+            await self.refresh(domain, product_ids, correlation_id)
+        except Exception as e:
+            self.logger.warning(
+                f"Product refresh failed for {domain}, left to the next incremental sync: {e}",
+                extra={"correlation_id": correlation_id, "product_ids": product_ids},
+            )
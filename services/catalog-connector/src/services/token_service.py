@@ -2,7 +2,6 @@
 
 import aiohttp
 
-from shared.api.correlation import add_correlation_header
 from shared.utils.exceptions import InfrastructureError, NotFoundError, UnauthorizedError
 from shared.utils.logger import ServiceLogger
 
@@ -19,7 +18,7 @@ class TokenServiceClient:
         """Get Shopify access token from Token Service"""
 
         url = f"{self.base_url}/api/v1/tokens/shopify/{domain}"
-        headers = add_correlation_header({"Content-Type": "application/json"})
+        headers = {"Content-Type": "application/json", "X-Correlation-ID": correlation_id}
 
         try:
             async with aiohttp.ClientSession() as session:
@@ -58,7 +57,7 @@ class TokenServiceClient:
         """Get WooCommerce API credentials from Token Service"""
 
         url = f"{self.base_url}/api/v1/tokens/woocommerce/{domain}"
-        headers = add_correlation_header({"Content-Type": "application/json"})
+        headers = {"Content-Type": "application/json", "X-Correlation-ID": correlation_id}
 
         try:
             async with aiohttp.ClientSession() as session:
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from scripts.shopify_bulk_stub import serve
+from src.adapters.shopify import ShopifyAdapter
+from src.adapters.shopify_bulk import BULK_FAILED_STATUSES
+
+from shared.utils.logger import ServiceLogger
+
+
+@pytest.fixture
+def stub():
+    server, state = serve(0, polls=2)
+    yield server, state
+    server.shutdown()
+    server.server_close()
+
+
+def _adapter(port: int, batch_size: int) -> ShopifyAdapter:
+    config = {
+        "shopify_api_url": f"http://127.0.0.1:{port}/admin/api/2024-01/graphql.json",
+        "shopify_batch_size": batch_size,
+        "shopify_bulk_poll_seconds": 0.01,
+    }
+    return ShopifyAdapter(ServiceLogger("test-shopify-bulk"), config, token_client=None)
+
+
+def _bulk_batches(adapter: ShopifyAdapter) -> list[tuple[list[dict], bool]]:
+    async def run():
+        try:
+            return [
+                batch async for batch in adapter._bulk_batches("shop.myshopify.com", "token", "shop_1", "corr", "sync")
+            ]
+        finally:
+            await adapter.close()
+
+    return asyncio.run(run())
+
+
+def test_bulk_export_is_streamed_in_product_batches(stub):
+    server, state = stub
+
+    batches = _bulk_batches(_adapter(server.server_port, batch_size=2))
+
+    # Two products per batch: shirt (3 variants) + skirt (1), gift card (2) + a product without variants
+    assert [(len(products), has_more) for products, has_more in batches] == [(4, True), (2, False)]
+    assert [product["sku"] for product in batches[0][0]] == ["LCS-S-SND", "LCS-M-SND", "LCS-M-OLV", "PMS-ONE"]
+    assert batches[0][0][0]["image_url"].endswith("linen-camp-shirt-sand.jpg?v=1716019307")
+    # Variant without its own image falls back to the product's featured image
+    assert batches[0][0][1]["image_url"].endswith("linen-camp-shirt.jpg?v=1716019307")
+    assert state.status_queries == 3
+
+
+def test_catalog_smaller_than_a_batch_is_one_final_batch(stub):
+    server, _ = stub
+
+    batches = _bulk_batches(_adapter(server.server_port, batch_size=250))
+
+    assert [(len(products), has_more) for products, has_more in batches] == [(6, False)]
+
+
+def test_canceling_is_not_a_terminal_status():
+    assert "CANCELING" not in BULK_FAILED_STATUSES
+    assert {"CANCELED", "FAILED", "EXPIRED"} <= BULK_FAILED_STATUSES
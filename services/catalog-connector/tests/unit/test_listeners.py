@@ -0,0 +1,87 @@
+import asyncio
+import types
+
+from src.events.listeners import CatalogSyncRequestedListener, ProductChangedListener
+
+from shared.messaging.events.base import EventEnvelope
+from shared.utils.logger import ServiceLogger
+
+
+class _ConnectorService:
+    def __init__(self):
+        self.refreshes: list[dict] = []
+        self.syncs: list[dict] = []
+
+    def queue_product_refresh(self, **kwargs) -> None:
+        self.refreshes.append(kwargs)
+
+    async def process_sync_request(self, **kwargs) -> None:
+        self.syncs.append(kwargs)
+
+
+def _envelope(event_type: str, data: dict) -> EventEnvelope:
+    # Round-trip through JSON, as the base Listener parses the message
+    envelope = EventEnvelope(
+        event_type=event_type, correlation_id="corr_1", source_service="webhook-service", data=data
+    )
+    return EventEnvelope.model_validate_json(envelope.to_bytes())
+
+
+def _js():
+    return types.SimpleNamespace(js=None)
+
+
+def test_product_webhook_queues_a_refresh():
+    service = _ConnectorService()
+    listener = ProductChangedListener(_js(), service, ServiceLogger("test-connector-listeners"), action="updated")
+
+    envelope = _envelope(
+        "evt.webhook.catalog.product_updated",
+        {"domain": "shop.myshopify.com", "product_id": "8526062977266", "webhook_id": "wh_1"},
+    )
+    asyncio.run(listener.on_message(envelope))
+
+    assert listener.subject == "evt.webhook.catalog.product_updated"
+    assert service.refreshes == [
+        {"domain": "shop.myshopify.com", "product_id": "8526062977266", "correlation_id": "corr_1"}
+    ]
+
+
+def test_invalid_product_webhook_is_acked():
+    service = _ConnectorService()
+    listener = ProductChangedListener(_js(), service, ServiceLogger("test-connector-listeners"))
+
+    asyncio.run(listener.on_message(_envelope("evt.webhook.catalog.product_updated", {"domain": "shop"})))
+
+    assert service.refreshes == []
+
+
+def test_incremental_sync_request_carries_its_cursor():
+    service = _ConnectorService()
+    listener = CatalogSyncRequestedListener(_js(), service, ServiceLogger("test-connector-listeners"))
+
+    envelope = _envelope(
+        "evt.catalog.sync.requested",
+        {
+            "merchant_id": "merchant_1",
+            "platform_name": "shopify",
+            "platform_shop_id": "shop_1",
+            "domain": "shop.myshopify.com",
+            "sync_id": "sync_1",
+            "sync_type": "incremental",
+            "updated_since": "2024-05-01T00:00:00+00:00",
+        },
+    )
+    asyncio.run(listener.on_message(envelope))
+
+    assert service.syncs == [
+        {
+            "merchant_id": "merchant_1",
+            "platform_name": "shopify",
+            "platform_shop_id": "shop_1",
+            "domain": "shop.myshopify.com",
+            "sync_id": "sync_1",
+            "correlation_id": "corr_1",
+            "updated_since": "2024-05-01T00:00:00+00:00",
+        }
+    ]
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from pathlib import Path
+
+from src.adapters.shopify_bulk import iter_jsonl, iter_products
+
+FIXTURE = Path(__file__).parents[1] / "fixtures" / "shopify_bulk_products.jsonl"
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _records(records: list[dict]):
+    for record in records:
+        yield dict(record)
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+class _Logger:
+    def __init__(self):
+        self.warnings: list[str] = []
+
+    def warning(self, message: str) -> None:
+        self.warnings.append(message)
+
+
+def test_iter_jsonl_reassembles_lines_split_across_chunks():
+    data = FIXTURE.read_bytes()
+    expected = [json.loads(line) for line in data.splitlines() if line.strip()]
+
+    # Chunk sizes that split lines mid-record, on newlines and inside multi-byte escapes
+    for size in (1, 7, 64, len(data)):
+        assert asyncio.run(_collect(iter_jsonl(_chunks(data, size)))) == expected
+
+
+def test_iter_jsonl_parses_a_last_line_without_newline():
+    data = b'{"id": 1}\n\n{"id": 2}'
+
+    assert asyncio.run(_collect(iter_jsonl(_chunks(data, 4)))) == [{"id": 1}, {"id": 2}]
+
+
+def test_iter_products_stitches_variants_to_their_product():
+    records = [json.loads(line) for line in FIXTURE.read_bytes().splitlines()]
+
+    products = asyncio.run(_collect(iter_products(_records(records))))
+
+    assert [product["title"] for product in products] == [
+        "Linen Camp Shirt",
+        "Pleated Midi Skirt",
+        "Gift Card",
+        "Archived Sample",
+    ]
+    assert [len(product["variants"]["edges"]) for product in products] == [3, 1, 2, 0]
+    assert all("__parentId" not in edge["node"] for product in products for edge in product["variants"]["edges"])
+
+
+def test_iter_products_skips_orphan_children():
+    records = [
+        {"id": "gid://shopify/ProductVariant/1", "__parentId": "gid://shopify/Product/0"},
+        {"id": "gid://shopify/Product/1", "title": "Shirt"},
+        {"id": "gid://shopify/ProductVariant/2", "__parentId": "gid://shopify/Product/1"},
+        {"id": "gid://shopify/ProductVariant/3", "__parentId": "gid://shopify/Product/9"},
+    ]
+    logger = _Logger()
+
+    products = asyncio.run(_collect(iter_products(_records(records), logger)))
+
+    assert len(products) == 1
+    assert [edge["node"]["id"] for edge in products[0]["variants"]["edges"]] == ["gid://shopify/ProductVariant/2"]
+    assert len(logger.warnings) == 2
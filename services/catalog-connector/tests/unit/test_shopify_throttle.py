@@ -0,0 +1,20 @@
+import time
+from email.utils import formatdate
+
+from src.adapters.shopify_throttle import retry_after_seconds
+
+
+def test_retry_after_in_seconds():
+    assert retry_after_seconds("2.5") == 2.5
+    assert retry_after_seconds("-1") == 0.0
+
+
+def test_retry_after_as_http_date():
+    delay = retry_after_seconds(formatdate(time.time() + 30, usegmt=True))
+
+    assert 28 <= delay <= 30
+
+
+def test_missing_or_malformed_retry_after_falls_back_to_the_default():
+    assert retry_after_seconds(None) == 5.0
+    assert retry_after_seconds("soon", default=2.0) == 2.0
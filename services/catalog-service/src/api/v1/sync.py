@@ -50,8 +50,9 @@ async def start_sync(
         platform_shop_id=platform.domain,
         domain=platform.domain,
         sync_id=sync.id,
-        sync_type=body.sync_type,
+        sync_type=sync.sync_type,  # May have fallen back to full
         correlation_id=ctx.correlation_id,
+        updated_since=sync.updated_since,
     )
 
     return success_response(data=sync, request_id=ctx.request_id, correlation_id=ctx.correlation_id)
@@ -41,6 +41,11 @@ class ServiceConfig(BaseModel):
     # Sync configuration
     sync_batch_size: int = Field(default=100, alias="CATALOG_SYNC_BATCH_SIZE")
     sync_progress_ttl: int = Field(default=3600, alias="CATALOG_SYNC_PROGRESS_TTL")
+    # Incremental syncs re-read this much before the newest stored updated_at, for edits still in flight
+    incremental_sync_overlap_seconds: int = Field(default=300, alias="CATALOG_INCREMENTAL_SYNC_OVERLAP")
+
+    # Analyzer model version results must come from; bumping it re-analyzes the whole catalog
+    analysis_model_version: str = Field(default="v1.0.0", alias="CATALOG_ANALYSIS_MODEL_VERSION")
 
     # Logging (used by shared package logger)
     logging_level: str = "INFO"
@@ -1,10 +1,14 @@
 # services/catalog-service/src/events/listeners.py
-from typing import Dict, Any
+from pydantic import ValidationError as PydanticValidationError
 from shared.messaging import Listener
-from shared.utils.exceptions import ValidationError
-from shared.api.correlation import set_correlation_context
+from shared.messaging.events.base import EventEnvelope
 
-from ..schemas.events import ProductsFetchedPayload, AnalysisCompletedPayload
+from ..schemas.events import (
+    AnalysisCompletedPayload,
+    ProductDeletedPayload,
+    ProductsFetchedPayload,
+    ProductsRefreshedPayload,
+)
 
 class ProductsFetchedListener(Listener):
     """Listen for products fetched from platform"""
@@ -26,15 +30,12 @@ class ProductsFetchedListener(Listener):
         self.publisher = publisher
         self.service = service
     
-    async def on_message(self, data: Dict[str, Any]) -> None:
+    async def on_message(self, envelope: EventEnvelope) -> None:
         """Process products batch from platform"""
+        correlation_id = envelope.correlation_id
         try:
             # Validate payload
-            payload = ProductsFetchedPayload(**data)
-            
-            # Set correlation context from event
-            if correlation_id := data.get("correlation_id"):
-                set_correlation_context(correlation_id)
+            payload = ProductsFetchedPayload.model_validate(envelope.data)
             
             # Process batch
             items, items_to_analyze = await self.service.process_product_batch(
@@ -43,7 +44,7 @@ class ProductsFetchedListener(Listener):
                 products=payload.products,
                 batch_num=payload.batch_num,
                 has_more=payload.has_more,
-                correlation_id=correlation_id or "unknown"
+                correlation_id=correlation_id
             )
             
             # Request analysis if items have images
@@ -52,7 +53,7 @@ class ProductsFetchedListener(Listener):
                     merchant_id=payload.merchant_id,
                     sync_id=payload.sync_id,
                     items=items_to_analyze,
-                    correlation_id=correlation_id or "unknown"
+                    correlation_id=correlation_id
                 )
             
             # If no more batches, complete sync
@@ -60,7 +61,7 @@ class ProductsFetchedListener(Listener):
                 await self.service.complete_sync(
                     sync_id=payload.sync_id,
                     status="completed",
-                    correlation_id=correlation_id or "unknown"
+                    correlation_id=correlation_id
                 )
                 
                 # Publish completion event
@@ -69,10 +70,10 @@ class ProductsFetchedListener(Listener):
                     sync_id=payload.sync_id,
                     total_items=len(items),
                     duration_seconds=0,  # Calculate from start time
-                    correlation_id=correlation_id or "unknown"
+                    correlation_id=correlation_id
                 )
             
-        except ValidationError as e:
+        except PydanticValidationError as e:
             self.logger.exception(f"Invalid products batch: {e}")
             # ACK to prevent retry of invalid messages
             return
@@ -80,12 +81,100 @@ class ProductsFetchedListener(Listener):
             self.logger.exception(f"Products processing failed: {e}", exc_info=True)
             raise  # NACK for retry
 
+class ProductsRefreshedListener(Listener):
+    """Listen for products re-fetched after product webhooks"""
+    
+    @property
+    def subject(self) -> str:
+        return "evt.platform.products.refreshed"
+    
+    @property
+    def queue_group(self) -> str:
+        return "catalog-refresh-handler"
+    
+    @property
+    def service_name(self) -> str:
+        return "catalog-service"
+    
+    def __init__(self, js_client, publisher, service, logger):
+        super().__init__(js_client, logger)
+        self.publisher = publisher
+        self.service = service
+    
+    async def on_message(self, envelope: EventEnvelope) -> None:
+        """Store refreshed products and request analysis for changed images"""
+        correlation_id = envelope.correlation_id
+        try:
+            payload = ProductsRefreshedPayload.model_validate(envelope.data)
+            
+            _, items_to_analyze = await self.service.process_product_refresh(
+                merchant_id=payload.merchant_id,
+                products=payload.products,
+                correlation_id=correlation_id
+            )
+            
+            # No sync operation here; the refresh id keys the analyzer's checkpoint
+            if items_to_analyze:
+                await self.publisher.catalog_analysis_requested(
+                    merchant_id=payload.merchant_id,
+                    sync_id=payload.refresh_id,
+                    items=items_to_analyze,
+                    correlation_id=correlation_id
+                )
+            
+        except PydanticValidationError as e:
+            self.logger.exception(f"Invalid products refresh: {e}")
+            return
+        except Exception as e:
+            self.logger.exception(f"Products refresh failed: {e}", exc_info=True)
+            raise  # NACK for retry
+
+class ProductDeletedListener(Listener):
+    """Listen for products deleted on the platform"""
+    
+    @property
+    def subject(self) -> str:
+        return "evt.webhook.catalog.product_deleted"
+    
+    @property
+    def queue_group(self) -> str:
+        return "catalog-product-deleted-handler"
+    
+    @property
+    def service_name(self) -> str:
+        return "catalog-service"
+    
+    def __init__(self, js_client, service, logger):
+        super().__init__(js_client, logger)
+        self.service = service
+    
+    async def on_message(self, envelope: EventEnvelope) -> None:
+        """Remove the product's items"""
+        correlation_id = envelope.correlation_id
+        try:
+            payload = ProductDeletedPayload.model_validate(envelope.data)
+            
+            # Product webhooks come from Shopify; the shop domain is the merchant id
+            await self.service.delete_product(
+                merchant_id=payload.domain,
+                platform_name="shopify",
+                product_id=payload.product_id,
+                correlation_id=correlation_id
+            )
+            
+        except PydanticValidationError as e:
+            self.logger.exception(f"Invalid product deletion: {e}")
+            return
+        except Exception as e:
+            self.logger.exception(f"Product deletion failed: {e}", exc_info=True)
+            raise  # NACK for retry
+
 class AnalysisCompletedListener(Listener):
     """Listen for AI analysis results"""
     
     @property
     def subject(self) -> str:
-        return "evt.analysis.completed"
+        return "evt.catalog.ai.analysis.completed"
     
     @property
     def queue_group(self) -> str:
@@ -100,40 +189,48 @@ class AnalysisCompletedListener(Listener):
         self.analysis_repo = analysis_repo
         self.catalog_repo = catalog_repo
     
-    async def on_message(self, data: Dict[str, Any]) -> None:
+    async def on_message(self, envelope: EventEnvelope) -> None:
         """Store AI analysis results"""
         try:
             # Validate payload
-            payload = AnalysisCompletedPayload(**data)
+            payload = AnalysisCompletedPayload.model_validate(envelope.data)
+            
+            if payload.status == "failed":
+                await self.catalog_repo.update_analysis_status(item_id=payload.item_id, status="failed")
+                return
             
-            # Store analysis result
-            await self.analysis_repo.create({
-                "item_id": payload.item_id,
-                "model_version": payload.model_version,
-                "category": payload.category,
-                "subcategory": payload.subcategory,
-                "description": payload.description,
-                "gender": payload.gender,
-                "attributes": payload.attributes,
-                "quality_score": payload.quality_score,
-                "confidence_score": payload.confidence_score,
-                "processing_time_ms": payload.processing_time_ms
-            })
+            # An unchanged image keeps its stored result; only the new URL is recorded
+            if payload.status != "unchanged":
+                metadata = payload.analysis_metadata
+                await self.analysis_repo.upsert({
+                    "item_id": payload.item_id,
+                    "model_version": payload.model_version,
+                    "category": payload.category,
+                    "subcategory": payload.subcategory,
+                    "description": payload.description,
+                    "gender": payload.gender,
+                    "attributes": payload.attributes,
+                    "quality_score": metadata.quality_score if metadata else None,
+                    "confidence_score": metadata.confidence_score if metadata else None,
+                    "processing_time_ms": metadata.processing_times.get("total_ms") if metadata else None
+                })
             
-            # Update catalog item status
-            await self.catalog_repo.update_analysis_status(
+            # Update catalog item status, with what the analysis was computed from
+            await self.catalog_repo.record_analysis(
                 item_id=payload.item_id,
-                status="analyzed"
+                image_url=payload.image_url,
+                image_hash=payload.image_hash,
+                model_version=payload.model_version
             )
             
             self.logger.info(
                 f"Stored analysis for item {payload.item_id}",
-                extra={"item_id": payload.item_id}
+                extra={"item_id": payload.item_id, "correlation_id": envelope.correlation_id}
             )
             
-        except ValidationError as e:
+        except PydanticValidationError as e:
             self.logger.exception(f"Invalid analysis result: {e}")
             return  # ACK invalid messages
         except Exception as e:
             self.logger.exception(f"Analysis storage failed: {e}", exc_info=True)
-            raise  # NACK for retry
\ No newline at end of file
+            raise  # NACK for retry
@@ -1,4 +1,6 @@
 # services/catalog-service/src/events/publishers.py
+from datetime import datetime
+
 from shared.messaging import Publisher
 
 
@@ -18,8 +20,9 @@ class CatalogEventPublisher(Publisher):
         sync_id: str,
         sync_type: str,
         correlation_id: str,
+        updated_since: datetime | None = None,
     ) -> str:
-        """Publish catalog sync requested event"""
+        """Publish catalog sync requested event; incremental syncs carry their updated_since cursor"""
         return await self.publish_event(
             subject="evt.catalog.sync.requested",
             data={
@@ -29,6 +32,7 @@ class CatalogEventPublisher(Publisher):
                 "domain": domain,
                 "sync_id": sync_id,
                 "sync_type": sync_type,
+                "updated_since": updated_since.isoformat() if updated_since else None,
             },
             correlation_id=correlation_id,
         )
@@ -36,8 +40,8 @@ class CatalogEventPublisher(Publisher):
     async def catalog_analysis_requested(self, merchant_id: str, sync_id: str, items: list, correlation_id: str) -> str:
         """Request AI analysis for catalog items"""
         return await self.publish_event(
-            subject="evt.catalog.analysis.requested",
-            data={"merchant_id": merchant_id, "sync_id": sync_id, "items": items},
+            subject="evt.catalog.ai.analysis.requested",
+            data={"merchant_id": merchant_id, "sync_id": sync_id, "correlation_id": correlation_id, "items": items},
             correlation_id=correlation_id,
         )
 
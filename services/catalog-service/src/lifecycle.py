@@ -13,7 +13,12 @@ from .repositories.sync_repository import SyncRepository
 from .repositories.analysis_repository import AnalysisRepository
 from .services.catalog_service import CatalogService
 from .events.publishers import CatalogEventPublisher
-from .events.listeners import ProductsFetchedListener, AnalysisCompletedListener
+from .events.listeners import (
+    AnalysisCompletedListener,
+    ProductDeletedListener,
+    ProductsFetchedListener,
+    ProductsRefreshedListener,
+)
 
 class ServiceLifecycle:
     """Manages all service components lifecycle"""
@@ -198,6 +203,24 @@ class ServiceLifecycle:
         await products_listener.start()
         self._listeners.append(products_listener)
         
+        # Webhook-driven product refreshes and deletions
+        refresh_listener = ProductsRefreshedListener(
+            js_client=self.messaging_client,
+            publisher=self.event_publisher,
+            service=self.catalog_service,
+            logger=self.logger
+        )
+        await refresh_listener.start()
+        self._listeners.append(refresh_listener)
+        
+        deleted_listener = ProductDeletedListener(
+            js_client=self.messaging_client,
+            service=self.catalog_service,
+            logger=self.logger
+        )
+        await deleted_listener.start()
+        self._listeners.append(deleted_listener)
+        
         # Analysis completed listener
         analysis_listener = AnalysisCompletedListener(
             js_client=self.messaging_client,
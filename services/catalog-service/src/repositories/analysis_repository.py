@@ -0,0 +1,29 @@
+# services/catalog-service/src/repositories/analysis_repository.py
+from typing import Any
+
+from prisma import Json, Prisma
+
+
+class AnalysisRepository:
+    """Repository for AI analysis results"""
+
+    def __init__(self, prisma: Prisma):
+        self.prisma = prisma
+
+    async def upsert(self, data: dict[str, Any]) -> None:
+        """Store the item's result for a model version, replacing an earlier one (e.g. after an image change)"""
+        fields = {
+            "category": data.get("category"),
+            "subcategory": data.get("subcategory"),
+            "description": data.get("description"),
+            "gender": data.get("gender"),
+            "attributes": Json(data["attributes"]) if data.get("attributes") is not None else None,
+            "quality_score": str(data["quality_score"]) if data.get("quality_score") is not None else None,
+            "confidence_score": str(data["confidence_score"]) if data.get("confidence_score") is not None else None,
+            "processing_time_ms": data.get("processing_time_ms"),
+        }
+        await self.prisma.analysisresult.upsert(
+            where={"item_id_model_version": {"item_id": data["item_id"], "model_version": data["model_version"]}},
+            create={"item_id": data["item_id"], "model_version": data["model_version"], **fields},
+            update=fields,
+        )
@@ -1,13 +1,55 @@
 # services/catalog-service/src/repositories/catalog_repository.py
+import uuid
+from datetime import UTC, datetime
 
 from prisma import Prisma
 
 from ..schemas.catalog import CatalogItemCreate, CatalogItemOut
 
+# Columns written by bulk_upsert, with the cast each placeholder needs
+_BULK_COLUMNS = (
+    ("id", "text"),
+    ("merchant_id", "text"),
+    ("platform_name", "text"),
+    ("platform_shop_id", "text"),
+    ("domain", "text"),
+    ("product_id", "text"),
+    ("variant_id", "text"),
+    ("image_id", "text"),
+    ("product_title", "text"),
+    ("variant_title", "text"),
+    ("sku", "text"),
+    ("price", "text"),
+    ("currency", "text"),
+    ("inventory_quantity", "integer"),
+    ("image_url", "text"),
+    ("platform_created_at", "timestamp(3)"),
+    ("platform_updated_at", "timestamp(3)"),
+    ("synced_at", "timestamp(3)"),
+)
+
+# Same fields upsert() refreshes on an existing item
+_BULK_UPDATED = (
+    "product_title",
+    "variant_title",
+    "sku",
+    "price",
+    "currency",
+    "inventory_quantity",
+    "image_url",
+    "platform_updated_at",
+    "sync_status",
+    "synced_at",
+    "updated_at",
+)
+
 
 class CatalogRepository:
     """Repository for catalog items using Prisma client"""
 
+    # Rows per INSERT; keeps the placeholders well under Postgres' 65535 bind parameters
+    bulk_chunk_size = 1000
+
     def __init__(self, prisma: Prisma):
         self.prisma = prisma
 
@@ -29,6 +71,7 @@ class CatalogRepository:
                 "currency": dto.currency,
                 "inventory_quantity": dto.inventory_quantity,
                 "image_url": dto.image_url,
+                "platform_updated_at": dto.platform_updated_at,
                 "sync_status": "synced",
                 "synced_at": dto.synced_at,
             },
@@ -54,11 +97,79 @@ class CatalogRepository:
         )
         return CatalogItemOut.model_validate(item)
 
+    async def bulk_upsert(self, dtos: list[CatalogItemCreate]) -> list[CatalogItemOut]:
+        """Upsert many catalog items with multi-row INSERT ... ON CONFLICT, one statement per chunk.
+
+        Same semantics as upsert(); a variant listed twice keeps its last
+        version. Returns the stored items (new or existing ids) in no
+        particular order.
+        """
+        latest = {(dto.merchant_id, dto.platform_name, dto.variant_id): dto for dto in dtos}
+        rows = list(latest.values())
+
+        items = []
+        for start in range(0, len(rows), self.bulk_chunk_size):
+            query, params = self._bulk_upsert_query(rows[start : start + self.bulk_chunk_size])
+            items.extend(await self.prisma.query_raw(query, *params))
+        return [CatalogItemOut.model_validate(item) for item in items]
+
+    @staticmethod
+    def _bulk_upsert_query(dtos: list[CatalogItemCreate]) -> tuple[str, list]:
+        width = len(_BULK_COLUMNS)
+        params = []
+        values = []
+        for row, dto in enumerate(dtos):
+            params.extend(
+                [
+                    str(uuid.uuid4()),
+                    dto.merchant_id,
+                    dto.platform_name,
+                    dto.platform_shop_id,
+                    dto.domain,
+                    dto.product_id,
+                    dto.variant_id,
+                    dto.image_id,
+                    dto.product_title,
+                    dto.variant_title,
+                    dto.sku,
+                    str(dto.price),
+                    dto.currency,
+                    dto.inventory_quantity,
+                    dto.image_url,
+                    _utc_iso(dto.platform_created_at),
+                    _utc_iso(dto.platform_updated_at),
+                    _utc_iso(dto.synced_at),
+                ]
+            )
+            placeholders = ", ".join(
+                f"${row * width + index + 1}::{cast}" for index, (_, cast) in enumerate(_BULK_COLUMNS)
+            )
+            values.append(f"({placeholders}, 'synced', NOW())")
+
+        columns = ", ".join(column for column, _ in _BULK_COLUMNS)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in _BULK_UPDATED)
+        query = (
+            f"INSERT INTO catalog_items ({columns}, sync_status, updated_at) "
+            f"VALUES {', '.join(values)} "
+            f"ON CONFLICT (merchant_id, platform_name, variant_id) DO UPDATE SET {updates} "
+            f"RETURNING *"
+        )
+        return query, params
+
     async def find_by_id(self, item_id: str) -> CatalogItemOut | None:
         """Find catalog item by ID"""
         item = await self.prisma.catalogitem.find_unique(where={"id": item_id})
         return CatalogItemOut.model_validate(item) if item else None
 
+    async def find_by_variant_ids(
+        self, merchant_id: str, variant_ids: list[str]
+    ) -> dict[tuple[str, str], CatalogItemOut]:
+        """Existing items of a merchant by (platform_name, variant_id), in one query"""
+        items = await self.prisma.catalogitem.find_many(
+            where={"merchant_id": merchant_id, "variant_id": {"in": variant_ids}}
+        )
+        return {(item.platform_name, item.variant_id): CatalogItemOut.model_validate(item) for item in items}
+
     async def find_by_merchant(self, merchant_id: str, skip: int = 0, take: int = 100) -> list[CatalogItemOut]:
         """Find catalog items by merchant"""
         items = await self.prisma.catalogitem.find_many(
@@ -66,6 +177,20 @@ class CatalogRepository:
         )
         return [CatalogItemOut.model_validate(item) for item in items]
 
+    async def latest_platform_update(self, merchant_id: str, platform_name: str) -> datetime | None:
+        """Newest platform updated_at stored for the merchant: the high-water mark of incremental syncs"""
+        item = await self.prisma.catalogitem.find_first(
+            where={"merchant_id": merchant_id, "platform_name": platform_name, "platform_updated_at": {"not": None}},
+            order={"platform_updated_at": "desc"},
+        )
+        return item.platform_updated_at if item else None
+
+    async def delete_by_product(self, merchant_id: str, platform_name: str, product_id: str) -> int:
+        """Delete all variants of a product (their analysis results cascade); returns the count"""
+        return await self.prisma.catalogitem.delete_many(
+            where={"merchant_id": merchant_id, "platform_name": platform_name, "product_id": product_id}
+        )
+
     async def count_by_merchant(self, merchant_id: str) -> int:
         """Count catalog items for merchant"""
         return await self.prisma.catalogitem.count(where={"merchant_id": merchant_id})
@@ -73,3 +198,30 @@ class CatalogRepository:
     async def update_analysis_status(self, item_id: str, status: str) -> None:
         """Update analysis status"""
         await self.prisma.catalogitem.update(where={"id": item_id}, data={"analysis_status": status})
+
+    async def mark_analysis_pending(self, item_ids: list[str]) -> None:
+        """Flag items queued for (re-)analysis"""
+        await self.prisma.catalogitem.update_many(where={"id": {"in": item_ids}}, data={"analysis_status": "pending"})
+
+    async def record_analysis(
+        self, item_id: str, image_url: str | None, image_hash: str | None, model_version: str | None
+    ) -> None:
+        """Mark item analyzed and remember which image and model version the analysis is for"""
+        await self.prisma.catalogitem.update(
+            where={"id": item_id},
+            data={
+                "analysis_status": "analyzed",
+                "analyzed_image_url": image_url,
+                "image_hash": image_hash,
+                "analyzed_model_version": model_version,
+            },
+        )
+
+
+def _utc_iso(value: datetime | None) -> str | None:
+    """Naive UTC ISO string, as Prisma stores DateTime columns"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value.isoformat()
@@ -21,6 +21,7 @@ class SyncRepository:
                 "platform_shop_id": dto.platform_shop_id,
                 "domain": dto.domain,
                 "sync_type": dto.sync_type,
+                "updated_since": dto.updated_since,
                 "status": "pending",
             }
         )
@@ -62,6 +62,9 @@ class CatalogItemOut(BaseModel):
     image_url: str | None
     sync_status: str
     analysis_status: str
+    analyzed_image_url: str | None = None
+    image_hash: str | None = None
+    analyzed_model_version: str | None = None
     synced_at: datetime
     created_at: datetime
     updated_at: datetime
@@ -2,7 +2,7 @@
 from decimal import Decimal
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # Consumed event payloads
@@ -19,17 +19,47 @@ class ProductsFetchedPayload(BaseModel):
     has_more: bool
 
 
+class ProductsRefreshedPayload(BaseModel):
+    """Payload for platform.products.refreshed event (products re-fetched after webhooks)"""
+
+    merchant_id: str
+    refresh_id: str
+    platform_name: str
+    platform_shop_id: str
+    domain: str
+    products: list[dict[str, Any]]
+
+
+class ProductDeletedPayload(BaseModel):
+    """Payload for webhook.catalog.product_deleted event"""
+
+    domain: str
+    product_id: str
+    webhook_id: str | None = None
+
+
+class AnalysisMetadataPayload(BaseModel):
+    """Scores and stage timings of an analysis result"""
+
+    quality_score: Decimal | None = None
+    confidence_score: Decimal | None = None
+    processing_times: dict[str, int] = Field(default_factory=dict)
+
+
 class AnalysisCompletedPayload(BaseModel):
-    """Payload for analysis.completed event"""
+    """Payload for catalog.ai.analysis.completed event (the analyzer's ItemAnalysisResult)"""
 
     merchant_id: str
     item_id: str
-    model_version: str
-    category: str | None
-    subcategory: str | None
-    description: str | None
-    gender: str | None
-    attributes: dict[str, Any] | None
-    quality_score: Decimal | None
-    confidence_score: Decimal | None
-    processing_time_ms: int | None
+    # Failed results carry no model version
+    model_version: str | None = None
+    status: str = "success"  # success, partial, failed, unchanged
+    image_url: str | None = None
+    image_hash: str | None = None
+    category: str | None = None
+    subcategory: str | None = None
+    description: str | None = None
+    gender: str | None = None
+    attributes: dict[str, Any] | None = None
+    analysis_metadata: AnalysisMetadataPayload | None = None
+    error: str | None = None
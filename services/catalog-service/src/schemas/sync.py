@@ -22,6 +22,7 @@ class SyncOperationCreate(BaseModel):
     platform_shop_id: str
     domain: str
     sync_type: str = "full"
+    updated_since: datetime | None = None
 
 
 class SyncOperationOut(BaseModel):
@@ -33,6 +34,7 @@ class SyncOperationOut(BaseModel):
     platform_shop_id: str
     domain: str
     sync_type: str
+    updated_since: datetime | None = None
     status: str
     total_products: int
     processed_products: int
@@ -1,6 +1,6 @@
 # services/catalog-service/src/services/catalog_service.py
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import redis.asyncio as redis
 
@@ -51,6 +51,19 @@ class CatalogService:
                 details={"sync_id": existing.id},
             )
 
+        # Incremental syncs only fetch products updated since the newest one stored
+        updated_since = None
+        if sync_type == "incremental":
+            latest = await self.catalog_repo.latest_platform_update(merchant_id, platform_name)
+            if latest:
+                updated_since = latest - timedelta(seconds=self.config.get("incremental_sync_overlap_seconds", 300))
+            else:
+                self.logger.info(
+                    "No synced products yet, running a full sync instead of incremental",
+                    extra={"correlation_id": correlation_id, "merchant_id": merchant_id},
+                )
+                sync_type = "full"
+
         # Create sync operation
         sync_dto = SyncOperationCreate(
             merchant_id=merchant_id,
@@ -58,6 +71,7 @@ class CatalogService:
             platform_shop_id=platform_shop_id,
             domain=domain,
             sync_type=sync_type,
+            updated_since=updated_since,
         )
 
         sync = await self.sync_repo.create(sync_dto)
@@ -80,6 +94,8 @@ class CatalogService:
                 "sync_id": sync.id,
                 "merchant_id": merchant_id,
                 "platform": platform_name,
+                "sync_type": sync_type,
+                "updated_since": updated_since.isoformat() if updated_since else None,
             },
         )
 
@@ -115,41 +131,14 @@ class CatalogService:
 
     async def process_product_batch(
         self, sync_id: str, merchant_id: str, products: list[dict], batch_num: int, has_more: bool, correlation_id: str
-    ) -> list[CatalogItemOut]:
-        """Process batch of products from platform"""
-
-        items_created = []
-        items_to_analyze = []
-
-        for product in products:
-            # Create DTO
-            item_dto = CatalogItemCreate(
-                merchant_id=merchant_id,
-                platform_name=product.get("platform_name", "shopify"),
-                platform_shop_id=product["platform_shop_id"],
-                domain=product["domain"],
-                product_id=product["product_id"],
-                variant_id=product["variant_id"],
-                image_id=product.get("image_id"),
-                product_title=product["product_title"],
-                variant_title=product.get("variant_title", ""),
-                sku=product.get("sku"),
-                price=product["price"],
-                currency=product.get("currency", "USD"),
-                inventory_quantity=product.get("inventory", 0),
-                image_url=product.get("image_url"),
-                platform_created_at=product.get("created_at"),
-                platform_updated_at=product.get("updated_at"),
-                synced_at=datetime.utcnow(),
-            )
+    ) -> tuple[list[CatalogItemOut], list[dict]]:
+        """Process batch of products from platform.
 
-            # Upsert catalog item
-            item = await self.catalog_repo.upsert(item_dto)
-            items_created.append(item)
+        Only items whose image or the analyzer model version changed since
+        their last analysis are returned for analysis.
+        """
 
-            # Queue for analysis if has image
-            if item.image_url:
-                items_to_analyze.append({"item_id": item.id, "image_url": item.image_url})
+        items_created, items_to_analyze = await self._store_products(merchant_id, products)
 
         # Update progress
         sync = await self.sync_repo.find_by_id(sync_id)
@@ -183,11 +172,111 @@ class CatalogService:
                 "sync_id": sync_id,
                 "batch_size": len(products),
                 "items_to_analyze": len(items_to_analyze),
+                "items_unchanged": sum(1 for item in items_created if item.image_url) - len(items_to_analyze),
             },
         )
 
         return items_created, items_to_analyze
 
+    async def process_product_refresh(
+        self, merchant_id: str, products: list[dict], correlation_id: str
+    ) -> tuple[list[CatalogItemOut], list[dict]]:
+        """Store products refreshed outside a sync (product webhooks); same change detection as a batch"""
+        items, items_to_analyze = await self._store_products(merchant_id, products)
+
+        self.logger.info(
+            f"Refreshed {len(items)} catalog items",
+            extra={
+                "correlation_id": correlation_id,
+                "merchant_id": merchant_id,
+                "product_ids": sorted({item.product_id for item in items}),
+                "items_to_analyze": len(items_to_analyze),
+            },
+        )
+        return items, items_to_analyze
+
+    async def delete_product(self, merchant_id: str, platform_name: str, product_id: str, correlation_id: str) -> int:
+        """Remove a product deleted on the platform"""
+        deleted = await self.catalog_repo.delete_by_product(merchant_id, platform_name, product_id)
+
+        self.logger.info(
+            f"Deleted {deleted} catalog items of product {product_id}",
+            extra={"correlation_id": correlation_id, "merchant_id": merchant_id, "platform": platform_name},
+        )
+        return deleted
+
+    async def _store_products(self, merchant_id: str, products: list[dict]) -> tuple[list[CatalogItemOut], list[dict]]:
+        """Upsert products; returns the stored items and analysis requests for those that changed"""
+        items_to_analyze = []
+        model_version = self.config.get("analysis_model_version")
+
+        # Previous state of the batch's items, to tell what changed
+        existing = await self.catalog_repo.find_by_variant_ids(
+            merchant_id, [product["variant_id"] for product in products]
+        )
+
+        item_dtos = [
+            CatalogItemCreate(
+                merchant_id=merchant_id,
+                platform_name=product.get("platform_name", "shopify"),
+                platform_shop_id=product["platform_shop_id"],
+                domain=product["domain"],
+                product_id=product["product_id"],
+                variant_id=product["variant_id"],
+                image_id=product.get("image_id"),
+                product_title=product["product_title"],
+                variant_title=product.get("variant_title", ""),
+                sku=product.get("sku"),
+                price=product["price"],
+                currency=product.get("currency", "USD"),
+                inventory_quantity=product.get("inventory", 0),
+                image_url=product.get("image_url"),
+                platform_created_at=product.get("created_at"),
+                platform_updated_at=product.get("updated_at"),
+                synced_at=datetime.utcnow(),
+            )
+            for product in products
+        ]
+
+        # One multi-row upsert instead of a round trip per variant
+        items_created = await self.catalog_repo.bulk_upsert(item_dtos)
+
+        for item in items_created:
+            # Queue for analysis if it has an image that wasn't analyzed yet
+            request = self._analysis_request(item, existing.get((item.platform_name, item.variant_id)), model_version)
+            if request:
+                items_to_analyze.append(request)
+
+        if items_to_analyze:
+            await self.catalog_repo.mark_analysis_pending([request["item_id"] for request in items_to_analyze])
+
+        return items_created, items_to_analyze
+
+    @staticmethod
+    def _analysis_request(item: CatalogItemOut, previous: CatalogItemOut | None, model_version: str) -> dict | None:
+        """Analysis request for the item, or None when its current analysis still holds"""
+        if not item.image_url:
+            return None
+
+        current = (
+            previous is not None
+            and previous.analysis_status == "analyzed"
+            and previous.analyzed_model_version == model_version
+        )
+        if current and previous.analyzed_image_url == item.image_url:
+            return None
+
+        request = {
+            "item_id": item.id,
+            "product_id": item.product_id,
+            "variant_id": item.variant_id,
+            "image_url": item.image_url,
+        }
+        if current and previous.image_hash:
+            # New URL: the analyzer downloads it, but skips analysis if the bytes are the same
+            request["image_hash"] = previous.image_hash
+        return request
+
     async def get_catalog_status(self, merchant_id: str, correlation_id: str) -> dict:
         """Get catalog status for merchant"""
 
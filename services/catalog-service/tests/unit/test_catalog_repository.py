@@ -0,0 +1,92 @@
+import asyncio
+import re
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from src.repositories.catalog_repository import _BULK_COLUMNS, CatalogRepository
+from src.schemas.catalog import CatalogItemCreate
+
+WIDTH = len(_BULK_COLUMNS)
+PLACEHOLDER = re.compile(r"\$(\d+)::([a-z0-9()]+)")
+
+
+class _Prisma:
+    """Records query_raw calls and returns the inserted rows, as RETURNING * would"""
+
+    def __init__(self):
+        self.queries: list[tuple[str, list]] = []
+
+    async def query_raw(self, query, *params):
+        self.queries.append((query, list(params)))
+        now = datetime.now(UTC)
+        rows = []
+        for start in range(0, len(params), WIDTH):
+            row = dict(zip((column for column, _ in _BULK_COLUMNS), params[start : start + WIDTH], strict=True))
+            rows.append(
+                {**row, "sync_status": "synced", "analysis_status": "pending", "created_at": now, "updated_at": now}
+            )
+        return rows
+
+
+def _dto(variant_id: str, price: str = "19.90") -> CatalogItemCreate:
+    return CatalogItemCreate(
+        merchant_id="merchant_1",
+        platform_name="shopify",
+        platform_shop_id="shop_1",
+        domain="shop.myshopify.com",
+        product_id="p1",
+        variant_id=variant_id,
+        product_title="Shirt",
+        variant_title=variant_id,
+        price=Decimal(price),
+        platform_updated_at=datetime(2024, 5, 1, 12, tzinfo=UTC),
+        synced_at=datetime(2024, 5, 2, tzinfo=UTC),
+    )
+
+
+def _bulk_upsert(dtos: list[CatalogItemCreate], chunk_size: int | None = None):
+    prisma = _Prisma()
+    repository = CatalogRepository(prisma)
+    if chunk_size:
+        repository.bulk_chunk_size = chunk_size
+    items = asyncio.run(repository.bulk_upsert(dtos))
+    return items, prisma.queries
+
+
+def test_placeholders_are_numbered_across_rows():
+    query, params = CatalogRepository._bulk_upsert_query([_dto("v1"), _dto("v2")])
+
+    placeholders = PLACEHOLDER.findall(query)
+    assert [int(number) for number, _ in placeholders] == list(range(1, 2 * WIDTH + 1))
+    assert [cast for _, cast in placeholders] == [cast for _, cast in _BULK_COLUMNS] * 2
+    assert len(params) == 2 * WIDTH
+    # Row 2 starts right after row 1: its variant_id is the 7th column
+    assert params[WIDTH + 6] == "v2"
+    # Timestamps are naive UTC, prices are text
+    assert params[16] == "2024-05-01T12:00:00"
+    assert params[11] == "19.90"
+
+
+def test_variant_listed_twice_keeps_its_last_version():
+    items, queries = _bulk_upsert([_dto("v1", "10.00"), _dto("v2"), _dto("v1", "12.50")])
+
+    assert len(queries) == 1
+    assert len(PLACEHOLDER.findall(queries[0][0])) == 2 * WIDTH
+    assert {item.variant_id: item.price for item in items} == {"v1": Decimal("12.50"), "v2": Decimal("19.90")}
+
+
+def test_rows_are_split_into_chunks_with_their_own_numbering():
+    dtos = [_dto(f"v{index}") for index in range(CatalogRepository.bulk_chunk_size + 1)]
+
+    items, queries = _bulk_upsert(dtos)
+
+    assert [len(params) // WIDTH for _, params in queries] == [CatalogRepository.bulk_chunk_size, 1]
+    assert max(int(number) for number, _ in PLACEHOLDER.findall(queries[0][0])) == 1000 * WIDTH
+    assert [int(number) for number, _ in PLACEHOLDER.findall(queries[1][0])] == list(range(1, WIDTH + 1))
+    assert len(items) == len(dtos)
+
+
+def test_exact_multiple_of_the_chunk_size_has_no_empty_statement():
+    _, queries = _bulk_upsert([_dto(f"v{index}") for index in range(4)], chunk_size=2)
+
+    assert [len(params) // WIDTH for _, params in queries] == [2, 2]
@@ -0,0 +1,165 @@
+import asyncio
+import types
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from src.events.listeners import AnalysisCompletedListener
+from src.schemas.catalog import CatalogItemOut
+from src.services.catalog_service import CatalogService
+
+from shared.messaging.events.base import EventEnvelope
+from shared.utils.logger import ServiceLogger
+
+MODEL_VERSION = "v1.0.0"
+
+
+class _CatalogRepo:
+    """In-memory catalog_items keyed by (platform_name, variant_id)"""
+
+    def __init__(self):
+        self.items: dict[tuple[str, str], CatalogItemOut] = {}
+
+    async def find_by_variant_ids(self, merchant_id, variant_ids):
+        return {key: item for key, item in self.items.items() if item.variant_id in variant_ids}
+
+    async def bulk_upsert(self, dtos):
+        now = datetime.now(UTC)
+        stored = []
+        for dto in dtos:
+            key = (dto.platform_name, dto.variant_id)
+            previous = self.items.get(key)
+            self.items[key] = CatalogItemOut(
+                **dto.model_dump(),
+                id=previous.id if previous else f"item_{dto.variant_id}",
+                sync_status="synced",
+                analysis_status=previous.analysis_status if previous else "pending",
+                analyzed_image_url=previous.analyzed_image_url if previous else None,
+                image_hash=previous.image_hash if previous else None,
+                analyzed_model_version=previous.analyzed_model_version if previous else None,
+                created_at=now,
+                updated_at=now,
+            )
+            stored.append(self.items[key])
+        return stored
+
+    async def mark_analysis_pending(self, item_ids):
+        self._update(item_ids, analysis_status="pending")
+
+    async def update_analysis_status(self, item_id, status):
+        self._update([item_id], analysis_status=status)
+
+    async def record_analysis(self, item_id, image_url, image_hash, model_version):
+        self._update(
+            [item_id],
+            analysis_status="analyzed",
+            analyzed_image_url=image_url,
+            image_hash=image_hash,
+            analyzed_model_version=model_version,
+        )
+
+    def _update(self, item_ids, **fields):
+        for key, item in self.items.items():
+            if item.id in item_ids:
+                self.items[key] = item.model_copy(update=fields)
+
+
+class _AnalysisRepo:
+    def __init__(self):
+        self.results = []
+
+    async def upsert(self, data):
+        self.results.append(data)
+
+
+def _product(image_url: str) -> dict:
+    return {
+        "platform_shop_id": "shop_1",
+        "domain": "shop.myshopify.com",
+        "product_id": "p1",
+        "variant_id": "v1",
+        "product_title": "Shirt",
+        "price": "19.90",
+        "image_url": image_url,
+    }
+
+
+def _result_envelope(request: dict, **overrides) -> EventEnvelope:
+    """evt.catalog.ai.analysis.completed as the analyzer publishes it (ItemAnalysisResult)"""
+    return EventEnvelope(
+        event_type="evt.catalog.ai.analysis.completed",
+        correlation_id="corr_1",
+        source_service="catalog-ai-analyzer",
+        data={
+            "merchant_id": "9b2f6c1e-0000-4000-8000-000000000001",
+            "item_id": request["item_id"],
+            "product_id": request["product_id"],
+            "variant_id": request["variant_id"],
+            "correlation_id": "corr_1",
+            "service_version": "v1.0.0",
+            "model_version": MODEL_VERSION,
+            "status": "success",
+            "image_url": request["image_url"],
+            "image_hash": "a" * 64,
+            "category": "shirts",
+            "attributes": {"colors": [], "season": ["summer"]},
+            "analysis_metadata": {
+                "analyzers_used": ["mediapipe", "openai"],
+                "quality_score": 0.9,
+                "confidence_score": 0.8,
+                "processing_times": {"download_ms": 12, "total_ms": 340},
+            },
+            "error": None,
+            **overrides,
+        },
+    )
+
+
+def _setup():
+    catalog_repo, analysis_repo = _CatalogRepo(), _AnalysisRepo()
+    logger = ServiceLogger("test-change-detection")
+    service = CatalogService(
+        catalog_repo, sync_repo=None, redis_client=None, logger=logger, config={"analysis_model_version": MODEL_VERSION}
+    )
+    listener = AnalysisCompletedListener(
+        types.SimpleNamespace(js=None), analysis_repo=analysis_repo, catalog_repo=catalog_repo, logger=logger
+    )
+    return service, listener, catalog_repo, analysis_repo
+
+
+def test_analyzed_item_is_not_sent_again():
+    service, listener, _, analysis_repo = _setup()
+    assert listener.subject == "evt.catalog.ai.analysis.completed"
+
+    async def run():
+        _, requests = await service._store_products("merchant_1", [_product("https://cdn/a.jpg")])
+        assert len(requests) == 1
+
+        await listener.on_message(_result_envelope(requests[0]))
+
+        _, unchanged = await service._store_products("merchant_1", [_product("https://cdn/a.jpg")])
+        _, moved = await service._store_products("merchant_1", [_product("https://cdn/b.jpg")])
+        return unchanged, moved
+
+    unchanged, moved = asyncio.run(run())
+
+    assert unchanged == []
+    # A new URL is re-sent with the stored hash, so identical bytes are not re-analyzed
+    assert [request["image_hash"] for request in moved] == ["a" * 64]
+    assert analysis_repo.results[0]["quality_score"] == Decimal("0.9")
+    assert analysis_repo.results[0]["processing_time_ms"] == 340
+
+
+def test_failed_result_without_model_version_is_retried_next_sync():
+    service, listener, catalog_repo, analysis_repo = _setup()
+
+    async def run():
+        _, requests = await service._store_products("merchant_1", [_product("https://cdn/a.jpg")])
+        await listener.on_message(_result_envelope(requests[0], status="failed", model_version=None, image_hash=None))
+        _, retried = await service._store_products("merchant_1", [_product("https://cdn/a.jpg")])
+        return retried
+
+    retried = asyncio.run(run())
+
+    assert catalog_repo.items[("shopify", "v1")].analysis_status == "pending"
+    assert len(retried) == 1
+    assert analysis_repo.results == []
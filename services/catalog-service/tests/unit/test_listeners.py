@@ -0,0 +1,99 @@
+import asyncio
+import types
+
+from src.events.listeners import ProductDeletedListener, ProductsRefreshedListener
+
+from shared.messaging.events.base import EventEnvelope
+from shared.utils.logger import ServiceLogger
+
+
+class _Recorder:
+    """Records calls to any async method"""
+
+    def __init__(self, **returns):
+        self.calls: list[tuple[str, dict]] = []
+        self._returns = returns
+
+    def __getattr__(self, name):
+        async def method(**kwargs):
+            self.calls.append((name, kwargs))
+            return self._returns.get(name)
+
+        return method
+
+
+def _envelope(event_type: str, data: dict) -> EventEnvelope:
+    # Round-trip through JSON, as the base Listener parses the message
+    envelope = EventEnvelope(
+        event_type=event_type, correlation_id="corr_webhook", source_service="platform-connector", data=data
+    )
+    return EventEnvelope.model_validate_json(envelope.to_bytes())
+
+
+def _js():
+    return types.SimpleNamespace(js=None)
+
+
+def test_refreshed_products_are_stored_and_changed_images_sent_for_analysis():
+    request = {"item_id": "item_1", "product_id": "p1", "variant_id": "v1", "image_url": "https://cdn/a.jpg"}
+    service = _Recorder(process_product_refresh=([object()], [request]))
+    publisher = _Recorder()
+    listener = ProductsRefreshedListener(_js(), publisher, service, ServiceLogger("test-catalog-listeners"))
+
+    envelope = _envelope(
+        "evt.platform.products.refreshed",
+        {
+            "merchant_id": "merchant_1",
+            "refresh_id": "refresh_1",
+            "platform_name": "shopify",
+            "platform_shop_id": "shop_1",
+            "domain": "shop.myshopify.com",
+            "products": [{"variant_id": "v1"}],
+        },
+    )
+    asyncio.run(listener.on_message(envelope))
+
+    assert service.calls == [
+        (
+            "process_product_refresh",
+            {"merchant_id": "merchant_1", "products": [{"variant_id": "v1"}], "correlation_id": "corr_webhook"},
+        )
+    ]
+    assert publisher.calls == [
+        (
+            "catalog_analysis_requested",
+            {"merchant_id": "merchant_1", "sync_id": "refresh_1", "items": [request], "correlation_id": "corr_webhook"},
+        )
+    ]
+
+
+def test_deleted_product_is_removed():
+    service = _Recorder(delete_product=2)
+    listener = ProductDeletedListener(_js(), service, ServiceLogger("test-catalog-listeners"))
+
+    envelope = _envelope(
+        "evt.webhook.catalog.product_deleted", {"domain": "shop.myshopify.com", "product_id": "8526062977266"}
+    )
+    asyncio.run(listener.on_message(envelope))
+
+    assert service.calls == [
+        (
+            "delete_product",
+            {
+                "merchant_id": "shop.myshopify.com",
+                "platform_name": "shopify",
+                "product_id": "8526062977266",
+                "correlation_id": "corr_webhook",
+            },
+        )
+    ]
+
+
+def test_invalid_payload_is_acked_without_side_effects():
+    service = _Recorder()
+    listener = ProductDeletedListener(_js(), service, ServiceLogger("test-catalog-listeners"))
+
+    # Returns instead of raising, so the base Listener acks rather than redelivers
+    asyncio.run(listener.on_message(_envelope("evt.webhook.catalog.product_deleted", {"domain": "shop"})))
+
+    assert service.calls == []
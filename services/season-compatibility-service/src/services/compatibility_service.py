@@ -3,6 +3,7 @@ import time
 
 import numpy as np
 
+from shared.color import MAX_DELTA_E, LabPalette
 from shared.utils.exceptions import ValidationError
 from shared.utils.logger import ServiceLogger
 
@@ -22,27 +23,21 @@ class CompatibilityService:
         self.repository = repository
         self.logger = logger
 
-    def _calculate_color_distance(self, rgb1: list[int], rgb2: list[int]) -> float:
-        """Calculate Euclidean distance between two RGB colors"""
-        return np.sqrt(sum((c1 - c2) ** 2 for c1, c2 in zip(rgb1, rgb2)))
+        # Reference colors of all seasons with LAB precomputed once
+        self.reference_palette = LabPalette({name: p["reference_colors"] for name, p in SEASON_PALETTES.items()})
 
-    def _compute_color_compatibility(self, item_colors: list[list[int]], season_palette: dict) -> float:
-        """Compute color compatibility score for a season"""
+    def _compute_color_compatibility(self, item_colors: list[list[int]]) -> np.ndarray:
+        """Compute color compatibility scores for every season, in SEASON_PALETTES order"""
         if not item_colors:
-            return 0.0
+            return np.zeros(len(self.reference_palette.names))
 
-        reference_colors = season_palette["reference_colors"]
-        total_score = 0.0
+        # CIEDE2000 from each item color to its nearest reference color, per season
+        min_distances = self.reference_palette.min_delta_e(item_colors)
 
-        # For each item color, find minimum distance to reference colors
-        for item_color in item_colors:
-            min_distance = min(self._calculate_color_distance(item_color, ref_color) for ref_color in reference_colors)
-            # Convert distance to score (0-1, where 1 is perfect match)
-            # Max possible distance is ~441 (sqrt(255^2 * 3))
-            score = 1.0 - (min_distance / 441.0)
-            total_score += score
+        # Convert distance to score (0-1, where 1 is perfect match)
+        scores = np.maximum(0.0, 1.0 - min_distances / MAX_DELTA_E)
 
-        return total_score / len(item_colors)
+        return scores.mean(axis=1)
 
     def _compute_axis_compatibility(self, item_colors: list[list[int]], season_palette: dict) -> float:
         """Compute compatibility based on temperature/value/chroma axes"""
@@ -82,10 +77,10 @@ class CompatibilityService:
         """Compute compatibility scores for all 16 seasons"""
         scores = {}
 
-        for season_name, season_palette in SEASON_PALETTES.items():
-            # Color-based scoring (60% weight)
-            color_score = self._compute_color_compatibility(rgb_colors, season_palette)
+        # Color-based scoring (60% weight), all seasons in one pass
+        color_scores = self._compute_color_compatibility(rgb_colors)
 
+        for color_score, (season_name, season_palette) in zip(color_scores.tolist(), SEASON_PALETTES.items()):
             # Axis-based scoring (40% weight)
             axis_score = self._compute_axis_compatibility(rgb_colors, season_palette)
 
@@ -0,0 +1,97 @@
+# ruff: noqa: T201
+"""Benchmark dominant-color quantizers on synthetic selfie regions.
+
+Reports latency per region, palette delta against the legacy full-pixel
+KMeans(n_init=10) palette (symmetric mean nearest-color CIEDE2000) and each
+palette's pixel quantization error.
+
+Run from the service root:
+    PYTHONPATH=../../shared:. python -m scripts.benchmark_color_quantizer
+"""
+
+import argparse
+import logging
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from src.services.color_extractor import ColorExtractor
+
+from shared.color import QUANTIZER_METHODS, delta_e_ciede2000, rgb_to_lab
+
+# Skin, hair and eye-ish cluster centers with realistic spread
+REGION_CENTERS = {
+    "face": [[224, 172, 140], [196, 140, 110], [150, 100, 80]],
+    "hair": [[60, 40, 30], [100, 70, 45], [30, 25, 20]],
+}
+
+
+def synthetic_region(centers: list, n_pixels: int, rng: np.random.Generator) -> np.ndarray:
+    weights = rng.dirichlet(np.ones(len(centers)) * 3)
+    labels = rng.choice(len(centers), size=n_pixels, p=weights)
+    pixels = np.asarray(centers)[labels] + rng.normal(0, 12, size=(n_pixels, 3))
+    return np.clip(pixels, 0, 255).astype(np.uint8)
+
+
+def palette_delta(reference: list, candidate: list) -> float:
+    """Symmetric mean nearest-color CIEDE2000 between two palettes"""
+    if not reference or not candidate:
+        return float("nan")
+    distances = delta_e_ciede2000(rgb_to_lab(np.asarray(reference))[:, None], rgb_to_lab(np.asarray(candidate))[None])
+    return float((distances.min(axis=1).mean() + distances.min(axis=0).mean()) / 2)
+
+
+def quantization_error(pixels_rgb: np.ndarray, palette: list) -> float:
+    """Mean CIEDE2000 from pixels to their nearest palette color"""
+    if not palette:
+        return float("nan")
+    distances = delta_e_ciede2000(rgb_to_lab(pixels_rgb)[:, None], rgb_to_lab(np.asarray(palette))[None])
+    return float(distances.min(axis=1).mean())
+
+
+def extractor(method: str, sample_size: int) -> ColorExtractor:
+    config = SimpleNamespace(color_quantizer=method, color_sample_size=sample_size)
+    return ColorExtractor(config, logging.getLogger("benchmark"))
+
+
+def timed(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000, 300_000])
+    parser.add_argument("--sample-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    legacy = extractor("kmeans", sample_size=0)
+
+    # Warm up sklearn/BLAS so the first row is not dominated by import cost
+    legacy._extract_dominant_colors(synthetic_region(REGION_CENTERS["face"], 1000, rng))
+
+    print(f"{'region':<6} {'pixels':>8} {'method':<10} {'ms':>9} {'speedup':>8} {'ΔE vs legacy':>13} {'pixel ΔE':>9}")
+    for region, centers in REGION_CENTERS.items():
+        for size in args.sizes:
+            pixels = synthetic_region(centers, size, rng)
+            reference, legacy_ms = timed(lambda pixels=pixels: legacy._extract_dominant_colors(pixels), 1)
+            rows = [("legacy", reference, legacy_ms)]
+
+            for method in QUANTIZER_METHODS:
+                candidate = extractor(method, args.sample_size)
+                palette, ms = timed(lambda c=candidate, pixels=pixels: c._extract_dominant_colors(pixels), args.repeat)
+                rows.append((method, palette, ms))
+
+            for method, palette, ms in rows:
+                print(
+                    f"{region:<6} {size:>8} {method:<10} {ms:>9.1f} {legacy_ms / ms:>8.1f} "
+                    f"{palette_delta(reference, palette):>13.2f} {quantization_error(pixels[::50], palette):>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# ruff: noqa: T201
+"""Offline CPU benchmark of the selfie analysis pipeline.
+
+Per-stage timings (decode, fingerprint, face mesh, segmentation, DeepFace,
+color extraction, season scoring) for synthetic selfies at several
+resolutions, end-to-end throughput under concurrency, and memory high-water
+marks. Stages whose models are not installed are reported as skipped.
+
+Run from the service root:
+    PYTHONPATH=../../shared:. python -m scripts.benchmark_pipeline --output pipeline.json
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import cv2
+from src.config import ServiceConfig
+from src.lifecycle import ServiceLifecycle
+from src.schemas.analysis import AnalysisTarget
+from src.utils.result_cache import image_fingerprint
+from src.utils.startup import StartupReport
+
+from shared.utils.benchmark import (
+    StageTimer,
+    encode_jpeg,
+    environment_info,
+    load_fixtures,
+    parse_resolutions,
+    peak_rss_mb,
+    run_concurrent,
+    synthetic_selfie,
+    write_report,
+)
+
+# What selfie-service actually sends: analyzer JPEGs of at most 1280px
+ANALYZER_RESOLUTIONS = [(640, 480), (960, 720), (1280, 960)]
+
+
+def build_config(args: argparse.Namespace) -> ServiceConfig:
+    """Defaults without the service env; no result cache, so every request does the work"""
+    return ServiceConfig.model_construct(
+        result_cache_enabled=False,
+        warmup_on_startup=False,
+        temp_dir=args.temp_dir,
+        worker_queue_size=max(args.concurrency) * 4,
+    )
+
+
+def run_stage(timer: StageTimer, name: str, fn, *args):
+    """Time one stage; a missing model marks it skipped instead of failing the run"""
+    if name in timer.skipped:
+        return None
+    try:
+        with timer.stage(name):
+            return fn(*args)
+    except (ImportError, AttributeError) as e:
+        timer.samples.pop(name, None)
+        timer.skip(name, f"{type(e).__name__}: {e}")
+    except Exception as e:
+        timer.samples.pop(name, None)
+        timer.skip(name, f"failed: {e}")
+    return None
+
+
+async def profile_stages(lifecycle: ServiceLifecycle, jpeg: bytes, runs: int, trace_memory: bool) -> dict:
+    """Each stage in isolation, on the same decoded image the service would use"""
+    svc = lifecycle.analysis_service
+    face = lifecycle.face_analyzer
+    timer = StageTimer(trace_memory=trace_memory)
+
+    # DeepFace failures are swallowed inside the analyzer, so probe the import up front
+    try:
+        import deepface  # noqa: F401
+    except ImportError as e:
+        timer.skip("deepface", f"ImportError: {e}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        image_path = str(Path(work_dir) / "selfie.png")
+        for _ in range(runs):
+            with timer.stage("decode"):
+                image, _ = await svc._decode_and_validate_image(jpeg)
+            with timer.stage("fingerprint"):
+                h, w = image.shape[:2]
+                image_fingerprint(image, {"x": w // 4, "y": h // 4, "width": w // 2, "height": h // 2})
+            with timer.stage("write_png"):
+                cv2.imwrite(image_path, image)
+
+            mesh = run_stage(timer, "face_mesh", face._run_face_mesh, image_path)
+            segmentation = run_stage(timer, "segmentation", face._run_segmentation, image_path)
+            run_stage(timer, "deepface", face._run_deepface, image_path)
+
+            with timer.stage("color_extraction"):
+                colors = await lifecycle.color_extractor.extract_region_colors(image_path, segmentation, mesh)
+            with timer.stage("season_scoring"):
+                await lifecycle.season_calculator.compute_season_scores(colors)
+
+    return timer.summary()
+
+
+async def measure_throughput(lifecycle: ServiceLifecycle, jpeg: bytes, total: int, concurrency: int) -> dict:
+    """End-to-end AnalysisService.analyze_selfie with bounded in-flight requests"""
+    svc = lifecycle.analysis_service
+
+    async def call(i: int):
+        target = AnalysisTarget(analysis_id=f"ana_bench{concurrency}x{i}", merchant_id="merch_bench")
+        return await svc.analyze_selfie(target, jpeg, correlation_id=f"bench-{i}")
+
+    return await run_concurrent(call, total=total, concurrency=concurrency)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resolutions", type=parse_resolutions, default=ANALYZER_RESOLUTIONS)
+    parser.add_argument("--fixtures", help="directory of real selfies to run instead of synthetic ones")
+    parser.add_argument("--runs", type=int, default=5, help="stage runs per image")
+    parser.add_argument("--requests", type=int, default=16, help="requests per concurrency level")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4])
+    parser.add_argument("--warmup", action="store_true", help="load every model before timing")
+    parser.add_argument("--trace-memory", action="store_true", help="per-stage allocation peaks (slower)")
+    parser.add_argument("--temp-dir", default=tempfile.mkdtemp(prefix="selfie-bench-"))
+    parser.add_argument("--output", help="JSON report path ('-' for stdout)")
+    args = parser.parse_args()
+
+    # Model failures are expected offline; keep the report readable
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.CRITICAL)
+
+    lifecycle = ServiceLifecycle(build_config(args), logger)
+    await lifecycle.startup()
+
+    warmup = None
+    if args.warmup:
+        report = StartupReport()
+        await asyncio.to_thread(lifecycle.face_analyzer.warmup, report)
+        warmup = report.as_dict()
+
+    if args.fixtures:
+        images = load_fixtures(args.fixtures)
+    else:
+        images = [
+            (f"synthetic_{w}x{h}", encode_jpeg(synthetic_selfie(w, h, seed=i)))
+            for i, (w, h) in enumerate(args.resolutions)
+        ]
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    results = []
+    try:
+        for name, jpeg in images:
+            if len(jpeg) > lifecycle.config.max_image_size_bytes:
+                print(f"\n{name}: skipped, {len(jpeg) / 1e6:.1f} MB is over the analyzer upload limit")
+                continue
+            stages = await profile_stages(lifecycle, jpeg, args.runs, args.trace_memory)
+            throughput = [await measure_throughput(lifecycle, jpeg, args.requests, level) for level in args.concurrency]
+            results.append({"image": name, "bytes": len(jpeg), "stages": stages, "throughput": throughput})
+
+            print(f"\n{name} ({len(jpeg) / 1e3:.0f} KB)")
+            for stage, summary in stages.items():
+                if "skipped" in summary:
+                    print(f"  {stage:<18} skipped ({summary['skipped'][:60]})")
+                else:
+                    print(f"  {stage:<18} p50 {summary['p50_ms']:9.2f} ms   p95 {summary['p95_ms']:9.2f} ms")
+            for level in throughput:
+                print(
+                    f"  concurrency {level['concurrency']:<3}    {level['throughput_rps']:7.2f} req/s   "
+                    f"p95 {level['latency']['p95_ms']:9.2f} ms   errors {level['errors']}"
+                )
+    finally:
+        await lifecycle.shutdown()
+
+    report = {
+        "benchmark": "selfie-ai-analyzer.pipeline",
+        "environment": environment_info(),
+        "warmup": warmup,
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"\npeak rss: {report['peak_rss_mb']} MB")
+    write_report(args.output, report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
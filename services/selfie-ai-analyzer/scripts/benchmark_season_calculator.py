@@ -0,0 +1,139 @@
+# ruff: noqa: T201
+"""Benchmark vectorized SeasonCalculator scoring against the per-palette loop.
+
+Run from the service root:
+    PYTHONPATH=../../shared:. python -m scripts.benchmark_season_calculator
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import numpy as np
+from src.schemas.analysis import ColorAttributes, ColorInfo
+from src.services.season_calculator import SeasonCalculator
+
+from shared.color import delta_e_ciede2000, rgb_to_lab
+
+
+def _reference_rgb_to_hsv(rgb):
+    r, g, b = [x / 255.0 for x in rgb]
+    max_c = max(r, g, b)
+    min_c = min(r, g, b)
+    diff = max_c - min_c
+    if diff == 0:
+        h = 0
+    elif max_c == r:
+        h = ((g - b) / diff) % 6
+    elif max_c == g:
+        h = (b - r) / diff + 2
+    else:
+        h = (r - g) / diff + 4
+    return h * 60, (0 if max_c == 0 else diff / max_c), max_c
+
+
+def _reference_similarity(color, references):
+    lab = rgb_to_lab(color)
+    return max(max(0, 1 - float(delta_e_ciede2000(lab, rgb_to_lab(ref))) / 100) for ref in references)
+
+
+def _reference_harmony(color1, color2):
+    h1, s1, v1 = _reference_rgb_to_hsv(color1)
+    h2, s2, v2 = _reference_rgb_to_hsv(color2)
+    hue_diff = abs(h1 - h2)
+    if hue_diff > 180:
+        hue_diff = 360 - hue_diff
+    if 170 <= hue_diff <= 190:
+        harmony = 0.9
+    elif hue_diff <= 30:
+        harmony = 0.8
+    elif 110 <= hue_diff <= 130:
+        harmony = 0.7
+    else:
+        harmony = max(0, 1 - hue_diff / 180)
+    harmony *= 1 - abs(s1 - s2) * 0.3
+    harmony *= 1 - abs(v1 - v2) * 0.2
+    return harmony
+
+
+def reference_scores(calc: SeasonCalculator, attributes: ColorAttributes) -> dict[str, float]:
+    """Per-palette, per-color Python loop over the same scoring rules"""
+    scores = {}
+    for name, palette in calc.season_palettes.items():
+        score = 0.0
+        if attributes.left_iris or attributes.right_iris:
+            eye = (attributes.left_iris or attributes.right_iris).dominant_rgb
+            score += _reference_similarity(eye, palette["eye_colors"]) * 0.25
+        if attributes.hair:
+            score += _reference_similarity(attributes.hair.dominant_rgb, palette["hair_colors"]) * 0.25
+        if attributes.face_skin:
+            skin = attributes.face_skin.dominant_rgb
+            score += _reference_similarity(skin, palette["skin_tones"]) * 0.30
+            score += np.mean([_reference_harmony(skin, key) for key in palette["key_colors"]]) * 0.20
+
+        multiplier = 1.0
+        undertone = calc._analyze_temperature(attributes)
+        if palette["temperature"] == undertone and undertone in ("warm", "cool"):
+            multiplier *= 1.2
+        elif palette["temperature"] in ("warm_neutral", "cool_neutral") and undertone == "neutral":
+            multiplier *= 1.1
+        if palette["value"] == calc._analyze_value(attributes):
+            multiplier *= 1.15
+        if palette["chroma"] == calc._analyze_chroma(attributes):
+            multiplier *= 1.1
+        scores[name] = score * min(multiplier, 1.5)
+
+    max_score = max(scores.values())
+    return {k: v / max_score for k, v in scores.items()} if max_score > 0 else scores
+
+
+def random_attributes(rng: np.random.Generator) -> ColorAttributes:
+    def info() -> ColorInfo:
+        colors = rng.integers(0, 256, size=(3, 3)).tolist()
+        return ColorInfo(dominant_rgb=colors[0], colors=colors)
+
+    iris = info()
+    return ColorAttributes(hair=info(), face_skin=info(), left_iris=iris, right_iris=iris)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    calc = SeasonCalculator(logging.getLogger("benchmark"))
+    rng = np.random.default_rng(args.seed)
+    samples = [random_attributes(rng) for _ in range(args.samples)]
+
+    # Parity check
+    max_error = 0.0
+    for attributes in samples:
+        expected = reference_scores(calc, attributes)
+        actual = asyncio.run(calc.compute_season_scores(attributes)).model_dump()
+        max_error = max(max_error, max(abs(expected[k] - actual[k]) for k in expected))
+
+    # Timing
+    start = time.perf_counter()
+    for attributes in samples:
+        reference_scores(calc, attributes)
+    loop_s = time.perf_counter() - start
+
+    async def run_vectorized():
+        for attributes in samples:
+            await calc.compute_season_scores(attributes)
+
+    start = time.perf_counter()
+    asyncio.run(run_vectorized())
+    vector_s = time.perf_counter() - start
+
+    print(f"samples:          {args.samples}")
+    print(f"max abs error:    {max_error:.3e}")
+    print(f"loop:             {loop_s / args.samples * 1e6:8.1f} us/call")
+    print(f"vectorized:       {vector_s / args.samples * 1e6:8.1f} us/call")
+    print(f"speedup:          {loop_s / vector_s:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
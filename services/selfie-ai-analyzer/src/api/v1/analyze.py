@@ -1,74 +1,143 @@
 # services/selfie-ai-analyzer/src/api/v1/analyze.py
-import time
-import hmac
-import hashlib
-from fastapi import APIRouter, Body, Header, HTTPException, status
-from shared.api import ApiResponse, success_response
+import json
+from fastapi import APIRouter, Header, Request, status
+from pydantic import ValidationError as PydanticValidationError
+from shared.api import ApiResponse, SignedHeaders, body_digest, success_response
 from shared.api.dependencies import RequestContextDep, InternalAuthDep
-from shared.utils.exceptions import ValidationError
-from ...dependencies import AnalysisServiceDep, ConfigDep
-from ...schemas.analysis import AnalysisRequest, AnalysisResponse
+from shared.utils.exceptions import UnauthorizedError, ValidationError
+from ...dependencies import AnalysisServiceDep, ConfigDep, SignatureVerifierDep
+from ...schemas.analysis import AnalysisRequest, AnalysisResponse, AnalysisTarget
 
 router = APIRouter(prefix="/api/v1", tags=["Analysis"])
 
+# Binary transport: raw JPEG body, analysis identity in headers
+BINARY_CONTENT_TYPES = ("image/jpeg", "application/octet-stream")
+# JSON transport: room for the request fields around the base64 image
+JSON_BODY_OVERHEAD_BYTES = 16 * 1024
+
 @router.post(
     "/analyze",
     response_model=ApiResponse[AnalysisResponse],
     status_code=status.HTTP_200_OK,
-    summary="Analyze selfie for color seasons"
+    summary="Analyze selfie for color seasons",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": AnalysisRequest.model_json_schema()},
+                "image/jpeg": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    }
 )
 async def analyze_selfie(
+    request: Request,
     svc: AnalysisServiceDep,
     ctx: RequestContextDep,
     config: ConfigDep,
     auth: InternalAuthDep,  # Internal service auth
+    verifier: SignatureVerifierDep,
     x_signature: str | None = Header(None),
-    body: AnalysisRequest = Body(...)
+    idempotency_key: str | None = Header(None),
+    content_type: str | None = Header(None),
+    x_analysis_id: str | None = Header(None),
+    x_merchant_id: str | None = Header(None),
+    x_analysis_metadata: str | None = Header(None),
+    x_face_bbox: str | None = Header(None)
 ):
     """
     Analyze selfie image for seasonal color analysis.
     Internal endpoint called by Selfie Service only.
+    
+    Accepts either a raw `image/jpeg` body with X-Analysis-ID, X-Merchant-ID,
+    X-Analysis-Metadata (JSON) and optional X-Face-BBox (JSON) headers, or the
+    legacy JSON body with a base64 image.
+    A face bbox from the upload gate lets the models run on the face region only.
     """
     
-    # Optional HMAC verification if signature provided
-    if x_signature and config.hmac_secret:
-        expected = hmac.new(
-            config.hmac_secret.encode(),
-            f"{body.analysis_id}{int(time.time())}".encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
-        # Allow some time skew
-        valid = False
-        for offset in range(-config.hmac_time_skew_seconds, config.hmac_time_skew_seconds):
-            test_sig = hmac.new(
-                config.hmac_secret.encode(),
-                f"{body.analysis_id}{int(time.time() + offset)}".encode(),
-                hashlib.sha256
-            ).hexdigest()
-            if hmac.compare_digest(x_signature, test_sig):
-                valid = True
-                break
-        
-        if not valid:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid signature"
-            )
+    # Signature headers (presence, skew, nonce) are checked before the body is read;
+    # the HMAC over the body digest is checked before the image is decoded
+    signed = _check_signature_headers(request, verifier, config, x_signature)
+    if content_type and content_type.split(";")[0].strip().lower() in BINARY_CONTENT_TYPES:
+        body = _parse_model(AnalysisTarget, {
+            "analysis_id": x_analysis_id,
+            "merchant_id": x_merchant_id,
+            "metadata": _parse_json_header(x_analysis_metadata, "X-Analysis-Metadata") or {},
+            "face_bbox": _parse_json_header(x_face_bbox, "X-Face-BBox")
+        })
+        image_bytes = await _read_image_body(request, config.max_image_size_bytes)
+        _verify_signature(verifier, signed, image_bytes, body.analysis_id)
+    else:
+        # The analysis id is inside the JSON body: bound the read by the base64 size of the largest image
+        raw = await _read_image_body(request, config.max_image_size_bytes * 4 // 3 + JSON_BODY_OVERHEAD_BYTES)
+        body = _parse_model(AnalysisRequest, bytes(raw))
+        _verify_signature(verifier, signed, raw, body.analysis_id)
+        image_bytes = svc.decode_base64_image(body.image_jpeg_b64)
     
     # Process analysis
     result = await svc.analyze_selfie(
         request=body,
-        correlation_id=ctx.correlation_id
+        image_bytes=image_bytes,
+        correlation_id=ctx.correlation_id,
+        idempotency_key=idempotency_key
     )
     
     # Return success response
     return success_response(
         data=result,
-        request_id=ctx.request_id,
         correlation_id=ctx.correlation_id
     )
 
+def _check_signature_headers(request: Request, verifier, config, x_signature: str | None) -> SignedHeaders | None:
+    """Reject unsigned, stale or replayed requests from their headers alone; None when signing is not in use"""
+    if verifier and (x_signature or config.hmac_required):
+        return verifier.check_request_headers(request)
+    if config.hmac_required:
+        raise UnauthorizedError("Request signing is required but not configured", auth_type="hmac")
+    return None
+
+def _verify_signature(verifier, signed: SignedHeaders | None, raw_body: bytes | bytearray, analysis_id: str) -> None:
+    """HMAC over the SHA-256 of the exact body received and the analysis_id"""
+    if signed is not None:
+        verifier.verify(signed, body_digest(raw_body), analysis_id)
+
+def _parse_model(model, data):
+    """Validate a request model from a dict or raw JSON, as a 400 ValidationError"""
+    try:
+        if isinstance(data, dict):
+            return model.model_validate(data)
+        return model.model_validate_json(data)
+    except PydanticValidationError as e:
+        raise ValidationError(
+            message="Invalid analysis request",
+            details={"errors": e.errors(include_url=False, include_context=False, include_input=False)}
+        ) from e
+
+def _parse_json_header(raw: str | None, header: str):
+    """Structured headers (X-Analysis-Metadata, X-Face-BBox) carry JSON"""
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValidationError(message=f"Invalid {header} JSON", field=header) from e
+
+async def _read_image_body(request: Request, max_bytes: int) -> bytearray:
+    """Stream the raw request body into one buffer, rejecting oversize uploads early"""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ValidationError(message=f"Image exceeds {max_bytes} bytes", field="image")
+    
+    buffer = bytearray()
+    async for chunk in request.stream():
+        if len(buffer) + len(chunk) > max_bytes:
+            raise ValidationError(message=f"Image exceeds {max_bytes} bytes", field="image")
+        buffer += chunk
+    
+    if not buffer:
+        raise ValidationError(message="Empty image body", field="image")
+    return buffer
+
 @router.get(
     "/model-versions",
     response_model=ApiResponse[dict],
@@ -89,6 +158,22 @@ async def get_model_versions(
     
     return success_response(
         data=versions,
-        request_id=ctx.request_id,
+        correlation_id=ctx.correlation_id
+    )
+
+@router.get(
+    "/cache-stats",
+    response_model=ApiResponse[dict],
+    summary="Get result cache hit/miss metrics"
+)
+async def get_cache_stats(
+    svc: AnalysisServiceDep,
+    ctx: RequestContextDep,
+    auth: InternalAuthDep
+):
+    """Get result cache counters"""
+    
+    return success_response(
+        data=svc.cache_stats(),
         correlation_id=ctx.correlation_id
     )
\ No newline at end of file
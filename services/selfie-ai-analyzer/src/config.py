@@ -26,6 +26,9 @@ class ServiceConfig(BaseModel):
     internal_api_key: str = Field(..., alias="SELFIE_ANALYZER_API_KEY")
     hmac_secret: str | None = Field(None, alias="ANALYZER_HMAC_SECRET")
     hmac_time_skew_seconds: int = 60
+    # Reject unsigned /analyze requests (otherwise only present signatures are checked)
+    hmac_required: bool = Field(default=False, alias="ANALYZER_HMAC_REQUIRED")
+    hmac_nonce_cache_size: int = 100_000
     
     # Processing timeouts
     total_analysis_timeout_seconds: int = 24
@@ -40,13 +43,39 @@ class ServiceConfig(BaseModel):
     deepface_backend: str = "opencv"
     max_face_width_pixels: int = 300
     
+    # Crop to the selfie-service face bbox before mesh/segmentation/deepface
+    face_roi_enabled: bool = Field(default=True, alias="SELFIE_FACE_ROI_ENABLED")
+    face_roi_margin: float = 0.6
+    
+    # MediaPipe graphs per model: one serializes all inference, each extra one costs its memory (~30-60MB)
+    mediapipe_pool_size: int = Field(default=2, alias="SELFIE_MEDIAPIPE_POOL_SIZE")
+
+    # Load and run every model before /health/ready reports ready
+    warmup_on_startup: bool = Field(default=True, alias="SELFIE_WARMUP_ON_STARTUP")
+    
+    # Dominant color quantization (kmeans | minibatch | histogram); minibatch/histogram trade accuracy for speed
+    color_quantizer: str = Field(default="kmeans", alias="SELFIE_COLOR_QUANTIZER")
+    color_sample_size: int = Field(default=5000, alias="SELFIE_COLOR_SAMPLE_SIZE")
+    
+    # Result cache (idempotent retries and near-duplicate re-uploads)
+    result_cache_enabled: bool = Field(default=True, alias="SELFIE_RESULT_CACHE_ENABLED")
+    result_cache_max_entries: int = Field(default=1024, alias="SELFIE_RESULT_CACHE_MAX_ENTRIES")
+    result_cache_ttl_seconds: int = Field(default=3600, alias="SELFIE_RESULT_CACHE_TTL_SECONDS")
+    result_cache_max_hash_distance: int = 6
+    result_cache_max_color_difference: int = 4
+    
     # API configuration
     api_host: str = "0.0.0.0"
     max_image_size_mb: float = 1.5
     
     # Temp file management
     temp_dir: str = "/tmp/selfies"
-    temp_cleanup_hours: int = 1
+    temp_cleanup_hours: float = 1
+    # "disk" uses temp_dir; "tmpfs" keeps workspaces in RAM (falls back to disk if unavailable)
+    temp_storage: str = Field(default="disk", alias="SELFIE_TEMP_STORAGE")
+    temp_tmpfs_dir: str = "/dev/shm/selfies"
+    temp_janitor_interval_seconds: int = 300
+    temp_max_bytes: int = Field(default=512 * 1024 * 1024, alias="SELFIE_TEMP_MAX_BYTES")
     
     @property
     def api_port(self) -> int:
@@ -1,6 +1,7 @@
 # services/selfie-ai-analyzer/src/dependencies.py
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, Request
+from shared.api import SignatureVerifier
 from .lifecycle import ServiceLifecycle
 from .services.analysis_service import AnalysisService
 
@@ -13,7 +14,13 @@ def get_config(request: Request):
 def get_analysis_service(lifecycle: Annotated[ServiceLifecycle, Depends(get_lifecycle)]) -> AnalysisService:
     return lifecycle.analysis_service
 
+def get_signature_verifier(
+    lifecycle: Annotated[ServiceLifecycle, Depends(get_lifecycle)]
+) -> Optional[SignatureVerifier]:
+    return lifecycle.signature_verifier
+
 # Type aliases
 LifecycleDep = Annotated[ServiceLifecycle, Depends(get_lifecycle)]
 ConfigDep = Annotated[object, Depends(get_config)]
-AnalysisServiceDep = Annotated[AnalysisService, Depends(get_analysis_service)]
\ No newline at end of file
+AnalysisServiceDep = Annotated[AnalysisService, Depends(get_analysis_service)]
+SignatureVerifierDep = Annotated[Optional[SignatureVerifier], Depends(get_signature_verifier)]
\ No newline at end of file
@@ -1,11 +1,13 @@
 # services/selfie-ai-analyzer/src/lifecycle.py
 import asyncio
-from pathlib import Path
 from .services.face_analyzer import FaceAnalyzer
 from .services.color_extractor import ColorExtractor
 from .services.season_calculator import SeasonCalculator
 from .services.analysis_service import AnalysisService
 from .utils.temp_manager import TempManager
+from .utils.result_cache import AnalysisResultCache
+from .utils.startup import StartupReport
+from shared.api import NonceCache, SignatureVerifier
 from shared.utils.logger import ServiceLogger
 
 class ServiceLifecycle:
@@ -18,11 +20,17 @@ class ServiceLifecycle:
         # Create worker queue for backpressure
         self.worker_queue = asyncio.Queue(maxsize=config.worker_queue_size)
         
+        # Readiness: flips after models are warm, not when the app starts listening
+        self.startup_report = StartupReport()
+        self._warmup_task = None
+        
         # Components
         self.face_analyzer = None
         self.color_extractor = None
         self.season_calculator = None
         self.temp_manager = None
+        self.result_cache = None
+        self.signature_verifier = None
         self.analysis_service = None
     
     async def startup(self) -> None:
@@ -32,9 +40,27 @@ class ServiceLifecycle:
             
             # Initialize analyzers
             self.face_analyzer = FaceAnalyzer(self.config, self.logger)
-            self.color_extractor = ColorExtractor(self.logger)
+            self.color_extractor = ColorExtractor(self.config, self.logger)
             self.season_calculator = SeasonCalculator(self.logger)
-            self.temp_manager = TempManager(self.config.temp_dir, self.logger)
+            self.temp_manager = TempManager(self.config, self.logger)
+            
+            if self.config.result_cache_enabled:
+                self.result_cache = AnalysisResultCache(
+                    max_entries=self.config.result_cache_max_entries,
+                    ttl_seconds=self.config.result_cache_ttl_seconds,
+                    max_hash_distance=self.config.result_cache_max_hash_distance,
+                    max_color_difference=self.config.result_cache_max_color_difference
+                )
+            
+            if self.config.hmac_secret:
+                self.signature_verifier = SignatureVerifier(
+                    self.config.hmac_secret,
+                    max_skew_seconds=self.config.hmac_time_skew_seconds,
+                    nonce_cache=NonceCache(
+                        max_entries=self.config.hmac_nonce_cache_size,
+                        ttl_seconds=2 * self.config.hmac_time_skew_seconds
+                    )
+                )
             
             # Initialize main service
             self.analysis_service = AnalysisService(
@@ -42,13 +68,21 @@ class ServiceLifecycle:
                 color_extractor=self.color_extractor,
                 season_calculator=self.season_calculator,
                 temp_manager=self.temp_manager,
+                result_cache=self.result_cache,
                 config=self.config,
                 logger=self.logger,
                 queue=self.worker_queue
             )
             
-            # Ensure temp directory exists
-            Path(self.config.temp_dir).mkdir(parents=True, exist_ok=True)
+            # Temp dir and its janitor (one task for all workspaces)
+            self.temp_manager.start()
+            
+            # Preload models in the background; /health/ready stays 503 until done
+            if self.config.warmup_on_startup:
+                self.startup_report.status = "warming"
+                self._warmup_task = asyncio.create_task(self._warmup())
+            else:
+                self.startup_report.finish()
             
             self.logger.info("Selfie AI Analyzer started successfully")
             
@@ -56,12 +90,36 @@ class ServiceLifecycle:
             self.logger.critical("Service startup failed", exc_info=True)
             raise
     
+    async def _warmup(self) -> None:
+        """Import, load and run every model once, then report startup timings"""
+        report = self.startup_report
+        
+        try:
+            await asyncio.to_thread(self.face_analyzer.warmup, report)
+            with report.phase("warm_color_quantizer"):
+                await asyncio.to_thread(self.color_extractor.warmup)
+        except Exception as e:
+            # Anything outside a phase still ends warmup, as failed rather than stuck in "warming"
+            report.fail("warmup", e)
+        
+        report.finish()
+        if report.errors:
+            self.logger.error("Model warmup failed, service stays not ready", extra=report.as_dict())
+        else:
+            self.logger.info("Model warmup complete", extra=report.as_dict())
+    
     async def shutdown(self) -> None:
         """Graceful shutdown"""
         self.logger.info("Shutting down Selfie AI Analyzer")
         
-        # Cleanup temp files
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        
+        if self.face_analyzer:
+            self.face_analyzer.close()
+        
+        # Stop the janitor and remove this process's temp files
         if self.temp_manager:
-            await self.temp_manager.cleanup_all()
+            await self.temp_manager.stop()
         
         self.logger.info("Selfie AI Analyzer shutdown complete")
\ No newline at end of file
@@ -1,6 +1,6 @@
 # services/selfie-ai-analyzer/src/main.py
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from shared.api import setup_middleware, create_health_router
 from shared.utils import create_logger
 from .config import get_service_config
@@ -25,6 +25,11 @@ async def lifespan(app: FastAPI):
     finally:
         await lifecycle.shutdown()
 
+async def readiness_check(request: Request):
+    """Ready once models are loaded and have run a warm inference"""
+    report = request.app.state.lifecycle.startup_report
+    return report.ready, report.as_dict()
+
 def create_application() -> FastAPI:
     """Create FastAPI app with shared package integration"""
     app = FastAPI(
@@ -40,8 +45,8 @@ def create_application() -> FastAPI:
         service_name=config.service_name
     )
     
-    # Add health check
-    app.include_router(create_health_router(config.service_name))
+    # Add health check (liveness) and /health/ready (readiness)
+    app.include_router(create_health_router(config.service_name, readiness_check=readiness_check))
     
     # Add API routers
     from .api.v1 import analyze
@@ -4,15 +4,26 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Dict, List
 
 # Request DTOs
-class AnalysisRequest(BaseModel):
-    """Request for selfie analysis"""
+class FaceBBox(BaseModel):
+    """Face bounding box in image pixels, from the selfie-service upload gate"""
+    x: int = Field(ge=0)
+    y: int = Field(ge=0)
+    width: int = Field(gt=0)
+    height: int = Field(gt=0)
+
+class AnalysisTarget(BaseModel):
+    """Analysis identity and metadata; the image travels separately in binary uploads"""
     analysis_id: str = Field(..., pattern="^ana_[a-zA-Z0-9]+$")
     merchant_id: str = Field(..., pattern="^merch_[a-zA-Z0-9]+$")
-    image_jpeg_b64: str = Field(..., description="Base64 encoded JPEG ≤1.5MB")
     metadata: Dict[str, str] = Field(default_factory=dict)
+    face_bbox: Optional[FaceBBox] = None
     
     model_config = ConfigDict(extra="forbid")
 
+class AnalysisRequest(AnalysisTarget):
+    """Request for selfie analysis (JSON/base64 transport)"""
+    image_jpeg_b64: str = Field(..., description="Base64 encoded JPEG ≤1.5MB")
+
 # Response DTOs
 class SeasonScores(BaseModel):
     """Seasonal color analysis scores"""
@@ -12,13 +12,14 @@ from shared.utils.logger import ServiceLogger
 from shared.utils.exceptions import ValidationError, ServiceUnavailableError, RequestTimeoutError
 
 from ..schemas.analysis import (
-    AnalysisRequest, AnalysisResponse, SeasonScores,
+    AnalysisTarget, AnalysisResponse, FaceBBox, SeasonScores,
     Demographics, ColorAttributes, AnalysisMetrics, ModelVersions
 )
 from .face_analyzer import FaceAnalyzer
 from .color_extractor import ColorExtractor
 from .season_calculator import SeasonCalculator
 from ..utils.temp_manager import TempManager
+from ..utils.result_cache import AnalysisResultCache, image_fingerprint
 
 class AnalysisService:
     """Main service for selfie analysis orchestration"""
@@ -31,7 +32,8 @@ class AnalysisService:
         temp_manager: TempManager,
         config,
         logger: ServiceLogger,
-        queue: asyncio.Queue
+        queue: asyncio.Queue,
+        result_cache: Optional[AnalysisResultCache] = None
     ):
         self.face_analyzer = face_analyzer
         self.color_extractor = color_extractor
@@ -40,25 +42,39 @@ class AnalysisService:
         self.config = config
         self.logger = logger
         self.queue = queue
+        self.result_cache = result_cache
     
     async def analyze_selfie(
         self,
-        request: AnalysisRequest,
-        correlation_id: str
+        request: AnalysisTarget,
+        image_bytes: bytes | bytearray,
+        correlation_id: str,
+        idempotency_key: Optional[str] = None
     ) -> AnalysisResponse:
-        """Main analysis orchestration"""
+        """Main analysis orchestration; image_bytes is the raw encoded image"""
+        
+        # Retries of a finished analysis are answered without touching the queue
+        cache_key = idempotency_key or request.analysis_id
+        if self.result_cache:
+            cached = self.result_cache.get(cache_key)
+            if cached:
+                self.logger.info(
+                    "Returning cached analysis",
+                    extra={"analysis_id": request.analysis_id, "correlation_id": correlation_id}
+                )
+                return cached
         
         # Check queue capacity (backpressure)
         if self.queue.full():
             raise ServiceUnavailableError(
                 message="Service temporarily unavailable, please retry",
-                retry_after=5
+                details={"retry_after": 5}
             )
         
         # Queue the work
         try:
             result = await asyncio.wait_for(
-                self._process_analysis(request, correlation_id),
+                self._process_analysis(request, image_bytes, correlation_id, cache_key),
                 timeout=self.config.total_analysis_timeout_seconds
             )
             return result
@@ -70,8 +86,10 @@ class AnalysisService:
     
     async def _process_analysis(
         self,
-        request: AnalysisRequest,
-        correlation_id: str
+        request: AnalysisTarget,
+        image_bytes: bytes | bytearray,
+        correlation_id: str,
+        cache_key: str
     ) -> AnalysisResponse:
         """Process analysis with timeout management"""
         
@@ -79,12 +97,32 @@ class AnalysisService:
         work_dir = None
         warnings = []
         
+        # Decode and validate image
+        image, scale = await self._decode_and_validate_image(image_bytes)
+        face_bbox = self._scale_face_bbox(request.face_bbox, scale, image.shape)
+        
+        # Near-identical re-upload of the same customer's face: reuse the stored result
+        fingerprint = None
+        scope = self._cache_scope(request)
+        if self.result_cache and scope and face_bbox:
+            fingerprint = image_fingerprint(image, face_bbox)
+            cached = self.result_cache.find_similar(scope, fingerprint) if fingerprint else None
+            if cached:
+                result = cached.model_copy(update={
+                    "analysis_id": request.analysis_id,
+                    "warnings": [*cached.warnings, "cached_result"],
+                    "processing_ms": int((time.perf_counter() - start_time) * 1000)
+                })
+                self.result_cache.put(cache_key, None, None, result)
+                return result
+        
         try:
             # Setup workspace
             work_dir = await self.temp_manager.create_workspace(request.analysis_id)
             
-            # Decode and validate image
-            image = await self._decode_and_validate_image(request.image_jpeg_b64)
+            # Models only see the face region (plus hair and context) when the bbox is known
+            if face_bbox and self.config.face_roi_enabled:
+                image = self._crop_face_roi(image, face_bbox)
             
             # Save for processing
             image_path = work_dir / "selfie.png"
@@ -139,7 +177,8 @@ class AnalysisService:
             # Extract colors from regions (critical path)
             color_attributes = await self.color_extractor.extract_region_colors(
                 str(image_path),
-                segmentation
+                segmentation,
+                face_mesh
             )
             
             # Calculate season scores based on extracted colors
@@ -153,7 +192,7 @@ class AnalysisService:
             # Build response
             processing_ms = int((time.perf_counter() - start_time) * 1000)
             
-            return AnalysisResponse(
+            result = AnalysisResponse(
                 success=True,
                 analysis_id=request.analysis_id,
                 season_scores=season_scores,
@@ -179,44 +218,36 @@ class AnalysisService:
                 processing_ms=processing_ms
             )
             
+            if self.result_cache:
+                self.result_cache.put(cache_key, scope, fingerprint, result)
+            
+            return result
+            
         finally:
-            # Schedule cleanup
+            # Hand the workspace to the janitor (removed after temp_cleanup_hours)
             if work_dir:
-                asyncio.create_task(
-                    self.temp_manager.schedule_cleanup(
-                        work_dir,
-                        self.config.temp_cleanup_hours
-                    )
-                )
+                self.temp_manager.release(work_dir)
+    
+    def cache_stats(self) -> dict:
+        """Result cache hit/miss counters"""
+        if not self.result_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.result_cache.stats()}
     
-    async def _decode_and_validate_image(self, image_b64: str) -> np.ndarray:
-        """Decode base64 image and validate"""
+    @staticmethod
+    def _cache_scope(request: AnalysisTarget) -> str | None:
+        """Near-duplicate cache scope: merchant plus customer (or anonymous visitor); None when unknown"""
+        if customer_id := request.metadata.get("customer_id"):
+            return f"{request.merchant_id}:customer:{customer_id}"
+        if anonymous_id := request.metadata.get("anonymous_id"):
+            return f"{request.merchant_id}:anonymous:{anonymous_id}"
+        return None
+
+    @staticmethod
+    def decode_base64_image(image_b64: str) -> bytes:
+        """Decode the image of a JSON/base64 request"""
         try:
-            # Decode base64
-            image_bytes = base64.b64decode(image_b64)
-            
-            # Check size
-            if len(image_bytes) > self.config.max_image_size_bytes:
-                raise ValidationError(
-                    message=f"Image exceeds {self.config.max_image_size_mb}MB limit",
-                    field="image_jpeg_b64"
-                )
-            
-            # Decode to numpy array
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if image is None:
-                raise ValidationError(
-                    message="Failed to decode image",
-                    field="image_jpeg_b64"
-                )
-            
-            # Ensure sRGB color space
-            image = self._ensure_srgb(image)
-            
-            return image
-            
+            return base64.b64decode(image_b64)
         except base64.binascii.Error as e:
             raise ValidationError(
                 message="Invalid base64 encoding",
@@ -224,6 +255,30 @@ class AnalysisService:
                 details={"error": str(e)}
             )
     
+    async def _decode_and_validate_image(self, image_bytes: bytes | bytearray) -> Tuple[np.ndarray, float]:
+        """Decode image bytes and validate; returns (image, scale applied after decode)"""
+        # Check size
+        if len(image_bytes) > self.config.max_image_size_bytes:
+            raise ValidationError(
+                message=f"Image exceeds {self.config.max_image_size_mb}MB limit",
+                field="image"
+            )
+        
+        # Decode to numpy array (frombuffer is a view, no copy of the upload)
+        nparr = np.frombuffer(image_bytes, np.uint8)
+        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        
+        if image is None:
+            raise ValidationError(
+                message="Failed to decode image",
+                field="image"
+            )
+        
+        # Ensure sRGB color space
+        width = image.shape[1]
+        image = self._ensure_srgb(image)
+        return image, image.shape[1] / width
+    
     def _ensure_srgb(self, image: np.ndarray) -> np.ndarray:
         """Ensure image is in sRGB color space with quality preservation"""
         height, width = image.shape[:2]
@@ -241,6 +296,34 @@ class AnalysisService:
         
         return image
     
+    @staticmethod
+    def _scale_face_bbox(bbox: Optional[FaceBBox], scale: float, shape: tuple) -> Optional[dict]:
+        """Upload-gate bbox in decoded image pixels, clipped; None when it misses the image"""
+        if bbox is None:
+            return None
+        
+        h, w = shape[:2]
+        x0, y0 = min(int(bbox.x * scale), w), min(int(bbox.y * scale), h)
+        x1, y1 = min(int((bbox.x + bbox.width) * scale), w), min(int((bbox.y + bbox.height) * scale), h)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        return {"x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0}
+    
+    def _crop_face_roi(self, image: np.ndarray, face_bbox: dict) -> np.ndarray:
+        """Face bbox grown by face_roi_margin (more above, for the hairline); the full image if that is most of it"""
+        h, w = image.shape[:2]
+        margin = self.config.face_roi_margin
+        pad_x, pad_y = face_bbox["width"] * margin, face_bbox["height"] * margin
+        
+        x0 = max(int(face_bbox["x"] - pad_x), 0)
+        x1 = min(int(face_bbox["x"] + face_bbox["width"] + pad_x), w)
+        y0 = max(int(face_bbox["y"] - 1.5 * pad_y), 0)
+        y1 = min(int(face_bbox["y"] + face_bbox["height"] + pad_y), h)
+        
+        if (x1 - x0) * (y1 - y0) > 0.8 * w * h:
+            return image
+        return image[y0:y1, x0:x1]
+    
     async def _run_with_timeout(self, coro, timeout: float, name: str):
         """Run coroutine with timeout"""
         try:
@@ -2,26 +2,50 @@
 import cv2
 import numpy as np
 from typing import Optional, Dict, List
-from sklearn.cluster import KMeans
+from shared.color import ColorQuantizer
 from shared.utils.logger import ServiceLogger
 from ..schemas.analysis import ColorAttributes, ColorInfo
 
+# MediaPipe face mesh landmark indices (refine_landmarks=True, 478 points)
+LEFT_IRIS = (473, 474, 475, 476, 477)     # center, then boundary ring
+RIGHT_IRIS = (468, 469, 470, 471, 472)
+LEFT_CHEEK = (346, 347, 330, 266, 425, 411, 352)
+RIGHT_CHEEK = (117, 118, 101, 36, 205, 187, 123)
+HAIRLINE = (54, 103, 67, 109, 10, 338, 297, 332, 284)  # top of the face oval
+FOREHEAD_TOP = 10
+CHIN = 152
+
 class ColorExtractor:
     """Extract colors from different regions of the image"""
     
-    def __init__(self, logger: ServiceLogger):
+    def __init__(self, config, logger: ServiceLogger):
+        self.config = config
         self.logger = logger
         self.n_colors = 3  # Number of dominant colors to extract per region
+        
+        # Subsampled quantizer instead of KMeans over every region pixel
+        self.quantizer = ColorQuantizer(
+            method=config.color_quantizer,
+            sample_size=config.color_sample_size,
+            random_state=42
+        )
+    
+    def warmup(self) -> None:
+        """Run the quantizer once so sklearn (kmeans/minibatch) is imported before traffic"""
+        pixels = np.random.default_rng(0).integers(0, 256, (512, 3), dtype=np.uint8)
+        self.quantizer.quantize(pixels, self.n_colors)
     
     async def extract_region_colors(
         self, 
         image_path: str,
-        segmentation: Optional[Dict] = None
+        segmentation: Optional[Dict] = None,
+        face_mesh: Optional[Dict] = None
     ) -> ColorAttributes:
         """Extract colors from different regions"""
         
         image = cv2.imread(image_path)
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        h, w = image_rgb.shape[:2]
         
         # Extract colors from different regions
         hair_colors = None
@@ -29,47 +53,133 @@ class ColorExtractor:
         left_iris_colors = None
         right_iris_colors = None
         
+        # Landmark polygons: iris rings, cheek patches and a hairline band
+        if face_mesh and face_mesh.get("landmarks"):
+            points = np.asarray(face_mesh["landmarks"], dtype=np.float64)[:, :2] * (w, h)
+            seg_mask = segmentation.get("mask") if segmentation else None
+            
+            left_iris_colors = self._extract_dominant_colors(self._iris_pixels(image_rgb, points, LEFT_IRIS))
+            right_iris_colors = self._extract_dominant_colors(self._iris_pixels(image_rgb, points, RIGHT_IRIS))
+            
+            cheeks = [self._polygon_pixels(image_rgb, points[list(idx)]) for idx in (LEFT_CHEEK, RIGHT_CHEEK)]
+            skin_colors = self._extract_dominant_colors(np.concatenate(cheeks))
+            
+            hair_colors = self._extract_dominant_colors(self._hairline_pixels(image_rgb, points, seg_mask))
+        
+        # Fallbacks for regions the landmarks did not cover
         if segmentation and "segments" in segmentation:
             segments = segmentation["segments"]
             
             # Extract hair colors
-            if "hair" in segments:
+            if not hair_colors and "hair" in segments:
                 hair_region = image_rgb[segments["hair"]]
                 if len(hair_region) > 0:
                     hair_colors = self._extract_dominant_colors(hair_region)
             
             # Extract skin colors
-            if "face" in segments:
+            if not skin_colors and "face" in segments:
                 face_region = image_rgb[segments["face"]]
                 if len(face_region) > 0:
                     skin_colors = self._extract_dominant_colors(face_region)
         else:
             # Fallback: use simple region detection
-            h, w = image_rgb.shape[:2]
             
             # Top region for hair
-            hair_region = image_rgb[0:h//3, w//4:3*w//4]
-            hair_colors = self._extract_dominant_colors(hair_region.reshape(-1, 3))
+            if not hair_colors:
+                hair_region = image_rgb[0:h//3, w//4:3*w//4]
+                hair_colors = self._extract_dominant_colors(hair_region.reshape(-1, 3))
             
             # Middle region for face
-            face_region = image_rgb[h//3:2*h//3, w//4:3*w//4]
-            skin_colors = self._extract_dominant_colors(face_region.reshape(-1, 3))
+            if not skin_colors:
+                face_region = image_rgb[h//3:2*h//3, w//4:3*w//4]
+                skin_colors = self._extract_dominant_colors(face_region.reshape(-1, 3))
         
-        # Extract eye colors (simplified - would need eye detection)
-        # For now, use a central face region
-        eye_region = image_rgb[2*h//5:3*h//5, w//3:2*w//3]
-        eye_colors = self._extract_dominant_colors(eye_region.reshape(-1, 3))
+        # Without iris landmarks, use a central face region for both eyes
+        if not left_iris_colors and not right_iris_colors:
+            eye_region = image_rgb[2*h//5:3*h//5, w//3:2*w//3]
+            left_iris_colors = right_iris_colors = self._extract_dominant_colors(eye_region.reshape(-1, 3))
         
         # Build response
         return ColorAttributes(
             hair=self._to_color_info(hair_colors) if hair_colors else None,
             face_skin=self._to_color_info(skin_colors) if skin_colors else None,
-            left_iris=self._to_color_info(eye_colors) if eye_colors else None,
-            right_iris=self._to_color_info(eye_colors) if eye_colors else None
+            left_iris=self._to_color_info(left_iris_colors) if left_iris_colors else None,
+            right_iris=self._to_color_info(right_iris_colors) if right_iris_colors else None
+        )
+    
+    @staticmethod
+    def _bbox(x_min: float, y_min: float, x_max: float, y_max: float, shape: tuple) -> tuple:
+        """Integer pixel bounds clipped to the image"""
+        h, w = shape[:2]
+        x0, y0 = max(int(np.floor(x_min)), 0), max(int(np.floor(y_min)), 0)
+        x1, y1 = min(int(np.ceil(x_max)) + 1, w), min(int(np.ceil(y_max)) + 1, h)
+        return x0, y0, x1, y1
+    
+    def _iris_pixels(self, image: np.ndarray, points: np.ndarray, indices: tuple) -> np.ndarray:
+        """Pixels of the iris ring, excluding pupil and limbus edge"""
+        center = points[indices[0]]
+        radius = np.linalg.norm(points[list(indices[1:])] - center, axis=1).mean()
+        if radius < 1:
+            return np.empty((0, 3), dtype=image.dtype)
+        
+        x0, y0, x1, y1 = self._bbox(*(center - radius), *(center + radius), image.shape)
+        yy, xx = np.mgrid[y0:y1, x0:x1]
+        distance = np.hypot(xx + 0.5 - center[0], yy + 0.5 - center[1])
+        ring = (distance >= 0.35 * radius) & (distance <= 0.85 * radius)
+        
+        return image[y0:y1, x0:x1][ring]
+    
+    def _polygon_pixels(self, image: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+        """Pixels inside the convex hull of the polygon points (half-plane test over its bbox)"""
+        hull = cv2.convexHull(polygon.astype(np.float32)).reshape(-1, 2).astype(np.float64)
+        if len(hull) < 3:
+            return np.empty((0, 3), dtype=image.dtype)
+        
+        x0, y0, x1, y1 = self._bbox(*hull.min(axis=0), *hull.max(axis=0), image.shape)
+        yy, xx = np.mgrid[y0:y1, x0:x1]
+        pixels = np.stack([xx.ravel() + 0.5, yy.ravel() + 0.5], axis=1)
+        
+        # Sign of the cross product against every edge; inside points agree on all edges
+        edges = np.roll(hull, -1, axis=0) - hull
+        rel = pixels[None, :, :] - hull[:, None, :]
+        cross = edges[:, None, 0] * rel[..., 1] - edges[:, None, 1] * rel[..., 0]
+        inside = (cross >= 0).all(axis=0) | (cross <= 0).all(axis=0)
+        
+        return image[y0:y1, x0:x1].reshape(-1, 3)[inside]
+    
+    def _hairline_pixels(
+        self,
+        image: np.ndarray,
+        points: np.ndarray,
+        seg_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Pixels in a band just above the top of the face oval"""
+        line = points[list(HAIRLINE)]
+        line = line[np.argsort(line[:, 0])]
+        face_height = abs(points[CHIN, 1] - points[FOREHEAD_TOP, 1])
+        if face_height < 1:
+            return np.empty((0, 3), dtype=image.dtype)
+        
+        # Skip a thin margin of forehead skin, then take a band of ~15% face height
+        near, far = 0.04 * face_height, 0.20 * face_height
+        x0, y0, x1, y1 = self._bbox(
+            line[0, 0], line[:, 1].min() - far, line[-1, 0], line[:, 1].max() - near, image.shape
         )
+        if x1 <= x0 or y1 <= y0:
+            return np.empty((0, 3), dtype=image.dtype)
+        
+        top = np.interp(np.arange(x0, x1) + 0.5, line[:, 0], line[:, 1])
+        yy = np.arange(y0, y1)[:, None] + 0.5
+        band = (yy <= top - near) & (yy >= top - far)
+        
+        # Drop background pixels when a person mask is available
+        if seg_mask is not None and seg_mask.shape[:2] == image.shape[:2]:
+            band &= seg_mask[y0:y1, x0:x1] > 0.1
+        
+        return image[y0:y1, x0:x1][band]
     
     def _extract_dominant_colors(self, pixels: np.ndarray) -> List[List[int]]:
-        """Extract dominant colors using K-means clustering"""
+        """Extract dominant colors, sorted by frequency"""
         
         if len(pixels) < self.n_colors:
             return []
@@ -78,18 +188,9 @@ class ColorExtractor:
         if len(pixels.shape) == 3:
             pixels = pixels.reshape(-1, 3)
         
-        # Apply K-means clustering
-        kmeans = KMeans(n_clusters=self.n_colors, random_state=42, n_init=10)
-        kmeans.fit(pixels)
-        
-        # Get cluster centers (dominant colors)
-        colors = kmeans.cluster_centers_.astype(int)
-        
-        # Sort by frequency
-        labels, counts = np.unique(kmeans.labels_, return_counts=True)
-        sorted_indices = np.argsort(counts)[::-1]
+        centers, _ = self.quantizer.quantize(pixels, self.n_colors)
         
-        return [colors[i].tolist() for i in sorted_indices]
+        return centers.astype(int).tolist()
     
     def _to_color_info(self, colors: List[List[int]]) -> ColorInfo:
         """Convert color list to ColorInfo"""
@@ -1,12 +1,71 @@
 # services/selfie-ai-analyzer/src/services/face_analyzer.py
 import asyncio
+import queue
 import threading
-import mediapipe as mp
+from collections.abc import Callable
+from contextlib import contextmanager
 import numpy as np
 from typing import Optional, Dict, Any
-from deepface import DeepFace
 from shared.utils.logger import ServiceLogger
 from ..schemas.analysis import Demographics
+from ..utils.startup import StartupReport
+
+# mediapipe and deepface are imported lazily: importing them costs seconds
+# (TensorFlow for deepface), which is paid during warmup rather than at import
+
+class GraphPool:
+    """Up to `size` instances of a MediaPipe graph, each used by one thread at a time.
+
+    A graph is not thread-safe, so a single instance serializes every
+    request's inference; each extra instance lets one more to_thread worker
+    run in parallel, for one more copy of the model in memory.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int):
+        self._factory = factory
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue[Any] = queue.LifoQueue()
+        self._graphs: list = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        """Check out an idle graph, building one while under size, else wait for one"""
+        graph = self._checkout()
+        try:
+            yield graph
+        finally:
+            self._idle.put(graph)
+
+    def warm(self, run: Callable[[Any], Any]) -> None:
+        """Build every instance and run `run` on each, so no request pays for a build"""
+        graphs = [self._checkout() for _ in range(self.size)]
+        try:
+            for graph in graphs:
+                run(graph)
+        finally:
+            for graph in graphs:
+                self._idle.put(graph)
+
+    def close(self) -> None:
+        with self._lock:
+            for graph in self._graphs:
+                graph.close()
+            self._graphs.clear()
+            self._idle = queue.LifoQueue()
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._graphs) < self.size:
+                graph = self._factory()
+                self._graphs.append(graph)
+                return graph
+        return self._idle.get()
 
 class FaceAnalyzer:
     """Face analysis using MediaPipe and DeepFace"""
@@ -15,13 +74,72 @@ class FaceAnalyzer:
         self.config = config
         self.logger = logger
         
-        # Initialize MediaPipe
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
+        # MediaPipe graphs are built once and reused; each is used by one thread at a time
+        self._face_mesh = GraphPool(self._build_face_mesh, config.mediapipe_pool_size)
+        self._segmenter = GraphPool(self._build_segmenter, config.mediapipe_pool_size)
         
         # Global lock for DeepFace (thread safety)
         self.deepface_lock = threading.Lock() if config.deepface_thread_lock else None
     
+    def warmup(self, report: StartupReport) -> None:
+        """Import, load and run every model once on a synthetic image (blocking)"""
+        import cv2
+        
+        with report.phase("import_mediapipe"):
+            import mediapipe  # noqa: F401
+        with report.phase("import_deepface"):
+            from deepface import DeepFace  # noqa: F401
+        
+        # Synthetic skin-toned oval: no real face is needed to load and run the graphs
+        image = np.full((256, 256, 3), 200, dtype=np.uint8)
+        cv2.ellipse(image, (128, 128), (60, 80), 0, 0, 360, (140, 170, 210), -1)
+        
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with report.phase("warm_face_mesh"):
+            self._face_mesh.warm(lambda graph: graph.process(rgb))
+        with report.phase("warm_segmentation"):
+            self._segmenter.warm(lambda graph: graph.process(rgb))
+        with report.phase("warm_deepface"):
+            self._deepface_call(image, enforce_detection=False)
+    
+    def close(self) -> None:
+        """Release MediaPipe graphs"""
+        self._face_mesh.close()
+        self._segmenter.close()
+
+    @staticmethod
+    def _build_face_mesh():
+        import mediapipe as mp
+        return mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5
+        )
+
+    @staticmethod
+    def _build_segmenter():
+        import mediapipe as mp
+        return mp.solutions.selfie_segmentation.SelfieSegmentation(
+            model_selection=1  # 0 or 1, 1 is more accurate
+        )
+    
+    def _face_mesh_process(self, image: np.ndarray):
+        """Run a pooled FaceMesh graph on a BGR image"""
+        import cv2
+        
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with self._face_mesh.acquire() as face_mesh:
+            return face_mesh.process(rgb)
+    
+    def _segmentation_process(self, image: np.ndarray):
+        """Run a pooled SelfieSegmentation graph on a BGR image"""
+        import cv2
+        
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with self._segmenter.acquire() as segmenter:
+            return segmenter.process(rgb)
+    
     async def extract_face_mesh(self, image_path: str) -> Optional[Dict]:
         """Extract 478 face landmarks using MediaPipe"""
         try:
@@ -34,24 +152,17 @@ class FaceAnalyzer:
         """Run face mesh in thread"""
         import cv2
         
-        with self.mp_face_mesh.FaceMesh(
-            static_image_mode=True,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5
-        ) as face_mesh:
-            
-            image = cv2.imread(image_path)
-            results = face_mesh.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-            
-            if not results.multi_face_landmarks:
-                return None
-            
-            landmarks = results.multi_face_landmarks[0]
-            return {
-                "landmarks": [[lm.x, lm.y, lm.z] for lm in landmarks.landmark],
-                "count": len(landmarks.landmark)
-            }
+        image = cv2.imread(image_path)
+        results = self._face_mesh_process(image)
+        
+        if not results.multi_face_landmarks:
+            return None
+        
+        landmarks = results.multi_face_landmarks[0]
+        return {
+            "landmarks": [[lm.x, lm.y, lm.z] for lm in landmarks.landmark],
+            "count": len(landmarks.landmark)
+        }
     
     async def extract_segmentation(self, image_path: str) -> Optional[Dict]:
         """Extract selfie segmentation using MediaPipe"""
@@ -65,20 +176,13 @@ class FaceAnalyzer:
         """Run segmentation in thread"""
         import cv2
         
-        with self.mp_selfie_segmentation.SelfieSegmentation(
-            model_selection=1  # 0 or 1, 1 is more accurate
-        ) as selfie_segmentation:
-            
-            image = cv2.imread(image_path)
-            results = selfie_segmentation.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-            
-            # Get segmentation mask
-            condition = results.segmentation_mask > 0.5
-            
-            return {
-                "mask": results.segmentation_mask,
-                "segments": self._extract_segments(results.segmentation_mask)
-            }
+        image = cv2.imread(image_path)
+        results = self._segmentation_process(image)
+        
+        return {
+            "mask": results.segmentation_mask,
+            "segments": self._extract_segments(results.segmentation_mask)
+        }
     
     def _extract_segments(self, mask: np.ndarray) -> Dict:
         """Extract different segments from mask"""
@@ -101,13 +205,7 @@ class FaceAnalyzer:
     
     def _run_deepface(self, image_path: str) -> Demographics:
         """Run DeepFace in thread with optional lock"""
-        
-        # Use lock if configured for thread safety
-        if self.deepface_lock:
-            with self.deepface_lock:
-                result = self._deepface_analyze(image_path)
-        else:
-            result = self._deepface_analyze(image_path)
+        result = self._deepface_analyze(image_path)
         
         if not result:
             return None
@@ -122,12 +220,7 @@ class FaceAnalyzer:
     def _deepface_analyze(self, image_path: str) -> Dict:
         """Actual DeepFace analysis"""
         try:
-            results = DeepFace.analyze(
-                img_path=image_path,
-                actions=["age", "gender", "race"],
-                enforce_detection=True,
-                detector_backend=self.config.deepface_backend
-            )
+            results = self._deepface_call(image_path, enforce_detection=True)
             
             # DeepFace returns a list if multiple faces
             if isinstance(results, list):
@@ -136,4 +229,21 @@ class FaceAnalyzer:
             
         except Exception as e:
             self.logger.warning(f"DeepFace analysis failed: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    def _deepface_call(self, img, enforce_detection: bool):
+        """DeepFace.analyze under the optional lock; img is a path or BGR array"""
+        from deepface import DeepFace
+        
+        kwargs = {
+            "img_path": img,
+            "actions": ["age", "gender", "race"],
+            "enforce_detection": enforce_detection,
+            "detector_backend": self.config.deepface_backend,
+        }
+        
+        # Use lock if configured for thread safety
+        if self.deepface_lock:
+            with self.deepface_lock:
+                return DeepFace.analyze(**kwargs)
+        return DeepFace.analyze(**kwargs)
\ No newline at end of file
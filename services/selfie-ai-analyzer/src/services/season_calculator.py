@@ -2,6 +2,7 @@
 import numpy as np
 from typing import Dict, Tuple
 from ..schemas.analysis import ColorAttributes, SeasonScores
+from shared.color import MAX_DELTA_E, LabPalette, delta_e_ciede2000, rgb_to_lab
 from shared.utils.logger import ServiceLogger
 
 class SeasonCalculator:
@@ -10,6 +11,7 @@ class SeasonCalculator:
     def __init__(self, logger: ServiceLogger):
         self.logger = logger
         self.season_palettes = self._initialize_season_palettes()
+        self._compile_palettes()
     
     def _initialize_season_palettes(self) -> Dict:
         """Initialize color palettes for each season based on the 16-season model"""
@@ -231,185 +233,155 @@ class SeasonCalculator:
             }
         }
     
+    def _compile_palettes(self) -> None:
+        """Compile palette data into arrays so all seasons are scored in one pass"""
+        palettes = self.season_palettes
+        self.season_names = list(palettes.keys())
+        
+        # Eye, hair and skin references with LAB precomputed: (regions, seasons, refs, 3)
+        self._region_lab = np.stack([
+            LabPalette({name: p[key] for name, p in palettes.items()}).lab
+            for key in ("eye_colors", "hair_colors", "skin_tones")
+        ])
+        
+        # Key colors never change, so their HSV is computed once
+        key_colors = np.array([p["key_colors"] for p in palettes.values()], dtype=np.float64)
+        self._key_hsv = self._rgb_to_hsv(key_colors)
+        
+        # Characteristic labels for the multiplier masks
+        self._temperatures = np.array([p["temperature"] for p in palettes.values()])
+        self._values = np.array([p["value"] for p in palettes.values()])
+        self._chromas = np.array([p["chroma"] for p in palettes.values()])
+    
     async def compute_season_scores(self, color_attributes: ColorAttributes) -> SeasonScores:
         """Compute scores for all 16 seasons based on extracted colors"""
         
-        scores = {}
-        
-        for season_name, palette in self.season_palettes.items():
-            score = self._calculate_season_score(color_attributes, palette)
-            scores[season_name] = score
+        scores = self._score_all_seasons(color_attributes)
         
         # Normalize scores to 0-1 range
-        max_score = max(scores.values()) if scores else 1
+        max_score = scores.max() if scores.size else 1
         if max_score > 0:
-            scores = {k: v/max_score for k, v in scores.items()}
+            scores = scores / max_score
         
-        return SeasonScores(**scores)
+        return SeasonScores(**dict(zip(self.season_names, scores.tolist())))
     
-    def _calculate_season_score(
-        self, 
-        attributes: ColorAttributes, 
-        palette: Dict
-    ) -> float:
-        """Calculate how well colors match a specific season palette"""
-        
-        score = 0.0
-        weights = {
-            "eye": 0.25,
-            "hair": 0.25,
-            "skin": 0.30,
-            "overall": 0.20
-        }
+    def _score_all_seasons(self, attributes: ColorAttributes) -> np.ndarray:
+        """Calculate how well colors match every season palette at once"""
         
-        # Compare eye colors
-        if attributes.left_iris or attributes.right_iris:
-            eye_color = attributes.left_iris.dominant_rgb if attributes.left_iris else attributes.right_iris.dominant_rgb
-            eye_score = self._color_similarity(eye_color, palette["eye_colors"])
-            score += eye_score * weights["eye"]
+        eye = attributes.left_iris or attributes.right_iris
+        skin = attributes.face_skin
         
-        # Compare hair colors
-        if attributes.hair:
-            hair_score = self._color_similarity(
-                attributes.hair.dominant_rgb, 
-                palette["hair_colors"]
-            )
-            score += hair_score * weights["hair"]
+        # Region colors in (eye, hair, skin) order; absent regions get zero weight
+        regions = [eye, attributes.hair, skin]
+        region_weights = np.array([
+            0.25 if eye else 0.0,
+            0.25 if attributes.hair else 0.0,
+            0.30 if skin else 0.0,
+        ])
         
-        # Compare skin tones
-        if attributes.face_skin:
-            skin_score = self._color_similarity(
-                attributes.face_skin.dominant_rgb,
-                palette["skin_tones"]
-            )
-            score += skin_score * weights["skin"]
+        scores = np.zeros(len(self.season_names))
+        
+        if region_weights.any():
+            colors = [region.dominant_rgb if region else [0, 0, 0] for region in regions]
+            similarities = self._color_similarity(colors)
+            scores += region_weights @ similarities
         
         # Overall harmony with key colors
-        if attributes.face_skin:
-            harmony_score = self._evaluate_harmony(
-                attributes.face_skin.dominant_rgb,
-                palette["key_colors"]
-            )
-            score += harmony_score * weights["overall"]
+        if skin:
+            scores += self._evaluate_harmony(skin.dominant_rgb) * 0.20
         
         # Apply temperature, value, and chroma modifiers
-        score *= self._get_characteristic_multiplier(attributes, palette)
+        scores *= self._get_characteristic_multipliers(attributes)
         
-        return score
-    
-    def _color_similarity(self, color1: list, color2_list: list) -> float:
-        """Calculate similarity between a color and a list of reference colors"""
-        
-        if not color2_list:
-            return 0.0
-        
-        # Convert to LAB color space for better perceptual distance
-        similarities = []
-        for ref_color in color2_list:
-            # Simple Euclidean distance in RGB (could be improved with LAB)
-            distance = np.sqrt(sum([(c1-c2)**2 for c1, c2 in zip(color1, ref_color)]))
-            # Convert distance to similarity (0-1)
-            similarity = max(0, 1 - distance / 441.67)  # max RGB distance is ~441.67
-            similarities.append(similarity)
-        
-        return max(similarities)
+        return scores
     
-    def _evaluate_harmony(self, skin_color: list, key_colors: list) -> float:
-        """Evaluate how harmonious key colors would look with skin tone"""
+    def _color_similarity(self, colors: list) -> np.ndarray:
+        """Best 0-1 CIEDE2000 similarity of each region color to each season: (regions, seasons)"""
         
-        harmonies = []
-        for key_color in key_colors:
-            # Calculate color harmony based on color theory
-            harmony = self._calculate_color_harmony(skin_color, key_color)
-            harmonies.append(harmony)
+        lab = rgb_to_lab(colors)
+        distances = delta_e_ciede2000(lab[:, None, None, :], self._region_lab).min(axis=-1)
         
-        return np.mean(harmonies) if harmonies else 0.0
+        return np.maximum(0.0, 1 - distances / MAX_DELTA_E)
     
-    def _calculate_color_harmony(self, color1: list, color2: list) -> float:
-        """Calculate color harmony using color theory principles"""
+    def _evaluate_harmony(self, skin_color: list) -> np.ndarray:
+        """Evaluate how harmonious each season's key colors would look with skin tone"""
         
-        # Convert RGB to HSV for harmony calculation
-        def rgb_to_hsv(rgb):
-            r, g, b = [x/255.0 for x in rgb]
-            max_c = max(r, g, b)
-            min_c = min(r, g, b)
-            diff = max_c - min_c
-            
-            if diff == 0:
-                h = 0
-            elif max_c == r:
-                h = ((g - b) / diff) % 6
-            elif max_c == g:
-                h = (b - r) / diff + 2
-            else:
-                h = (r - g) / diff + 4
-            
-            h = h * 60
-            s = 0 if max_c == 0 else diff / max_c
-            v = max_c
-            
-            return h, s, v
+        skin_hsv = self._rgb_to_hsv(np.asarray(skin_color, dtype=np.float64))
+        harmonies = self._calculate_color_harmony(skin_hsv, self._key_hsv)
         
-        h1, s1, v1 = rgb_to_hsv(color1)
-        h2, s2, v2 = rgb_to_hsv(color2)
+        return harmonies.mean(axis=-1)
+    
+    @staticmethod
+    def _rgb_to_hsv(rgb: np.ndarray) -> np.ndarray:
+        """Convert RGB array (..., 3) in 0-255 to HSV with hue in degrees"""
+        
+        rgb = rgb / 255.0
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        max_c = rgb.max(axis=-1)
+        min_c = rgb.min(axis=-1)
+        diff = max_c - min_c
+        safe_diff = np.where(diff == 0, 1.0, diff)
+        
+        h = np.select(
+            [diff == 0, max_c == r, max_c == g],
+            [0.0, np.mod((g - b) / safe_diff, 6), (b - r) / safe_diff + 2],
+            default=(r - g) / safe_diff + 4
+        )
+        s = np.where(max_c == 0, 0.0, diff / np.where(max_c == 0, 1.0, max_c))
+        
+        return np.stack([h * 60, s, max_c], axis=-1)
+    
+    @staticmethod
+    def _calculate_color_harmony(hsv1: np.ndarray, hsv2: np.ndarray) -> np.ndarray:
+        """Calculate color harmony using color theory principles"""
         
         # Calculate harmony based on color relationships
-        hue_diff = abs(h1 - h2)
-        if hue_diff > 180:
-            hue_diff = 360 - hue_diff
+        hue_diff = np.abs(hsv1[..., 0] - hsv2[..., 0])
+        hue_diff = np.where(hue_diff > 180, 360 - hue_diff, hue_diff)
         
         # Complementary colors (180°) are harmonious
         # Analogous colors (30°) are harmonious
         # Triadic colors (120°) are harmonious
-        harmony = 0.0
-        
-        if 170 <= hue_diff <= 190:  # Complementary
-            harmony = 0.9
-        elif hue_diff <= 30:  # Analogous
-            harmony = 0.8
-        elif 110 <= hue_diff <= 130:  # Triadic
-            harmony = 0.7
-        else:
-            harmony = max(0, 1 - hue_diff / 180)
+        harmony = np.select(
+            [
+                (hue_diff >= 170) & (hue_diff <= 190),  # Complementary
+                hue_diff <= 30,                         # Analogous
+                (hue_diff >= 110) & (hue_diff <= 130),  # Triadic
+            ],
+            [0.9, 0.8, 0.7],
+            default=np.maximum(0, 1 - hue_diff / 180)
+        )
         
         # Adjust for saturation and value differences
-        sat_diff = abs(s1 - s2)
-        val_diff = abs(v1 - v2)
+        sat_diff = np.abs(hsv1[..., 1] - hsv2[..., 1])
+        val_diff = np.abs(hsv1[..., 2] - hsv2[..., 2])
         
-        harmony *= (1 - sat_diff * 0.3)
-        harmony *= (1 - val_diff * 0.2)
+        harmony = harmony * (1 - sat_diff * 0.3)
+        harmony = harmony * (1 - val_diff * 0.2)
         
         return harmony
     
-    def _get_characteristic_multiplier(
-        self, 
-        attributes: ColorAttributes,
-        palette: Dict
-    ) -> float:
-        """Get multiplier based on temperature, value, and chroma characteristics"""
+    def _get_characteristic_multipliers(self, attributes: ColorAttributes) -> np.ndarray:
+        """Get per-season multipliers based on temperature, value, and chroma characteristics"""
         
-        multiplier = 1.0
+        multipliers = np.ones(len(self.season_names))
         
         # Temperature analysis
         undertone = self._analyze_temperature(attributes)
-        if palette["temperature"] == "warm" and undertone == "warm":
-            multiplier *= 1.2
-        elif palette["temperature"] == "cool" and undertone == "cool":
-            multiplier *= 1.2
-        elif palette["temperature"] in ["warm_neutral", "cool_neutral"] and undertone == "neutral":
-            multiplier *= 1.1
+        if undertone in ("warm", "cool"):
+            multipliers[self._temperatures == undertone] *= 1.2
+        elif undertone == "neutral":
+            multipliers[np.isin(self._temperatures, ["warm_neutral", "cool_neutral"])] *= 1.1
         
         # Value (depth) analysis
         depth = self._analyze_value(attributes)
-        if palette["value"] == depth:
-            multiplier *= 1.15
+        multipliers[self._values == depth] *= 1.15
         
         # Chroma (clarity) analysis
         clarity = self._analyze_chroma(attributes)
-        if palette["chroma"] == clarity:
-            multiplier *= 1.1
+        multipliers[self._chromas == clarity] *= 1.1
         
-        return min(multiplier, 1.5)  # Cap at 1.5x
+        return np.minimum(multipliers, 1.5)  # Cap at 1.5x
     
     def _analyze_temperature(self, attributes: ColorAttributes) -> str:
         """Analyze warm vs cool undertone"""
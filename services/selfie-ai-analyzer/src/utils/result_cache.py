@@ -0,0 +1,191 @@
+# services/selfie-ai-analyzer/src/utils/result_cache.py
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from ..schemas.analysis import AnalysisResponse
+
+
+@dataclass(frozen=True)
+class ImageFingerprint:
+    """Perceptual identity of a face crop: 64-bit DCT hash plus mean color of each quadrant"""
+
+    phash: int
+    quadrant_rgb: tuple[tuple[int, int, int], ...]
+
+    def distance(self, other: "ImageFingerprint") -> tuple[int, int]:
+        """(hamming distance of hashes, max per-channel quadrant color difference)"""
+        color_diff = max(
+            abs(a - b)
+            for mine, theirs in zip(self.quadrant_rgb, other.quadrant_rgb, strict=True)
+            for a, b in zip(mine, theirs, strict=True)
+        )
+        return (self.phash ^ other.phash).bit_count(), color_diff
+
+
+def image_fingerprint(image_bgr: np.ndarray, face_bbox: dict) -> ImageFingerprint | None:
+    """Fingerprint the normalized face crop; None when the bbox misses the image"""
+    x, y = max(int(face_bbox["x"]), 0), max(int(face_bbox["y"]), 0)
+    crop = image_bgr[y : y + int(face_bbox["height"]), x : x + int(face_bbox["width"])]
+    if not crop.size:
+        return None
+
+    # Normalize: fixed 32x32 size, so re-encodes and rescales hash the same
+    small = cv2.resize(crop, (32, 32), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    # pHash: low-frequency DCT block (minus DC) against its median
+    low = cv2.dct(gray)[:8, :8].flatten()[1:]
+    bits = low > np.median(low)
+    phash = int("".join("1" if b else "0" for b in bits), 2)
+
+    # Grayscale hash is blind to white balance and skin/hair tone, which the analysis is about:
+    # compare the mean color of each quadrant (forehead/hair, cheeks, jaw) as well
+    quadrants = small.reshape(2, 16, 2, 16, 3).mean(axis=(1, 3)).reshape(4, 3)
+    return ImageFingerprint(
+        phash=phash,
+        quadrant_rgb=tuple((int(r), int(g), int(b)) for b, g, r in quadrants),
+    )
+
+
+@dataclass
+class _Entry:
+    response: AnalysisResponse
+    fingerprint: ImageFingerprint | None
+    expires_at: float
+
+
+class AnalysisResultCache:
+    """In-process LRU/TTL cache of analysis responses.
+
+    Indexed by idempotency key (the analysis_id for retries) and, per
+    scope (merchant plus customer), by face fingerprint for near-identical
+    re-uploads. A perceptual match never crosses scopes: two customers'
+    similar selfies still get their own analyses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 3600,
+        max_hash_distance: int = 6,
+        max_color_difference: int = 4,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_hash_distance = max_hash_distance
+        self.max_color_difference = max_color_difference
+        self._clock = clock
+
+        self._by_key: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_image: dict[str, OrderedDict[int, _Entry]] = {}
+        self._image_entries = 0
+
+        self._stats = {
+            "key_hits": 0,
+            "image_hits": 0,
+            "key_misses": 0,
+            "image_misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def get(self, key: str) -> AnalysisResponse | None:
+        """Stored response for an idempotency key / analysis_id"""
+        entry = self._by_key.get(key)
+        if entry and not self._expired(entry):
+            self._by_key.move_to_end(key)
+            self._stats["key_hits"] += 1
+            return entry.response
+
+        if entry:
+            del self._by_key[key]
+            self._stats["expirations"] += 1
+        self._stats["key_misses"] += 1
+        return None
+
+    def find_similar(self, scope: str, fingerprint: ImageFingerprint) -> AnalysisResponse | None:
+        """Stored response for a near-identical face from the same scope (merchant plus customer)"""
+        best_hash, best_distance = None, None
+        for phash, entry in list(self._by_image.get(scope, {}).items()):
+            if self._expired(entry):
+                self._drop_image(scope, phash)
+                self._stats["expirations"] += 1
+                continue
+
+            # Both checks apply to every candidate, an identical hash included
+            hash_distance, color_difference = fingerprint.distance(entry.fingerprint)
+            if hash_distance > self.max_hash_distance or color_difference > self.max_color_difference:
+                continue
+            if best_distance is None or hash_distance < best_distance:
+                best_hash, best_distance = phash, hash_distance
+
+        if best_hash is None:
+            self._stats["image_misses"] += 1
+            return None
+
+        entries = self._by_image[scope]
+        entries.move_to_end(best_hash)
+        self._stats["image_hits"] += 1
+        return entries[best_hash].response
+
+    def put(
+        self,
+        key: str,
+        scope: str | None,
+        fingerprint: ImageFingerprint | None,
+        response: AnalysisResponse,
+    ) -> None:
+        """Store a response under its key and, if given, its scope and face fingerprint"""
+        entry = _Entry(response=response, fingerprint=fingerprint, expires_at=self._clock() + self.ttl_seconds)
+
+        self._by_key[key] = entry
+        self._by_key.move_to_end(key)
+        while len(self._by_key) > self.max_entries:
+            self._by_key.popitem(last=False)
+            self._stats["evictions"] += 1
+
+        if scope is None or fingerprint is None:
+            return
+
+        entries = self._by_image.setdefault(scope, OrderedDict())
+        if fingerprint.phash not in entries:
+            self._image_entries += 1
+        entries[fingerprint.phash] = entry
+        entries.move_to_end(fingerprint.phash)
+
+        while self._image_entries > self.max_entries:
+            self._evict_oldest_image()
+
+    def stats(self) -> dict[str, int | float]:
+        """Hit/miss counters and current sizes"""
+        # Every request does one key lookup; image lookups only follow key misses
+        lookups = self._stats["key_hits"] + self._stats["key_misses"]
+        hits = self._stats["key_hits"] + self._stats["image_hits"]
+        return {
+            **self._stats,
+            "key_entries": len(self._by_key),
+            "image_entries": self._image_entries,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _expired(self, entry: _Entry) -> bool:
+        return entry.expires_at <= self._clock()
+
+    def _drop_image(self, scope: str, phash: int) -> None:
+        entries = self._by_image[scope]
+        del entries[phash]
+        self._image_entries -= 1
+        if not entries:
+            del self._by_image[scope]
+
+    def _evict_oldest_image(self) -> None:
+        """Evict the oldest stored fingerprint across scopes"""
+        scope = min(self._by_image, key=lambda s: next(iter(self._by_image[s].values())).expires_at)
+        phash = next(iter(self._by_image[scope]))
+        self._drop_image(scope, phash)
+        self._stats["evictions"] += 1
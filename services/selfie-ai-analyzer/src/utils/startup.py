@@ -0,0 +1,51 @@
+# services/selfie-ai-analyzer/src/utils/startup.py
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """Timed startup phases and readiness state.
+
+    Status moves starting -> warming -> ready once every model has run a
+    warm inference, or failed when a phase (or the warmup around them)
+    raised. Only ready accepts traffic.
+    """
+
+    def __init__(self):
+        self.status = "starting"
+        self.phases: dict[str, int] = {}
+        self.errors: dict[str, str] = {}
+        self._started = time.perf_counter()
+        self._total_ms = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a startup phase in ms, recording (not raising) its failure"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.fail(name, e)
+        finally:
+            self.phases[name] = int((time.perf_counter() - start) * 1000)
+
+    def fail(self, name: str, error: Exception) -> None:
+        """Record a failure; the report can no longer become ready"""
+        self.errors[name] = f"{type(error).__name__}: {error}"
+
+    def finish(self) -> None:
+        """Mark warmup finished: ready only if every phase succeeded"""
+        self.status = "failed" if self.errors else "ready"
+        self._total_ms = int((time.perf_counter() - self._started) * 1000)
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "startup_ms": self._total_ms,
+            "phases_ms": dict(self.phases),
+            "errors": dict(self.errors),
+        }
@@ -1,41 +1,184 @@
 # services/selfie-ai-analyzer/src/utils/temp_manager.py
 import asyncio
+import contextlib
+import os
 import shutil
+import time
 from pathlib import Path
+from typing import Dict, Optional, Set
 from shared.utils.logger import ServiceLogger
 
 class TempManager:
-    """Manage temporary file workspace"""
-    
-    def __init__(self, base_dir: str, logger: ServiceLogger):
-        self.base_dir = Path(base_dir)
+    """Manage temporary file workspaces.
+
+    Workspaces are released when an analysis finishes and removed by a single
+    janitor task once idle for the retention period, or sooner (oldest first)
+    when the base dir exceeds its byte cap. Leftovers from a previous process
+    are picked up by the janitor's first pass.
+    """
+
+    def __init__(self, config, logger: ServiceLogger):
+        self.config = config
         self.logger = logger
-    
+        self.base_dir = self._resolve_base_dir(config)
+
+        self.retention_seconds = config.temp_cleanup_hours * 3600
+        self.interval_seconds = config.temp_janitor_interval_seconds
+        self.max_bytes = config.temp_max_bytes
+        # Never evict a workspace this recent: another process may still be using it
+        self.min_idle_seconds = config.total_analysis_timeout_seconds + 30
+
+        self._active: Set[Path] = set()
+        self._owned: Set[Path] = set()
+        self._released_bytes = 0
+        self._usage_bytes = 0
+        self._wakeup = asyncio.Event()
+        self._janitor: Optional[asyncio.Task] = None
+
+    def _resolve_base_dir(self, config) -> Path:
+        """temp_dir on disk, or a RAM-backed dir in tmpfs mode"""
+        if config.temp_storage == "tmpfs":
+            tmpfs_dir = Path(config.temp_tmpfs_dir)
+            if tmpfs_dir.parent.is_dir():
+                return tmpfs_dir
+            self.logger.warning(f"tmpfs dir {tmpfs_dir.parent} not available, using {config.temp_dir}")
+        return Path(config.temp_dir)
+
+    def start(self) -> None:
+        """Create the base dir and start the janitor"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        if self._janitor is None:
+            self._janitor = asyncio.create_task(self._run_janitor())
+
+    async def stop(self) -> None:
+        """Stop the janitor and remove this process's workspaces"""
+        if self._janitor:
+            self._janitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._janitor
+            self._janitor = None
+        await self.cleanup_all()
+
     async def create_workspace(self, analysis_id: str) -> Path:
         """Create temporary workspace for analysis"""
         work_dir = self.base_dir / analysis_id
         work_dir.mkdir(parents=True, exist_ok=True)
+        self._active.add(work_dir)
+        self._owned.add(work_dir)
         return work_dir
-    
-    async def schedule_cleanup(self, work_dir: Path, hours: int):
-        """Schedule cleanup after specified hours"""
-        await asyncio.sleep(hours * 3600)
-        await self.cleanup_directory(work_dir)
-    
-    async def cleanup_directory(self, work_dir: Path):
-        """Clean up a specific directory"""
+
+    def release(self, work_dir: Path) -> None:
+        """Analysis finished with the workspace; retention counts from now"""
+        self._active.discard(work_dir)
         try:
-            if work_dir.exists():
-                shutil.rmtree(work_dir)
-                self.logger.debug(f"Cleaned up {work_dir}")
-        except Exception as e:
-            self.logger.exception(f"Failed to cleanup {work_dir}: {e}")
-    
-    async def cleanup_all(self):
-        """Clean up all temp directories"""
+            os.utime(work_dir)
+            self._released_bytes += self._dir_size(work_dir)
+        except OSError:
+            return
+
+        # Over the cap: run a pass now instead of waiting for the interval
+        if self.max_bytes and self._usage_bytes + self._released_bytes > self.max_bytes:
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Workspace counts and bytes as of the last janitor pass"""
+        return {
+            "active_workspaces": len(self._active),
+            "usage_bytes": self._usage_bytes + self._released_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    async def _run_janitor(self) -> None:
+        """Single long-lived cleanup task, regardless of request volume"""
+        while True:
+            try:
+                # Bytes released during the pass are already on disk and get counted by it
+                self._released_bytes = 0
+                self._usage_bytes = await asyncio.to_thread(self._sweep)
+            except Exception as e:
+                self.logger.exception(f"Temp janitor pass failed: {e}")
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            self._wakeup.clear()
+
+    def _sweep(self) -> int:
+        """Remove expired workspaces, then the oldest idle ones while over the byte cap; returns bytes in use"""
+        now = time.time()
+        idle = []
+        usage = 0
+        removed = 0
+
+        with os.scandir(self.base_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+
+                path = Path(entry.path)
+                age = now - entry.stat(follow_symlinks=False).st_mtime
+                if path not in self._active and age >= self.retention_seconds:
+                    removed += self._remove(path)
+                    continue
+
+                size = self._dir_size(path)
+                usage += size
+                if path not in self._active and age >= self.min_idle_seconds:
+                    idle.append((age, size, path))
+
+        # Oldest first until back under the cap
+        if self.max_bytes and usage > self.max_bytes:
+            for _, size, path in sorted(idle, reverse=True):
+                if usage <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    usage -= size
+                    removed += 1
+            if usage > self.max_bytes:
+                self.logger.warning(
+                    "Temp dir over its byte cap with no idle workspaces to evict",
+                    extra={"usage_bytes": usage, "max_bytes": self.max_bytes}
+                )
+
+        if removed:
+            self.logger.debug(f"Temp janitor removed {removed} workspaces")
+        return usage
+
+    def _remove(self, path: Path) -> int:
+        """rmtree one workspace; 1 if removed"""
         try:
-            if self.base_dir.exists():
-                shutil.rmtree(self.base_dir)
-                self.logger.info("Cleaned up all temp files")
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            self.logger.exception(f"Failed to cleanup temp directory: {e}")
\ No newline at end of file
+            self.logger.exception(f"Failed to cleanup {path}: {e}")
+            return 0
+        self._owned.discard(path)
+        return 1
+
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        """Bytes of the files directly in a workspace (workspaces are flat)"""
+        total = 0
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        except FileNotFoundError:
+            pass
+        return total
+
+    async def cleanup_directory(self, work_dir: Path):
+        """Clean up a specific directory"""
+        self._active.discard(work_dir)
+        if await asyncio.to_thread(self._remove, work_dir):
+            self.logger.debug(f"Cleaned up {work_dir}")
+
+    async def cleanup_all(self):
+        """Remove the workspaces this process created; other processes' and the base dir stay"""
+        owned = list(self._owned)
+        for work_dir in owned:
+            await asyncio.to_thread(self._remove, work_dir)
+        self._active.clear()
+        if owned:
+            self.logger.info(f"Cleaned up {len(owned)} temp workspaces")
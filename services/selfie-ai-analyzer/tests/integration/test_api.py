@@ -0,0 +1,145 @@
+import base64
+import json
+import time
+import types
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.v1 import analyze
+from src.schemas.analysis import AnalysisMetrics, AnalysisResponse, ColorAttributes, ModelVersions, SeasonScores
+
+from shared.api import NonceCache, SignatureVerifier, setup_middleware, signature_headers
+from shared.api.dependencies import require_internal_auth
+from shared.utils.logger import ServiceLogger
+
+SECRET = "test-hmac-secret"
+MAX_IMAGE_BYTES = 1024
+
+
+class _AnalysisService:
+    """Records the images that reached the service; the pipeline itself is not under test"""
+
+    def __init__(self):
+        self.images = []
+
+    async def analyze_selfie(self, request, image_bytes, correlation_id, idempotency_key=None):
+        self.images.append(bytes(image_bytes))
+        return AnalysisResponse(
+            analysis_id=request.analysis_id,
+            season_scores=SeasonScores(**dict.fromkeys(SeasonScores.model_fields, 0.5)),
+            primary_season="True Spring",
+            secondary_season="Light Spring",
+            tertiary_season="Warm Spring",
+            confidence=0.5,
+            color_attributes=ColorAttributes(),
+            analysis_metrics=AnalysisMetrics(
+                face_landmarks_count=478,
+                segmentation_classes=6,
+                colors_extracted=0,
+                undertone="neutral",
+                contrast_level="medium",
+            ),
+            model_versions=ModelVersions(deepface="4.0", mediapipe="0.10.9", algorithm="v1.0.0"),
+            processing_ms=1,
+        )
+
+    @staticmethod
+    def decode_base64_image(image_b64: str) -> bytes:
+        return base64.b64decode(image_b64)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    setup_middleware(app, service_name="selfie-ai-analyzer")
+    app.include_router(analyze.router)
+    app.dependency_overrides[require_internal_auth] = lambda: None
+
+    app.state.logger = ServiceLogger("test-analyze-api")
+    app.state.config = types.SimpleNamespace(max_image_size_bytes=MAX_IMAGE_BYTES, hmac_required=True)
+    app.state.lifecycle = types.SimpleNamespace(
+        analysis_service=_AnalysisService(),
+        signature_verifier=SignatureVerifier(SECRET, nonce_cache=NonceCache(ttl_seconds=120)),
+    )
+    with TestClient(app, headers={"X-Correlation-ID": "corr_test"}) as test_client:
+        yield test_client
+
+
+def _binary_headers(analysis_id: str, signed_id: str, secret: str = SECRET, signed_body: bytes = b"jpeg") -> dict:
+    return {
+        **signature_headers(secret, signed_body, signed_id),
+        "Content-Type": "image/jpeg",
+        "X-Analysis-ID": analysis_id,
+        "X-Merchant-ID": "merch_1",
+        "X-Analysis-Metadata": json.dumps({"customer_id": "c1"}),
+    }
+
+
+def test_signed_binary_request_reaches_the_service(client):
+    response = client.post("/api/v1/analyze", headers=_binary_headers("ana_1", "ana_1"), content=b"jpeg")
+
+    assert response.status_code == 200
+    assert client.app.state.lifecycle.analysis_service.images == [b"jpeg"]
+
+
+def test_stale_signature_is_rejected_before_the_body_is_read(client):
+    headers = {**_binary_headers("ana_1", "ana_1"), "X-Signature-Timestamp": str(int(time.time()) - 3600)}
+    # An oversized body would be a 400 if it were read first
+    oversized = b"x" * (MAX_IMAGE_BYTES + 1)
+    response = client.post("/api/v1/analyze", headers=headers, content=oversized)
+
+    assert response.status_code == 401
+    assert client.app.state.lifecycle.analysis_service.images == []
+
+
+def test_bad_signature_is_rejected(client):
+    response = client.post(
+        "/api/v1/analyze", headers=_binary_headers("ana_1", "ana_1", secret="wrong"), content=b"jpeg"
+    )
+
+    assert response.status_code == 401
+    assert client.app.state.lifecycle.analysis_service.images == []
+
+
+def test_signature_replayed_with_another_image_is_rejected(client):
+    headers = _binary_headers("ana_1", "ana_1", signed_body=b"jpeg")
+    response = client.post("/api/v1/analyze", headers=headers, content=b"other")
+
+    assert response.status_code == 401
+    assert client.app.state.lifecycle.analysis_service.images == []
+
+
+def test_replayed_request_is_rejected(client):
+    headers = _binary_headers("ana_1", "ana_1")
+    assert client.post("/api/v1/analyze", headers=headers, content=b"jpeg").status_code == 200
+
+    response = client.post("/api/v1/analyze", headers=headers, content=b"jpeg")
+
+    assert response.status_code == 401
+    assert client.app.state.lifecycle.analysis_service.images == [b"jpeg"]
+
+
+def test_bad_signature_on_json_is_rejected_before_decoding(client):
+    content = json.dumps({"analysis_id": "ana_1", "merchant_id": "merch_1", "image_jpeg_b64": "not base64!"})
+    response = client.post(
+        "/api/v1/analyze",
+        headers={**signature_headers(SECRET, content.encode(), "ana_other"), "Content-Type": "application/json"},
+        content=content,
+    )
+
+    assert response.status_code == 401
+    assert client.app.state.lifecycle.analysis_service.images == []
+
+
+def test_signed_json_request_reaches_the_service(client):
+    image_b64 = base64.b64encode(b"jpeg").decode()
+    content = json.dumps({"analysis_id": "ana_1", "merchant_id": "merch_1", "image_jpeg_b64": image_b64}).encode()
+    response = client.post(
+        "/api/v1/analyze",
+        headers={**signature_headers(SECRET, content, "ana_1"), "Content-Type": "application/json"},
+        content=content,
+    )
+
+    assert response.status_code == 200
+    assert client.app.state.lifecycle.analysis_service.images == [b"jpeg"]
@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+from src.schemas.analysis import AnalysisResponse
+from src.utils.result_cache import AnalysisResultCache, image_fingerprint
+
+FACE_BBOX = {"x": 40, "y": 30, "width": 120, "height": 140}
+
+
+def _selfie(background: int = 30) -> np.ndarray:
+    """Drawn face (skin, hair, eyes, mouth) filling FACE_BBOX, on a flat background"""
+    image = np.full((240, 200, 3), background, dtype=np.uint8)
+    image[30:170, 40:160] = (60, 40, 30)  # hair
+    cv2.ellipse(image, (100, 110), (55, 60), 0, 0, 360, (120, 150, 200), -1)  # skin
+    for eye_x in (78, 122):
+        cv2.circle(image, (eye_x, 95), 8, (40, 30, 30), -1)
+    cv2.ellipse(image, (100, 140), (20, 8), 0, 0, 180, (80, 70, 160), -1)
+    return image
+
+
+def _response(analysis_id: str) -> AnalysisResponse:
+    return AnalysisResponse.model_construct(analysis_id=analysis_id, warnings=[])
+
+
+def test_fingerprint_covers_the_face_region_only():
+    # Same face on a different background
+    assert image_fingerprint(_selfie(30), FACE_BBOX) == image_fingerprint(_selfie(220), FACE_BBOX)
+    assert image_fingerprint(_selfie(), {"x": 500, "y": 500, "width": 10, "height": 10}) is None
+
+
+def test_near_duplicate_is_scoped_to_the_customer():
+    cache = AnalysisResultCache()
+    fingerprint = image_fingerprint(_selfie(), FACE_BBOX)
+    cache.put("ana_a", "merch_1:customer:c1", fingerprint, _response("ana_a"))
+
+    assert cache.find_similar("merch_1:customer:c1", fingerprint).analysis_id == "ana_a"
+    assert cache.find_similar("merch_1:customer:c2", fingerprint) is None
+    assert cache.find_similar("merch_2:customer:c1", fingerprint) is None
+
+
+def test_identical_hash_still_needs_matching_colors():
+    cache = AnalysisResultCache()
+    image = _selfie()
+    cache.put("ana_a", "scope", image_fingerprint(image, FACE_BBOX), _response("ana_a"))
+
+    # Warmer white balance: same structure (pHash within range), different skin tone
+    warmer = image.copy()
+    warmer[..., 2] = np.clip(warmer[..., 2].astype(int) + 25, 0, 255)
+    fingerprint = image_fingerprint(warmer, FACE_BBOX)
+
+    hash_distance, color_difference = fingerprint.distance(image_fingerprint(image, FACE_BBOX))
+    assert hash_distance <= cache.max_hash_distance < color_difference
+    assert cache.find_similar("scope", fingerprint) is None
+    assert cache.stats()["image_misses"] == 1
+
+
+def test_expired_entries_are_not_served():
+    now = [0.0]
+    cache = AnalysisResultCache(ttl_seconds=10, clock=lambda: now[0])
+    fingerprint = image_fingerprint(_selfie(), FACE_BBOX)
+    cache.put("ana_a", "scope", fingerprint, _response("ana_a"))
+
+    now[0] = 11.0
+    assert cache.get("ana_a") is None
+    assert cache.find_similar("scope", fingerprint) is None
+    assert cache.stats()["image_entries"] == 0
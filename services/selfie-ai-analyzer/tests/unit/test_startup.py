@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from src.lifecycle import ServiceLifecycle
+from src.services.face_analyzer import GraphPool
+from src.utils.startup import StartupReport
+
+from shared.utils.logger import ServiceLogger
+
+
+class _Graph:
+    """Stand-in for a MediaPipe graph: inference releases the GIL, concurrent use is an error"""
+
+    def __init__(self):
+        self.busy = threading.Lock()
+        self.calls = 0
+        self.closed = False
+
+    def process(self, _image):
+        assert self.busy.acquire(blocking=False), "graph used by two threads at once"
+        try:
+            time.sleep(0.02)
+            self.calls += 1
+        finally:
+            self.busy.release()
+
+    def close(self):
+        self.closed = True
+
+
+def test_report_is_ready_only_when_every_phase_succeeded():
+    report = StartupReport()
+    with report.phase("warm_face_mesh"):
+        pass
+    report.finish()
+    assert report.ready
+
+    report = StartupReport()
+    with report.phase("warm_deepface"):
+        raise ImportError("No module named 'deepface'")
+    report.finish()
+    assert report.status == "failed"
+    assert not report.ready
+    assert report.as_dict()["errors"] == {"warm_deepface": "ImportError: No module named 'deepface'"}
+
+
+def test_warmup_failing_outside_a_phase_ends_failed():
+    class _BrokenFaceAnalyzer:
+        def warmup(self, report):
+            raise RuntimeError("graph build crashed")
+
+    lifecycle = ServiceLifecycle(types.SimpleNamespace(worker_queue_size=1), ServiceLogger("test-startup"))
+    lifecycle.face_analyzer = _BrokenFaceAnalyzer()
+    lifecycle.startup_report.status = "warming"
+
+    asyncio.run(lifecycle._warmup())
+
+    assert lifecycle.startup_report.status == "failed"
+    assert lifecycle.startup_report.errors == {"warmup": "RuntimeError: graph build crashed"}
+
+
+def test_graph_pool_runs_up_to_size_graphs_in_parallel():
+    graphs = []
+
+    def build():
+        graphs.append(_Graph())
+        return graphs[-1]
+
+    pool = GraphPool(build, size=2)
+    pool.warm(lambda graph: graph.process(None))
+    assert len(graphs) == 2
+
+    def infer(_):
+        with pool.acquire() as graph:
+            graph.process(None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(infer, range(8)))
+    elapsed = time.perf_counter() - start
+
+    # 8 inferences of 20ms on 2 graphs: ~80ms, against ~160ms on a single graph
+    assert len(graphs) == 2
+    assert sum(graph.calls for graph in graphs) == 10
+    assert elapsed < 0.14
+
+    pool.close()
+    assert all(graph.closed for graph in graphs)
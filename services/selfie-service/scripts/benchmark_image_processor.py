@@ -0,0 +1,204 @@
+# ruff: noqa: T201
+"""Per-stage timing of ImageProcessor against the previous decode/resize/encode pipeline.
+
+Runs synthetic selfies at several resolutions (or --image / --fixtures),
+then upload throughput under thread concurrency; --output writes a JSON
+report for regression tracking.
+
+Run from the service root:
+    PYTHONPATH=../../shared:. python -m scripts.benchmark_image_processor [--output report.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import tracemalloc
+import warnings
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+from PIL import Image
+from src.config import ServiceConfig
+from src.services.image_fingerprint import compute_fingerprint, dedup_scope
+from src.services.image_processor import ImageProcessor
+
+from shared.utils.benchmark import (
+    DEFAULT_RESOLUTIONS,
+    StageTimer,
+    encode_jpeg,
+    environment_info,
+    load_fixtures,
+    parse_resolutions,
+    peak_rss_mb,
+    run_concurrent,
+    synthetic_selfie,
+    write_report,
+)
+from shared.utils.exceptions import ValidationError
+
+# Full-resolution cascade without a minimum face size, as the gate ran before
+LEGACY_CASCADE = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+
+def legacy_pipeline(processor: ImageProcessor, image_bytes: bytes, timer: StageTimer) -> bytes:
+    """Previous flow: full decode, two LANCZOS resizes from full size, putdata copy, optimized progressive encode"""
+    with timer.stage("decode"):
+        image = Image.open(io.BytesIO(image_bytes))
+        image.load()
+
+    with timer.stage("srgb"):
+        rgb = image.convert("RGB")
+
+    with timer.stage("resize"):
+        scale = min(1.0, 1024 / max(rgb.size))
+        quality_img = rgb.resize((int(rgb.width * scale), int(rgb.height * scale)), Image.Resampling.LANCZOS)
+        quality_array = np.array(quality_img)
+        scale = min(1.0, processor.config.analyzer_max_side / max(rgb.size))
+        analyzer_img = rgb.resize((int(rgb.width * scale), int(rgb.height * scale)), Image.Resampling.LANCZOS)
+
+    with timer.stage("quality"):
+        gray = cv2.cvtColor(quality_array, cv2.COLOR_RGB2GRAY)
+        cv2.Laplacian(gray, cv2.CV_64F).var()
+        if not LEGACY_CASCADE.empty():
+            LEGACY_CASCADE.detectMultiScale(gray, 1.1, 4)
+
+    with timer.stage("encode"):
+        buffer = io.BytesIO()
+        clean = Image.new("RGB", analyzer_img.size)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            clean.putdata(list(analyzer_img.getdata()))
+        clean.save(buffer, format="JPEG", quality=90, optimize=True, subsampling=0, progressive=True)
+
+    with timer.stage("hash"):
+        rgb.tobytes()[:1024]
+    return buffer.getvalue()
+
+
+def current_pipeline(processor: ImageProcessor, image_bytes: bytes, timer: StageTimer) -> bytes:
+    """ImageProcessor stages as called by validate_and_process"""
+    with timer.stage("decode"):
+        image = processor._open(image_bytes)
+        processor._oriented_size(image)
+        if image.format == "JPEG":
+            image.draft("RGB", (processor.config.analyzer_max_side,) * 2)
+        image.load()
+
+    with timer.stage("srgb"):
+        rgb = processor._ensure_srgb(image)
+
+    with timer.stage("resize"):
+        analyzer_img = processor._resize_max_side(rgb, processor.config.analyzer_max_side)
+        quality_img = processor._resize_max_side(analyzer_img, processor.QUALITY_CHECK_MAX_SIDE)
+
+    # Synthetic input has no detectable face (or no cascade data); the other checks still ran
+    with timer.stage("quality"), contextlib.suppress(ValidationError, cv2.error):
+        processor._check_quality(quality_img)
+
+    with timer.stage("encode"):
+        jpeg, _ = processor._encode_analyzer_jpeg(analyzer_img, probe=quality_img)
+
+    with timer.stage("hash"):
+        compute_fingerprint(quality_img, processor._dedup_key, dedup_scope("benchmark", None))
+    return jpeg
+
+
+async def measure_throughput(config: ServiceConfig, image_bytes: bytes, total: int, concurrency: int) -> dict[str, Any]:
+    """Current pipeline in worker threads, one processor per thread (the cascade is not thread-safe)"""
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(concurrency):
+        pool.put_nowait(ImageProcessor(config, logging.getLogger("benchmark")))
+
+    async def call(i: int) -> None:
+        processor = await pool.get()
+        try:
+            await asyncio.to_thread(current_pipeline, processor, image_bytes, StageTimer())
+        finally:
+            pool.put_nowait(processor)
+
+    return await run_concurrent(call, total=total, concurrency=concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", help="single JPEG/PNG/WebP to process")
+    parser.add_argument("--fixtures", help="directory of real selfies to process")
+    parser.add_argument("--resolutions", type=parse_resolutions, default=list(DEFAULT_RESOLUTIONS))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=16, help="uploads per concurrency level")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4])
+    parser.add_argument("--trace-memory", action="store_true", help="per-stage allocation peaks (slower)")
+    parser.add_argument("--output", help="JSON report path ('-' for stdout)")
+    args = parser.parse_args()
+
+    if args.image:
+        images = [(os.path.basename(args.image), Path(args.image).read_bytes())]
+    elif args.fixtures:
+        images = load_fixtures(args.fixtures)
+    else:
+        images = [
+            (f"synthetic_{w}x{h}", encode_jpeg(synthetic_selfie(w, h, seed=i)))
+            for i, (w, h) in enumerate(args.resolutions)
+        ]
+
+    config = ServiceConfig.model_construct(global_dedup_secret="benchmark")
+    processor = ImageProcessor(config, logging.getLogger("benchmark"))
+    if LEGACY_CASCADE.empty():
+        print("note: haar cascade data not found, quality stage excludes face detection")
+    if args.trace_memory:
+        tracemalloc.start()
+
+    results = []
+    for name, image_bytes in images:
+        timers, sizes = {}, {}
+        for label, pipeline in (("legacy", legacy_pipeline), ("current", current_pipeline)):
+            timers[label] = StageTimer(trace_memory=args.trace_memory)
+            for _ in range(args.runs):
+                sizes[label] = len(pipeline(processor, image_bytes, timers[label]))
+        throughput = [
+            asyncio.run(measure_throughput(config, image_bytes, args.requests, level)) for level in args.concurrency
+        ]
+
+        legacy, current = timers["legacy"].summary(), timers["current"].summary()
+        results.append(
+            {
+                "image": name,
+                "bytes": len(image_bytes),
+                "stages": {"legacy": legacy, "current": current},
+                "analyzer_jpeg_bytes": sizes,
+                "throughput": throughput,
+            }
+        )
+
+        print(f"\n{name}: {len(image_bytes) / 1e6:.2f} MB, runs: {args.runs} (median ms per stage)")
+        print(f"{'stage':<10}{'legacy':>10}{'current':>10}{'speedup':>10}")
+        for stage in legacy:
+            legacy_ms, current_ms = legacy[stage]["p50_ms"], current[stage]["p50_ms"]
+            print(f"{stage:<10}{legacy_ms:>10.1f}{current_ms:>10.1f}{legacy_ms / max(current_ms, 1e-6):>9.1f}x")
+        legacy_total = sum(v["p50_ms"] for v in legacy.values())
+        current_total = sum(v["p50_ms"] for v in current.values())
+        print(f"{'total':<10}{legacy_total:>10.1f}{current_total:>10.1f}{legacy_total / current_total:>9.1f}x")
+        print(f"analyzer jpeg: legacy {sizes['legacy'] / 1e3:.0f} KB, current {sizes['current'] / 1e3:.0f} KB")
+        for level in throughput:
+            print(
+                f"concurrency {level['concurrency']:<3} {level['throughput_rps']:7.2f} uploads/s   "
+                f"p95 {level['latency']['p95_ms']:8.1f} ms"
+            )
+
+    report = {
+        "benchmark": "selfie-service.image_processor",
+        "environment": environment_info(),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"\npeak rss: {report['peak_rss_mb']} MB")
+    write_report(args.output, report)
+
+
+if __name__ == "__main__":
+    main()
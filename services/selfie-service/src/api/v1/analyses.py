@@ -1,7 +1,7 @@
 # services/selfie-service/src/api/v1/analyses.py
 import json
 
-from fastapi import APIRouter, BackgroundTasks, File, Form, Header, Response, UploadFile, status
+from fastapi import APIRouter, File, Form, Header, Response, UploadFile, status
 from fastapi.responses import JSONResponse
 
 from shared.api import ApiResponse, success_response
@@ -24,7 +24,6 @@ async def create_analysis(
     auth: ClientAuthDep,
     platform: PlatformContextDep,
     logger: LoggerDep,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Selfie image"),
     metadata: str = Form(..., description="JSON metadata"),
 ):
@@ -57,14 +56,16 @@ async def create_analysis(
         correlation_id=ctx.correlation_id,
     )
 
-    # If new, queue background AI processing
+    # If new, queue AI processing on the analysis work queue
     if is_new and hasattr(analysis, "_image_data"):
-        background_tasks.add_task(
-            svc.process_ai_analysis,
-            analysis_id=analysis.id,
-            image_jpeg_b64=analysis._image_data,
-            correlation_id=ctx.correlation_id,
-        )
+        try:
+            await svc.request_ai_analysis(
+                analysis, analysis._image_data, face_bbox=getattr(analysis, "_face_bbox", None)
+            )
+        except Exception as e:
+            # Never queued: fail it so a retried upload is not deduplicated onto it
+            await svc.fail_analysis(analysis.id, error_code="QUEUE_UNAVAILABLE", error_message=str(e))
+            raise
 
         # Publish event
         await publisher.analysis_started(analysis)
@@ -6,6 +6,8 @@ from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from shared.utils import ConfigurationError, load_root_env
 
+from .services.image_fingerprint import PHASH_MAX_INDEXED_DISTANCE
+
 
 class ServiceConfig(BaseModel):
     """Selfie service configuration"""
@@ -36,38 +38,62 @@ class ServiceConfig(BaseModel):
     # AI Analyzer
     ai_analyzer_url: str = Field(..., alias="AI_ANALYZER_URL")
     ai_analyzer_api_key: str = Field(..., alias="AI_ANALYZER_API_KEY")
-    ai_analyzer_timeout = 25
+    ai_analyzer_timeout: int = 25
+    # "binary" streams the raw JPEG with metadata headers; "json" is the legacy base64 body
+    ai_analyzer_transport: str = Field(default="binary", alias="AI_ANALYZER_TRANSPORT")
+    # Shared with the analyzer; when set, every /analyze request carries an HMAC signature
+    ai_analyzer_hmac_secret: str | None = Field(default=None, alias="ANALYZER_HMAC_SECRET")
 
     # Image processing limits
-    max_upload_size = 10_485_760  # 10MB
-    max_image_pixels = 12_000_000  # 12MP
-    min_image_dimension = 480
+    max_upload_size: int = 10_485_760  # 10MB
+    max_image_pixels: int = 12_000_000  # 12MP
+    min_image_dimension: int = 480
 
     # Image quality thresholds
-    min_blur_score = 100.0
-    min_exposure = 60
-    max_exposure = 200
-    min_face_area_ratio = 0.07
+    min_blur_score: float = 100.0
+    min_exposure: int = 60
+    max_exposure: int = 200
+    min_face_area_ratio: float = 0.07
+
+    # Face detection gate: "cascade" (Haar) or "yunet" (needs the ONNX model file)
+    face_detector: str = Field(default="cascade", alias="SELFIE_FACE_DETECTOR")
+    face_detector_model_path: str | None = Field(default=None, alias="SELFIE_FACE_DETECTOR_MODEL")
+    face_detection_max_side: int = 480
+    face_detection_score_threshold: float = 0.8
 
     # Analyzer image settings
-    analyzer_max_side = 1280
-    analyzer_quality_high = 90
-    analyzer_quality_medium = 85
-    analyzer_max_size = 1_500_000  # 1.5MB
-    min_face_width_after_resize = 300
+    analyzer_max_side: int = 1280
+    analyzer_quality_high: int = 90
+    analyzer_quality_medium: int = 85
+    analyzer_quality_min: int = 75
+    analyzer_max_size: int = 1_500_000  # 1.5MB
+    min_face_width_after_resize: int = 300
 
     # Deduplication
-    dedup_window_days = 30
+    dedup_window_days: int = 30
+    # Near-duplicate re-uploads: pHash within the banded index guarantee and the same white balance
+    dedup_phash_max_distance: int = 5
+    dedup_max_color_difference: int = 6
+    dedup_candidate_limit: int = 50
 
     # Cleanup sweeper
-    sweeper_interval_seconds = 45
+    sweeper_interval_seconds: int = 45
+    # PROCESSING longer than this is failed; covers queue wait plus every retry
+    analysis_stale_seconds: int = 300
+
+    # Analysis work queue (cmd.selfie.analysis.requested.v1)
+    analysis_worker_enabled: bool = Field(default=True, alias="SELFIE_ANALYSIS_WORKER_ENABLED")
+    analysis_worker_concurrency: int = Field(default=4, alias="SELFIE_ANALYSIS_WORKER_CONCURRENCY")
+    analysis_max_attempts: int = 4
+    analysis_retry_backoff_seconds: list[float] = [2.0, 10.0, 30.0]
+    analysis_image_ttl_seconds: int = 3600
 
     # API settings
-    api_host = "0.0.0.0"
-    logging_level = "INFO"
+    api_host: str = "0.0.0.0"
+    logging_level: str = "INFO"
 
     # CORS origins
-    cors_origins = ["https://*.myshopify.com", "https://*.shopify.com"]
+    cors_origins: list[str] = ["https://*.myshopify.com", "https://*.shopify.com"]
 
     @property
     def nats_url(self) -> str:
@@ -89,6 +115,10 @@ class ServiceConfig(BaseModel):
             raise ValueError("DATABASE_URL required when database is enabled")
         if not self.global_dedup_secret:
             raise ValueError("GLOBAL_DEDUP_SECRET is required")
+        if self.dedup_phash_max_distance > PHASH_MAX_INDEXED_DISTANCE:
+            raise ValueError(
+                f"dedup_phash_max_distance above {PHASH_MAX_INDEXED_DISTANCE} is not covered by the pHash index"
+            )
         return self
 
 
@@ -1,9 +1,14 @@
 # services/selfie-service/src/events/listeners.py
 from typing import Any
 
+from pydantic import ValidationError as PydanticValidationError
+
+from shared.messaging.events.base import EventEnvelope
 from shared.messaging.listener import Listener
 from shared.utils.exceptions import ValidationError
 
+from ..schemas.events import AnalysisRequestedPayload
+
 
 class AnalysisCompletedListener(Listener):
     """Listen for analysis completion from AI analyzer"""
@@ -65,3 +70,68 @@ class AnalysisCompletedListener(Listener):
             return True  # ACK to prevent further retries
 
         return False  # NACK for retry
+
+
+class AnalysisRequestedListener(Listener):
+    """Work queue: run AI analysis for queued selfies with a bounded worker pool"""
+
+    @property
+    def subject(self) -> str:
+        return "cmd.selfie.analysis.requested.v1"
+
+    @property
+    def queue_group(self) -> str:
+        return "analysis-workers"
+
+    @property
+    def service_name(self) -> str:
+        return "selfie-service"
+
+    def __init__(self, js_client, service, image_staging, config, logger):
+        super().__init__(js_client, logger)
+        self.service = service
+        self.image_staging = image_staging
+
+        self.max_concurrency = config.analysis_worker_concurrency
+        self.max_deliver = config.analysis_max_attempts
+        self.retry_backoff_sec = tuple(config.analysis_retry_backoff_seconds)
+        # An attempt may take the full analyzer timeout; don't redeliver while it runs
+        self.ack_wait_sec = config.ai_analyzer_timeout + 15
+        self.batch_size = self.max_concurrency
+
+    async def on_message(self, envelope: EventEnvelope) -> None:
+        """Analyze one selfie; transient analyzer errors raise and are retried with backoff"""
+        try:
+            payload = AnalysisRequestedPayload(**envelope.data)
+        except PydanticValidationError:
+            self.logger.exception("Invalid analysis request command", extra={"data": envelope.data})
+            return
+
+        image_jpeg = await self.image_staging.get(payload.image_key)
+        if image_jpeg is None:
+            await self.service.fail_analysis(
+                analysis_id=payload.analysis_id,
+                error_code="IMAGE_EXPIRED",
+                error_message="Staged image no longer available",
+            )
+            return
+
+        await self.service.process_ai_analysis(
+            analysis_id=payload.analysis_id,
+            image_jpeg=image_jpeg,
+            correlation_id=envelope.correlation_id,
+            face_bbox=payload.face_bbox,
+        )
+        await self.image_staging.delete(payload.image_key)
+
+    async def on_exhausted(self, envelope: EventEnvelope, error: Exception) -> None:
+        """Out of retries: fail the analysis instead of leaving it to the sweeper"""
+        analysis_id = envelope.data.get("analysis_id")
+        if not analysis_id:
+            return
+
+        await self.service.fail_analysis(
+            analysis_id=analysis_id, error_code="ANALYZER_UNAVAILABLE", error_message=str(error)
+        )
+        if image_key := envelope.data.get("image_key"):
+            await self.image_staging.delete(image_key)
@@ -9,6 +9,7 @@ from ..schemas.events import (
     AnalysisClaimedPayload,
     AnalysisCompletedPayload,
     AnalysisFailedPayload,
+    AnalysisRequestedPayload,
     AnalysisStartedPayload,
 )
 
@@ -20,6 +21,26 @@ class SelfieEventPublisher(Publisher):
     def service_name(self) -> str:
         return "selfie-service"
 
+    async def analysis_requested(
+        self, analysis_id: str, merchant_id: str, image_key: str, face_bbox: dict[str, int] | None = None
+    ) -> str:
+        """Queue AI analysis for the worker pool"""
+        payload = AnalysisRequestedPayload(
+            analysis_id=analysis_id,
+            merchant_id=merchant_id,
+            image_key=image_key,
+            requested_at=datetime.now(UTC),
+            face_bbox=face_bbox,
+        )
+
+        correlation_id = get_correlation_context() or "unknown"
+
+        return await self.publish_event(
+            subject="cmd.selfie.analysis.requested.v1",
+            payload=payload,
+            correlation_id=correlation_id,
+        )
+
     async def analysis_started(self, analysis: AnalysisOut) -> str:
         """Publish analysis started event"""
         payload = AnalysisStartedPayload(
@@ -42,7 +63,7 @@ class SelfieEventPublisher(Publisher):
 
         return await self.publish_event(
             subject="evt.selfie.analysis.started.v1",
-            data=payload.model_dump(mode="json"),
+            payload=payload,
             correlation_id=correlation_id,
         )
 
@@ -51,13 +72,13 @@ class SelfieEventPublisher(Publisher):
         analysis_id: str,
         merchant_id: str,
         platform: dict,
-        customer_id: Optional[str],
-        anonymous_id: Optional[str],
+        customer_id: str | None,
+        anonymous_id: str | None,
         season_type: str,
         confidence: float,
-        attributes: Optional[dict] = None,
-        model_version: Optional[str] = None,
-        processing_time_ms: Optional[int] = None,
+        attributes: dict | None = None,
+        model_version: str | None = None,
+        processing_time_ms: int | None = None,
     ) -> str:
         """Publish analysis completed event"""
         payload = AnalysisCompletedPayload(
@@ -78,7 +99,7 @@ class SelfieEventPublisher(Publisher):
 
         return await self.publish_event(
             subject="evt.selfie.analysis.completed.v1",
-            data=payload.model_dump(mode="json"),
+            payload=payload,
             correlation_id=correlation_id,
         )
 
@@ -87,8 +108,8 @@ class SelfieEventPublisher(Publisher):
         analysis_id: str,
         merchant_id: str,
         platform: dict,
-        customer_id: Optional[str],
-        anonymous_id: Optional[str],
+        customer_id: str | None,
+        anonymous_id: str | None,
         error_code: str,
         error_message: str,
     ) -> str:
@@ -107,7 +128,7 @@ class SelfieEventPublisher(Publisher):
         correlation_id = get_correlation_context() or "unknown"
 
         return await self.publish_event(
-            subject="evt.selfie.analysis.failed.v1", data=payload.model_dump(mode="json"), correlation_id=correlation_id
+            subject="evt.selfie.analysis.failed.v1", payload=payload, correlation_id=correlation_id
         )
 
     async def analyses_claimed(self, merchant_id: str, customer_id: str, anonymous_id: str, claimed_count: int) -> str:
@@ -124,6 +145,6 @@ class SelfieEventPublisher(Publisher):
 
         return await self.publish_event(
             subject="evt.selfie.analyses.claimed.v1",
-            data=payload.model_dump(mode="json"),
+            payload=payload,
             correlation_id=correlation_id,
         )
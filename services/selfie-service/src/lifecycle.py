@@ -7,9 +7,11 @@ from shared.messaging.jetstream_client import JetStreamClient
 from shared.utils.logger import ServiceLogger
 
 from .config import ServiceConfig
+from .events.listeners import AnalysisRequestedListener
 from .events.publishers import SelfieEventPublisher
 from .repositories.analysis_repository import AnalysisRepository
 from .services.image_processor import ImageProcessor
+from .services.image_staging import AnalysisImageStaging
 from .services.selfie_service import SelfieService
 
 
@@ -27,6 +29,7 @@ class ServiceLifecycle:
 
         # Components
         self.event_publisher: SelfieEventPublisher | None = None
+        self.image_staging: AnalysisImageStaging | None = None
         self.analysis_repo: AnalysisRepository | None = None
         self.image_processor: ImageProcessor | None = None
         self.selfie_service: SelfieService | None = None
@@ -52,7 +55,10 @@ class ServiceLifecycle:
             # 4. Core services
             self._init_services()
 
-            # 5. Event listeners (optional for MVP)
+            # 5. Analysis workers (work queue consumers)
+            await self._init_workers()
+
+            # 6. Event listeners (optional for MVP)
             # await self._init_listeners()
 
             self.logger.info(f"{self.config.service_name} started successfully")
@@ -103,6 +109,10 @@ class ServiceLifecycle:
 
         # Initialize publisher
         self.event_publisher = SelfieEventPublisher(jetstream_client=self.messaging_client, logger=self.logger)
+
+        # Analyzer JPEGs wait here for the work queue
+        self.image_staging = AnalysisImageStaging(self.messaging_client, self.config, self.logger)
+        await self.image_staging.start()
         self.logger.info("Messaging client and publisher initialized")
 
     async def _init_database(self) -> None:
@@ -139,11 +149,33 @@ class ServiceLifecycle:
             raise RuntimeError("Analysis repository not initialized")
 
         self.selfie_service = SelfieService(
-            repository=self.analysis_repo, image_processor=self.image_processor, config=self.config, logger=self.logger
+            repository=self.analysis_repo,
+            image_processor=self.image_processor,
+            config=self.config,
+            logger=self.logger,
+            event_publisher=self.event_publisher,
+            image_staging=self.image_staging,
         )
 
         self.logger.info("Selfie service initialized")
 
+    async def _init_workers(self) -> None:
+        """Consume cmd.selfie.analysis.requested with a bounded worker pool"""
+        if not self.config.analysis_worker_enabled:
+            self.logger.info("Analysis workers disabled; queued analyses are handled by other replicas")
+            return
+
+        worker = AnalysisRequestedListener(
+            js_client=self.messaging_client,
+            service=self.selfie_service,
+            image_staging=self.image_staging,
+            config=self.config,
+            logger=self.logger,
+        )
+        await worker.start()
+        self._listeners.append(worker)
+        self.logger.info(f"Analysis workers started (concurrency={self.config.analysis_worker_concurrency})")
+
     async def _init_listeners(self) -> None:
         """Initialize event listeners (optional)"""
         if not self.messaging_client or not self.selfie_service:
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
 from prisma import Prisma
 
@@ -23,6 +23,41 @@ class AnalysisRepository:
         )
         return AnalysisOut.model_validate(analysis) if analysis else None
 
+    async def find_near_duplicates(
+        self,
+        merchant_id: str,
+        customer_id: str | None,
+        anonymous_id: str | None,
+        phash_bands: list[int],
+        since: datetime,
+        limit: int,
+    ) -> list[tuple[AnalysisOut, int, int]]:
+        """The customer's (else the anonymous visitor's) recent non-failed analyses sharing a pHash band:
+        (analysis, phash, packed mean RGB)"""
+        identity = {"customer_id": customer_id} if customer_id else {"anonymous_id": anonymous_id}
+        rows = await self.prisma.analysis.find_many(
+            where={
+                "merchant_id": merchant_id,
+                **identity,
+                "phash_bands": {"has_some": phash_bands},
+                "status": {"not": AnalysisStatus.FAILED.value},
+                "created_at": {"gte": since},
+            },
+            order={"created_at": "desc"},
+            take=limit,
+        )
+        return [
+            (AnalysisOut.model_validate(row), row.image_phash, row.image_mean_rgb)
+            for row in rows
+            if row.image_phash is not None and row.image_mean_rgb is not None
+        ]
+
+    async def release_hash(self, analysis_id: str):
+        """Retire a stale row from exact dedup; the id is unique, so it cannot collide"""
+        await self.prisma.analysis.update(
+            where={"id": analysis_id}, data={"image_hash": f"released:{analysis_id}"[:64], "phash_bands": []}
+        )
+
     async def update_with_results(
         self,
         analysis_id: str,
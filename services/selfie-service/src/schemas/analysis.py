@@ -24,6 +24,9 @@ class AnalysisCreate(BaseModel):
     customer_id: str | None = None
     anonymous_id: str | None = None
     image_hash: str
+    image_phash: int | None = None
+    image_mean_rgb: int | None = None
+    phash_bands: list[int] = Field(default_factory=list)
     image_width: int
     image_height: int
     blur_score: float | None = None
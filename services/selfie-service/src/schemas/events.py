@@ -5,6 +5,17 @@ from typing import Any
 from pydantic import BaseModel
 
 
+# Commands
+class AnalysisRequestedPayload(BaseModel):
+    """Payload for selfie.analysis.requested command (AI analysis work item)"""
+
+    analysis_id: str
+    merchant_id: str
+    image_key: str  # object in the selfie-analysis-images bucket
+    requested_at: datetime
+    face_bbox: dict[str, int] | None = None  # x/y/width/height in analyzer JPEG pixels
+
+
 # Published events
 class AnalysisStartedPayload(BaseModel):
     """Payload for selfie.analysis.started event"""
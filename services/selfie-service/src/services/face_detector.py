@@ -0,0 +1,138 @@
+# services/selfie-service/src/services/face_detector.py
+import math
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from shared.utils.logger import ServiceLogger
+
+from ..config import ServiceConfig
+
+
+@dataclass(frozen=True)
+class FaceBox:
+    """Face bounding box in the pixel coordinates of the image passed to detect()"""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float = 1.0
+
+    def scaled(self, factor: float) -> "FaceBox":
+        """Same box in an image resized by factor"""
+        return FaceBox(
+            x=round(self.x * factor),
+            y=round(self.y * factor),
+            width=round(self.width * factor),
+            height=round(self.height * factor),
+            score=self.score,
+        )
+
+    def as_dict(self) -> dict[str, int]:
+        return {"x": self.x, "y": self.y, "width": self.width, "height": self.height}
+
+
+class FaceDetector(ABC):
+    """Face detection backend for the upload quality gate"""
+
+    name: str
+
+    def __init__(self, config: ServiceConfig, logger: ServiceLogger):
+        self.config = config
+        self.logger = logger
+        self.max_side = config.face_detection_max_side
+
+    def detect(self, image: Image.Image) -> list[FaceBox]:
+        """Faces in an RGB image, in its own coordinates, largest first"""
+        scale = min(1.0, self.max_side / max(image.size))
+        small = image
+        if scale < 1.0:
+            # Faces that pass the area gate are large; a small image holds every size that matters
+            small = image.resize(
+                (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                Image.Resampling.BILINEAR,
+                reducing_gap=2.0,
+            )
+
+        faces = [box.scaled(image.width / small.width) for box in self._detect(small)]
+        return sorted(faces, key=lambda box: box.width * box.height, reverse=True)
+
+    def min_face_side(self, width: int, height: int) -> int:
+        """Smallest face side worth searching for; half the side implied by min_face_area_ratio"""
+        return max(16, int(0.5 * math.sqrt(self.config.min_face_area_ratio * width * height)))
+
+    @abstractmethod
+    def _detect(self, image: Image.Image) -> list[FaceBox]:
+        """Run the backend on the already downscaled image"""
+
+
+class CascadeFaceDetector(FaceDetector):
+    """Haar cascade on a downscaled luma image, skipping scales below the face-size gate"""
+
+    name = "cascade"
+
+    def __init__(self, config: ServiceConfig, logger: ServiceLogger):
+        super().__init__(config, logger)
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+    def _detect(self, image: Image.Image) -> list[FaceBox]:
+        gray = np.asarray(image.convert("L"))
+        min_side = self.min_face_side(image.width, image.height)
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=4, minSize=(min_side, min_side))
+        return [FaceBox(int(x), int(y), int(w), int(h)) for x, y, w, h in faces]
+
+
+class YuNetFaceDetector(FaceDetector):
+    """OpenCV YuNet CNN detector (cv2.FaceDetectorYN); not thread-safe, used from the event loop"""
+
+    name = "yunet"
+
+    def __init__(self, config: ServiceConfig, logger: ServiceLogger):
+        super().__init__(config, logger)
+        self.model = cv2.FaceDetectorYN.create(
+            config.face_detector_model_path,
+            "",
+            (self.max_side, self.max_side),
+            score_threshold=config.face_detection_score_threshold,
+            nms_threshold=0.3,
+            top_k=50,
+        )
+
+    def _detect(self, image: Image.Image) -> list[FaceBox]:
+        bgr = np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+        self.model.setInputSize((image.width, image.height))
+        _, faces = self.model.detect(bgr)
+        if faces is None:
+            return []
+
+        min_side = self.min_face_side(image.width, image.height)
+        boxes = []
+        for face in faces:
+            x, y, w, h = face[:4]
+            if min(w, h) < min_side:
+                continue
+            # Boxes may overhang the frame for faces at the border
+            x0, y0 = max(0.0, x), max(0.0, y)
+            x1, y1 = min(float(image.width), x + w), min(float(image.height), y + h)
+            boxes.append(FaceBox(int(x0), int(y0), int(x1 - x0), int(y1 - y0), score=float(face[14])))
+        return boxes
+
+
+def create_face_detector(config: ServiceConfig, logger: ServiceLogger) -> FaceDetector:
+    """Configured backend; YuNet falls back to the cascade when its model is unavailable"""
+    if config.face_detector == "yunet":
+        model_path = config.face_detector_model_path
+        if model_path and os.path.isfile(model_path) and hasattr(cv2, "FaceDetectorYN"):
+            try:
+                return YuNetFaceDetector(config, logger)
+            except cv2.error as e:
+                logger.warning(f"YuNet model failed to load, using cascade: {e}")
+        else:
+            logger.warning(f"YuNet model not found at {model_path!r}, using cascade")
+
+    return CascadeFaceDetector(config, logger)
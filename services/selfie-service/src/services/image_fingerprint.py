@@ -0,0 +1,75 @@
+# services/selfie-service/src/services/image_fingerprint.py
+import hashlib
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# The 63-bit perceptual hash is split into bands for indexed lookup. Two hashes
+# within Hamming distance len(PHASH_BANDS) - 1 agree exactly on at least one band
+# (pigeonhole), so a band match query finds every candidate within that distance.
+PHASH_BANDS = (11, 11, 11, 10, 10, 10)
+PHASH_MAX_INDEXED_DISTANCE = len(PHASH_BANDS) - 1
+
+
+@dataclass(frozen=True)
+class ImageFingerprint:
+    """Dedup identity of an upload: exact content digest plus perceptual hash and mean color"""
+
+    digest: str  # keyed BLAKE2b of the dedup scope and canonical raster, 64 hex chars
+    phash: int  # 63-bit DCT hash, fits a signed BIGINT
+    mean_rgb: tuple[int, int, int]
+
+    @property
+    def bands(self) -> list[int]:
+        return phash_bands(self.phash)
+
+    @property
+    def packed_rgb(self) -> int:
+        r, g, b = self.mean_rgb
+        return (r << 16) | (g << 8) | b
+
+    def distance(self, phash: int, packed_rgb: int) -> tuple[int, int]:
+        """(Hamming distance of hashes, max per-channel mean color difference) to a stored fingerprint"""
+        other = ((packed_rgb >> 16) & 0xFF, (packed_rgb >> 8) & 0xFF, packed_rgb & 0xFF)
+        color_diff = max(abs(a - b) for a, b in zip(self.mean_rgb, other, strict=True))
+        return (self.phash ^ phash).bit_count(), color_diff
+
+
+def phash_bands(phash: int) -> list[int]:
+    """Band values tagged with their band index, so equal bits in different bands don't collide"""
+    bands, shift = [], 0
+    for index, bits in enumerate(PHASH_BANDS):
+        bands.append((index << 16) | ((phash >> shift) & ((1 << bits) - 1)))
+        shift += bits
+    return bands
+
+
+def dedup_scope(customer_id: str | None, anonymous_id: str | None) -> str:
+    """Whose uploads may share an analysis: the customer, else the anonymous visitor"""
+    return f"customer:{customer_id}" if customer_id else f"anonymous:{anonymous_id}"
+
+
+def compute_fingerprint(image: Image.Image, key: bytes, scope: str) -> ImageFingerprint:
+    """Fingerprint a decoded, oriented sRGB image (the canonical quality-check level).
+
+    The digest covers the dedup scope too, so the same photo uploaded by two
+    customers of a merchant has two digests and never shares an analysis.
+    """
+    raster = image.tobytes()
+    digest = hashlib.blake2b(f"{scope}\0{image.width}:{image.height}:".encode(), key=key, digest_size=32)
+    digest.update(raster)
+
+    # Fixed 32x32 so re-encodes and rescales land on the same hash
+    small = image.resize((32, 32), Image.Resampling.BOX)
+    gray = np.asarray(small.convert("L"), dtype=np.float32)
+
+    # pHash: low-frequency 8x8 DCT block (minus DC) against its median
+    low = cv2.dct(gray)[:8, :8].flatten()[1:]
+    bits = low > np.median(low)
+    phash = int.from_bytes(np.packbits(np.concatenate(([False], bits))).tobytes(), "big")
+
+    # Grayscale hash is blind to white balance, which matters for color analysis
+    r, g, b = np.asarray(small).reshape(-1, 3).mean(axis=0)
+    return ImageFingerprint(digest=digest.hexdigest(), phash=phash, mean_rgb=(int(r), int(g), int(b)))
@@ -1,34 +1,43 @@
 # services/selfie-service/src/services/image_processor.py
-import base64
 import hashlib
-import hmac
 import io
 from typing import Any
 
 import cv2
 import numpy as np
-from PIL import Image, ImageCms
+from PIL import Image, ImageCms, ImageOps
 
 from shared.utils.exceptions import ValidationError
 from shared.utils.logger import ServiceLogger
 
 from ..config import ServiceConfig
+from .face_detector import create_face_detector
+from .image_fingerprint import compute_fingerprint
 
 
 class ImageProcessor:
     """Image validation and processing service"""
 
+    QUALITY_CHECK_MAX_SIDE = 1024
+    # Downscales tried when even the lowest JPEG quality is over analyzer_max_size
+    ANALYZER_DOWNSCALE_ATTEMPTS = 3
+
     def __init__(self, config: ServiceConfig, logger: ServiceLogger):
         self.config = config
         self.logger = logger
+        self._srgb_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+
+        # BLAKE2b keys are at most 64 bytes
+        secret = config.global_dedup_secret.encode()
+        self._dedup_key = secret if len(secret) <= 64 else hashlib.blake2b(secret).digest()
 
-        # Load face detection model
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        # Pluggable face detection backend (downscaled cascade or YuNet)
+        self.face_detector = create_face_detector(config, logger)
 
-    async def validate_and_process(self, image_bytes: bytes) -> dict[str, Any]:
+    async def validate_and_process(self, image_bytes: bytes, dedup_scope: str) -> dict[str, Any]:
         """
         Validate image and prepare for AI analysis.
-        Returns processed image data and metrics.
+        Returns processed image data and metrics; the fingerprint is specific to dedup_scope.
         """
         # Check file size
         if len(image_bytes) > self.config.max_upload_size:
@@ -42,17 +51,11 @@ class ImageProcessor:
                 message="Invalid image format. Supported: JPEG, PNG, WebP", code="INVALID_IMAGE_FORMAT"
             )
 
-        # Open and validate image
-        try:
-            image = Image.open(io.BytesIO(image_bytes))
-        except Exception as e:
-            raise ValidationError(message="Cannot decode image", code="INVALID_IMAGE_FORMAT", details={"error": str(e)})
-
-        # Convert to sRGB color space
-        rgb_image = self._ensure_srgb(image)
-        width, height = rgb_image.size
+        # Open lazily: only the header is parsed here
+        image = self._open(image_bytes)
+        width, height = self._oriented_size(image)
 
-        # Check dimensions
+        # Check dimensions (on the original size, before any reduced decode)
         if width < self.config.min_image_dimension or height < self.config.min_image_dimension:
             raise ValidationError(
                 message=f"Image too small. Minimum: {self.config.min_image_dimension}x{self.config.min_image_dimension}",
@@ -67,29 +70,84 @@ class ImageProcessor:
                 details={"megapixels": (width * height) / 1_000_000},
             )
 
-        # Quality checks on downscaled copy
-        quality_image = self._resize_for_quality_check(rgb_image)
-        quality_metrics = self._check_quality(quality_image)
+        # Single decode, at reduced scale for JPEGs much larger than the analyzer needs
+        rgb_image = self._decode_srgb(image, draft_side=self.config.analyzer_max_side)
+
+        # Resize pyramid shared by the quality check and the analyzer image
+        analyzer_img = self._resize_max_side(rgb_image, self.config.analyzer_max_side)
+        quality_img = self._resize_max_side(analyzer_img, self.QUALITY_CHECK_MAX_SIDE)
+
+        # Quality checks on the smallest level
+        quality_metrics = self._check_quality(quality_img)
 
         # Validate quality metrics
         self._validate_quality(quality_metrics)
 
-        # Prepare image for AI analyzer
-        analyzer_jpeg = self._prepare_analyzer_image(rgb_image, face_bbox=quality_metrics["face_bbox"])
+        # Small faces keep full resolution, which needs the undrafted decode
+        face_box = quality_metrics["face_bbox"].scaled(analyzer_img.width / quality_img.width)
+        if face_box.width < self.config.min_face_width_after_resize and analyzer_img.size != (width, height):
+            self.logger.info(f"Skipping resize to preserve face size: {face_box.width}px")
+            if rgb_image.size == (width, height):
+                analyzer_img = rgb_image
+            else:
+                analyzer_img = self._decode_srgb(self._open(image_bytes), draft_side=None)
+            face_box = quality_metrics["face_bbox"].scaled(analyzer_img.width / quality_img.width)
+
+        # Prepare image for AI analyzer; may downscale, so the bbox follows the encoded image
+        analyzer_jpeg, encoded_img = self._encode_analyzer_jpeg(analyzer_img, probe=quality_img)
+        if encoded_img is not analyzer_img:
+            face_box = quality_metrics["face_bbox"].scaled(encoded_img.width / quality_img.width)
 
-        # Compute deduplication hash
-        image_hash = self._compute_hash(rgb_image.tobytes(), width, height)
+        # Dedup fingerprint over the whole canonical raster (exact digest + perceptual hash)
+        fingerprint = compute_fingerprint(quality_img, self._dedup_key, dedup_scope)
 
         return {
             "width": width,
             "height": height,
-            "image_hash": image_hash,
-            "analyzer_jpeg_b64": base64.b64encode(analyzer_jpeg).decode(),
+            "fingerprint": fingerprint,
+            "analyzer_jpeg": analyzer_jpeg,
             "blur_score": quality_metrics["blur_score"],
             "exposure_score": quality_metrics["exposure_score"],
             "face_area_ratio": quality_metrics["face_area_ratio"],
+            # In analyzer JPEG pixels, so the analyzer can crop to the face
+            "face_bbox": face_box.as_dict(),
         }
 
+    def _open(self, image_bytes: bytes) -> Image.Image:
+        """Open without decoding pixels"""
+        try:
+            return Image.open(io.BytesIO(image_bytes))
+        except Exception as e:
+            raise ValidationError(
+                message="Cannot decode image", code="INVALID_IMAGE_FORMAT", details={"error": str(e)}
+            ) from e
+
+    @staticmethod
+    def _oriented_size(image: Image.Image) -> tuple[int, int]:
+        """Size after EXIF rotation, read from the header"""
+        width, height = image.size
+        try:
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                return height, width
+        except Exception:
+            pass
+        return width, height
+
+    def _decode_srgb(self, image: Image.Image, draft_side: int | None) -> Image.Image:
+        """Decode once (JPEG draft mode when draft_side is set) and convert to sRGB"""
+        if draft_side and image.format == "JPEG":
+            # libjpeg DCT scaling (1/2, 1/4, 1/8); keeps both sides >= the requested box
+            image.draft("RGB", (draft_side, draft_side))
+
+        try:
+            image.load()
+        except Exception as e:
+            raise ValidationError(
+                message="Cannot decode image", code="INVALID_IMAGE_FORMAT", details={"error": str(e)}
+            ) from e
+
+        return self._ensure_srgb(image)
+
     def _validate_format(self, image_bytes: bytes) -> bool:
         """Check magic bytes for supported formats"""
         # JPEG
@@ -105,64 +163,44 @@ class ImageProcessor:
 
     def _ensure_srgb(self, image: Image.Image) -> Image.Image:
         """Convert to sRGB color space"""
+        icc_profile = image.info.get("icc_profile")
+
         # Apply EXIF rotation
         image = self._apply_exif_rotation(image)
 
-        # Convert to RGB mode
-        if image.mode not in ("RGB", "RGBA"):
+        # Convert to RGB mode (drops alpha)
+        if image.mode != "RGB":
             image = image.convert("RGB")
 
-        # Handle ICC profile conversion
-        if "icc_profile" in image.info:
+        # Handle ICC profile conversion, in place on our own decoded copy
+        if icc_profile:
             try:
-                input_profile = ImageCms.ImageCmsProfile(io.BytesIO(image.info["icc_profile"]))
-                srgb_profile = ImageCms.createProfile("sRGB")
-                image = ImageCms.profileToProfile(
-                    image, input_profile, srgb_profile, renderingIntent=ImageCms.Intent.PERCEPTUAL
+                input_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+                ImageCms.profileToProfile(
+                    image,
+                    input_profile,
+                    self._srgb_profile,
+                    renderingIntent=ImageCms.Intent.PERCEPTUAL,
+                    inPlace=True,
                 )
             except Exception as e:
                 self.logger.warning(f"ICC conversion failed: {e}")
 
-        # Ensure RGB (drop alpha)
-        if image.mode == "RGBA":
-            image = image.convert("RGB")
-
+        # Pixels are sRGB now; drop EXIF/ICC so nothing is carried into the analyzer JPEG
+        image.info = {}
         return image
 
     def _apply_exif_rotation(self, image: Image.Image) -> Image.Image:
-        """Apply EXIF rotation to correct orientation"""
+        """Apply EXIF orientation (all 8 values, including mirrored)"""
         try:
-            exif = image._getexif()
-            if exif is not None:
-                orientation = exif.get(0x0112)
-                if orientation:
-                    rotations = {3: 180, 6: 270, 8: 90}
-                    if orientation in rotations:
-                        image = image.rotate(rotations[orientation], expand=True)
+            return ImageOps.exif_transpose(image)
         except Exception:
-            pass
-        return image
-
-    def _resize_for_quality_check(self, image: Image.Image) -> np.ndarray:
-        """Resize image for quality checks (max 1024px)"""
-        max_side = 1024
-        width, height = image.size
-
-        if max(width, height) > max_side:
-            if width > height:
-                new_width = max_side
-                new_height = int(height * max_side / width)
-            else:
-                new_height = max_side
-                new_width = int(width * max_side / height)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        # Convert to numpy array for OpenCV
-        return np.array(image)
+            return image
 
-    def _check_quality(self, image_array: np.ndarray) -> dict[str, Any]:
+    def _check_quality(self, image: Image.Image) -> dict[str, Any]:
         """Run quality checks on image"""
-        gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
+        # Read-only view of the luma plane, no RGB array copy
+        gray = np.asarray(image.convert("L"))
 
         # Blur detection (Laplacian)
         blur_score = cv2.Laplacian(gray, cv2.CV_64F).var()
@@ -171,7 +209,7 @@ class ImageProcessor:
         exposure_score = np.mean(gray)
 
         # Face detection
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+        faces = self.face_detector.detect(image)
 
         if len(faces) == 0:
             raise ValidationError(
@@ -186,14 +224,14 @@ class ImageProcessor:
             )
 
         # Get face bbox
-        x, y, w, h = faces[0]
-        face_area = (w * h) / (image_array.shape[0] * image_array.shape[1])
+        face = faces[0]
+        face_area = (face.width * face.height) / (gray.shape[0] * gray.shape[1])
 
         return {
             "blur_score": float(blur_score),
             "exposure_score": float(exposure_score),
             "face_area_ratio": float(face_area),
-            "face_bbox": {"x": int(x), "y": int(y), "width": int(w), "height": int(h)},
+            "face_bbox": face,
         }
 
     def _validate_quality(self, metrics: dict[str, Any]):
@@ -219,35 +257,50 @@ class ImageProcessor:
                 details={"reason": "face_size", "ratio": metrics["face_area_ratio"]},
             )
 
-    def _prepare_analyzer_image(self, rgb_image: Image.Image, face_bbox: dict) -> bytes:
-        """Prepare color-accurate JPEG for AI analyzer"""
-        # Calculate if face would be too small after resize
-        width, height = rgb_image.size
-        max_side = max(width, height)
-        resize_ratio = min(self.config.analyzer_max_side / max_side, 1.0)
-        face_width_after = face_bbox["width"] * resize_ratio
-
-        # Skip resize if face would be too small
-        if face_width_after < self.config.min_face_width_after_resize:
-            analyzer_img = rgb_image
-            self.logger.info(f"Skipping resize to preserve face size: {face_bbox['width']}px")
-        else:
-            analyzer_img = self._resize_max_side(rgb_image, self.config.analyzer_max_side)
+    def _encode_analyzer_jpeg(self, analyzer_img: Image.Image, probe: Image.Image) -> tuple[bytes, Image.Image]:
+        """
+        Color-accurate JPEG for the AI analyzer, within analyzer_max_size.
+        The highest quality usually fits; otherwise the size at each lower quality
+        is predicted from encodes of the small probe level, calibrated by the
+        full-size encode, so the final quality normally takes one more encode.
+        If the lowest quality is still too large the image is downscaled.
+        Returns the JPEG and the image it encodes.
+        """
+        jpeg_bytes = self._image_to_jpeg(analyzer_img, quality=self.config.analyzer_quality_high)
+        if len(jpeg_bytes) <= self.config.analyzer_max_size:
+            return jpeg_bytes, analyzer_img
+
+        ladder = range(self.config.analyzer_quality_medium, self.config.analyzer_quality_min - 1, -5)
+        scale = len(jpeg_bytes) / len(self._image_to_jpeg(probe, quality=self.config.analyzer_quality_high))
+        candidates = [
+            q for q in ladder if len(self._image_to_jpeg(probe, quality=q)) * scale <= self.config.analyzer_max_size
+        ]
+
+        # Walk down from the predicted quality; only a misprediction costs another full encode
+        for quality in candidates or [ladder[-1]]:
+            jpeg_bytes = self._image_to_jpeg(analyzer_img, quality=quality)
+            if len(jpeg_bytes) <= self.config.analyzer_max_size:
+                self.logger.info(f"Reduced quality to {quality}")
+                return jpeg_bytes, analyzer_img
+
+        # Very detailed or noisy images: JPEG size tracks pixel count, so shrink by the overshoot
+        for _ in range(self.ANALYZER_DOWNSCALE_ATTEMPTS):
+            factor = 0.9 * (self.config.analyzer_max_size / len(jpeg_bytes)) ** 0.5
+            width, height = analyzer_img.size
+            analyzer_img = self._resize_max_side(analyzer_img, int(max(width, height) * factor))
+            jpeg_bytes = self._image_to_jpeg(analyzer_img, quality=ladder[-1])
+            if len(jpeg_bytes) <= self.config.analyzer_max_size:
+                self.logger.info(
+                    f"Reduced quality to {ladder[-1]} and size to {analyzer_img.width}x{analyzer_img.height}"
+                )
+                return jpeg_bytes, analyzer_img
 
-        # First attempt: High quality with no chroma subsampling
-        jpeg_bytes = self._image_to_jpeg(
-            analyzer_img,
-            quality=self.config.analyzer_quality_high,
-            subsampling=0,  # 4:4:4 for color accuracy
+        raise ValidationError(
+            message="Image cannot be compressed under the analyzer size limit",
+            code="IMAGE_TOO_LARGE",
+            details={"bytes": len(jpeg_bytes), "limit": self.config.analyzer_max_size},
         )
 
-        # If too large, reduce quality (not subsampling)
-        if len(jpeg_bytes) > self.config.analyzer_max_size:
-            jpeg_bytes = self._image_to_jpeg(analyzer_img, quality=self.config.analyzer_quality_medium, subsampling=0)
-            self.logger.info(f"Reduced quality to {self.config.analyzer_quality_medium}")
-
-        return jpeg_bytes
-
     def _resize_max_side(self, image: Image.Image, max_side: int) -> Image.Image:
         """Resize keeping aspect ratio"""
         width, height = image.size
@@ -261,23 +314,11 @@ class ImageProcessor:
             new_height = max_side
             new_width = int(width * max_side / height)
 
-        return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # reducing_gap: box-reduce by an integer factor first, then LANCZOS the remainder
+        return image.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
 
-    def _image_to_jpeg(self, image: Image.Image, quality: int, subsampling: int) -> bytes:
-        """Convert to JPEG with specified parameters"""
+    def _image_to_jpeg(self, image: Image.Image, quality: int) -> bytes:
+        """Baseline 4:4:4 JPEG; the image carries no EXIF/ICC after _ensure_srgb"""
         buffer = io.BytesIO()
-        # Clean image (no EXIF/ICC)
-        clean_image = Image.new("RGB", image.size)
-        clean_image.putdata(list(image.getdata()))
-        clean_image.save(
-            buffer, format="JPEG", quality=quality, optimize=True, subsampling=subsampling, progressive=True
-        )
+        image.save(buffer, format="JPEG", quality=quality, subsampling=0)
         return buffer.getvalue()
-
-    def _compute_hash(self, rgb_bytes: bytes, width: int, height: int) -> str:
-        """Compute HMAC-SHA256 for deduplication"""
-        # Construct message: merchant_id || width || height || rgb_bytes
-        # Note: merchant_id will be added by the service layer
-        message = f"{width}:{height}:".encode() + rgb_bytes[:1024]  # Sample for performance
-
-        return hmac.new(self.config.global_dedup_secret.encode(), message, hashlib.sha256).hexdigest()
@@ -0,0 +1,65 @@
+# services/selfie-service/src/services/image_staging.py
+import contextlib
+
+from nats.js.api import ObjectStoreConfig, StorageType
+from nats.js.errors import NotFoundError
+from nats.js.object_store import ObjectStore
+
+from shared.messaging.jetstream_client import JetStreamClient
+from shared.utils.logger import ServiceLogger
+
+from ..config import ServiceConfig
+
+
+class AnalysisImageStaging:
+    """Analyzer JPEGs parked in a JetStream object store until a worker picks them up.
+
+    Commands carry only the object key, which keeps them under the NATS
+    payload limit and lets the image survive restarts of the API process.
+    """
+
+    bucket = "selfie-analysis-images"
+
+    def __init__(self, js_client: JetStreamClient, config: ServiceConfig, logger: ServiceLogger):
+        self.js_client = js_client
+        self.config = config
+        self.logger = logger
+        self._store: ObjectStore | None = None
+
+    async def start(self) -> None:
+        """Open the bucket, creating it with a TTL on first use"""
+        try:
+            self._store = await self.js_client.js.object_store(self.bucket)
+        except NotFoundError:
+            self._store = await self.js_client.js.create_object_store(
+                config=ObjectStoreConfig(
+                    bucket=self.bucket,
+                    ttl=self.config.analysis_image_ttl_seconds,
+                    storage=StorageType.FILE,
+                )
+            )
+            self.logger.info(f"Created object store '{self.bucket}'")
+
+    @property
+    def store(self) -> ObjectStore:
+        if not self._store:
+            raise RuntimeError("Image staging not started")
+        return self._store
+
+    async def put(self, analysis_id: str, image_jpeg: bytes) -> str:
+        """Stage an analyzer JPEG, returning its key"""
+        await self.store.put(analysis_id, image_jpeg)
+        return analysis_id
+
+    async def get(self, key: str) -> bytes | None:
+        """Staged JPEG, or None if it expired or was already consumed"""
+        try:
+            result = await self.store.get(key)
+        except NotFoundError:
+            return None
+        return result.data
+
+    async def delete(self, key: str) -> None:
+        """Drop a staged JPEG once its analysis is settled"""
+        with contextlib.suppress(NotFoundError):
+            await self.store.delete(key)
@@ -1,17 +1,23 @@
 # services/selfie-service/src/services/selfie_service.py
+import base64
+import json
 from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import uuid4
 
 import httpx
 
-from shared.utils.exceptions import NotFoundError, ValidationError
+from shared.api import signature_headers
+from shared.utils.exceptions import NotFoundError, RequestTimeoutError, ServiceUnavailableError, ValidationError
 from shared.utils.logger import ServiceLogger
 
 from ..config import ServiceConfig
+from ..events.publishers import SelfieEventPublisher
 from ..repositories.analysis_repository import AnalysisRepository
 from ..schemas.analysis import AnalysisCreate, AnalysisOut, AnalysisStatus
+from ..services.image_fingerprint import ImageFingerprint, dedup_scope
 from ..services.image_processor import ImageProcessor
+from ..services.image_staging import AnalysisImageStaging
 
 
 class SelfieService:
@@ -23,9 +29,13 @@ class SelfieService:
         image_processor: ImageProcessor,
         config: ServiceConfig,
         logger: ServiceLogger,
+        event_publisher: SelfieEventPublisher | None = None,
+        image_staging: AnalysisImageStaging | None = None,
     ):
         self.repository = repository
         self.image_processor = image_processor
+        self.event_publisher = event_publisher
+        self.image_staging = image_staging
         self.config = config
         self.logger = logger
 
@@ -51,24 +61,34 @@ class SelfieService:
             raise ValidationError(message="Either customer_id or anonymous_id is required", code="VALIDATION_ERROR")
 
         # Process and validate image
-        image_data = await self.image_processor.validate_and_process(image_bytes)
-
-        # Add merchant_id to hash for deduplication
-        full_hash = f"{merchant_id}:{image_data['image_hash']}"
-
-        # Check for existing analysis (deduplication)
-        existing = await self.repository.find_by_hash(merchant_id, full_hash)
+        image_data = await self.image_processor.validate_and_process(
+            image_bytes, dedup_scope(customer_id, anonymous_id)
+        )
+        fingerprint: ImageFingerprint = image_data["fingerprint"]
+
+        # Check for existing analysis (deduplication): exact content first, then near-duplicates.
+        # Both are scoped to this customer (or anonymous visitor): the digest includes the
+        # identity and near-duplicates must belong to it, so nobody gets another person's analysis.
+        existing = await self.repository.find_by_hash(merchant_id, fingerprint.digest)
+        match = "exact"
+        if not self._is_reusable(existing):
+            if existing:
+                # Failed or expired: free the (merchant_id, image_hash) slot for the new analysis
+                await self.repository.release_hash(existing.id)
+            existing = await self._find_near_duplicate(merchant_id, customer_id, anonymous_id, fingerprint)
+            match = "perceptual"
 
         if existing:
-            # Check age (30-day window)
-            age = datetime.now(UTC) - existing.created_at
-            if age < timedelta(days=self.config.dedup_window_days):
-                if existing.status != AnalysisStatus.FAILED:
-                    self.logger.info(
-                        "Returning existing analysis",
-                        extra={"correlation_id": correlation_id, "analysis_id": existing.id, "age_days": age.days},
-                    )
-                    return existing, False
+            self.logger.info(
+                "Returning existing analysis",
+                extra={
+                    "correlation_id": correlation_id,
+                    "analysis_id": existing.id,
+                    "match": match,
+                    "age_days": (datetime.now(UTC) - existing.created_at).days,
+                },
+            )
+            return existing, False
 
         # Generate new analysis ID
         analysis_id = f"ana_{uuid4().hex[:12]}"
@@ -82,7 +102,10 @@ class SelfieService:
             domain=domain,
             customer_id=customer_id,
             anonymous_id=anonymous_id,
-            image_hash=full_hash,
+            image_hash=fingerprint.digest,
+            image_phash=fingerprint.phash,
+            image_mean_rgb=fingerprint.packed_rgb,
+            phash_bands=fingerprint.bands,
             image_width=image_data["width"],
             image_height=image_data["height"],
             blur_score=image_data["blur_score"],
@@ -100,10 +123,41 @@ class SelfieService:
         )
 
         # Store image data for background processing
-        analysis._image_data = image_data["analyzer_jpeg_b64"]
+        analysis._image_data = image_data["analyzer_jpeg"]
+        analysis._face_bbox = image_data["face_bbox"]
 
         return analysis, True
 
+    def _is_reusable(self, analysis: AnalysisOut | None) -> bool:
+        """Non-failed and inside the dedup window"""
+        if analysis is None or analysis.status == AnalysisStatus.FAILED:
+            return False
+        return datetime.now(UTC) - analysis.created_at < timedelta(days=self.config.dedup_window_days)
+
+    async def _find_near_duplicate(
+        self, merchant_id: str, customer_id: str | None, anonymous_id: str | None, fingerprint: ImageFingerprint
+    ) -> AnalysisOut | None:
+        """Closest recent analysis of a re-encoded/rescaled copy of the same photo by the same person"""
+        candidates = await self.repository.find_near_duplicates(
+            merchant_id=merchant_id,
+            customer_id=customer_id,
+            anonymous_id=anonymous_id,
+            phash_bands=fingerprint.bands,
+            since=datetime.now(UTC) - timedelta(days=self.config.dedup_window_days),
+            limit=self.config.dedup_candidate_limit,
+        )
+
+        best, best_distance = None, None
+        for analysis, phash, packed_rgb in candidates:
+            hash_distance, color_difference = fingerprint.distance(phash, packed_rgb)
+            if hash_distance > self.config.dedup_phash_max_distance:
+                continue
+            if color_difference > self.config.dedup_max_color_difference:
+                continue
+            if best_distance is None or hash_distance < best_distance:
+                best, best_distance = analysis, hash_distance
+        return best
+
     async def get_analysis(self, analysis_id: str, merchant_id: str) -> AnalysisOut:
         """Get analysis by ID"""
         analysis = await self.repository.find_by_id(analysis_id)
@@ -190,42 +244,59 @@ class SelfieService:
 
         return count
 
-    async def process_ai_analysis(self, analysis_id: str, image_jpeg_b64: str, correlation_id: str):
-        """Process analysis with AI analyzer (background task)"""
-        try:
-            analysis = await self.repository.find_by_id(analysis_id)
-            if not analysis:
-                self.logger.exception(f"Analysis {analysis_id} not found for AI processing")
-                return
+    async def request_ai_analysis(
+        self, analysis: AnalysisOut, image_jpeg: bytes, face_bbox: dict[str, int] | None = None
+    ) -> None:
+        """Stage the analyzer JPEG and queue the analysis for the worker pool"""
+        image_key = await self.image_staging.put(analysis.id, image_jpeg)
+        await self.event_publisher.analysis_requested(
+            analysis_id=analysis.id, merchant_id=analysis.merchant_id, image_key=image_key, face_bbox=face_bbox
+        )
+
+    async def process_ai_analysis(
+        self,
+        analysis_id: str,
+        image_jpeg: bytes,
+        correlation_id: str,
+        face_bbox: dict[str, int] | None = None,
+    ):
+        """
+        Process analysis with AI analyzer (work queue handler).
+        Transient analyzer failures raise so the queue redelivers with backoff;
+        anything else marks the analysis failed.
+        """
+        analysis = await self.repository.find_by_id(analysis_id)
+        if not analysis:
+            self.logger.error(f"Analysis {analysis_id} not found for AI processing")
+            return
 
-            # Call AI analyzer
+        # Redelivery after the result was already stored
+        if analysis.status != AnalysisStatus.PROCESSING:
+            self.logger.info(f"Analysis {analysis_id} already {analysis.status.value}, skipping")
+            return
+
+        # Call AI analyzer
+        try:
             async with httpx.AsyncClient(timeout=self.config.ai_analyzer_timeout) as client:
-                response = await client.post(
-                    f"{self.config.ai_analyzer_url}/analyze",
-                    headers={
-                        "Content-Type": "application/json",
-                        "Idempotency-Key": analysis_id,
-                        "X-Internal-API-Key": self.config.ai_analyzer_api_key,
-                        "X-Correlation-ID": correlation_id,
-                    },
-                    json={
-                        "analysis_id": analysis_id,
-                        "merchant_id": analysis.merchant_id,
-                        "image_jpeg_b64": image_jpeg_b64,
-                        "metadata": {
-                            "platform": analysis.platform_name,
-                            "customer_id": analysis.customer_id,
-                            "anonymous_id": analysis.anonymous_id,
-                            "source": analysis.source,
-                            "device_type": analysis.device_type,
-                        },
-                    },
-                )
+                response = await self._post_to_analyzer(client, analysis, image_jpeg, correlation_id, face_bbox)
+        except httpx.TimeoutException as e:
+            raise RequestTimeoutError(
+                f"AI analyzer timed out for {analysis_id}", timeout_seconds=self.config.ai_analyzer_timeout
+            ) from e
+        except httpx.TransportError as e:
+            raise ServiceUnavailableError(f"AI analyzer unreachable: {e}", service="selfie-ai-analyzer") from e
+
+        # Backpressure / outage on the analyzer side
+        if response.status_code == 429 or response.status_code >= 500:
+            raise ServiceUnavailableError(f"AI analyzer returned {response.status_code}", service="selfie-ai-analyzer")
 
+        try:
             if response.status_code != 200:
                 raise Exception(f"AI analyzer returned {response.status_code}")
 
+            # Unwrap the shared API envelope
             data = response.json()
+            data = data.get("data") or data
             if not data.get("success"):
                 raise Exception("AI analyzer returned success=false")
 
@@ -267,26 +338,105 @@ class SelfieService:
                     processing_time_ms=data.get("processing_ms"),
                 )
 
-        except httpx.TimeoutException:
-            # Let sweeper handle timeout
-            self.logger.warning(f"AI timeout for analysis {analysis_id}")
         except Exception as e:
-            # Mark as failed
-            await self.repository.mark_failed(
-                analysis_id=analysis_id, error_code="ANALYSIS_FAILED", error_message=str(e)
+            self.logger.exception(
+                f"AI analysis failed for {analysis_id}: {e}", extra={"correlation_id": correlation_id}
             )
-            self.logger.exception(f"AI analysis failed for {analysis_id}: {e}", extra={"correlation_id": correlation_id})
-            if self.event_publisher:
-                await self.event_publisher.analysis_failed(
-                    analysis_id=analysis_id,
-                    merchant_id=analysis.merchant_id,
-                    platform={
-                        "name": analysis.platform_name,
-                        "shop_id": analysis.platform_shop_id,
-                        "domain": analysis.domain,
-                    },
-                    customer_id=analysis.customer_id,
-                    anonymous_id=analysis.anonymous_id,
-                    error_code="ANALYSIS_FAILED",
-                    error_message=str(e),
-                )
+            await self._mark_failed(analysis, error_code="ANALYSIS_FAILED", error_message=str(e))
+
+    async def fail_analysis(self, analysis_id: str, error_code: str, error_message: str) -> None:
+        """Mark a still-processing analysis failed (e.g. retries exhausted)"""
+        analysis = await self.repository.find_by_id(analysis_id)
+        if not analysis or analysis.status != AnalysisStatus.PROCESSING:
+            return
+
+        self.logger.warning(f"Failing analysis {analysis_id}: {error_code}", extra={"error_message": error_message})
+        await self._mark_failed(analysis, error_code=error_code, error_message=error_message)
+
+    async def _mark_failed(self, analysis: AnalysisOut, error_code: str, error_message: str) -> None:
+        """Persist failure and publish the failed event"""
+        await self.repository.mark_failed(analysis_id=analysis.id, error_code=error_code, error_message=error_message)
+        if self.event_publisher:
+            await self.event_publisher.analysis_failed(
+                analysis_id=analysis.id,
+                merchant_id=analysis.merchant_id,
+                platform={
+                    "name": analysis.platform_name,
+                    "shop_id": analysis.platform_shop_id,
+                    "domain": analysis.domain,
+                },
+                customer_id=analysis.customer_id,
+                anonymous_id=analysis.anonymous_id,
+                error_code=error_code,
+                error_message=error_message,
+            )
+
+    async def _post_to_analyzer(
+        self,
+        client: httpx.AsyncClient,
+        analysis: AnalysisOut,
+        image_jpeg: bytes,
+        correlation_id: str,
+        face_bbox: dict[str, int] | None = None,
+    ) -> httpx.Response:
+        """POST the analyzer JPEG, as a raw binary body or the legacy JSON/base64 body"""
+        headers = {
+            "Idempotency-Key": analysis.id,
+            "X-Internal-API-Key": self.config.ai_analyzer_api_key,
+            "X-Correlation-ID": correlation_id,
+        }
+        metadata = {
+            key: value
+            for key, value in {
+                "platform": analysis.platform_name,
+                "customer_id": analysis.customer_id,
+                "anonymous_id": analysis.anonymous_id,
+                "source": analysis.source,
+                "device_type": analysis.device_type,
+            }.items()
+            if value is not None
+        }
+
+        if self.config.ai_analyzer_transport == "json":
+            body = {
+                "analysis_id": analysis.id,
+                "merchant_id": analysis.merchant_id,
+                "image_jpeg_b64": base64.b64encode(image_jpeg).decode(),
+                "metadata": metadata,
+            }
+            if face_bbox:
+                body["face_bbox"] = face_bbox
+            # Serialized here so the signature covers the exact bytes sent
+            content = json.dumps(body).encode()
+            return await client.post(
+                f"{self.config.ai_analyzer_url}/analyze",
+                headers={
+                    **headers,
+                    **self._analyzer_signature(content, analysis.id),
+                    "Content-Type": "application/json",
+                },
+                content=content,
+            )
+
+        if face_bbox:
+            headers["X-Face-BBox"] = json.dumps(face_bbox)
+
+        # bytes are sent as-is: no base64 inflation, no JSON encoding of the image
+        return await client.post(
+            f"{self.config.ai_analyzer_url}/analyze",
+            headers={
+                **headers,
+                **self._analyzer_signature(image_jpeg, analysis.id),
+                "Content-Type": "image/jpeg",
+                "X-Analysis-ID": analysis.id,
+                "X-Merchant-ID": analysis.merchant_id,
+                "X-Analysis-Metadata": json.dumps(metadata),
+            },
+            content=image_jpeg,
+        )
+
+    def _analyzer_signature(self, content: bytes, analysis_id: str) -> dict[str, str]:
+        """The analyzer verifies the HMAC over the body digest and analysis id, and rejects replays"""
+        if not self.config.ai_analyzer_hmac_secret:
+            return {}
+        return signature_headers(self.config.ai_analyzer_hmac_secret, content, analysis_id)
@@ -9,8 +9,8 @@ async def cleanup_stale_analyses(lifecycle, logger: ServiceLogger):
     """Mark stale PROCESSING analyses as FAILED"""
     while True:
         try:
-            # Get stale analyses (>45s in PROCESSING)
-            cutoff = datetime.now(UTC) - timedelta(seconds=lifecycle.config.sweeper_interval_seconds)
+            # Get stale analyses (queued or retrying for longer than any attempt budget)
+            cutoff = datetime.now(UTC) - timedelta(seconds=lifecycle.config.analysis_stale_seconds)
 
             count = await lifecycle.analysis_repo.mark_stale_as_failed(cutoff)
 
@@ -0,0 +1,27 @@
+import numpy as np
+from PIL import Image
+from src.services.image_fingerprint import compute_fingerprint, dedup_scope
+
+KEY = b"dedup-key"
+
+
+def _image() -> Image.Image:
+    pixels = np.random.default_rng(0).integers(0, 256, (64, 48, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_digest_is_scoped_to_the_customer():
+    alice = compute_fingerprint(_image(), KEY, dedup_scope("alice", None))
+
+    assert alice == compute_fingerprint(_image(), KEY, dedup_scope("alice", "anon_1"))
+    assert alice.digest != compute_fingerprint(_image(), KEY, dedup_scope("bob", None)).digest
+    # Perceptual identity is unchanged; the repository scopes near-duplicate candidates
+    assert alice.phash == compute_fingerprint(_image(), KEY, dedup_scope("bob", None)).phash
+
+
+def test_anonymous_scope_never_matches_a_customer_with_the_same_id():
+    assert dedup_scope(None, "abc") != dedup_scope("abc", None)
+    assert (
+        compute_fingerprint(_image(), KEY, dedup_scope(None, "abc")).digest
+        != compute_fingerprint(_image(), KEY, dedup_scope("abc", None)).digest
+    )
@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+from src.config import ServiceConfig
+from src.services.image_processor import ImageProcessor
+
+from shared.utils.exceptions import ValidationError
+from shared.utils.logger import ServiceLogger
+
+
+def _processor(**overrides) -> ImageProcessor:
+    config = ServiceConfig(
+        APP_ENV="test",
+        DATABASE_URL="postgresql://localhost/test",
+        CLIENT_JWT_SECRET="client",
+        INTERNAL_JWT_SECRET="internal",
+        GLOBAL_DEDUP_SECRET="dedup",
+        AI_ANALYZER_URL="http://analyzer",
+        AI_ANALYZER_API_KEY="key",
+        **overrides,
+    )
+    return ImageProcessor(config, ServiceLogger("test-image-processor"))
+
+
+def _noise(side: int) -> Image.Image:
+    """Incompressible image: every JPEG quality stays large"""
+    pixels = np.random.default_rng(0).integers(0, 256, (side, side, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_fitting_image_is_encoded_at_high_quality_and_full_size():
+    image = Image.new("RGB", (640, 640), (180, 140, 120))
+    jpeg, encoded = _processor()._encode_analyzer_jpeg(image, probe=image)
+
+    assert encoded is image
+    assert len(jpeg) <= 1_500_000
+
+
+def test_image_over_the_limit_at_lowest_quality_is_downscaled():
+    processor = _processor(analyzer_max_size=200_000)
+    image = _noise(640)
+
+    jpeg, encoded = processor._encode_analyzer_jpeg(image, probe=image.resize((320, 320)))
+
+    assert len(jpeg) <= 200_000
+    assert encoded.width < image.width
+    assert Image.open(io.BytesIO(jpeg)).size == encoded.size
+
+
+def test_image_that_cannot_fit_is_rejected():
+    processor = _processor(analyzer_max_size=500)
+
+    with pytest.raises(ValidationError) as exc_info:
+        processor._encode_analyzer_jpeg(_noise(640), probe=_noise(320))
+
+    assert exc_info.value.code == "IMAGE_TOO_LARGE"
@@ -39,6 +39,14 @@ from .responses import (
     paginated_response_ctx,
     success_response,
 )
+from .signing import (
+    # Signed internal requests
+    NonceCache,
+    SignatureVerifier,
+    SignedHeaders,
+    body_digest,
+    signature_headers,
+)
 
 __all__ = [
     "APIMiddleware",
@@ -49,14 +57,19 @@ __all__ = [
     "Links",
     "LoggerDep",
     "Meta",
+    "NonceCache",
     "Pagination",
     "PaginationDep",
     "RequestContextDep",
+    "SignatureVerifier",
+    "SignedHeaders",
     "WebhookHeadersDep",
+    "body_digest",
     "create_health_router",
     "create_response",
     "error_response",
     "paginated_response_ctx",
     "setup_middleware",
+    "signature_headers",
     "success_response",
 ]
@@ -1,11 +1,21 @@
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime
+from typing import Any
 
 from fastapi import APIRouter, Request
 
 from shared.api.responses import success_response
+from shared.utils.exceptions import ServiceUnavailableError
 
+# Returns (ready, details); details are included in both the 200 and 503 bodies
+ReadinessCheck = Callable[[Request], Awaitable[tuple[bool, dict[str, Any]]]]
 
-def create_health_router(service_name: str, prefix: str = "") -> APIRouter:
+
+def create_health_router(
+    service_name: str,
+    prefix: str = "",
+    readiness_check: ReadinessCheck | None = None,
+) -> APIRouter:
     router = APIRouter(prefix=prefix)
 
     @router.get("/health", tags=["Health"])
@@ -20,4 +30,27 @@ def create_health_router(service_name: str, prefix: str = "") -> APIRouter:
             correlation_id=getattr(request.state, "correlation_id", None),
         )
 
+    if readiness_check is not None:
+
+        @router.get("/health/ready", tags=["Health"])
+        async def readiness(request: Request):
+            """Readiness probe: 503 until the service can serve traffic within its timeouts"""
+            ready, details = await readiness_check(request)
+            if not ready:
+                raise ServiceUnavailableError(
+                    f"{service_name} is not ready",
+                    service=service_name,
+                    details=details,
+                )
+
+            return success_response(
+                data={
+                    "status": "ready",
+                    "service": service_name,
+                    "timestamp": datetime.now(UTC).isoformat(),
+                    **details,
+                },
+                correlation_id=getattr(request.state, "correlation_id", None),
+            )
+
     return router
@@ -0,0 +1,169 @@
+# shared/api/signing.py
+"""HMAC request signing over the body digest, with a timestamp and replay protection.
+
+The client sends the signing time and a random nonce next to the signature,
+so the server verifies with exactly one HMAC instead of searching the allowed
+clock skew. The signature covers a SHA-256 digest of the request body, so a
+captured signature cannot be reused with another body, and a bounded nonce
+cache rejects replays within the skew window.
+
+    signature = hex(HMAC-SHA256(secret, f"{timestamp}.{nonce}.{sha256_hex(body)}." + payload))
+
+Servers check the headers (presence, clock skew, unseen nonce) with
+check_headers() before reading the body, then verify() the HMAC once the
+body digest is known.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from fastapi import Request
+
+from shared.utils.exceptions import UnauthorizedError
+
+SIGNATURE_HEADER = "X-Signature"
+TIMESTAMP_HEADER = "X-Signature-Timestamp"
+NONCE_HEADER = "X-Signature-Nonce"
+
+
+def body_digest(body: bytes | bytearray) -> str:
+    """Hex SHA-256 of a request body, as covered by the signature"""
+    return hashlib.sha256(body).hexdigest()
+
+
+def compute_signature(
+    secret: str | bytes, timestamp: int, nonce: str, body_sha256: str, payload: str | bytes = b""
+) -> str:
+    """Hex HMAC-SHA256 over "{timestamp}.{nonce}.{body_sha256}." + payload"""
+    key = secret.encode() if isinstance(secret, str) else secret
+    data = payload.encode() if isinstance(payload, str) else payload
+    mac = hmac.new(key, f"{timestamp}.{nonce}.{body_sha256}.".encode(), hashlib.sha256)
+    mac.update(data)
+    return mac.hexdigest()
+
+
+def signature_headers(
+    secret: str | bytes, body: bytes, payload: str | bytes = b"", *, now: float | None = None
+) -> dict[str, str]:
+    """Headers a client adds to sign one request: the exact body bytes sent, plus any out-of-body payload"""
+    timestamp = int(time.time() if now is None else now)
+    nonce = secrets.token_hex(16)
+    return {
+        SIGNATURE_HEADER: compute_signature(secret, timestamp, nonce, body_digest(body), payload),
+        TIMESTAMP_HEADER: str(timestamp),
+        NONCE_HEADER: nonce,
+    }
+
+
+@dataclass(frozen=True)
+class SignedHeaders:
+    """Signature headers that passed the pre-body checks"""
+
+    signature: str
+    timestamp: int
+    nonce: str
+
+
+class NonceCache:
+    """Bounded set of recently seen nonces with a TTL.
+
+    When full, the oldest nonce is evicted; size it for the peak request rate
+    times the TTL or replays of evicted nonces are accepted.
+    """
+
+    def __init__(
+        self, max_entries: int = 100_000, ttl_seconds: float = 120, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, nonce: str) -> bool:
+        """Record a nonce; False if it was already seen and has not expired"""
+        with self._lock:
+            self._expire()
+            if nonce in self._seen:
+                return False
+
+            self._seen[nonce] = self._clock() + self.ttl_seconds
+            if len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+            return True
+
+    def __contains__(self, nonce: str) -> bool:
+        with self._lock:
+            self._expire()
+            return nonce in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _expire(self) -> None:
+        # Entries are in insertion order, so expired ones are at the front
+        now = self._clock()
+        while self._seen and next(iter(self._seen.values())) <= now:
+            self._seen.popitem(last=False)
+
+
+class SignatureVerifier:
+    """Verify signed requests: timestamp within max_skew_seconds, one HMAC over the body digest, unused nonce"""
+
+    def __init__(
+        self,
+        secret: str | bytes,
+        *,
+        max_skew_seconds: int = 60,
+        nonce_cache: NonceCache | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._key = secret.encode() if isinstance(secret, str) else secret
+        self.max_skew_seconds = max_skew_seconds
+        # A nonce only needs remembering while its timestamp can still pass the skew check
+        self.nonce_cache = nonce_cache or NonceCache(ttl_seconds=2 * max_skew_seconds)
+        self._clock = clock
+
+    def check_headers(self, *, signature: str | None, timestamp: str | None, nonce: str | None) -> SignedHeaders:
+        """Checks that need no body: all headers present, timestamp fresh, nonce not used yet"""
+        if not signature or not timestamp or not nonce:
+            raise UnauthorizedError(
+                f"{SIGNATURE_HEADER}, {TIMESTAMP_HEADER} and {NONCE_HEADER} are required", auth_type="hmac"
+            )
+
+        try:
+            signed_at = int(timestamp)
+        except ValueError:
+            raise UnauthorizedError("Invalid signature timestamp", auth_type="hmac") from None
+
+        if abs(self._clock() - signed_at) > self.max_skew_seconds:
+            raise UnauthorizedError("Signature timestamp outside the allowed skew", auth_type="hmac")
+
+        if nonce in self.nonce_cache:
+            raise UnauthorizedError("Replayed request", auth_type="hmac")
+
+        return SignedHeaders(signature=signature, timestamp=signed_at, nonce=nonce)
+
+    def check_request_headers(self, request: Request) -> SignedHeaders:
+        """check_headers() with the signature headers of a FastAPI request"""
+        return self.check_headers(
+            signature=request.headers.get(SIGNATURE_HEADER),
+            timestamp=request.headers.get(TIMESTAMP_HEADER),
+            nonce=request.headers.get(NONCE_HEADER),
+        )
+
+    def verify(self, headers: SignedHeaders, body_sha256: str, payload: str | bytes = b"") -> None:
+        """Raise UnauthorizedError unless the signature matches the body digest and payload and is not replayed"""
+        expected = compute_signature(self._key, headers.timestamp, headers.nonce, body_sha256, payload)
+        if not hmac.compare_digest(headers.signature.lower(), expected):
+            raise UnauthorizedError("Invalid signature", auth_type="hmac")
+
+        # Only valid signatures consume a nonce, so forged requests can't flush the cache
+        if not self.nonce_cache.add(headers.nonce):
+            raise UnauthorizedError("Replayed request", auth_type="hmac")
@@ -0,0 +1,26 @@
+# -------------------------------
+# shared/color/__init__.py
+# -------------------------------
+
+"""
+Vectorized color science shared by the selfie and catalog scoring services.
+
+Requires numpy (install shared with the ``color`` extra); the sklearn-backed
+quantizer methods also need the ``clustering`` extra. Not imported by
+``shared`` itself so services without numpy are unaffected.
+"""
+
+from .colorspace import rgb_to_lab
+from .delta_e import delta_e_ciede2000
+from .palette import MAX_DELTA_E, LabPalette
+from .quantize import QUANTIZER_METHODS, ColorQuantizer, stratified_sample
+
+__all__ = [
+    "MAX_DELTA_E",
+    "QUANTIZER_METHODS",
+    "ColorQuantizer",
+    "LabPalette",
+    "delta_e_ciede2000",
+    "rgb_to_lab",
+    "stratified_sample",
+]
@@ -0,0 +1,83 @@
+# shared/color/delta_e.py
+"""Batched CIEDE2000 color difference."""
+
+import numpy as np
+
+_POW25_7 = 25.0**7
+
+
+def delta_e_ciede2000(
+    lab1: np.ndarray,
+    lab2: np.ndarray,
+    k_l: float = 1.0,
+    k_c: float = 1.0,
+    k_h: float = 1.0,
+) -> np.ndarray:
+    """CIEDE2000 ΔE between LAB colors (..., 3), broadcasting like numpy.
+
+    Follows Sharma, Wu & Dalal (2005). Pass ``lab1[:, None]`` against
+    ``lab2[None]`` to get a full distance matrix.
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    l1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    l2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    # Chroma-dependent a* rescaling
+    c_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    c_bar7 = c_bar**7
+    g = 0.5 * (1 - np.sqrt(c_bar7 / (c_bar7 + _POW25_7)))
+    a1p = (1 + g) * a1
+    a2p = (1 + g) * a2
+
+    c1p = np.hypot(a1p, b1)
+    c2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_zero = (c1p * c2p) == 0
+
+    # Differences
+    d_lp = l2 - l1
+    d_cp = c2p - c1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, dhp)
+    dhp = np.where(dhp < -180, dhp + 360, dhp)
+    dhp = np.where(chroma_zero, 0.0, dhp)
+    d_hp = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dhp) / 2)
+
+    # Means
+    lp_bar = (l1 + l2) / 2
+    cp_bar = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    hp_bar = np.where(
+        chroma_zero,
+        h_sum,
+        np.where(
+            np.abs(h1p - h2p) <= 180,
+            h_sum / 2,
+            np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2),
+        ),
+    )
+
+    # Weighting functions
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(hp_bar - 30))
+        + 0.24 * np.cos(np.radians(2 * hp_bar))
+        + 0.32 * np.cos(np.radians(3 * hp_bar + 6))
+        - 0.20 * np.cos(np.radians(4 * hp_bar - 63))
+    )
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    cp_bar7 = cp_bar**7
+    r_c = 2 * np.sqrt(cp_bar7 / (cp_bar7 + _POW25_7))
+    l_term = (lp_bar - 50) ** 2
+    s_l = 1 + 0.015 * l_term / np.sqrt(20 + l_term)
+    s_c = 1 + 0.045 * cp_bar
+    s_h = 1 + 0.015 * cp_bar * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    dl = d_lp / (k_l * s_l)
+    dc = d_cp / (k_c * s_c)
+    dh = d_hp / (k_h * s_h)
+
+    return np.sqrt(dl**2 + dc**2 + dh**2 + r_t * dc * dh)
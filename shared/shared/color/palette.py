@@ -0,0 +1,41 @@
+# shared/color/palette.py
+"""Reference palettes with LAB coordinates precomputed once."""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from .colorspace import rgb_to_lab
+from .delta_e import delta_e_ciede2000
+
+# ΔE2000 at which a color is treated as entirely dissimilar (black vs white is ~100)
+MAX_DELTA_E = 100.0
+
+
+class LabPalette:
+    """Named groups of reference colors stored as one (groups, refs, 3) LAB array.
+
+    Every group must have the same number of reference colors, so a whole
+    palette set (e.g. all 16 seasons) is scored with a single broadcast.
+    """
+
+    def __init__(self, groups: Mapping[str, Sequence[Sequence[int]]]):
+        self.names = list(groups.keys())
+        self.rgb = np.array([groups[name] for name in self.names], dtype=np.float64)
+        if self.rgb.ndim != 3 or self.rgb.shape[-1] != 3:
+            raise ValueError("All palette groups must contain the same number of RGB triplets")
+
+        self.lab = rgb_to_lab(self.rgb)
+
+    def delta_e(self, colors: np.ndarray | list) -> np.ndarray:
+        """ΔE2000 from colors (n, 3) RGB to every reference: shape (groups, n, refs)"""
+        lab = rgb_to_lab(np.asarray(colors).reshape(-1, 3))
+        return delta_e_ciede2000(lab[None, :, None, :], self.lab[:, None, :, :])
+
+    def min_delta_e(self, colors: np.ndarray | list) -> np.ndarray:
+        """Distance from each color to its nearest reference per group: shape (groups, n)"""
+        return self.delta_e(colors).min(axis=-1)
+
+    def similarity(self, color: np.ndarray | list) -> np.ndarray:
+        """Best 0-1 similarity of a single color to each group: shape (groups,)"""
+        return np.maximum(0.0, 1 - self.min_delta_e(color)[:, 0] / MAX_DELTA_E)
@@ -0,0 +1,158 @@
+# shared/color/quantize.py
+"""Dominant-color quantization with subsampling and pluggable backends."""
+
+from typing import Literal
+
+import numpy as np
+
+QuantizerMethod = Literal["kmeans", "minibatch", "histogram"]
+
+QUANTIZER_METHODS = ("kmeans", "minibatch", "histogram")
+
+
+def stratified_sample(pixels: np.ndarray, sample_size: int, rng: np.random.Generator) -> np.ndarray:
+    """Pick one random pixel from each of ``sample_size`` equal, contiguous strata.
+
+    Pixels come in scanline order, so every part of the region stays
+    represented, unlike a plain random choice over the whole array.
+    """
+    n = len(pixels)
+    if n <= sample_size:
+        return pixels
+
+    bounds = (np.arange(sample_size + 1, dtype=np.int64) * n) // sample_size
+    widths = bounds[1:] - bounds[:-1]
+    idx = bounds[:-1] + (rng.random(sample_size) * widths).astype(np.int64)
+    return pixels[idx]
+
+
+class ColorQuantizer:
+    """Find the dominant colors of a pixel set.
+
+    Methods:
+        kmeans:    full sklearn KMeans with ``n_init`` restarts (legacy, slowest)
+        minibatch: sklearn MiniBatchKMeans warm-started from median-cut centroids
+        histogram: 5-bit color histogram, weighted median cut, then a few
+                   weighted Lloyd iterations (numpy only, fastest)
+
+    Pixels are (n, 3) in any 0-255 color space (RGB, or 8-bit OpenCV LAB).
+    Inputs larger than ``sample_size`` are stratified-sampled first; pass 0
+    when the caller has already sampled.
+    """
+
+    def __init__(
+        self,
+        method: QuantizerMethod = "kmeans",
+        sample_size: int = 5000,
+        n_init: int = 10,
+        refine_iterations: int = 4,
+        random_state: int = 0,
+    ):
+        if method not in QUANTIZER_METHODS:
+            raise ValueError(f"Unknown quantizer method '{method}', expected one of {QUANTIZER_METHODS}")
+
+        self.method = method
+        self.sample_size = sample_size
+        self.n_init = n_init
+        self.refine_iterations = refine_iterations
+        self.random_state = random_state
+
+    def quantize(self, pixels: np.ndarray, n_colors: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (centers, counts) sorted by descending count.
+
+        Counts are relative to the sampled pixels. Fewer than ``n_colors``
+        centers come back when the input has fewer distinct colors.
+        """
+        pixels = np.asarray(pixels).reshape(-1, 3)
+        if len(pixels) == 0:
+            return np.empty((0, 3)), np.empty(0, dtype=np.int64)
+
+        rng = np.random.default_rng(self.random_state)
+        if self.sample_size:
+            pixels = stratified_sample(pixels, self.sample_size, rng)
+        pixels = pixels.astype(np.float64)
+
+        if self.method == "kmeans":
+            centers, labels = self._kmeans(pixels, n_colors)
+        elif self.method == "minibatch":
+            centers, labels = self._minibatch(pixels, n_colors)
+        else:
+            centers, labels = self._histogram(pixels, n_colors)
+
+        counts = np.bincount(labels, minlength=len(centers))
+        order = np.argsort(-counts, kind="stable")
+        return centers[order], counts[order]
+
+    def _kmeans(self, pixels: np.ndarray, n_colors: int) -> tuple[np.ndarray, np.ndarray]:
+        from sklearn.cluster import KMeans
+
+        km = KMeans(n_clusters=min(n_colors, len(pixels)), n_init=self.n_init, random_state=self.random_state)
+        labels = km.fit_predict(pixels)
+        return km.cluster_centers_, labels
+
+    def _minibatch(self, pixels: np.ndarray, n_colors: int) -> tuple[np.ndarray, np.ndarray]:
+        from sklearn.cluster import MiniBatchKMeans
+
+        init = self._median_cut(*self._histogram_bins(pixels), n_colors)
+        km = MiniBatchKMeans(
+            n_clusters=len(init),
+            init=init,
+            n_init=1,
+            batch_size=min(1024, len(pixels)),
+            random_state=self.random_state,
+        )
+        labels = km.fit_predict(pixels)
+        return km.cluster_centers_, labels
+
+    def _histogram(self, pixels: np.ndarray, n_colors: int) -> tuple[np.ndarray, np.ndarray]:
+        colors, weights = self._histogram_bins(pixels)
+        centers = self._median_cut(colors, weights, n_colors)
+
+        # Weighted Lloyd refinement on the bins, warm-started from median cut
+        for _ in range(self.refine_iterations):
+            bin_labels = _nearest(colors, centers)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, bin_labels, colors * weights[:, None])
+            totals = np.bincount(bin_labels, weights=weights, minlength=len(centers))
+            filled = totals > 0
+            centers[filled] = sums[filled] / totals[filled, None]
+
+        return centers, _nearest(pixels, centers)
+
+    @staticmethod
+    def _histogram_bins(pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Collapse pixels into occupied 5-bit-per-channel bins: (bin means, pixel counts)"""
+        q = np.clip(pixels, 0, 255).astype(np.int64) >> 3
+        codes = (q[:, 0] << 10) | (q[:, 1] << 5) | q[:, 2]
+        uniq, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+
+        sums = np.zeros((len(uniq), 3))
+        np.add.at(sums, inverse, pixels)
+        return sums / counts[:, None], counts.astype(np.float64)
+
+    @staticmethod
+    def _median_cut(colors: np.ndarray, weights: np.ndarray, n_colors: int) -> np.ndarray:
+        """Weighted median cut: split the widest box at its weighted median until n boxes"""
+        boxes = [np.arange(len(colors))]
+
+        while len(boxes) < n_colors:
+            ranges = [np.ptp(colors[b], axis=0).max() if len(b) > 1 else -1.0 for b in boxes]
+            widest = int(np.argmax(ranges))
+            if ranges[widest] <= 0:
+                break
+
+            box = boxes.pop(widest)
+            channel = int(np.argmax(np.ptp(colors[box], axis=0)))
+            order = box[np.argsort(colors[box, channel], kind="stable")]
+            cumulative = np.cumsum(weights[order])
+            split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+            split = min(max(split, 1), len(order) - 1)
+            boxes.extend([order[:split], order[split:]])
+
+        return np.array([np.average(colors[b], axis=0, weights=weights[b]) for b in boxes])
+
+
+def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Index of the nearest center for each point (squared Euclidean)"""
+    d = (points**2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers**2).sum(axis=1)[None, :]
+    return d.argmin(axis=1)
@@ -19,6 +19,13 @@ from .jetstream_client import JetStreamClient
 class Listener(ABC):
     """
     Base listener that passes EventEnvelope to subclasses.
+
+    Messages are handled one at a time unless ``max_concurrency`` > 1, in
+    which case up to that many run concurrently (a bounded worker pool over
+    the durable consumer). ``retry_backoff_sec`` delays redeliveries after a
+    failure, indexed by attempt; the last value repeats. Handlers that can
+    outlast ``ack_wait_sec`` set ``in_progress_interval_sec`` so the message
+    is kept from redelivery while it runs.
     """
 
     stream_name: str = "GLAM_EVENTS"
@@ -26,6 +33,10 @@ class Listener(ABC):
     max_deliver: int = 3
     idle_sleep_sec: float = 0.05
     poll_window_sec: float = 2.0
+    max_concurrency: int = 1
+    ack_wait_sec: float | None = None
+    retry_backoff_sec: tuple[float, ...] = ()
+    in_progress_interval_sec: float | None = None
 
     @property
     @abstractmethod
@@ -60,6 +71,7 @@ class Listener(ABC):
                     deliver_policy=DeliverPolicy.ALL,
                     ack_policy=AckPolicy.EXPLICIT,
                     max_deliver=self.max_deliver,
+                    ack_wait=self.ack_wait_sec,
                     filter_subject=self.subject,
                 ),
             )
@@ -88,8 +100,16 @@ class Listener(ABC):
         """
         ...
 
+    async def on_exhausted(self, envelope: EventEnvelope, error: Exception) -> None:
+        """Called once when a message failed on its last delivery, before it is acked."""
+        return None
+
     async def _poll_loop(self) -> None:
         """Polling loop."""
+        if self.max_concurrency > 1:
+            await self._pooled_poll_loop()
+            return
+
         while self._running:
             try:
                 msgs = await self._sub.fetch(batch=self.batch_size, timeout=self.poll_window_sec)
@@ -100,14 +120,56 @@ class Listener(ABC):
             for msg in msgs:
                 await self._handle_message(msg)
 
+    async def _pooled_poll_loop(self) -> None:
+        """Polling loop that keeps at most max_concurrency messages in flight."""
+        inflight: set[asyncio.Task] = set()
+        try:
+            while self._running:
+                free = self.max_concurrency - len(inflight)
+                if free <= 0:
+                    await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                # Only pull what can start now; the rest stays available to other replicas
+                try:
+                    msgs = await self._sub.fetch(batch=min(self.batch_size, free), timeout=self.poll_window_sec)
+                except (TimeoutError, NATSTimeoutError):
+                    await asyncio.sleep(self.idle_sleep_sec)
+                    continue
+
+                for msg in msgs:
+                    task = asyncio.create_task(self._handle_message(msg))
+                    inflight.add(task)
+                    task.add_done_callback(inflight.discard)
+        finally:
+            # Unacked messages are redelivered after ack_wait
+            for task in inflight:
+                task.cancel()
+
+    def _retry_delay(self, delivery_count: int) -> float | None:
+        """Redelivery delay for the given attempt, None for immediate"""
+        if not self.retry_backoff_sec:
+            return None
+        return self.retry_backoff_sec[min(delivery_count, len(self.retry_backoff_sec)) - 1]
+
+    async def _keep_in_progress(self, msg) -> None:
+        """Reset the ack timer until cancelled."""
+        while True:
+            await asyncio.sleep(self.in_progress_interval_sec)
+            try:
+                await msg.in_progress()
+            except Exception as e:
+                self.logger.warning(f"In-progress ack failed: {e}")
+
     async def _handle_message(self, msg) -> None:
         """Parse envelope and handle message."""
+        context_token = None
         try:
             # Parse into EventEnvelope (without typed data)
             envelope = EventEnvelope.model_validate_json(msg.data)
             
             # Set logging context for this message
-            self.logger.set_request_context(
+            context_token = self.logger.set_request_context(
                 event_id=envelope.event_id,
                 event_type=envelope.event_type,
                 correlation_id=envelope.correlation_id,
@@ -117,9 +179,16 @@ class Listener(ABC):
             )
 
             # Process message
+            heartbeat = (
+                asyncio.create_task(self._keep_in_progress(msg)) if self.in_progress_interval_sec else None
+            )
             try:
                 self.logger.info("Processing event")
-                await self.on_message(envelope)
+                try:
+                    await self.on_message(envelope)
+                finally:
+                    if heartbeat:
+                        heartbeat.cancel()
                 await msg.ack()
                 self.logger.info("Event processed successfully")
 
@@ -137,6 +206,10 @@ class Listener(ABC):
                             "delivery_count": delivery_count
                         },
                     )
+                    try:
+                        await self.on_exhausted(envelope, e)
+                    except Exception:
+                        self.logger.exception("on_exhausted handler failed")
                     await msg.ack()  # Don't retry anymore
                 else:
                     self.logger.exception(
@@ -146,7 +219,7 @@ class Listener(ABC):
                             "delivery_count": delivery_count
                         },
                     )
-                    await msg.nak()  # Retry
+                    await msg.nak(delay=self._retry_delay(delivery_count))  # Retry
 
         except json.JSONDecodeError:
             self.logger.exception("Invalid JSON message")
@@ -156,4 +229,4 @@ class Listener(ABC):
             await msg.ack()
         finally:
             # Clear context after handling message
-            self.logger.clear_request_context()
\ No newline at end of file
+            self.logger.clear_request_context(context_token)
\ No newline at end of file
@@ -66,8 +66,8 @@ class Publisher(ABC):
             data=payload_dict,
         )
 
-        # Set logging context
-        self.logger.set_request_context(
+        # Set logging context (restored afterwards, so a listener publishing keeps its own)
+        context_token = self.logger.set_request_context(
             event_id=envelope.event_id,
             event_type=subject,
             correlation_id=correlation_id,
@@ -100,7 +100,7 @@ class Publisher(ABC):
             )
             raise
         finally:
-            self.logger.clear_request_context()
+            self.logger.clear_request_context(context_token)
 
     async def publish_to_dlq(
         self,
@@ -0,0 +1,200 @@
+# shared/utils/benchmark.py
+"""Helpers for the offline benchmark scripts under services/*/scripts.
+
+Synthetic selfie fixtures, per-stage timers, a concurrency driver and a JSON
+report writer, so every service reports timings in the same shape.
+
+Benchmark-only: numpy and cv2 are imported inside the helpers that need them
+(the ``color`` extra), so importing this module adds no runtime dependency.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_RESOLUTIONS = ((640, 480), (1280, 960), (4032, 3024))
+
+
+def parse_resolutions(raw: str) -> list[tuple[int, int]]:
+    """'640x480,1280x960' -> [(640, 480), (1280, 960)]"""
+    return [tuple(int(v) for v in item.lower().split("x")) for item in raw.split(",") if item]
+
+
+def synthetic_selfie(width: int, height: int, seed: int = 0) -> "np.ndarray":
+    """BGR portrait-like test image: textured background, hair, skin oval, eyes, lips.
+
+    Not a detectable face for every model; it exercises decode, resize,
+    segmentation and color code paths with realistic sizes and palettes.
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(90, 200, (max(height // 24, 2), max(width // 24, 2), 3), dtype=np.uint8)
+    image = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    cx, cy = width // 2, int(height * 0.48)
+    face_w, face_h = int(min(width, height) * 0.22), int(min(width, height) * 0.30)
+    skin = tuple(int(c) for c in rng.integers((110, 140, 180), (150, 180, 225)))
+    hair = tuple(int(c) for c in rng.integers((15, 20, 25), (60, 70, 90)))
+    iris = tuple(int(c) for c in rng.integers((40, 50, 30), (140, 120, 90)))
+
+    cv2.ellipse(image, (cx, cy - face_h // 4), (int(face_w * 1.25), int(face_h * 1.05)), 0, 180, 360, hair, -1)
+    cv2.ellipse(image, (cx, cy), (face_w, face_h), 0, 0, 360, skin, -1)
+    for side in (-1, 1):
+        eye = (cx + side * face_w // 2, cy - face_h // 6)
+        cv2.ellipse(image, eye, (face_w // 6, face_h // 14), 0, 0, 360, (235, 235, 235), -1)
+        cv2.circle(image, eye, face_h // 16, iris, -1)
+        cv2.circle(image, eye, face_h // 40, (20, 20, 20), -1)
+    cv2.ellipse(image, (cx, cy + face_h // 2), (face_w // 3, face_h // 12), 0, 0, 360, (90, 90, 170), -1)
+
+    # Sensor-like noise so JPEG sizes and blur scores are realistic
+    noise = rng.normal(0, 4, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def encode_jpeg(image_bgr: "np.ndarray", quality: int = 92) -> bytes:
+    import cv2
+
+    return cv2.imencode(".jpg", image_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def load_fixtures(directory: str) -> list[tuple[str, bytes]]:
+    """(name, bytes) for every JPEG/PNG/WebP in a fixture directory"""
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp"))
+    return [(p.name, p.read_bytes()) for p in paths]
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """ms summary of second-valued samples"""
+    import numpy as np
+
+    if not samples:
+        return {"n": 0}
+    ms = np.asarray(samples) * 1000
+    return {
+        "n": len(samples),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Process resident-set high-water mark (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageTimer:
+    """Wall time per named stage, plus the traced Python/numpy allocation peak when enabled"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.peak_bytes: dict[str, int] = defaultdict(int)
+        self.skipped: dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+            if self.trace_memory:
+                self.peak_bytes[name] = max(self.peak_bytes[name], tracemalloc.get_traced_memory()[1] - base)
+
+    def skip(self, name: str, reason: str) -> None:
+        """Record a stage that cannot run here (missing model, no face found)"""
+        self.skipped[name] = reason
+
+    def summary(self) -> dict[str, Any]:
+        stages = {}
+        for name, samples in self.samples.items():
+            stages[name] = percentiles(samples)
+            if self.trace_memory:
+                stages[name]["peak_alloc_mb"] = round(self.peak_bytes[name] / 1e6, 2)
+        for name, reason in self.skipped.items():
+            stages.setdefault(name, {"n": 0})["skipped"] = reason
+        return stages
+
+
+async def run_concurrent(call: Callable[[int], Awaitable[Any]], total: int, concurrency: int) -> dict[str, Any]:
+    """Run call(i) for i < total with at most `concurrency` in flight; throughput and latency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(total / wall, 2) if wall else None,
+        "latency": percentiles(latencies),
+    }
+
+
+def environment_info() -> dict[str, Any]:
+    """Machine and code identity for comparing reports over time"""
+    import numpy as np
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=False
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def write_report(path: str | None, report: dict[str, Any]) -> None:
+    """Write the JSON report (stdout when path is '-')"""
+    if not path:
+        return
+    payload = json.dumps(report, indent=2, default=str) + "\n"
+    if path == "-":
+        sys.stdout.write(payload)
+    else:
+        Path(path).write_text(payload)
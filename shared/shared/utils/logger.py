@@ -5,8 +5,14 @@ import os
 import sys
 import inspect
 import traceback
+from contextvars import ContextVar, Token
 from typing import Any
 
+# Request context lives in a ContextVar so concurrent tasks (each asyncio task
+# runs on a copy of the context it was created in) don't see or clear each
+# other's. Always replaced, never mutated in place.
+_request_context: ContextVar[dict[str, Any]] = ContextVar("request_context")
+
 
 class JsonFormatter(logging.Formatter):
     """JSON formatter for production/container environments"""
@@ -47,7 +53,6 @@ class ServiceLogger:
     def __init__(self, service_name: str):
         self.service_name = service_name
         self.logger = logging.getLogger(service_name)
-        self._request_context: dict[str, Any] = {}
 
         # Only add handler if root logger has no handlers
         if not logging.root.handlers:
@@ -69,17 +74,20 @@ class ServiceLogger:
             logging.root.addHandler(handler)
             logging.root.setLevel(logging.INFO)
 
-    def set_request_context(self, **kwargs):
-        """Set request-scoped context"""
-        self._request_context.update(kwargs)
+    def set_request_context(self, **kwargs) -> Token:
+        """Set request-scoped context for the current task; returns a token for clear_request_context"""
+        return _request_context.set({**_request_context.get({}), **kwargs})
 
-    def clear_request_context(self):
-        """Clear request context"""
-        self._request_context = {}
+    def clear_request_context(self, token: Token | None = None):
+        """Clear request context, or restore the context from before the set that returned token"""
+        if token is None:
+            _request_context.set({})
+        else:
+            _request_context.reset(token)
 
     def _add_context(self, extra: dict | None) -> dict:
         """Add request context to extra fields"""
-        combined = self._request_context.copy()
+        combined = dict(_request_context.get({}))
         if extra:
             combined.update(extra)
         return combined if combined else None
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+from shared.utils.logger import ServiceLogger
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _logger() -> tuple[ServiceLogger, _Capture]:
+    logger = ServiceLogger("test-logger-context")
+    capture = _Capture()
+    logger.logger.addHandler(capture)
+    logger.logger.setLevel(logging.INFO)
+    return logger, capture
+
+
+def test_concurrent_tasks_keep_their_own_context():
+    logger, capture = _logger()
+
+    async def handle(event_id: str, delay: float) -> None:
+        token = logger.set_request_context(event_id=event_id)
+        try:
+            await asyncio.sleep(delay)
+            logger.info("handled")
+        finally:
+            logger.clear_request_context(token)
+
+    async def main() -> None:
+        # The fast task clears its context while the slow one is still running
+        await asyncio.gather(asyncio.create_task(handle("slow", 0.05)), asyncio.create_task(handle("fast", 0.0)))
+
+    asyncio.run(main())
+
+    assert sorted(record.event_id for record in capture.records) == ["fast", "slow"]
+
+
+def test_clear_with_token_restores_outer_context():
+    logger, capture = _logger()
+
+    async def main() -> None:
+        outer = logger.set_request_context(event_id="listener")
+        inner = logger.set_request_context(entry_point="event_publisher")
+        logger.clear_request_context(inner)
+        logger.info("after publish")
+        logger.clear_request_context(outer)
+        logger.info("after handling")
+
+    asyncio.run(main())
+
+    assert capture.records[0].event_id == "listener"
+    assert not hasattr(capture.records[0], "entry_point")
+    assert not hasattr(capture.records[1], "event_id")
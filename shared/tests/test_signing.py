@@ -0,0 +1,54 @@
+import pytest
+
+from shared.api.signing import (
+    NONCE_HEADER,
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    SignatureVerifier,
+    body_digest,
+    signature_headers,
+)
+from shared.utils.exceptions import UnauthorizedError
+
+SECRET = "signing-secret"
+NOW = 1_700_000_000
+
+
+def _verifier() -> SignatureVerifier:
+    return SignatureVerifier(SECRET, clock=lambda: NOW)
+
+
+def _check(verifier: SignatureVerifier, headers: dict[str, str]):
+    return verifier.check_headers(
+        signature=headers[SIGNATURE_HEADER], timestamp=headers[TIMESTAMP_HEADER], nonce=headers[NONCE_HEADER]
+    )
+
+
+def test_signature_covers_the_body():
+    verifier = _verifier()
+    headers = signature_headers(SECRET, b"image", "ana_1", now=NOW)
+
+    with pytest.raises(UnauthorizedError):
+        verifier.verify(_check(verifier, headers), body_digest(b"other"), "ana_1")
+
+    verifier.verify(_check(verifier, headers), body_digest(b"image"), "ana_1")
+
+
+def test_headers_are_checked_without_the_body():
+    verifier = _verifier()
+    headers = signature_headers(SECRET, b"image", "ana_1", now=NOW - 3600)
+
+    with pytest.raises(UnauthorizedError):
+        _check(verifier, headers)
+
+
+def test_nonce_is_consumed_by_a_valid_signature_only():
+    verifier = _verifier()
+    headers = signature_headers(SECRET, b"image", "ana_1", now=NOW)
+
+    with pytest.raises(UnauthorizedError):
+        verifier.verify(_check(verifier, {**headers, SIGNATURE_HEADER: "0" * 64}), body_digest(b"image"), "ana_1")
+    verifier.verify(_check(verifier, headers), body_digest(b"image"), "ana_1")
+
+    with pytest.raises(UnauthorizedError):
+        _check(verifier, headers)